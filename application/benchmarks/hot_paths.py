@@ -0,0 +1,257 @@
+"""Time the comparison, formatting, service history and opening times hot paths of service sync.
+
+The fixtures are derived from test_resources/STANDARD_EVENT.json, with its specified opening dates moved to next year
+so they are not removed as past dates. The unchanged DoS service is in line with the change event, so comparing them
+finds no changes, and the changed DoS service differs in its phone, website, address, Monday opening times and
+specified opening times, so every comparison finds a change and adds it to the service history.
+
+Run from the application directory:
+    python -m benchmarks.hot_paths [--number 2000] [--runs 1] [--json hot_paths.json] [--baseline previous.json]
+        [--max-regression 20] [--log-level ERROR] [case ...]
+
+Each case reports the median over --runs runs of the best time per call in microseconds over five repeats. With
+--baseline the run is compared against a previous --json report and exits with a non-zero status if any case
+regressed by more than --max-regression percent. Timings depend on the machine, so the baseline should be recorded
+on the same machine, from the commit being compared against.
+"""
+
+import json
+import sys
+from argparse import ArgumentParser
+from collections.abc import Callable
+from datetime import date
+from os import environ
+from pathlib import Path
+from platform import node, python_version
+from statistics import median
+from timeit import repeat
+from typing import Any
+
+from benchmarks.import_time import APPLICATION_DIR, IMPORT_ENVIRONMENT
+
+STANDARD_EVENT_PATH = APPLICATION_DIR / "test_resources" / "STANDARD_EVENT.json"
+# Cases that moved by less than this are treated as noise when comparing against a baseline
+MIN_REGRESSION_US = 0.5
+
+
+def load_change_event() -> dict[str, Any]:
+    """Loads the standard change event with its specified opening dates moved to next year.
+
+    Returns:
+        dict[str, Any]: The change event
+    """
+    change_event = json.loads(STANDARD_EVENT_PATH.read_text(encoding="utf8"))
+    next_year = str(date.today().year + 1)  # noqa: DTZ011
+    for opening_time in change_event["OpeningTimes"]:
+        if opening_time["AdditionalOpeningDate"]:
+            opening_time["AdditionalOpeningDate"] = f"{opening_time['AdditionalOpeningDate'][:-4]}{next_year}"
+    return change_event
+
+
+def dos_snapshot_record(change_event: dict[str, Any]) -> dict[str, Any]:
+    """Builds a DoS snapshot record of a pharmacy service in line with a change event.
+
+    Args:
+        change_event (dict[str, Any]): The change event
+
+    Returns:
+        dict[str, Any]: DoS snapshot record, in the format described in common.dos_snapshot
+    """
+    from service_sync.data_processing.formatting import format_address, format_public_phone, format_website
+
+    from common.nhs import NHSEntity
+    from common.opening_times import WEEKDAYS
+
+    nhs_entity = NHSEntity(change_event)
+    return {
+        "id": 2,
+        "uid": "100002",
+        "name": nhs_entity.org_name,
+        "odscode": nhs_entity.odscode,
+        "address": "$".join(format_address(line) for line in nhs_entity.address_lines),
+        "town": change_event["City"].upper(),
+        "postcode": nhs_entity.postcode,
+        "web": format_website(nhs_entity.website),
+        "typeid": 13,
+        "statusid": 1,
+        "publicphone": format_public_phone(nhs_entity.phone),
+        "publicname": nhs_entity.org_name,
+        "standard_opening_times": [
+            [weekday.title(), open_period.start.isoformat(), open_period.end.isoformat()]
+            for weekday in WEEKDAYS
+            for open_period in nhs_entity.standard_opening_times.get_openings(weekday)
+        ],
+        "specified_opening_times": [
+            [specified_opening_time.date.isoformat(), open_period.start.isoformat(), open_period.end.isoformat(), False]
+            if specified_opening_time.is_open
+            else [specified_opening_time.date.isoformat(), "00:00:00", "00:00:00", True]
+            for specified_opening_time in nhs_entity.specified_opening_times
+            for open_period in specified_opening_time.open_periods or [None]
+        ],
+        "sgsds": [],
+    }
+
+
+def build_cases(change_event: dict[str, Any]) -> dict[str, Callable[[], Any]]:
+    """Builds the benchmark cases, importing the lambda code after the log level is set.
+
+    Args:
+        change_event (dict[str, Any]): The change event the fixtures are derived from
+
+    Returns:
+        dict[str, Callable[[], Any]]: Function timed for each case, by case name
+    """
+    from service_sync.data_processing.check_for_change import compare_nhs_uk_and_dos_data
+    from service_sync.data_processing.formatting import format_address, format_public_phone, format_website
+    from service_sync.data_processing.service_histories import ServiceHistories
+
+    from common.constants import DOS_PALLIATIVE_CARE_SGSDID, DOS_STANDARD_OPENING_TIMES_MONDAY_CHANGE_KEY
+    from common.dos_snapshot import dos_service_from_snapshot
+    from common.nhs import NHSEntity
+    from common.opening_times import OpenPeriod, SpecifiedOpeningTime
+
+    record = dos_snapshot_record(change_event)
+    unchanged_service = dos_service_from_snapshot(record)
+    changed_service = dos_service_from_snapshot(
+        record
+        | {
+            "address": "Old Address$Bath",
+            "web": "www.old-website.co.uk",
+            "publicphone": "01000000000",
+            "standard_opening_times": [["Monday", "09:00:00", "17:00:00"], *record["standard_opening_times"][2:]],
+            "specified_opening_times": record["specified_opening_times"][1:],
+        },
+    )
+    nhs_entity = NHSEntity(change_event)
+    address_lines = nhs_entity.address_lines
+    open_periods = nhs_entity.standard_opening_times.get_openings("monday")
+    changed_open_periods = changed_service.standard_opening_times.get_openings("monday")
+    specified_opening_times = nhs_entity.specified_opening_times
+    changed_specified_opening_times = changed_service.specified_opening_times
+
+    def new_service_histories() -> ServiceHistories:
+        service_histories = ServiceHistories(service_id=unchanged_service.id)
+        service_histories.create_service_histories_entry()
+        return service_histories
+
+    def compare(dos_service: Any) -> Any:  # noqa: ANN401
+        # Each comparison gets its own NHSEntity as service sync does, as the comparison formats its fields
+        return compare_nhs_uk_and_dos_data(
+            dos_service=dos_service,
+            nhs_entity=NHSEntity(change_event),
+            service_histories=new_service_histories(),
+        )
+
+    return {
+        "nhs_entity": lambda: NHSEntity(change_event),
+        "compare_unchanged": lambda: compare(unchanged_service),
+        "compare_changed": lambda: compare(changed_service),
+        "format_address": lambda: [format_address(line) for line in address_lines],
+        "format_website": lambda: format_website(nhs_entity.website),
+        "format_public_phone": lambda: format_public_phone(nhs_entity.phone),
+        "history_standard_opening_times": lambda: new_service_histories().add_standard_opening_times_change(
+            current_opening_times=changed_service.standard_opening_times,
+            new_opening_times=nhs_entity.standard_opening_times,
+            weekday="monday",
+            dos_weekday_change_key=DOS_STANDARD_OPENING_TIMES_MONDAY_CHANGE_KEY,
+        ),
+        "history_specified_opening_times": lambda: new_service_histories().add_specified_opening_times_change(
+            current_opening_times=changed_specified_opening_times,
+            new_opening_times=specified_opening_times,
+        ),
+        "history_sgsdid": lambda: new_service_histories().add_sgsdid_change(
+            sgsdid=DOS_PALLIATIVE_CARE_SGSDID,
+            new_value=True,
+        ),
+        "open_period_from_string_times": lambda: OpenPeriod.from_string_times("09:00", "17:30"),
+        "open_period_equal_lists": lambda: OpenPeriod.equal_lists(open_periods, changed_open_periods),
+        "open_period_any_overlaps": lambda: OpenPeriod.any_overlaps(open_periods),
+        "specified_equal_lists": lambda: SpecifiedOpeningTime.equal_lists(
+            specified_opening_times,
+            changed_specified_opening_times,
+        ),
+        "specified_valid_list": lambda: SpecifiedOpeningTime.valid_list(specified_opening_times),
+        "specified_remove_past_dates": lambda: SpecifiedOpeningTime.remove_past_dates(specified_opening_times),
+    }
+
+
+def best_time(func: Callable[[], Any], number: int) -> float:
+    """Best time per call in microseconds over five repeats."""
+    return min(repeat(func, number=number, repeat=5)) / number * 1_000_000
+
+
+def median_best_time(func: Callable[[], Any], number: int, runs: int) -> float:
+    """Median over a number of runs of the best time per call in microseconds."""
+    return median(best_time(func, number) for _ in range(runs))
+
+
+def find_regressions(report: dict[str, Any], baseline: dict[str, Any], max_regression: float) -> list[str]:
+    """Compare a report against a baseline report.
+
+    Args:
+        report (dict[str, Any]): Report from this run
+        baseline (dict[str, Any]): Report from a previous run
+        max_regression (float): Percentage a case may slow down by before it counts as a regression
+
+    Returns:
+        list[str]: Description of each regressed case
+    """
+    regressions = []
+    for case, current_us in report["cases_us"].items():
+        previous_us = baseline["cases_us"].get(case)
+        if not previous_us:
+            continue
+        change = (current_us - previous_us) / previous_us * 100
+        if change > max_regression and current_us - previous_us > MIN_REGRESSION_US:
+            regressions.append(f"{case} {previous_us} -> {current_us} us (+{change:.0f}%)")
+    return regressions
+
+
+def main() -> None:
+    """Run the hot path benchmark, print a table and optionally compare against a baseline."""
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("cases", nargs="*", help="Cases to run, all if none are given")
+    parser.add_argument("--number", type=int, default=2000, help="Calls per repeat")
+    parser.add_argument("--runs", type=int, default=1, help="Runs of each case to take the median of")
+    parser.add_argument("--json", type=Path, help="Write the report to this file")
+    parser.add_argument("--baseline", type=Path, help="Report from a previous run on this machine to compare against")
+    parser.add_argument("--max-regression", type=float, default=20, help="Allowed increase in percent")
+    parser.add_argument("--log-level", default="ERROR", help="Log level of the lambda code")
+    args = parser.parse_args()
+
+    # The loggers read their level when the lambda code is imported
+    environ.update(IMPORT_ENVIRONMENT | {"LOG_LEVEL": args.log_level})
+    cases = build_cases(load_change_event())
+    if unknown_cases := set(args.cases) - set(cases):
+        parser.error(f"Unknown cases: {', '.join(sorted(unknown_cases))}")
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf8")) if args.baseline else None
+    if baseline and (baseline.get("host"), baseline.get("python")) != (node(), python_version()):
+        print(
+            f"Baseline was run on {baseline.get('host')} with Python {baseline.get('python')}, "
+            "so timings are not comparable",
+        )
+    report = {"host": node(), "python": python_version(), "number": args.number, "runs": args.runs, "cases_us": {}}
+    print(f"{'case':<36}{'us per call':>14}" + (f"{'baseline':>14}{'change':>10}" if baseline else ""))
+    for name, func in cases.items():
+        if args.cases and name not in args.cases:
+            continue
+        report["cases_us"][name] = current_us = round(median_best_time(func, args.number, args.runs), 2)
+        line = f"{name:<36}{current_us:>14.2f}"
+        if baseline and (previous_us := baseline["cases_us"].get(name)):
+            line += f"{previous_us:>14.2f}{(current_us - previous_us) / previous_us * 100:>+9.0f}%"
+        print(line)
+    if args.json:
+        args.json.write_text(f"{json.dumps(report, indent=2)}\n", encoding="utf8")
+        print(f"Report written to {args.json}")
+    if baseline:
+        regressions = find_regressions(report, baseline, args.max_regression)
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions over {args.max_regression}% against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
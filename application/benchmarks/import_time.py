@@ -0,0 +1,122 @@
+"""Measure the import time of every lambda handler module using python -X importtime.
+
+Each lambda is imported in a fresh interpreter, as it would be in a new lambda container,
+and the fastest of the repeats is reported with the top level packages that took the most time.
+
+Run from the application directory:
+    python -m benchmarks.import_time [--repeat 5] [--top 5] [--json import_time.json] [lambda ...]
+"""
+
+import json
+import sys
+from argparse import ArgumentParser
+from collections import defaultdict
+from os import environ
+from pathlib import Path
+from subprocess import run
+
+APPLICATION_DIR = Path(__file__).parent.parent
+LAMBDAS = (
+    "change_event_dlq_handler",
+    "dos_db_handler",
+    "dos_db_update_dlq_handler",
+    "event_replay",
+    "ingest_change_event",
+    "quality_checker",
+    "send_email",
+    "service_matcher",
+    "service_sync",
+    "slack_messenger",
+)
+# Environment variables some modules read at import time
+IMPORT_ENVIRONMENT = {"AWS_REGION": "eu-west-2", "AWS_DEFAULT_REGION": "eu-west-2"}
+
+
+def parse_import_time(output: str) -> list[tuple[str, int, int]]:
+    """Parse the stderr of python -X importtime.
+
+    Args:
+        output (str): stderr of the interpreter
+
+    Returns:
+        list[tuple[str, int, int]]: Module name, self time and cumulative time in microseconds
+    """
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_time, cumulative_time, name = line.removeprefix("import time:").split("|")
+        modules.append((name.strip(), int(self_time), int(cumulative_time)))
+    return modules
+
+
+def measure_import_time(lambda_name: str) -> list[tuple[str, int, int]]:
+    """Import a lambda handler module in a fresh interpreter.
+
+    Args:
+        lambda_name (str): Lambda name e.g. service_sync
+
+    Returns:
+        list[tuple[str, int, int]]: Module name, self time and cumulative time in microseconds
+    """
+    handler_module = f"{lambda_name}.{lambda_name}"
+    result = run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", f"import {handler_module}"],
+        cwd=APPLICATION_DIR,
+        env=IMPORT_ENVIRONMENT | environ,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_import_time(result.stderr)
+
+
+def summarise(lambda_name: str, modules: list[tuple[str, int, int]], top: int) -> dict:
+    """Summarise an import of a lambda handler module.
+
+    Args:
+        lambda_name (str): Lambda name e.g. service_sync
+        modules (list[tuple[str, int, int]]): Parsed import times
+        top (int): Number of top level packages to include
+
+    Returns:
+        dict: Total import time of the handler and the slowest top level packages in milliseconds
+    """
+    handler_module = f"{lambda_name}.{lambda_name}"
+    total = next(cumulative for name, _, cumulative in modules if name == handler_module)
+    packages = defaultdict(int)
+    for name, self_time, _ in modules:
+        packages[name.split(".")[0]] += self_time
+    slowest = sorted(packages.items(), key=lambda package: package[1], reverse=True)[:top]
+    return {
+        "lambda": lambda_name,
+        "import_ms": round(total / 1000, 1),
+        "modules": len(modules),
+        "packages_ms": {package: round(self_time / 1000, 1) for package, self_time in slowest},
+    }
+
+
+def main() -> None:
+    """Run the import time benchmark and print a table."""
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("lambdas", nargs="*", default=LAMBDAS, help="Lambdas to measure, defaults to all")
+    parser.add_argument("--repeat", type=int, default=5, help="Imports per lambda, the fastest is reported")
+    parser.add_argument("--top", type=int, default=5, help="Slowest top level packages to show")
+    parser.add_argument("--json", type=Path, help="Write the report to this file")
+    args = parser.parse_args()
+
+    report = []
+    for lambda_name in args.lambdas:
+        runs = [summarise(lambda_name, measure_import_time(lambda_name), args.top) for _ in range(args.repeat)]
+        summary = min(runs, key=lambda run: run["import_ms"])
+        report.append(summary)
+        packages = ", ".join(f"{package} {time_ms}" for package, time_ms in summary["packages_ms"].items())
+        print(f"{lambda_name:<28}{summary['import_ms']:>9.1f} ms  {summary['modules']:>5} modules  {packages}")
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2), encoding="utf8")
+        print(f"Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
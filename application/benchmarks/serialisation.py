@@ -0,0 +1,58 @@
+"""Compare the JSON and DynamoDB serialisation paths on the standard change event.
+
+Run from the application directory:
+    python -m benchmarks.serialisation [--number 2000]
+"""
+
+import json
+from argparse import ArgumentParser
+from collections.abc import Callable
+from decimal import Decimal
+from pathlib import Path
+from timeit import repeat
+from typing import Any
+
+from boto3.dynamodb.types import TypeSerializer
+
+from common.serialisation import JSON_BACKEND, dumps, loads, to_dynamodb_item
+
+STANDARD_EVENT_PATH = Path(__file__).parent.parent / "test_resources" / "STANDARD_EVENT.json"
+
+
+def stdlib_dynamodb_item(item: dict[str, Any]) -> dict[str, Any]:
+    """The original DynamoDB item conversion, a Decimal round trip followed by TypeSerializer."""
+    serializer = TypeSerializer()
+    decimal_item = json.loads(json.dumps(item), parse_float=Decimal)
+    return {k: serializer.serialize(v) for k, v in decimal_item.items()}
+
+
+def best_time(func: Callable[[], Any], number: int) -> float:
+    """Best time per call in microseconds over five repeats."""
+    return min(repeat(func, number=number, repeat=5)) / number * 1_000_000
+
+
+def main() -> None:
+    """Run the serialisation benchmark and print a comparison table."""
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=2000, help="Calls per repeat")
+    args = parser.parse_args()
+
+    change_event_json = STANDARD_EVENT_PATH.read_text(encoding="utf8")
+    change_event = json.loads(change_event_json)
+    item = {"Id": "benchmark", "ODSCode": change_event["ODSCode"], "SequenceNumber": 1, "Event": change_event}
+
+    cases = [
+        ("decode", lambda: json.loads(change_event_json), lambda: loads(change_event_json)),
+        ("encode", lambda: json.dumps(change_event), lambda: dumps(change_event)),
+        ("dynamodb item", lambda: stdlib_dynamodb_item(item), lambda: to_dynamodb_item(item)),
+    ]
+    print(f"JSON backend: {JSON_BACKEND}, payload: {len(change_event_json)} bytes, {args.number} calls per repeat")
+    print(f"{'case':<15}{'stdlib (us)':>14}{'common (us)':>14}{'speed up':>10}")
+    for name, baseline, candidate in cases:
+        baseline_time = best_time(baseline, args.number)
+        candidate_time = best_time(candidate, args.number)
+        print(f"{name:<15}{baseline_time:>14.2f}{candidate_time:>14.2f}{baseline_time / candidate_time:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
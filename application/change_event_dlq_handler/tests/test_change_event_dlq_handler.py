@@ -1,4 +1,3 @@
-from json import dumps
 from typing import Any
 from unittest.mock import MagicMock, patch
 
@@ -6,6 +5,7 @@ import pytest
 from aws_lambda_powertools.utilities.typing import LambdaContext
 
 from application.change_event_dlq_handler.change_event_dlq_handler import lambda_handler
+from application.common.serialisation import dumps
 from application.conftest import PHARMACY_STANDARD_EVENT, PHARMACY_STANDARD_EVENT_STAFF
 
 FILE_PATH = "application.change_event_dlq_handler.change_event_dlq_handler"
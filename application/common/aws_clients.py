@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from functools import cache
+from os import environ
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from botocore.client import BaseClient
+
+
+def get_client(service_name: str) -> BaseClient:
+    """Get the boto3 client for an AWS service.
+
+    Clients are created on first use and then reused for the life of the lambda container,
+    so lambdas only pay for importing boto3 and creating the clients they actually use.
+
+    Args:
+        service_name (str): AWS service name e.g. sqs
+
+    Returns:
+        BaseClient: boto3 client for the service
+    """
+    return _create_client(service_name, environ.get("AWS_REGION"))
+
+
+@cache
+def _create_client(service_name: str, region_name: str | None) -> BaseClient:
+    """Create a boto3 client, cached per service and region."""
+    from boto3 import client
+
+    return client(service_name, region_name=region_name)
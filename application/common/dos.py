@@ -17,10 +17,76 @@ from .constants import (
 from .dos_db_connection import connect_to_db_reader, query_dos_db
 from .dos_location import DoSLocation
 from .opening_times import OpenPeriod, SpecifiedOpeningTime, StandardOpeningTimes
+from .postcode_index import get_loaded_location_region, normalise_postcode
+from .query_registry import register_query
+from .reference_data import get_reference_data
 from common.commissioned_service_type import BLOOD_PRESSURE, CONTRACEPTION, CommissionedServiceType
 
 logger = Logger(child=True)
 dos_location_cache = {}
+# Service types and statuses of the DoS services matched to an NHS UK pharmacy by ODS code
+MATCHING_PHARMACY_SERVICE_TYPE_IDS = [13, 131, 132, 134, 137]
+MATCHING_PHARMACY_FIRST_SERVICE_TYPE_IDS = [148, 149]
+MATCHING_PHARMACY_FIRST_STATUS_IDS = [DOS_ACTIVE_STATUS_ID, DOS_CLOSED_STATUS_ID, DOS_COMMISSIONING_STATUS_ID]
+GET_MATCHING_DOS_SERVICES_QUERY = register_query(
+    "get_matching_dos_services",
+    "SELECT id, uid, name, odscode, address, postcode, web, typeid, statusid, publicphone, publicname "
+    "FROM services s "
+    "WHERE s.odscode LIKE %(ODS)s AND s.typeid = ANY(%(PHARMACY_SERVICE_TYPE_IDS)s) "
+    "AND s.statusid = %(ACTIVE_STATUS_ID)s OR s.odscode LIKE %(ODS)s "
+    "AND s.typeid = ANY(%(PHARMACY_FIRST_SERVICE_TYPE_IDS)s) AND s.statusid = ANY(%(PHARMACY_FIRST_STATUSES)s)",
+)
+GET_DOS_LOCATIONS_QUERY = register_query(
+    "get_dos_locations",
+    f"SELECT {', '.join(field.name for field in fields(DoSLocation))} "  # noqa: S608
+    "FROM locations WHERE postcode = ANY(%(pc_variations)s)",
+    # Safe as the columns come from DoSLocation and the postcodes are passed to psycopg as variables
+)
+GET_SPECIFIED_OPENING_TIMES_QUERY = register_query(
+    "get_specified_opening_times",
+    "SELECT ssod.serviceid, ssod.date, ssot.starttime, ssot.endtime, ssot.isclosed "
+    "FROM servicespecifiedopeningdates ssod "
+    "INNER JOIN servicespecifiedopeningtimes ssot "
+    "ON ssod.id = ssot.servicespecifiedopeningdateid "
+    "WHERE ssod.serviceid = %(SERVICE_ID)s",
+)
+GET_STANDARD_OPENING_TIMES_QUERY = register_query(
+    "get_standard_opening_times",
+    "SELECT sdo.serviceid, sdo.dayid, sdot.starttime, sdot.endtime "
+    "FROM servicedayopenings sdo "
+    "INNER JOIN servicedayopeningtimes sdot "
+    "ON sdo.id = sdot.servicedayopeningid "
+    "WHERE sdo.serviceid = %(SERVICE_ID)s",
+)
+HAS_PALLIATIVE_CARE_QUERY = register_query(
+    "has_palliative_care",
+    """SELECT sgsds.id as z_code from servicesgsds sgsds
+            WHERE sgsds.serviceid = %(SERVICE_ID)s
+            AND sgsds.sgid = %(PALLIATIVE_CARE_SYMPTOM_GROUP)s
+            AND sgsds.sdid  = %(PALLIATIVE_CARE_SYMPTOM_DISCRIMINATOR)s
+            """,
+)
+GET_REGION_QUERY = register_query(
+    "get_region",
+    """WITH
+RECURSIVE servicetree as
+(SELECT ser.parentid, ser.id, ser.uid, ser.name, 1 AS lvl
+FROM services ser where ser.id = %(SERVICE_ID)s
+UNION ALL
+SELECT ser.parentid, st.id, ser.uid, ser.name, lvl+1 AS lvl
+FROM services ser
+INNER JOIN servicetree st ON ser.id = st.parentid),
+serviceregion as
+(SELECT st.*, ROW_NUMBER() OVER (PARTITION BY st.id ORDER BY st.lvl desc) rn
+FROM servicetree st)
+SELECT sr.name region
+FROM serviceregion sr
+INNER JOIN services ser ON sr.id = ser.id
+LEFT OUTER JOIN services par ON ser.parentid = par.id
+WHERE sr.rn=1
+ORDER BY ser.name
+    """,
+)
 
 
 @dataclass
@@ -119,29 +185,52 @@ def get_matching_dos_services(odscode: str) -> list[DoSService]:
     """
     named_args = {
         "ODS": f"{odscode[:5]}%",
-        "PHARMACY_SERVICE_TYPE_IDS": [13, 131, 132, 134, 137],
+        "PHARMACY_SERVICE_TYPE_IDS": MATCHING_PHARMACY_SERVICE_TYPE_IDS,
         "ACTIVE_STATUS_ID": DOS_ACTIVE_STATUS_ID,
-        "PHARMACY_FIRST_SERVICE_TYPE_IDS": [148, 149],
-        "PHARMACY_FIRST_STATUSES": [DOS_ACTIVE_STATUS_ID, DOS_CLOSED_STATUS_ID, DOS_COMMISSIONING_STATUS_ID],
+        "PHARMACY_FIRST_SERVICE_TYPE_IDS": MATCHING_PHARMACY_FIRST_SERVICE_TYPE_IDS,
+        "PHARMACY_FIRST_STATUSES": MATCHING_PHARMACY_FIRST_STATUS_IDS,
     }
-    sql_query = (
-        "SELECT s.id, uid, s.name, odscode, address, postcode, web, typeid,"
-        "statusid, ss.name status_name, publicphone, publicname, st.name service_type_name "
-        "FROM services s LEFT JOIN servicetypes st ON s.typeid = st.id "
-        "LEFT JOIN servicestatuses ss on s.statusid = ss.id "
-        "WHERE s.odscode LIKE %(ODS)s AND s.typeid = ANY(%(PHARMACY_SERVICE_TYPE_IDS)s) "
-        "AND s.statusid = %(ACTIVE_STATUS_ID)s OR s.odscode LIKE %(ODS)s "
-        "AND s.typeid = ANY(%(PHARMACY_FIRST_SERVICE_TYPE_IDS)s) AND s.statusid = ANY(%(PHARMACY_FIRST_STATUSES)s)"
-    )
     with connect_to_db_reader() as connection:
-        cursor = query_dos_db(connection=connection, query=sql_query, query_vars=named_args)
+        cursor = query_dos_db(connection=connection, query=GET_MATCHING_DOS_SERVICES_QUERY, query_vars=named_args)
         # Create list of DoSService objects from returned rows
         services = [DoSService(row) for row in cursor.fetchall()]
         cursor.close()
+        add_reference_data_names(services, connection)
         # Connection closed by context manager
     return services
 
 
+def is_matchable_dos_service(service: DoSService) -> bool:
+    """Checks if a DoS service has a type and status that get_matching_dos_services would match.
+
+    Args:
+        service (DoSService): The DoS service to check
+
+    Returns:
+        bool: True if the service would be matched to an NHS UK pharmacy with the same ODS code prefix
+    """
+    if service.typeid in MATCHING_PHARMACY_SERVICE_TYPE_IDS:
+        return service.statusid == DOS_ACTIVE_STATUS_ID
+    if service.typeid in MATCHING_PHARMACY_FIRST_SERVICE_TYPE_IDS:
+        return service.statusid in MATCHING_PHARMACY_FIRST_STATUS_IDS
+    return False
+
+
+def add_reference_data_names(services: list[DoSService], connection: Connection) -> None:
+    """Sets the service type and status names of DoS services from the reference data.
+
+    Args:
+        services (list[DoSService]): DoS services with typeid and statusid set
+        connection (Connection): Connection to the DoS database, only used if the reference data is loaded
+    """
+    if not services:
+        return
+    reference_data = get_reference_data(connection)
+    for service in services:
+        service.service_type_name = reference_data.service_types.get(service.typeid)
+        service.status_name = reference_data.service_statuses.get(service.statusid)
+
+
 def get_dos_locations(postcode: str | None = None, try_cache: bool = True) -> list[DoSLocation]:
     """Retrieves DoS Locations from DoS database.
 
@@ -161,16 +250,10 @@ def get_dos_locations(postcode: str | None = None, try_cache: bool = True) -> li
 
     # Search for any variation of whitespace in postcode
     postcode_variations = [norm_pc] + [f"{norm_pc[:i]} {norm_pc[i:]}" for i in range(1, len(norm_pc))]
-    db_column_names = [f.name for f in fields(DoSLocation)]
-    sql_command = (
-        f"SELECT {', '.join(db_column_names)} FROM locations WHERE postcode = ANY(%(pc_variations)s)"  # noqa: S608
-        # Safe as conditional is configurable but variables is inputted to psycopg as variables
-    )
-
     with connect_to_db_reader() as connection:
         cursor = query_dos_db(
             connection=connection,
-            query=sql_command,
+            query=GET_DOS_LOCATIONS_QUERY,
             query_vars={"pc_variations": postcode_variations},
         )
         dos_locations = [DoSLocation(**row) for row in cursor.fetchall()]
@@ -184,12 +267,18 @@ def get_dos_locations(postcode: str | None = None, try_cache: bool = True) -> li
 def get_valid_dos_location(postcode: str) -> DoSLocation | None:
     """Gets the valid DoS location for the given postcode.
 
+    If a batch caller has loaded the postcode's region into the postcode index, the location is taken from the
+    index. Otherwise the postcode's variations are queried, as loading a region for one postcode costs far more.
+
     Args:
         postcode (str): The postcode to search for.
 
     Returns:
         Optional[DoSLocation]: The valid DoS location for the given postcode or None if no valid location is found.
     """
+    normal_postcode = normalise_postcode(postcode)
+    if (location_region := get_loaded_location_region(normal_postcode)) is not None:
+        return location_region.get_valid(normal_postcode)
     dos_locations = [loc for loc in get_dos_locations(postcode) if loc.is_valid()]
     return dos_locations[0] if dos_locations else None
 
@@ -206,16 +295,8 @@ def get_specified_opening_times_from_db(connection: Connection, service_id: int)
         matching serviceid
     """
     logger.debug(f"Searching for specified opening times with serviceid that matches '{service_id}'")
-
-    sql_query = (
-        "SELECT ssod.serviceid, ssod.date, ssot.starttime, ssot.endtime, ssot.isclosed "
-        "FROM servicespecifiedopeningdates ssod "
-        "INNER JOIN servicespecifiedopeningtimes ssot "
-        "ON ssod.id = ssot.servicespecifiedopeningdateid "
-        "WHERE ssod.serviceid = %(SERVICE_ID)s"
-    )
     named_args = {"SERVICE_ID": service_id}
-    cursor = query_dos_db(connection=connection, query=sql_query, query_vars=named_args)
+    cursor = query_dos_db(connection=connection, query=GET_SPECIFIED_OPENING_TIMES_QUERY, query_vars=named_args)
     specified_opening_times = db_rows_to_spec_open_times(cursor.fetchall())
     cursor.close()
     return specified_opening_times
@@ -228,20 +309,16 @@ def get_standard_opening_times_from_db(connection: Connection, service_id: int)
     with no opening periods.
     """
     logger.debug(f"Searching for standard opening times with serviceid that matches '{service_id}'")
-    sql_command = (
-        "SELECT sdo.serviceid, sdo.dayid, otd.name, sdot.starttime, sdot.endtime "
-        "FROM servicedayopenings sdo "
-        "INNER JOIN servicedayopeningtimes sdot "
-        "ON sdo.id = sdot.servicedayopeningid "
-        "LEFT JOIN openingtimedays otd "
-        "ON sdo.dayid = otd.id "
-        "WHERE sdo.serviceid = %(SERVICE_ID)s"
-    )
     named_args = {"SERVICE_ID": service_id}
-    cursor = query_dos_db(connection=connection, query=sql_command, query_vars=named_args)
-    standard_opening_times = db_rows_to_std_open_times(cursor.fetchall())
+    cursor = query_dos_db(connection=connection, query=GET_STANDARD_OPENING_TIMES_QUERY, query_vars=named_args)
+    db_rows = cursor.fetchall()
     cursor.close()
-    return standard_opening_times
+    if db_rows:
+        # Day names come from the reference data rather than joining openingtimedays
+        opening_time_days = get_reference_data(connection).opening_time_days
+        for row in db_rows:
+            row["name"] = opening_time_days.get(row["dayid"])
+    return db_rows_to_std_open_times(db_rows)
 
 
 def db_rows_to_spec_open_times(db_rows: Iterable[dict]) -> list[SpecifiedOpeningTime]:
@@ -290,17 +367,12 @@ def has_palliative_care(service: DoSService, connection: Connection) -> bool:
         True if the service has palliative care, False otherwise
     """
     if service.typeid in PHARMACY_SERVICE_TYPE_IDS:
-        sql_command = """SELECT sgsds.id as z_code from servicesgsds sgsds
-            WHERE sgsds.serviceid = %(SERVICE_ID)s
-            AND sgsds.sgid = %(PALLIATIVE_CARE_SYMPTOM_GROUP)s
-            AND sgsds.sdid  = %(PALLIATIVE_CARE_SYMPTOM_DISCRIMINATOR)s
-            """
         named_args = {
             "SERVICE_ID": service.id,
             "PALLIATIVE_CARE_SYMPTOM_GROUP": DOS_PALLIATIVE_CARE_SYMPTOM_GROUP,
             "PALLIATIVE_CARE_SYMPTOM_DISCRIMINATOR": DOS_PALLIATIVE_CARE_SYMPTOM_DISCRIMINATOR,
         }
-        cursor = query_dos_db(connection=connection, query=sql_command, query_vars=named_args)
+        cursor = query_dos_db(connection=connection, query=HAS_PALLIATIVE_CARE_QUERY, query_vars=named_args)
         cursor.fetchall()
         logger.debug("Checked if service has palliative care", has_palliative_care=cursor.rowcount != 0)
         return cursor.rowcount != 0
@@ -359,26 +431,8 @@ def get_region(dos_service_id: str) -> str:
     """
     with connect_to_db_reader() as connection:
         logger.debug("Getting region for service")
-        sql_command = """WITH
-RECURSIVE servicetree as
-(SELECT ser.parentid, ser.id, ser.uid, ser.name, 1 AS lvl
-FROM services ser where ser.id = %(SERVICE_ID)s
-UNION ALL
-SELECT ser.parentid, st.id, ser.uid, ser.name, lvl+1 AS lvl
-FROM services ser
-INNER JOIN servicetree st ON ser.id = st.parentid),
-serviceregion as
-(SELECT st.*, ROW_NUMBER() OVER (PARTITION BY st.id ORDER BY st.lvl desc) rn
-FROM servicetree st)
-SELECT sr.name region
-FROM serviceregion sr
-INNER JOIN services ser ON sr.id = ser.id
-LEFT OUTER JOIN services par ON ser.parentid = par.id
-WHERE sr.rn=1
-ORDER BY ser.name
-    """
         named_args = {"SERVICE_ID": dos_service_id}
-        cursor = query_dos_db(connection=connection, query=sql_command, query_vars=named_args)
+        cursor = query_dos_db(connection=connection, query=GET_REGION_QUERY, query_vars=named_args)
         region_response = cursor.fetchone()
         region_name = region_response["region"] if region_response else "Region not found"
         logger.debug("Got region for service", region_name=region_name)
@@ -1,14 +1,16 @@
 from collections.abc import Generator
 from contextlib import contextmanager
 from os import environ
-from time import time_ns
+from time import perf_counter
 from typing import Any, LiteralString
 
 from aws_lambda_powertools.logging import Logger
-from psycopg import Connection, Cursor, connect
+from psycopg import Connection, Cursor, ServerCursor, connect, pq
 from psycopg.rows import DictRow, dict_row
 
+from common.query_registry import DoSQuery, record_query
 from common.secretsmanager import get_secret
+from common.stage_metrics import record_stage_duration, time_stage
 
 logger = Logger(child=True)
 db_connection = None
@@ -91,36 +93,52 @@ def connection_to_db(
         f"Attempting connection to database: '{server}', host={server}, port={port}, "
         f"dbname={db_name}, schema={db_schema}, user={db_user}",
     )
-    return connect(
-        host=server,
-        port=port,
-        dbname=db_name,
-        user=db_user,
-        password=db_password,
-        connect_timeout=2,
-        options=f"-c search_path=dbo,{db_schema}",
-        application_name="DOS INTEGRATION <psycopg>",
-    )
+    with time_stage("db_connect"):
+        return connect(
+            host=server,
+            port=port,
+            dbname=db_name,
+            user=db_user,
+            password=db_password,
+            connect_timeout=2,
+            options=f"-c search_path=dbo,{db_schema}",
+            application_name="DOS INTEGRATION <psycopg>",
+        )
 
 
 def query_dos_db(
     connection: Connection,
     query: LiteralString,
     query_vars: dict[str, Any] | None = None,
-) -> Cursor[DictRow]:
+    cursor_name: str | None = None,
+) -> Cursor[DictRow] | ServerCursor[DictRow]:
     """Queries the database given in the connection object.
 
+    Queries sent in pipeline mode are not timed or recorded, as their results are only received when the
+    pipeline is synced, so their duration and row count are not known when they are sent.
+
     Args:
         connection (Connection): Connection to the database
-        query (str): Query to execute
+        query (str): Query to execute, registered queries (DoSQuery) have their statistics recorded under their name
         query_vars (Optional[Dict[str, Any]], optional): Variables to use in the query. Defaults to None.
+        cursor_name (Optional[str], optional): Name of a server side cursor to stream the results through,
+            instead of fetching them all when the query is executed. Defaults to None.
 
     Returns:
         DictRow: Cursor to the query results
     """
-    cursor = connection.cursor(row_factory=dict_row)
+    if cursor_name is None:
+        cursor = connection.cursor(row_factory=dict_row)
+    else:
+        cursor = connection.cursor(name=cursor_name, row_factory=dict_row)
     logger.debug("Query to execute", query=query, vars=query_vars)
-    time_start = time_ns() // 1000000
+    is_registered_query = isinstance(query, DoSQuery)
+    time_start = perf_counter()
     cursor.execute(query=query, params=query_vars)
-    logger.debug(f"DoS DB query completed in {(time_ns() // 1000000) - time_start}ms")
+    if connection.pgconn.pipeline_status in (pq.PipelineStatus.ON, pq.PipelineStatus.ABORTED):
+        return cursor
+    duration = (perf_counter() - time_start) * 1000
+    record_stage_duration(f"query.{query.name}" if is_registered_query else "query", duration)
+    record_query(query, duration, cursor.rowcount)
+    logger.debug(f"DoS DB query completed in {duration:.0f}ms")
     return cursor
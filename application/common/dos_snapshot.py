@@ -0,0 +1,266 @@
+import gzip
+from collections.abc import Generator, Iterable, Iterator
+from datetime import date, time
+from itertools import groupby
+from operator import itemgetter
+from pathlib import Path
+from typing import IO, Any, Self
+
+from aws_lambda_powertools.logging import Logger
+from psycopg import Connection
+
+from .constants import (
+    DOS_PALLIATIVE_CARE_SYMPTOM_DISCRIMINATOR,
+    DOS_PALLIATIVE_CARE_SYMPTOM_GROUP,
+    PHARMACY_SERVICE_TYPE_IDS,
+)
+from .dos import (
+    DoSService,
+    db_rows_to_spec_open_times,
+    db_rows_to_std_open_times,
+    has_blood_pressure,
+    has_contraception,
+)
+from .dos_db_connection import query_dos_db
+from .query_registry import DoSQuery, register_query
+from .reference_data import get_reference_data
+from .serialisation import dumps, loads
+
+logger = Logger(child=True)
+# Columns of the services table included in a DoS snapshot record, with the reference data names
+DOS_SNAPSHOT_SERVICE_FIELDS = (
+    "id",
+    "uid",
+    "name",
+    "odscode",
+    "address",
+    "town",
+    "postcode",
+    "web",
+    "typeid",
+    "statusid",
+    "publicphone",
+    "publicname",
+    "easting",
+    "northing",
+    "latitude",
+    "longitude",
+    "service_type_name",
+    "status_name",
+)
+# Rows fetched from each server side cursor at a time, which bounds the memory used by an export
+DOS_SNAPSHOT_FETCH_SIZE = 2000
+# Every query selects the services of these types, ordered by service id, so the rows can be merged in one pass
+DOS_SNAPSHOT_SERVICES_QUERY = register_query(
+    "dos_snapshot_services",
+    "SELECT id, uid, name, odscode, address, town, postcode, web, typeid, statusid, publicphone, publicname, "
+    "easting, northing, latitude, longitude FROM services "
+    "WHERE typeid = ANY(%(SERVICE_TYPE_IDS)s) AND odscode IS NOT NULL ORDER BY id",
+)
+DOS_SNAPSHOT_STANDARD_OPENING_TIMES_QUERY = register_query(
+    "dos_snapshot_standard_opening_times",
+    "SELECT sdo.serviceid, sdo.dayid, sdot.starttime, sdot.endtime "
+    "FROM servicedayopenings sdo "
+    "INNER JOIN servicedayopeningtimes sdot ON sdo.id = sdot.servicedayopeningid "
+    "INNER JOIN services s ON s.id = sdo.serviceid "
+    "WHERE s.typeid = ANY(%(SERVICE_TYPE_IDS)s) AND s.odscode IS NOT NULL ORDER BY sdo.serviceid",
+)
+DOS_SNAPSHOT_SPECIFIED_OPENING_TIMES_QUERY = register_query(
+    "dos_snapshot_specified_opening_times",
+    "SELECT ssod.serviceid, ssod.date, ssot.starttime, ssot.endtime, ssot.isclosed "
+    "FROM servicespecifiedopeningdates ssod "
+    "INNER JOIN servicespecifiedopeningtimes ssot ON ssod.id = ssot.servicespecifiedopeningdateid "
+    "INNER JOIN services s ON s.id = ssod.serviceid "
+    "WHERE s.typeid = ANY(%(SERVICE_TYPE_IDS)s) AND s.odscode IS NOT NULL "
+    "ORDER BY ssod.serviceid, ssod.date, ssot.starttime",
+)
+DOS_SNAPSHOT_SGSDS_QUERY = register_query(
+    "dos_snapshot_sgsds",
+    "SELECT sgsds.serviceid, sgsds.sgid, sgsds.sdid FROM servicesgsds sgsds "
+    "INNER JOIN services s ON s.id = sgsds.serviceid "
+    "WHERE s.typeid = ANY(%(SERVICE_TYPE_IDS)s) AND s.odscode IS NOT NULL ORDER BY sgsds.serviceid",
+)
+
+
+def open_dos_snapshot(path: Path, mode: str = "rt") -> IO[Any]:
+    """Opens a DoS snapshot file, which is gzip compressed if its name ends with .gz.
+
+    Args:
+        path (Path): Path to the DoS snapshot file
+        mode (str, optional): File mode. Defaults to "rt".
+
+    Returns:
+        IO[Any]: The open file
+    """
+    if path.suffix == ".gz":
+        return gzip.open(path, mode, encoding="utf-8")
+    return open(path, mode, encoding="utf-8")  # noqa: SIM115
+
+
+def read_dos_snapshot(path: Path) -> Generator[dict[str, Any], None, None]:
+    """Reads the records of a DoS snapshot file one at a time.
+
+    A DoS snapshot is NDJSON with one record per service. Each record has the DOS_SNAPSHOT_SERVICE_FIELDS and:
+        - standard_opening_times: [day name, start time, end time] for each open period
+        - specified_opening_times: [date, start time, end time, is closed] for each open period or closed date
+        - sgsds: [symptom group id, symptom discriminator id] for each sgsd on the service
+
+    Args:
+        path (Path): Path to the DoS snapshot file
+
+    Yields:
+        dict[str, Any]: DoS snapshot record
+    """
+    with open_dos_snapshot(path) as snapshot_file:
+        for line in snapshot_file:
+            if line.strip():
+                yield loads(line)
+
+
+def dos_service_from_snapshot(record: dict[str, Any]) -> DoSService:
+    """Creates a DoSService, with its opening times and commissioned services, from a DoS snapshot record.
+
+    Args:
+        record (dict[str, Any]): DoS snapshot record
+
+    Returns:
+        DoSService: The DoS service as it would be returned by get_dos_service_and_history
+    """
+    service = DoSService({field: record.get(field) for field in DOS_SNAPSHOT_SERVICE_FIELDS})
+    service.standard_opening_times = db_rows_to_std_open_times(
+        {"name": day, "starttime": time.fromisoformat(start), "endtime": time.fromisoformat(end)}
+        for day, start, end in record.get("standard_opening_times", [])
+    )
+    service.specified_opening_times = db_rows_to_spec_open_times(
+        {
+            "date": date.fromisoformat(specified_date),
+            "starttime": time.fromisoformat(start),
+            "endtime": time.fromisoformat(end),
+            "isclosed": is_closed,
+        }
+        for specified_date, start, end, is_closed in record.get("specified_opening_times", [])
+    )
+    service.palliative_care = service.typeid in PHARMACY_SERVICE_TYPE_IDS and has_sgsd(
+        record.get("sgsds", []),
+        DOS_PALLIATIVE_CARE_SYMPTOM_GROUP,
+        DOS_PALLIATIVE_CARE_SYMPTOM_DISCRIMINATOR,
+    )
+    service.blood_pressure = has_blood_pressure(service)
+    service.contraception = has_contraception(service)
+    return service
+
+
+def has_sgsd(sgsds: Iterable[list[int]], symptom_group_id: int, symptom_discriminator_id: int) -> bool:
+    """Checks if a symptom group and symptom discriminator combination is in a list of sgsds.
+
+    Args:
+        sgsds (Iterable[list[int]]): [symptom group id, symptom discriminator id] for each sgsd
+        symptom_group_id (int): The symptom group id
+        symptom_discriminator_id (int): The symptom discriminator id
+
+    Returns:
+        bool: True if the combination is in the list, False otherwise
+    """
+    return any(sgid == symptom_group_id and sdid == symptom_discriminator_id for sgid, sdid in sgsds)
+
+
+class ServiceRows:
+    """Rows of a query ordered by service id, taken one service at a time."""
+
+    def __init__(self: Self, rows: Iterable[dict[str, Any]]) -> None:
+        """Initialises the ServiceRows object.
+
+        Args:
+            rows (Iterable[dict[str, Any]]): Rows with a serviceid, ordered by serviceid
+        """
+        self.groups = groupby(rows, key=itemgetter("serviceid"))
+        self.next_group = next(self.groups, None)
+
+    def pop(self: Self, service_id: int) -> list[dict[str, Any]]:
+        """Takes the rows of a service, skipping the rows of any earlier services.
+
+        Args:
+            service_id (int): The service id, which must not be lower than the service id of the previous call
+
+        Returns:
+            list[dict[str, Any]]: The rows of the service
+        """
+        while self.next_group is not None and self.next_group[0] < service_id:
+            self.next_group = next(self.groups, None)
+        if self.next_group is None or self.next_group[0] != service_id:
+            return []
+        rows = list(self.next_group[1])
+        self.next_group = next(self.groups, None)
+        return rows
+
+
+def stream_dos_snapshot(
+    connection: Connection,
+    fetch_size: int = DOS_SNAPSHOT_FETCH_SIZE,
+) -> Generator[dict[str, Any], None, None]:
+    """Streams the DoS snapshot records of every pharmacy service from the DoS database.
+
+    The services, opening times and sgsds are each streamed through a server side cursor ordered by service id
+    and merged in one pass, so memory use depends on the fetch size rather than the size of the estate.
+
+    Args:
+        connection (Connection): Connection to the DoS database, the cursors are only valid in its transaction
+        fetch_size (int, optional): Rows fetched from each cursor at a time. Defaults to DOS_SNAPSHOT_FETCH_SIZE.
+
+    Yields:
+        dict[str, Any]: DoS snapshot record
+    """
+    reference_data = get_reference_data(connection)
+    query_vars = {"SERVICE_TYPE_IDS": PHARMACY_SERVICE_TYPE_IDS}
+
+    def stream(query: DoSQuery) -> Iterator[dict[str, Any]]:
+        # Each server side cursor is named after its query
+        cursor = query_dos_db(connection=connection, query=query, query_vars=query_vars, cursor_name=query.name)
+        cursor.itersize = fetch_size
+        return iter(cursor)
+
+    services = stream(DOS_SNAPSHOT_SERVICES_QUERY)
+    standard_opening_times = ServiceRows(stream(DOS_SNAPSHOT_STANDARD_OPENING_TIMES_QUERY))
+    specified_opening_times = ServiceRows(stream(DOS_SNAPSHOT_SPECIFIED_OPENING_TIMES_QUERY))
+    sgsds = ServiceRows(stream(DOS_SNAPSHOT_SGSDS_QUERY))
+    for service in services:
+        service_id = service["id"]
+        yield service | {
+            "service_type_name": reference_data.service_types.get(service["typeid"]),
+            "status_name": reference_data.service_statuses.get(service["statusid"]),
+            "standard_opening_times": [
+                [
+                    reference_data.opening_time_days.get(row["dayid"]),
+                    row["starttime"].isoformat(),
+                    row["endtime"].isoformat(),
+                ]
+                for row in standard_opening_times.pop(service_id)
+            ],
+            "specified_opening_times": [
+                [row["date"].isoformat(), row["starttime"].isoformat(), row["endtime"].isoformat(), row["isclosed"]]
+                for row in specified_opening_times.pop(service_id)
+            ],
+            "sgsds": [[row["sgid"], row["sdid"]] for row in sgsds.pop(service_id)],
+        }
+
+
+def export_dos_snapshot(connection: Connection, path: Path, fetch_size: int = DOS_SNAPSHOT_FETCH_SIZE) -> int:
+    """Exports a DoS snapshot of every pharmacy service from the DoS database to a file.
+
+    Args:
+        connection (Connection): Connection to the DoS database
+        path (Path): Path to write the DoS snapshot to, gzip compressed if its name ends with .gz
+        fetch_size (int, optional): Rows fetched from each cursor at a time. Defaults to DOS_SNAPSHOT_FETCH_SIZE.
+
+    Returns:
+        int: The number of services exported
+    """
+    services_exported = 0
+    with open_dos_snapshot(path, "wt") as snapshot_file:
+        for record in stream_dos_snapshot(connection, fetch_size=fetch_size):
+            snapshot_file.write(f"{dumps(record)}\n")
+            services_exported += 1
+    # Close the server side cursors
+    connection.rollback()
+    logger.info("Exported DoS snapshot", path=str(path), services_exported=services_exported)
+    return services_exported
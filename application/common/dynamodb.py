@@ -1,19 +1,18 @@
 import hashlib
-from decimal import Decimal
-from json import dumps, loads
+from json import dumps
 from os import environ
 from time import time
 from typing import Any
 
 from aws_lambda_powertools.logging.logger import Logger
-from boto3 import client
-from boto3.dynamodb.types import TypeSerializer
 
+from common.aws_clients import get_client
 from common.errors import DynamoDBError
+from common.serialisation import to_dynamodb_item
+from common.stage_metrics import time_stage
 
 TTL = 157680000  # int((365*5)*24*60*60) 5 years in seconds
 logger = Logger(child=True)
-dynamodb = client("dynamodb", region_name=environ["AWS_REGION"])
 
 
 def dict_hash(change_event: dict[str, Any], sequence_number: str) -> str:
@@ -42,12 +41,12 @@ def add_change_event_to_dynamodb(change_event: dict[str, Any], sequence_number:
         "TTL": int(time()) + TTL,
         "EventReceived": event_received_time,
         "SequenceNumber": sequence_number,
-        "Event": loads(dumps(change_event), parse_float=Decimal),
+        "Event": change_event,
     }
     try:
-        serializer = TypeSerializer()
-        put_item = {k: serializer.serialize(v) for k, v in dynamo_record.items()}
-        response = dynamodb.put_item(TableName=environ["CHANGE_EVENTS_TABLE_NAME"], Item=put_item)
+        put_item = to_dynamodb_item(dynamo_record)
+        with time_stage("dynamodb_put"):
+            response = get_client("dynamodb").put_item(TableName=environ["CHANGE_EVENTS_TABLE_NAME"], Item=put_item)
         logger.info("Added record to dynamodb", response=response, item=put_item)
     except Exception as err:
         msg = f"Unable to add change event (seq no: {sequence_number}) into dynamodb"
@@ -64,15 +63,16 @@ def get_latest_sequence_id_for_a_given_odscode_from_dynamodb(odscode: str) -> in
     Returns:
         int: Sequence number of the message or None if not present.
     """
-    resp = dynamodb.query(
-        TableName=environ["CHANGE_EVENTS_TABLE_NAME"],
-        IndexName="gsi_ods_sequence",
-        KeyConditionExpression="ODSCode = :odscode",
-        ExpressionAttributeValues={":odscode": {"S": odscode}},
-        Limit=1,
-        ScanIndexForward=False,
-        ProjectionExpression="ODSCode,SequenceNumber",
-    )
+    with time_stage("dynamodb_query"):
+        resp = get_client("dynamodb").query(
+            TableName=environ["CHANGE_EVENTS_TABLE_NAME"],
+            IndexName="gsi_ods_sequence",
+            KeyConditionExpression="ODSCode = :odscode",
+            ExpressionAttributeValues={":odscode": {"S": odscode}},
+            Limit=1,
+            ScanIndexForward=False,
+            ProjectionExpression="ODSCode,SequenceNumber",
+        )
     sequence_number = 0
     if resp.get("Count") > 0:
         sequence_number = int(resp.get("Items")[0]["SequenceNumber"]["N"])
@@ -4,3 +4,7 @@ class ValidationError(Exception):
 
 class DynamoDBError(Exception):
     """Exception raised for all DynamoDB errors."""
+
+
+class SQSError(Exception):
+    """Exception raised when messages could not be sent to SQS."""
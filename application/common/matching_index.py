@@ -0,0 +1,175 @@
+import gzip
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from os import getenv
+from pathlib import Path
+from time import monotonic
+from typing import Any, Self
+
+from aws_lambda_powertools.logging import Logger
+from botocore.exceptions import ClientError
+
+from .aws_clients import get_client
+from .constants import PHARMACY_ODSCODE_LENGTH
+from .dos import DoSService, is_matchable_dos_service
+from .serialisation import dumps, loads
+
+logger = Logger(child=True)
+# Columns of the services returned by get_matching_dos_services, with the reference data names
+MATCHING_INDEX_SERVICE_FIELDS = (
+    "id",
+    "uid",
+    "name",
+    "odscode",
+    "address",
+    "postcode",
+    "web",
+    "typeid",
+    "statusid",
+    "publicphone",
+    "publicname",
+    "service_type_name",
+    "status_name",
+)
+# Seconds before the matching index is reloaded, so a refreshed index is picked up by warm containers
+MATCHING_INDEX_TTL = 300
+# Seconds after its export that the matching index is stale, when MATCHING_INDEX_MAX_AGE is not set
+DEFAULT_MATCHING_INDEX_MAX_AGE = 3600
+GZIP_MAGIC_NUMBER = b"\x1f\x8b"
+
+
+@dataclass(frozen=True)
+class MatchingIndex:
+    """Matchable DoS services by the ODS code prefix they are matched on, built from a DoS snapshot."""
+
+    exported_at: datetime
+    services: dict[str, list[dict[str, Any]]]
+
+    def age(self: Self) -> float:
+        """Seconds since the DoS snapshot the index was built from was exported."""
+        return (datetime.now(UTC) - self.exported_at).total_seconds()
+
+
+matching_index_cache: MatchingIndex | None = None
+# Monotonic time the matching index was last loaded, or failed to load
+matching_index_loaded_at: float | None = None
+
+
+def build_matching_index(records: Iterable[dict[str, Any]], exported_at: datetime) -> MatchingIndex:
+    """Builds a matching index of the services get_matching_dos_services would match from DoS snapshot records.
+
+    Args:
+        records (Iterable[dict[str, Any]]): DoS snapshot records, see common.dos_snapshot
+        exported_at (datetime): When the DoS snapshot was exported, timezone aware
+
+    Returns:
+        MatchingIndex: The matching index
+    """
+    services: defaultdict[str, list[dict[str, Any]]] = defaultdict(list)
+    for record in records:
+        service = {field: record.get(field) for field in MATCHING_INDEX_SERVICE_FIELDS}
+        odscode = service["odscode"] or ""
+        # A shorter ODS code is never matched by the prefix of an NHS UK ODS code
+        if len(odscode) >= PHARMACY_ODSCODE_LENGTH and is_matchable_dos_service(DoSService(service)):
+            services[odscode[:PHARMACY_ODSCODE_LENGTH]].append(service)
+    return MatchingIndex(exported_at=exported_at, services=dict(services))
+
+
+def write_matching_index(matching_index: MatchingIndex, path: Path) -> None:
+    """Writes a matching index to a JSON file, gzip compressed if its name ends with .gz.
+
+    Args:
+        matching_index (MatchingIndex): The matching index
+        path (Path): Path to write the matching index to
+    """
+    data = dumps(
+        {"exported_at": matching_index.exported_at.isoformat(), "services": matching_index.services},
+    ).encode()
+    path.write_bytes(gzip.compress(data) if path.suffix == ".gz" else data)
+
+
+def load_matching_index(location: str) -> MatchingIndex:
+    """Loads a matching index written by write_matching_index.
+
+    Args:
+        location (str): Path of the matching index file, or an s3://bucket/key URI
+
+    Returns:
+        MatchingIndex: The matching index
+    """
+    if location.startswith("s3://"):
+        bucket, _, key = location.removeprefix("s3://").partition("/")
+        data = get_client("s3").get_object(Bucket=bucket, Key=key)["Body"].read()
+    else:
+        data = Path(location).read_bytes()
+    if data.startswith(GZIP_MAGIC_NUMBER):
+        data = gzip.decompress(data)
+    document = loads(data)
+    matching_index = MatchingIndex(
+        exported_at=datetime.fromisoformat(document["exported_at"]),
+        services=document["services"],
+    )
+    logger.info(
+        "Loaded matching index",
+        matching_index_location=location,
+        exported_at=document["exported_at"],
+        odscode_prefixes=len(matching_index.services),
+    )
+    return matching_index
+
+
+def get_matching_index() -> MatchingIndex | None:
+    """Gets the matching index at MATCHING_INDEX_PATH, loading it if it has not been loaded within the TTL.
+
+    If the index fails to load, the previously loaded index is kept and loading is not retried until the TTL passes.
+
+    Returns:
+        MatchingIndex | None: The matching index, None if MATCHING_INDEX_PATH is not set or it has never loaded
+    """
+    global matching_index_cache, matching_index_loaded_at  # noqa: PLW0603
+    location = getenv("MATCHING_INDEX_PATH")
+    if not location:
+        return None
+    if matching_index_loaded_at is None or monotonic() - matching_index_loaded_at > MATCHING_INDEX_TTL:
+        matching_index_loaded_at = monotonic()
+        try:
+            matching_index_cache = load_matching_index(location)
+        except (ClientError, OSError, ValueError, KeyError):
+            logger.exception("Failed to load matching index", matching_index_location=location)
+    return matching_index_cache
+
+
+def clear_matching_index() -> None:
+    """Clears the matching index so it is reloaded on next use."""
+    global matching_index_cache, matching_index_loaded_at  # noqa: PLW0603
+    matching_index_cache = None
+    matching_index_loaded_at = None
+
+
+def get_indexed_matching_services(odscode: str) -> list[DoSService] | None:
+    """Gets the DoS services matching the first 5 characters of an ODS code from the matching index.
+
+    Args:
+        odscode (str): ODS code to match on
+
+    Returns:
+        list[DoSService] | None: The matching DoS services, or None if they must be got from the DoS database
+        because the index is not enabled, has not loaded, is older than MATCHING_INDEX_MAX_AGE seconds or has no
+        services for the ODS code prefix
+    """
+    if len(odscode) < PHARMACY_ODSCODE_LENGTH or (matching_index := get_matching_index()) is None:
+        return None
+    max_age = float(getenv("MATCHING_INDEX_MAX_AGE") or DEFAULT_MATCHING_INDEX_MAX_AGE)
+    if matching_index.age() > max_age:
+        logger.warning(
+            "Matching index is stale, so matching from the DoS database",
+            exported_at=matching_index.exported_at.isoformat(),
+            max_age=max_age,
+        )
+        return None
+    services = matching_index.services.get(odscode[:PHARMACY_ODSCODE_LENGTH])
+    if services is None:
+        return None
+    return [DoSService(service) for service in services]
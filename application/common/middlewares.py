@@ -1,3 +1,5 @@
+from cProfile import Profile
+from pstats import Stats
 from typing import Any
 
 from aws_lambda_powertools.logging import Logger
@@ -6,7 +8,10 @@ from aws_lambda_powertools.utilities.typing import LambdaContext
 from botocore.exceptions import ClientError
 
 from common.errors import ValidationError
-from common.utilities import extract_body, json_str_body
+from common.profiling import save_profile, should_profile
+from common.query_registry import clear_query_stats, dump_query_stats
+from common.stage_metrics import clear_stage_durations, flush_stage_metrics, time_stage
+from common.utilities import clear_parsed_bodies, extract_body, json_str_body, set_parsed_body
 
 logger = Logger(child=True)
 
@@ -15,6 +20,9 @@ logger = Logger(child=True)
 def redact_staff_key_from_event(handler, event, context: LambdaContext) -> Any:  # noqa: ANN001, ANN401
     """Lambda middleware to remove the 'Staff' key from the Change Event payload.
 
+    Bodies without a 'Staff' key are not parsed. Bodies that are parsed are stored so the handler's
+    extract_body call reuses them rather than parsing the Change Event again.
+
     Args:
         handler: Lambda handler function
         event: Lambda event
@@ -24,12 +32,16 @@ def redact_staff_key_from_event(handler, event, context: LambdaContext) -> Any:
         Any: Lambda handler response
     """
     logger.info("Checking if 'Staff' key needs removing from Change Event payload")
+    clear_parsed_bodies()
     if "Records" in event and list(event["Records"]):
         for record in event["Records"]:
+            if '"Staff"' not in record["body"]:
+                continue
             change_event = extract_body(record["body"])
             if change_event.pop("Staff", None) is not None:
                 record["body"] = json_str_body(change_event)
                 logger.info("Redacted 'Staff' key from Change Event payload")
+            set_parsed_body(record["body"], change_event)
     return handler(event, context)
 
 
@@ -77,3 +89,51 @@ def unhandled_exception_logging_hidden_event(handler, event, context: LambdaCont
     except BaseException:
         logger.exception("Something went wrong but the event is hidden")
         raise
+
+
+@lambda_handler_decorator(trace_execution=True)
+def stage_metrics(handler, event, context: LambdaContext) -> Any:  # noqa: ANN001, ANN401
+    """Lambda middleware to time the handler and flush the stage durations of the invocation as EMF metrics.
+
+    The DoS query statistics of the invocation are logged at the same time.
+
+    Args:
+        handler: Lambda handler function
+        event: Lambda event
+        context: Lambda context object
+
+    Returns:
+        Any: Lambda handler response
+    """
+    clear_stage_durations()
+    clear_query_stats()
+    try:
+        with time_stage("handler"):
+            return handler(event, context)
+    finally:
+        flush_stage_metrics(lambda_name=context.function_name)
+        dump_query_stats()
+
+
+@lambda_handler_decorator(trace_execution=True)
+def profiling(handler, event, context: LambdaContext) -> Any:  # noqa: ANN001, ANN401
+    """Lambda middleware to profile sampled invocations with cProfile.
+
+    Invocations are profiled when PROFILING_ENABLED is true or when sampled at PROFILING_SAMPLE_RATE. The hot
+    functions of a profiled invocation are logged and the full profile saved, see common.profiling.save_profile.
+
+    Args:
+        handler: Lambda handler function
+        event: Lambda event
+        context: Lambda context object
+
+    Returns:
+        Any: Lambda handler response
+    """
+    if not should_profile():
+        return handler(event, context)
+    profiler = Profile()
+    try:
+        return profiler.runcall(handler, event, context)
+    finally:
+        save_profile(Stats(profiler), lambda_name=context.function_name, request_id=context.aws_request_id)
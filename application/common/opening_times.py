@@ -451,6 +451,40 @@ class StandardOpeningTimes:
         return change
 
 
+class OpeningTimesFingerprint:
+    """Canonical, hashable form of a service's standard opening times.
+
+    Each side of a comparison is sorted and hashed once, so unchanged opening times are found by comparing
+    hashes rather than re-sorting the open period lists for every weekday.
+    """
+
+    def __init__(self: Self, standard_opening_times: StandardOpeningTimes) -> None:
+        """Initialises the OpeningTimesFingerprint object.
+
+        Args:
+            standard_opening_times (StandardOpeningTimes): The standard opening times, generic bank holidays are ignored
+        """
+        self.weekdays = tuple(tuple(sorted(standard_opening_times.get_openings(day))) for day in WEEKDAYS)
+        self.weekday_hashes = tuple(hash(open_periods) for open_periods in self.weekdays)
+        self.standard_hash = hash(self.weekday_hashes)
+
+    def changed_weekdays(self: Self, other: "OpeningTimesFingerprint") -> list[str]:
+        """Returns the weekdays with different standard opening times, exiting early if the whole week is equal."""
+        if self.standard_hash == other.standard_hash and self.weekdays == other.weekdays:
+            return []
+        return [
+            day
+            for day, own_hash, other_hash, own_open_periods, other_open_periods in zip(  # noqa: B905
+                WEEKDAYS,
+                self.weekday_hashes,
+                other.weekday_hashes,
+                self.weekdays,
+                other.weekdays,
+            )
+            if own_hash != other_hash or own_open_periods != other_open_periods
+        ]
+
+
 def opening_period_times_from_list(open_periods: list[OpenPeriod], with_space: bool = True) -> str:
     """Converts a list of OpenPeriods into a string of times separated by a space.
 
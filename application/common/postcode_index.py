@@ -0,0 +1,186 @@
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass, fields
+from os import getenv
+from time import monotonic
+from typing import Self
+
+from aws_lambda_powertools.logging import Logger
+from psycopg import Connection
+
+from .dos_db_connection import connect_to_db_reader, query_dos_db
+from .dos_location import DoSLocation
+from .query_registry import register_query
+
+logger = Logger(child=True)
+# Locations are loaded by region, the first characters of their normalised postcode
+POSTCODE_INDEX_REGION_LENGTH = 2
+# Seconds before a region is reloaded from the DoS database
+POSTCODE_INDEX_TTL = 3600
+# A region's postcodes are stored either without spaces or with one space, matching the postcode variations of
+# get_dos_locations, so the space can be after the first character of the region
+GET_REGION_DOS_LOCATIONS_QUERY = register_query(
+    "get_region_dos_locations",
+    f"SELECT {', '.join(field.name for field in fields(DoSLocation))} "  # noqa: S608
+    "FROM locations WHERE postcode LIKE %(REGION)s OR postcode LIKE %(SPACED_REGION)s",
+    # Safe as the columns come from DoSLocation and the regions are passed to psycopg as variables
+)
+
+
+@dataclass(frozen=True)
+class LocationRegion:
+    """DoS locations of a region, sorted by their normalised postcode so they can be binary searched."""
+
+    postcodes: list[str]
+    locations: list[DoSLocation]
+    loaded_at: float
+
+    def get(self: Self, normal_postcode: str) -> list[DoSLocation]:
+        """Gets the locations with a normalised postcode.
+
+        Args:
+            normal_postcode (str): Postcode without spaces, in uppercase
+
+        Returns:
+            list[DoSLocation]: The locations with the postcode, in the order they were loaded
+        """
+        start = bisect_left(self.postcodes, normal_postcode)
+        return self.locations[start : bisect_right(self.postcodes, normal_postcode, lo=start)]
+
+    def get_valid(self: Self, normal_postcode: str) -> DoSLocation | None:
+        """Gets the first valid location with a normalised postcode.
+
+        Args:
+            normal_postcode (str): Postcode without spaces, in uppercase
+
+        Returns:
+            DoSLocation | None: The first valid location with the postcode, None if it has none
+        """
+        return next((location for location in self.get(normal_postcode) if location.is_valid()), None)
+
+
+# Loaded regions, by the first POSTCODE_INDEX_REGION_LENGTH characters of their normalised postcodes
+location_regions: dict[str, LocationRegion] = {}
+
+
+def normalise_postcode(postcode: str) -> str:
+    """Normalises a postcode as get_dos_locations does, without spaces and in uppercase."""
+    return postcode.replace(" ", "").upper()
+
+
+def is_postcode_variation(postcode: str) -> bool:
+    """Checks if a postcode stored in DoS would be one of the postcode variations get_dos_locations queries for.
+
+    The variations are the normalised postcode with no space, or with one space between two of its characters.
+
+    Args:
+        postcode (str): Postcode as stored in the locations table
+
+    Returns:
+        bool: True if the postcode would be found by get_dos_locations
+    """
+    return postcode == postcode.upper() and postcode.count(" ") <= 1 and postcode.strip(" ") == postcode
+
+
+def region_of(normal_postcode: str) -> str | None:
+    """Gets the region of a normalised postcode.
+
+    Args:
+        normal_postcode (str): Postcode without spaces, in uppercase
+
+    Returns:
+        str | None: The region, or None if the postcode has no region that can be used in a LIKE pattern
+    """
+    region = normal_postcode[:POSTCODE_INDEX_REGION_LENGTH]
+    if len(region) < POSTCODE_INDEX_REGION_LENGTH or not region.isalnum():
+        return None
+    return region
+
+
+def load_location_region(connection: Connection, region: str) -> LocationRegion:
+    """Loads the DoS locations of a region from the DoS database.
+
+    Args:
+        connection (Connection): Connection to the DoS database
+        region (str): The region, see region_of
+
+    Returns:
+        LocationRegion: The DoS locations of the region
+    """
+    cursor = query_dos_db(
+        connection=connection,
+        query=GET_REGION_DOS_LOCATIONS_QUERY,
+        query_vars={"REGION": f"{region}%", "SPACED_REGION": f"{region[0]} {region[1:]}%"},
+    )
+    locations = sorted(
+        (
+            (normalise_postcode(row["postcode"]), DoSLocation(**row))
+            for row in cursor.fetchall()
+            if is_postcode_variation(row["postcode"])
+        ),
+        key=lambda keyed_location: keyed_location[0],
+    )
+    cursor.close()
+    logger.debug("Loaded DoS locations of region", region=region, locations=len(locations))
+    return LocationRegion(
+        postcodes=[postcode for postcode, _ in locations],
+        locations=[location for _, location in locations],
+        loaded_at=monotonic(),
+    )
+
+
+def is_region_loaded(region: str) -> bool:
+    """Checks if a region has been loaded within the TTL."""
+    return region in location_regions and monotonic() - location_regions[region].loaded_at <= POSTCODE_INDEX_TTL
+
+
+def get_loaded_location_region(normal_postcode: str) -> LocationRegion | None:
+    """Gets the region of a normalised postcode if it has been loaded within the TTL, without loading it.
+
+    Args:
+        normal_postcode (str): Postcode without spaces, in uppercase
+
+    Returns:
+        LocationRegion | None: The loaded region, or None if it has not been loaded within the TTL
+    """
+    region = region_of(normal_postcode)
+    return location_regions[region] if region is not None and is_region_loaded(region) else None
+
+
+def get_valid_dos_locations(postcodes: Iterable[str]) -> dict[str, DoSLocation | None]:
+    """Gets the valid DoS location of each postcode, loading each region not loaded within the TTL in one query.
+
+    Loading a region costs far more than querying for one postcode, so this is for batch callers that validate
+    many postcodes in the same regions, such as reconciliation.
+
+    Args:
+        postcodes (Iterable[str]): Postcodes to validate, in any case and with any spaces
+
+    Returns:
+        dict[str, DoSLocation | None]: The first valid DoS location of each normalised postcode, None if it has none
+    """
+    postcodes_by_region: defaultdict[str | None, set[str]] = defaultdict(set)
+    for postcode in postcodes:
+        normal_postcode = normalise_postcode(postcode)
+        postcodes_by_region[region_of(normal_postcode)].add(normal_postcode)
+    # Postcodes without a region can't match a DoS location
+    valid_locations: dict[str, DoSLocation | None] = dict.fromkeys(postcodes_by_region.pop(None, ()))
+    if regions_to_load := [region for region in postcodes_by_region if not is_region_loaded(region)]:
+        with connect_to_db_reader() as connection:
+            for region in regions_to_load:
+                location_regions[region] = load_location_region(connection, region)
+    for region, normal_postcodes in postcodes_by_region.items():
+        for normal_postcode in normal_postcodes:
+            valid_locations[normal_postcode] = location_regions[region].get_valid(normal_postcode)
+    return valid_locations
+
+
+def is_postcode_index_enabled() -> bool:
+    """Whether batch callers validate DoS locations with the postcode index rather than a query per postcode."""
+    return getenv("POSTCODE_INDEX_ENABLED", "false").lower() == "true"
+
+
+def clear_location_regions() -> None:
+    """Clears the loaded regions so they are reloaded on next use."""
+    location_regions.clear()
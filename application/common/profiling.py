@@ -0,0 +1,97 @@
+from datetime import UTC, datetime
+from marshal import dumps
+from os import getenv
+from pathlib import Path
+from pstats import Stats
+from random import random
+from typing import Any
+
+from aws_lambda_powertools.logging import Logger
+from botocore.exceptions import ClientError
+
+from common.aws_clients import get_client
+
+logger = Logger(child=True)
+# Number of functions in the hot function summary logged when PROFILING_TOP_FUNCTIONS is not set
+DEFAULT_PROFILING_TOP_FUNCTIONS = 20
+
+
+def should_profile() -> bool:
+    """Whether to profile the current invocation.
+
+    Every invocation is profiled when PROFILING_ENABLED is true, otherwise invocations are sampled at
+    PROFILING_SAMPLE_RATE, a fraction between 0 and 1 which defaults to 0.
+
+    Returns:
+        bool: True if the invocation should be profiled
+    """
+    if getenv("PROFILING_ENABLED", "false").lower() == "true":
+        return True
+    sample_rate = float(getenv("PROFILING_SAMPLE_RATE") or 0)
+    return sample_rate > 0 and random() < sample_rate  # noqa: S311
+
+
+def hot_functions(stats: Stats, top: int) -> list[dict[str, Any]]:
+    """Summarises the functions the most time was spent in, excluding the functions they call.
+
+    Args:
+        stats (Stats): Statistics of the profiled invocation
+        top (int): Number of functions to include
+
+    Returns:
+        list[dict[str, Any]]: Calls and own and cumulative time in milliseconds of each function, slowest first
+    """
+    functions = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:top]
+    return [
+        {
+            "function": f"{'/'.join(Path(file_name).parts[-2:])}:{line_number}({function_name})",
+            "calls": calls,
+            "own_ms": round(own_time * 1000, 3),
+            "cumulative_ms": round(cumulative_time * 1000, 3),
+        }
+        for (file_name, line_number, function_name), (_, calls, own_time, cumulative_time, _) in functions
+    ]
+
+
+def profile_key(lambda_name: str, request_id: str) -> str:
+    """Key the full profile of an invocation is saved under, grouped by lambda and day.
+
+    Args:
+        lambda_name (str): Name of the lambda function
+        request_id (str): AWS request id of the invocation
+
+    Returns:
+        str: Key of the profile, e.g. service-sync/2024/01/31/<request id>.prof
+    """
+    return f"{lambda_name}/{datetime.now(UTC):%Y/%m/%d}/{request_id}.prof"
+
+
+def save_profile(stats: Stats, lambda_name: str, request_id: str) -> None:
+    """Logs the hot functions of a profiled invocation and saves the full profile.
+
+    The full profile is written to the PROFILES_DIRECTORY local directory if set, e.g. in tests, otherwise it is put
+    in the PROFILES_BUCKET_NAME S3 bucket if set. It is in the pstats format, so can be loaded with pstats.Stats or
+    viewed with tools such as snakeviz. Failing to save the profile is logged and does not fail the invocation.
+
+    Args:
+        stats (Stats): Statistics of the profiled invocation
+        lambda_name (str): Name of the lambda function
+        request_id (str): AWS request id of the invocation
+    """
+    top = int(getenv("PROFILING_TOP_FUNCTIONS") or DEFAULT_PROFILING_TOP_FUNCTIONS)
+    key = profile_key(lambda_name, request_id)
+    logger.info(
+        "Profiled invocation",
+        profile_total_ms=round(stats.total_tt * 1000, 3),
+        profile_hot_functions=hot_functions(stats, top),
+        profile_key=key,
+    )
+    try:
+        if directory := getenv("PROFILES_DIRECTORY"):
+            path = Path(directory, key)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            stats.dump_stats(path)
+        elif bucket := getenv("PROFILES_BUCKET_NAME"):
+            get_client("s3").put_object(Bucket=bucket, Key=key, Body=dumps(stats.stats))
+    except (ClientError, OSError):
+        logger.exception("Failed to save profile", profile_key=key)
@@ -0,0 +1,158 @@
+from bisect import bisect_left
+from hashlib import sha256
+from typing import Any, LiteralString, Self
+
+from aws_lambda_powertools.logging import Logger
+
+logger = Logger(child=True)
+# Upper bounds in milliseconds of the latency histogram buckets, the last bucket holds slower queries
+QUERY_LATENCY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+# Name the statistics of queries that are not registered, such as dynamically built queries, are recorded under
+UNNAMED_QUERY = "unnamed"
+
+
+class DoSQuery(str):
+    """A registered DoS database query, which is the SQL itself with a stable name and fingerprint."""
+
+    def __new__(cls: type[Self], name: str, sql: LiteralString) -> Self:
+        """Creates the DoSQuery object.
+
+        Args:
+            name (str): Stable name of the query, used in logs and metrics
+            sql (LiteralString): SQL of the query
+
+        Returns:
+            DoSQuery: The query
+        """
+        query = super().__new__(cls, sql)
+        query.name = name
+        query.fingerprint = fingerprint_sql(sql)
+        return query
+
+    def __reduce__(self: Self) -> tuple[type, tuple[str, str]]:
+        """Pickles the query with its name, so it can be sent to worker processes."""
+        return DoSQuery, (self.name, str(self))
+
+
+registered_queries: dict[str, DoSQuery] = {}
+
+
+def fingerprint_sql(sql: str) -> str:
+    """Fingerprints SQL so the same statement has the same fingerprint regardless of whitespace.
+
+    Args:
+        sql (str): SQL to fingerprint
+
+    Returns:
+        str: The fingerprint
+    """
+    return sha256(" ".join(sql.split()).encode()).hexdigest()[:16]
+
+
+def register_query(name: str, sql: LiteralString) -> DoSQuery:
+    """Registers a DoS database query under a stable name.
+
+    Args:
+        name (str): Name of the query, unique across the application
+        sql (LiteralString): SQL of the query
+
+    Raises:
+        ValueError: If a different query is already registered under the name
+
+    Returns:
+        DoSQuery: The registered query
+    """
+    query = DoSQuery(name, sql)
+    existing_query = registered_queries.setdefault(name, query)
+    if existing_query.fingerprint != query.fingerprint:
+        msg = f"Query '{name}' is already registered with different SQL"
+        raise ValueError(msg)
+    return existing_query
+
+
+class QueryStats:
+    """Call count, rows and latency histogram of a query."""
+
+    def __init__(self: Self, name: str, fingerprint: str | None) -> None:
+        """Initialises the QueryStats object with no calls.
+
+        Args:
+            name (str): Name of the query
+            fingerprint (str | None): Fingerprint of the query, None for unnamed queries
+        """
+        self.name = name
+        self.fingerprint = fingerprint
+        self.calls = 0
+        self.rows = 0
+        self.total_duration = 0.0
+        self.max_duration = 0.0
+        self.latency_histogram = [0] * (len(QUERY_LATENCY_BUCKETS) + 1)
+
+    def add(self: Self, duration: float, rows: int) -> None:
+        """Adds a call of the query.
+
+        Args:
+            duration (float): Duration of the call in milliseconds
+            rows (int): Rows returned or affected by the call, negative if not known
+        """
+        self.calls += 1
+        self.rows += max(rows, 0)
+        self.total_duration += duration
+        self.max_duration = max(self.max_duration, duration)
+        self.latency_histogram[bisect_left(QUERY_LATENCY_BUCKETS, duration)] += 1
+
+    def export(self: Self) -> dict[str, Any]:
+        """Exports the statistics as a JSON serialisable dictionary.
+
+        Returns:
+            dict[str, Any]: The statistics, with the histogram keyed by bucket upper bound in milliseconds
+        """
+        return {
+            "name": self.name,
+            "fingerprint": self.fingerprint,
+            "calls": self.calls,
+            "rows": self.rows,
+            "total_duration_ms": round(self.total_duration, 3),
+            "max_duration_ms": round(self.max_duration, 3),
+            "latency_histogram": {
+                f"le_{bucket}": count
+                for bucket, count in zip((*QUERY_LATENCY_BUCKETS, "inf"), self.latency_histogram, strict=True)
+                if count
+            },
+        }
+
+
+# Statistics of each query run in the current invocation, by query name
+query_stats: dict[str, QueryStats] = {}
+
+
+def record_query(query: str, duration: float, rows: int) -> None:
+    """Records a call of a query in the statistics of the current invocation.
+
+    Args:
+        query (str): The query, registered queries are recorded under their name and others under UNNAMED_QUERY
+        duration (float): Duration of the call in milliseconds
+        rows (int): Rows returned or affected by the call, negative if not known
+    """
+    name, fingerprint = (query.name, query.fingerprint) if isinstance(query, DoSQuery) else (UNNAMED_QUERY, None)
+    if name not in query_stats:
+        query_stats[name] = QueryStats(name, fingerprint)
+    query_stats[name].add(duration, rows)
+
+
+def clear_query_stats() -> None:
+    """Clears the query statistics."""
+    query_stats.clear()
+
+
+def dump_query_stats() -> list[dict[str, Any]]:
+    """Logs and clears the query statistics of the current invocation.
+
+    Returns:
+        list[dict[str, Any]]: The statistics of each query, slowest total duration first
+    """
+    stats = [stats.export() for stats in sorted(query_stats.values(), key=lambda stats: -stats.total_duration)]
+    if stats:
+        logger.info("DoS query statistics", query_stats=stats)
+    clear_query_stats()
+    return stats
@@ -0,0 +1,127 @@
+from dataclasses import dataclass
+from time import monotonic
+
+from aws_lambda_powertools.logging import Logger
+from psycopg import Connection
+
+from .dos_db_connection import query_dos_db
+from .query_registry import DoSQuery, register_query
+
+logger = Logger(child=True)
+# Seconds before the reference data is reloaded from the DoS database
+REFERENCE_DATA_TTL = 300
+GET_SERVICE_TYPES_QUERY = register_query("get_service_types", "SELECT id, name FROM servicetypes")
+GET_SERVICE_STATUSES_QUERY = register_query("get_service_statuses", "SELECT id, name FROM servicestatuses")
+GET_OPENING_TIME_DAYS_QUERY = register_query("get_opening_time_days", "SELECT id, name FROM openingtimedays")
+GET_SYMPTOM_GROUP_SYMPTOM_DISCRIMINATORS_QUERY = register_query(
+    "get_symptom_group_symptom_discriminators",
+    "SELECT symptomgroupid, symptomdiscriminatorid FROM symptomgroupsymptomdiscriminators",
+)
+
+
+@dataclass(frozen=True)
+class ReferenceData:
+    """Near static DoS lookup tables, loaded in bulk and shared by every invocation of the lambda container."""
+
+    service_types: dict[int, str]
+    service_statuses: dict[int, str]
+    opening_time_days: dict[int, str]
+    symptom_group_symptom_discriminators: frozenset[tuple[int, int]]
+    loaded_at: float
+
+
+reference_data_cache: ReferenceData | None = None
+# Monotonic time the reference data was last reloaded because a combination was missing from it
+reference_data_refreshed_at: float | None = None
+
+
+def get_reference_data(connection: Connection, refresh: bool = False) -> ReferenceData:
+    """Gets the DoS reference data, loading it if it has not been loaded or is older than the TTL.
+
+    Args:
+        connection (Connection): Connection to the DoS database, only used if the reference data is loaded
+        refresh (bool, optional): Whether to reload the reference data regardless of its age. Defaults to False.
+
+    Returns:
+        ReferenceData: The DoS reference data
+    """
+    global reference_data_cache  # noqa: PLW0603
+    if refresh or reference_data_cache is None or monotonic() - reference_data_cache.loaded_at > REFERENCE_DATA_TTL:
+        reference_data_cache = load_reference_data(connection)
+    return reference_data_cache
+
+
+def clear_reference_data() -> None:
+    """Clears the reference data so it is reloaded on next use."""
+    global reference_data_cache, reference_data_refreshed_at  # noqa: PLW0603
+    reference_data_cache = None
+    reference_data_refreshed_at = None
+
+
+def load_reference_data(connection: Connection) -> ReferenceData:
+    """Loads the DoS reference data from the DoS database.
+
+    Args:
+        connection (Connection): Connection to the DoS database
+
+    Returns:
+        ReferenceData: The DoS reference data
+    """
+
+    def fetch_all(query: DoSQuery) -> list[dict]:
+        cursor = query_dos_db(connection=connection, query=query)
+        rows = cursor.fetchall()
+        cursor.close()
+        return rows
+
+    reference_data = ReferenceData(
+        service_types={row["id"]: row["name"] for row in fetch_all(GET_SERVICE_TYPES_QUERY)},
+        service_statuses={row["id"]: row["name"] for row in fetch_all(GET_SERVICE_STATUSES_QUERY)},
+        opening_time_days={row["id"]: row["name"] for row in fetch_all(GET_OPENING_TIME_DAYS_QUERY)},
+        symptom_group_symptom_discriminators=frozenset(
+            (row["symptomgroupid"], row["symptomdiscriminatorid"])
+            for row in fetch_all(GET_SYMPTOM_GROUP_SYMPTOM_DISCRIMINATORS_QUERY)
+        ),
+        loaded_at=monotonic(),
+    )
+    logger.debug(
+        "Loaded reference data from the DoS database",
+        service_types=len(reference_data.service_types),
+        service_statuses=len(reference_data.service_statuses),
+        opening_time_days=len(reference_data.opening_time_days),
+        symptom_group_symptom_discriminators=len(reference_data.symptom_group_symptom_discriminators),
+    )
+    return reference_data
+
+
+def symptom_group_symptom_discriminator_exists(
+    connection: Connection,
+    symptom_group_id: int,
+    symptom_discriminator_id: int,
+) -> bool:
+    """Checks the symptom group and symptom discriminator combination exists in the DoS database.
+
+    A combination missing from previously loaded reference data causes a reload, so combinations added
+    since the reference data was loaded are found without waiting for the TTL. Unknown combinations are
+    common, so these reloads happen at most once per TTL.
+
+    Args:
+        connection (Connection): Connection to the DoS database
+        symptom_group_id (int): The symptom group id
+        symptom_discriminator_id (int): The symptom discriminator id
+
+    Returns:
+        bool: True if the combination exists, False if it does not
+    """
+    global reference_data_refreshed_at  # noqa: PLW0603
+    combination = (symptom_group_id, symptom_discriminator_id)
+    previous_reference_data = reference_data_cache
+    reference_data = get_reference_data(connection)
+    if (
+        combination not in reference_data.symptom_group_symptom_discriminators
+        and reference_data is previous_reference_data
+        and (reference_data_refreshed_at is None or monotonic() - reference_data_refreshed_at > REFERENCE_DATA_TTL)
+    ):
+        reference_data_refreshed_at = monotonic()
+        reference_data = get_reference_data(connection, refresh=True)
+    return combination in reference_data.symptom_group_symptom_discriminators
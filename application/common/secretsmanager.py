@@ -1,12 +1,12 @@
 from json import loads
 
 from aws_lambda_powertools.logging import Logger
-from boto3 import client
 from botocore.exceptions import ClientError
 
-logger = Logger()
+from common.aws_clients import get_client
+from common.stage_metrics import time_stage
 
-secrets_manager = client(service_name="secretsmanager")
+logger = Logger()
 
 
 def get_secret(secret_name: str) -> dict[str, str]:
@@ -22,7 +22,8 @@ def get_secret(secret_name: str) -> dict[str, str]:
         Dict[str, str]: Secrets as a dictionary
     """
     try:
-        secret_value_response = secrets_manager.get_secret_value(SecretId=secret_name)
+        with time_stage("secret_fetch"):
+            secret_value_response = get_client("secretsmanager").get_secret_value(SecretId=secret_name)
     except ClientError as err:
         msg = f"Failed getting secret '{secret_name}' from secrets manager"
         raise Exception(msg) from err  # noqa: TRY002
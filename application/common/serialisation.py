@@ -0,0 +1,133 @@
+import json
+from decimal import Clamped, Context, Decimal, Inexact, Overflow, Rounded, Underflow
+from math import isfinite
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+JSON_BACKEND = "stdlib" if orjson is None else "orjson"
+# Standard library json.dumps arguments matching orjson's compact, unescaped output for plain JSON values
+STDLIB_DUMPS_KWARGS: dict[str, Any] = {"separators": (",", ":"), "ensure_ascii": False}
+# Types orjson encodes the same as the standard library. Floats are checked separately, as orjson writes NaN and
+# Infinity as null and formats some exponents differently (1e-7 rather than 1e-07)
+ORJSON_PLAIN_TYPES = frozenset({str, int, bool, type(None)})
+# Same decimal context as boto3.dynamodb.types, defined here so boto3 is not imported just to serialise
+DYNAMODB_CONTEXT = Context(Emin=-128, Emax=126, prec=38, traps=[Clamped, Overflow, Inexact, Rounded, Underflow])
+
+
+def loads(data: str | bytes) -> Any:  # noqa: ANN401
+    """Decode a JSON document using the fastest available backend.
+
+    Anything orjson refuses (e.g. NaN literals) is handed to the standard library so behaviour
+    and error messages match the standard library json module.
+
+    Args:
+        data (str | bytes): JSON document
+
+    Returns:
+        Any: Decoded JSON document
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+
+def dumps(obj: Any) -> str:  # noqa: ANN401
+    """Encode an object as a JSON string using the fastest available backend.
+
+    orjson is only used for plain JSON values it encodes the same as the standard library. Anything else
+    (e.g. Decimals, datetimes, NaN or floats written with an exponent) and anything orjson refuses
+    (e.g. integers over 64 bits) is handed to the standard library, so the output, behaviour and error
+    messages match the standard library json module. Both backends encode compactly and without
+    escaping non-ASCII characters.
+
+    Args:
+        obj (Any): Object to encode
+
+    Returns:
+        str: JSON string
+    """
+    if orjson is not None and is_orjson_plain(obj):
+        try:
+            return orjson.dumps(obj).decode()
+        except orjson.JSONEncodeError:
+            pass
+    return json.dumps(obj, **STDLIB_DUMPS_KWARGS)
+
+
+def is_orjson_plain(obj: Any) -> bool:  # noqa: ANN401
+    """Check an object only holds values orjson encodes the same as the standard library json module.
+
+    Types are matched exactly, so subclasses such as enums are handed to the standard library.
+
+    Args:
+        obj (Any): Object to check
+
+    Returns:
+        bool: True if orjson and the standard library encode the object the same
+    """
+    stack = [obj]
+    while stack:
+        value = stack.pop()
+        value_type = type(value)
+        if value_type is dict:
+            stack.extend(value.values())
+        elif value_type is list or value_type is tuple:
+            stack.extend(value)
+        elif value_type is float:
+            if not isfinite(value) or "e" in repr(value):
+                return False
+        elif value_type not in ORJSON_PLAIN_TYPES:
+            return False
+    return True
+
+
+def to_attribute_value(value: Any) -> dict[str, Any]:  # noqa: ANN401, PLR0911
+    """Convert a JSON compatible value into a DynamoDB AttributeValue.
+
+    Numbers are converted the same way as boto3's TypeSerializer after a parse_float=Decimal
+    round trip, without having to encode and decode the value first.
+
+    Args:
+        value (Any): JSON compatible value
+
+    Returns:
+        dict[str, Any]: DynamoDB AttributeValue
+    """
+    if isinstance(value, str):
+        return {"S": value}
+    if isinstance(value, bool):
+        return {"BOOL": value}
+    if value is None:
+        return {"NULL": True}
+    if isinstance(value, int | Decimal):
+        return {"N": str(DYNAMODB_CONTEXT.create_decimal(value))}
+    if isinstance(value, float):
+        if not isfinite(value):
+            msg = "Infinity and NaN not supported"
+            raise TypeError(msg)
+        return {"N": str(DYNAMODB_CONTEXT.create_decimal(repr(value)))}
+    if isinstance(value, dict):
+        return {"M": {str(key): to_attribute_value(item) for key, item in value.items()}}
+    if isinstance(value, list | tuple):
+        return {"L": [to_attribute_value(item) for item in value]}
+    msg = f"Unsupported type {type(value)} for value {value}"
+    raise TypeError(msg)
+
+
+def to_dynamodb_item(item: dict[str, Any]) -> dict[str, dict[str, Any]]:
+    """Convert a dictionary into a DynamoDB item.
+
+    Args:
+        item (dict[str, Any]): Dictionary of JSON compatible values
+
+    Returns:
+        dict[str, dict[str, Any]]: DynamoDB item
+    """
+    return {key: to_attribute_value(value) for key, value in item.items()}
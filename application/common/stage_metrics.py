@@ -0,0 +1,67 @@
+from collections import defaultdict
+from collections.abc import Generator
+from contextlib import contextmanager
+from os import getenv
+from time import perf_counter
+
+from aws_lambda_powertools.logging import Logger
+from aws_lambda_powertools.metrics import EphemeralMetrics, MetricUnit
+
+logger = Logger(child=True)
+# Namespace used when POWERTOOLS_METRICS_NAMESPACE is not set
+DEFAULT_STAGE_METRICS_NAMESPACE = "uec-dos-int"
+STAGE_DURATION_METRIC = "StageDuration"
+# Durations in milliseconds of each stage of the current invocation, by stage name
+stage_durations: defaultdict[str, list[float]] = defaultdict(list)
+
+
+@contextmanager
+def time_stage(stage: str) -> Generator[None, None, None]:
+    """Times the code in the context manager as a stage of the current invocation.
+
+    The duration is recorded even if the code raises an exception.
+
+    Args:
+        stage (str): Name of the stage, e.g. secret_fetch or query.get_service
+    """
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        record_stage_duration(stage, (perf_counter() - start) * 1000)
+
+
+def record_stage_duration(stage: str, duration: float) -> None:
+    """Records the duration of a stage of the current invocation.
+
+    Args:
+        stage (str): Name of the stage
+        duration (float): Duration of the stage in milliseconds
+    """
+    stage_durations[stage].append(duration)
+
+
+def clear_stage_durations() -> None:
+    """Clears the recorded stage durations, e.g. left by an invocation that was not flushed."""
+    stage_durations.clear()
+
+
+def flush_stage_metrics(lambda_name: str) -> None:
+    """Writes the recorded stage durations as CloudWatch Embedded Metric Format metrics and clears them.
+
+    One EMF document is written per stage, with lambda and stage dimensions, holding every duration
+    recorded for the stage in the invocation.
+
+    Args:
+        lambda_name (str): Name of the lambda function, used as the lambda dimension
+    """
+    namespace = getenv("POWERTOOLS_METRICS_NAMESPACE", DEFAULT_STAGE_METRICS_NAMESPACE)
+    for stage, durations in stage_durations.items():
+        metrics = EphemeralMetrics(namespace=namespace)
+        metrics.add_dimension(name="lambda", value=lambda_name)
+        metrics.add_dimension(name="stage", value=stage)
+        for duration in durations:
+            metrics.add_metric(name=STAGE_DURATION_METRIC, unit=MetricUnit.Milliseconds, value=duration)
+        metrics.flush_metrics()
+    logger.debug("Flushed stage metrics", stages=list(stage_durations))
+    clear_stage_durations()
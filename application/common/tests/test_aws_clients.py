@@ -0,0 +1,52 @@
+from collections.abc import Generator
+from os import environ
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from application.common.aws_clients import _create_client, get_client
+
+
+@pytest.fixture(autouse=True)
+def _clear_clients() -> Generator[None, None, None]:
+    aws_region = environ.get("AWS_REGION")
+    _create_client.cache_clear()
+    yield
+    _create_client.cache_clear()
+    if aws_region is not None:
+        environ["AWS_REGION"] = aws_region
+
+
+@patch("boto3.client")
+def test_get_client(mock_client: MagicMock) -> None:
+    # Arrange
+    environ["AWS_REGION"] = "eu-west-2"
+    # Act
+    first = get_client("sqs")
+    second = get_client("sqs")
+    # Assert
+    assert first is second
+    mock_client.assert_called_once_with("sqs", region_name="eu-west-2")
+
+
+@patch("boto3.client")
+def test_get_client_per_service_and_region(mock_client: MagicMock) -> None:
+    # Arrange
+    environ["AWS_REGION"] = "eu-west-2"
+    # Act
+    get_client("sqs")
+    get_client("s3")
+    environ["AWS_REGION"] = "us-east-2"
+    get_client("sqs")
+    # Assert
+    assert mock_client.call_count == 3
+
+
+@patch("boto3.client")
+def test_get_client_after_cache_clear(mock_client: MagicMock) -> None:
+    # Act
+    get_client("sqs")
+    _create_client.cache_clear()
+    get_client("sqs")
+    # Assert
+    assert mock_client.call_count == 2
@@ -15,6 +15,7 @@ from application.common.dos import (
     has_blood_pressure,
     has_contraception,
     has_palliative_care,
+    is_matchable_dos_service,
 )
 from application.common.opening_times import OpenPeriod, SpecifiedOpeningTime, StandardOpeningTimes
 from application.conftest import dummy_dos_service
@@ -139,10 +140,11 @@ def test_dos_service_get_region_if_none(mock_get_region: MagicMock) -> None:
     mock_get_region.assert_called_once()
 
 
+@patch(f"{FILE_PATH}.get_reference_data")
 @patch(f"{FILE_PATH}.connect_to_db_reader")
 @patch(f"{FILE_PATH}.query_dos_db")
 def test_get_matching_dos_services_pharmacy_services_returned(
-    mock_query_dos_db: MagicMock, mock_connect_to_db_reader: MagicMock
+    mock_query_dos_db: MagicMock, mock_connect_to_db_reader: MagicMock, mock_get_reference_data: MagicMock
 ) -> None:
     # Arrange
     odscode = "FQ038"
@@ -161,13 +163,15 @@ def test_get_matching_dos_services_pharmacy_services_returned(
     assert service.odscode == odscode
     assert service.id == service_id
     assert service.name == name
+    assert service.service_type_name == mock_get_reference_data.return_value.service_types.get.return_value
+    assert service.status_name == mock_get_reference_data.return_value.service_statuses.get.return_value
+    mock_get_reference_data.assert_called_once_with(mock_connection)
     mock_query_dos_db.assert_called_once_with(
         connection=mock_connection,
         query=(
-            "SELECT s.id, uid, s.name, odscode, address, postcode, web, typeid,statusid, ss.name status_name, "
-            "publicphone, publicname, st.name service_type_name FROM services s LEFT JOIN servicetypes st ON s.typeid "
-            "= st.id LEFT JOIN servicestatuses ss on s.statusid = ss.id WHERE s.odscode LIKE %(ODS)s AND s.typeid = "
-            "ANY(%(PHARMACY_SERVICE_TYPE_IDS)s) AND s.statusid = %(ACTIVE_STATUS_ID)s OR s.odscode LIKE %(ODS)s AND "
+            "SELECT id, uid, name, odscode, address, postcode, web, typeid, statusid, publicphone, publicname "
+            "FROM services s WHERE s.odscode LIKE %(ODS)s AND s.typeid = ANY(%(PHARMACY_SERVICE_TYPE_IDS)s) "
+            "AND s.statusid = %(ACTIVE_STATUS_ID)s OR s.odscode LIKE %(ODS)s AND "
             "s.typeid = ANY(%(PHARMACY_FIRST_SERVICE_TYPE_IDS)s) AND s.statusid = ANY(%(PHARMACY_FIRST_STATUSES)s)"
         ),
         query_vars={
@@ -182,10 +186,11 @@ def test_get_matching_dos_services_pharmacy_services_returned(
     mock_cursor.close.assert_called_with()
 
 
+@patch(f"{FILE_PATH}.get_reference_data")
 @patch(f"{FILE_PATH}.connect_to_db_reader")
 @patch(f"{FILE_PATH}.query_dos_db")
 def test_get_matching_dos_services_pharmacy_first_services_returned(
-    mock_query_dos_db: MagicMock, mock_connect_to_db_reader: MagicMock
+    mock_query_dos_db: MagicMock, mock_connect_to_db_reader: MagicMock, mock_get_reference_data: MagicMock
 ) -> None:
     # Arrange
     odscode = "FQ038"
@@ -204,13 +209,15 @@ def test_get_matching_dos_services_pharmacy_first_services_returned(
     assert service.odscode == odscode
     assert service.id == service_id
     assert service.name == name
+    assert service.service_type_name == mock_get_reference_data.return_value.service_types.get.return_value
+    assert service.status_name == mock_get_reference_data.return_value.service_statuses.get.return_value
+    mock_get_reference_data.assert_called_once_with(mock_connection)
     mock_query_dos_db.assert_called_once_with(
         connection=mock_connection,
         query=(
-            "SELECT s.id, uid, s.name, odscode, address, postcode, web, typeid,statusid, ss.name status_name, "
-            "publicphone, publicname, st.name service_type_name FROM services s LEFT JOIN servicetypes st ON s.typeid "
-            "= st.id LEFT JOIN servicestatuses ss on s.statusid = ss.id WHERE s.odscode LIKE %(ODS)s AND s.typeid = "
-            "ANY(%(PHARMACY_SERVICE_TYPE_IDS)s) AND s.statusid = %(ACTIVE_STATUS_ID)s OR s.odscode LIKE %(ODS)s AND "
+            "SELECT id, uid, name, odscode, address, postcode, web, typeid, statusid, publicphone, publicname "
+            "FROM services s WHERE s.odscode LIKE %(ODS)s AND s.typeid = ANY(%(PHARMACY_SERVICE_TYPE_IDS)s) "
+            "AND s.statusid = %(ACTIVE_STATUS_ID)s OR s.odscode LIKE %(ODS)s AND "
             "s.typeid = ANY(%(PHARMACY_FIRST_SERVICE_TYPE_IDS)s) AND s.statusid = ANY(%(PHARMACY_FIRST_STATUSES)s)"
         ),
         query_vars={
@@ -257,10 +264,11 @@ def test_any_generic_bankholiday_open_periods() -> None:
     assert dos_service.any_generic_bankholiday_open_periods() is False
 
 
+@patch(f"{FILE_PATH}.get_reference_data")
 @patch(f"{FILE_PATH}.connect_to_db_reader")
 @patch(f"{FILE_PATH}.query_dos_db")
 def test_get_matching_dos_services_no_services_returned(
-    mock_query_dos_db: MagicMock, mock_connect_to_db_reader: MagicMock
+    mock_query_dos_db: MagicMock, mock_connect_to_db_reader: MagicMock, mock_get_reference_data: MagicMock
 ) -> None:
     # Arrange
     odscode = "FQ038"
@@ -274,13 +282,13 @@ def test_get_matching_dos_services_no_services_returned(
     response = get_matching_dos_services(odscode)
     # Assert
     assert response == []
+    mock_get_reference_data.assert_not_called()
     mock_query_dos_db.assert_called_once_with(
         connection=mock_connection,
         query=(
-            "SELECT s.id, uid, s.name, odscode, address, postcode, web, typeid,statusid, ss.name status_name, "
-            "publicphone, publicname, st.name service_type_name FROM services s LEFT JOIN servicetypes st ON s.typeid "
-            "= st.id LEFT JOIN servicestatuses ss on s.statusid = ss.id WHERE s.odscode LIKE %(ODS)s AND s.typeid = "
-            "ANY(%(PHARMACY_SERVICE_TYPE_IDS)s) AND s.statusid = %(ACTIVE_STATUS_ID)s OR s.odscode LIKE %(ODS)s AND "
+            "SELECT id, uid, name, odscode, address, postcode, web, typeid, statusid, publicphone, publicname "
+            "FROM services s WHERE s.odscode LIKE %(ODS)s AND s.typeid = ANY(%(PHARMACY_SERVICE_TYPE_IDS)s) "
+            "AND s.statusid = %(ACTIVE_STATUS_ID)s OR s.odscode LIKE %(ODS)s AND "
             "s.typeid = ANY(%(PHARMACY_FIRST_SERVICE_TYPE_IDS)s) AND s.statusid = ANY(%(PHARMACY_FIRST_STATUSES)s)"
         ),
         query_vars={
@@ -295,6 +303,24 @@ def test_get_matching_dos_services_no_services_returned(
     mock_cursor.close.assert_called_with()
 
 
+def test_is_matchable_dos_service() -> None:
+    # Arrange
+    dos_service = dummy_dos_service()
+    # Act & Assert
+    for typeid, statusid, expected in [
+        (13, 1, True),
+        (13, 2, False),
+        (134, 1, True),
+        (148, 2, True),
+        (149, 3, True),
+        (148, 4, False),
+        (100, 1, False),
+    ]:
+        dos_service.typeid = typeid
+        dos_service.statusid = statusid
+        assert is_matchable_dos_service(dos_service) is expected
+
+
 @patch(f"{FILE_PATH}.connect_to_db_reader")
 @patch(f"{FILE_PATH}.query_dos_db")
 def test_get_specified_opening_times_from_db_times_returned(
@@ -386,17 +412,19 @@ def test_get_specified_opening_times_from_db_times_returned(
     )
 
 
+@patch(f"{FILE_PATH}.get_reference_data")
 @patch(f"{FILE_PATH}.connect_to_db_reader")
 @patch(f"{FILE_PATH}.query_dos_db")
 def test_get_standard_opening_times_from_db_times_returned(
-    mock_query_dos_db: MagicMock, mock_connect_to_db_reader: MagicMock
+    mock_query_dos_db: MagicMock, mock_connect_to_db_reader: MagicMock, mock_get_reference_data: MagicMock
 ) -> None:
     # Arrange
     db_return = [
-        {"serviceid": 28334, "dayid": 1, "name": "Tuesday", "starttime": time(8, 0, 0), "endtime": time(17, 0, 0)},
-        {"serviceid": 28334, "dayid": 1, "name": "Friday", "starttime": time(9, 0, 0), "endtime": time(11, 30, 0)},
-        {"serviceid": 28334, "dayid": 1, "name": "Friday", "starttime": time(13, 0, 0), "endtime": time(15, 30, 0)},
+        {"serviceid": 28334, "dayid": 2, "starttime": time(8, 0, 0), "endtime": time(17, 0, 0)},
+        {"serviceid": 28334, "dayid": 5, "starttime": time(9, 0, 0), "endtime": time(11, 30, 0)},
+        {"serviceid": 28334, "dayid": 5, "starttime": time(13, 0, 0), "endtime": time(15, 30, 0)},
     ]
+    mock_get_reference_data.return_value.opening_time_days = {2: "Tuesday", 5: "Friday"}
     mock_cursor = MagicMock()
     service_id = 123456
     mock_cursor.fetchall.return_value = db_return
@@ -416,12 +444,10 @@ def test_get_standard_opening_times_from_db_times_returned(
 
     mock_query_dos_db.assert_called_once_with(
         connection=mock_connection,
-        query="SELECT sdo.serviceid, sdo.dayid, otd.name, sdot.starttime, sdot.endtime "
+        query="SELECT sdo.serviceid, sdo.dayid, sdot.starttime, sdot.endtime "
         "FROM servicedayopenings sdo "
         "INNER JOIN servicedayopeningtimes sdot "
         "ON sdo.id = sdot.servicedayopeningid "
-        "LEFT JOIN openingtimedays otd "
-        "ON sdo.dayid = otd.id "
         "WHERE sdo.serviceid = %(SERVICE_ID)s",
         query_vars={"SERVICE_ID": service_id},
     )
@@ -527,6 +553,38 @@ def test_get_valid_dos_location_invalid_postcode(mock_get_dos_locations: MagicMo
     assert location is None
 
 
+@patch(f"{FILE_PATH}.get_dos_locations")
+@patch(f"{FILE_PATH}.get_loaded_location_region")
+def test_get_valid_dos_location_loaded_postcode_region(
+    mock_get_loaded_location_region: MagicMock,
+    mock_get_dos_locations: MagicMock,
+) -> None:
+    # Act
+    location = get_valid_dos_location("ba2 7af")
+    # Assert
+    assert location == mock_get_loaded_location_region.return_value.get_valid.return_value
+    mock_get_loaded_location_region.assert_called_once_with("BA27AF")
+    mock_get_loaded_location_region.return_value.get_valid.assert_called_once_with("BA27AF")
+    mock_get_dos_locations.assert_not_called()
+
+
+@patch(f"{FILE_PATH}.get_dos_locations")
+@patch(f"{FILE_PATH}.get_loaded_location_region")
+def test_get_valid_dos_location_postcode_region_not_loaded(
+    mock_get_loaded_location_region: MagicMock,
+    mock_get_dos_locations: MagicMock,
+) -> None:
+    # Arrange
+    mock_get_loaded_location_region.return_value = None
+    mock_get_dos_locations.return_value = mock_location = [MagicMock()]
+    # Act
+    location = get_valid_dos_location("BA2 7AF")
+    # Assert
+    # One postcode is queried directly rather than loading its whole region
+    assert location == mock_location[0]
+    mock_get_dos_locations.assert_called_once_with("BA2 7AF")
+
+
 def test_db_rows_to_spec_open_times() -> None:
     db_rows = [
         {
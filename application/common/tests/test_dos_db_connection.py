@@ -1,9 +1,11 @@
 from os import environ
 from unittest.mock import MagicMock, patch
 
+from psycopg import pq
 from psycopg.rows import dict_row
 
 from application.common.dos_db_connection import (
+    DoSQuery,
     connect_to_db_reader,
     connect_to_db_writer,
     connection_to_db,
@@ -118,9 +120,55 @@ def test_query_dos_db() -> None:
     # Arrange
     query = "SELECT * FROM my_table"
     connection = MagicMock()
+    connection.cursor.return_value.rowcount = 1
     # Act
     result = query_dos_db(connection, query)
     # Assert
     assert result == connection.cursor.return_value
     connection.cursor.assert_called_once_with(row_factory=dict_row)
     connection.cursor.return_value.execute.assert_called_once_with(query=query, params=None)
+
+
+@patch(f"{FILE_PATH}.record_query")
+@patch(f"{FILE_PATH}.record_stage_duration")
+def test_query_dos_db_registered_query(mock_record_stage_duration: MagicMock, mock_record_query: MagicMock) -> None:
+    # Arrange
+    query = DoSQuery("get_my_table", "SELECT * FROM my_table WHERE id = %(ID)s")
+    connection = MagicMock()
+    connection.cursor.return_value.rowcount = 1
+    # Act
+    result = query_dos_db(connection, query, {"ID": 1})
+    # Assert
+    assert result == connection.cursor.return_value
+    connection.cursor.return_value.execute.assert_called_once_with(query=query, params={"ID": 1})
+    assert mock_record_stage_duration.call_args.args[0] == "query.get_my_table"
+    mock_record_query.assert_called_once_with(query, mock_record_stage_duration.call_args.args[1], 1)
+
+
+@patch(f"{FILE_PATH}.record_query")
+@patch(f"{FILE_PATH}.record_stage_duration")
+def test_query_dos_db_pipeline_mode(mock_record_stage_duration: MagicMock, mock_record_query: MagicMock) -> None:
+    # Arrange
+    query = DoSQuery("get_my_table", "SELECT * FROM my_table WHERE id = %(ID)s")
+    connection = MagicMock()
+    connection.pgconn.pipeline_status = pq.PipelineStatus.ON
+    # Act
+    result = query_dos_db(connection, query, {"ID": 1})
+    # Assert
+    assert result == connection.cursor.return_value
+    connection.cursor.return_value.execute.assert_called_once_with(query=query, params={"ID": 1})
+    mock_record_stage_duration.assert_not_called()
+    mock_record_query.assert_not_called()
+
+
+def test_query_dos_db_server_side_cursor() -> None:
+    # Arrange
+    query = DoSQuery("get_my_table", "SELECT * FROM my_table")
+    connection = MagicMock()
+    connection.cursor.return_value.rowcount = -1
+    # Act
+    result = query_dos_db(connection, query, cursor_name="my_cursor")
+    # Assert
+    assert result == connection.cursor.return_value
+    connection.cursor.assert_called_once_with(name="my_cursor", row_factory=dict_row)
+    connection.cursor.return_value.execute.assert_called_once_with(query=query, params=None)
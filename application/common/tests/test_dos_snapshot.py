@@ -0,0 +1,170 @@
+import gzip
+import json
+from datetime import date, time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from application.common.dos_snapshot import (
+    DOS_SNAPSHOT_SERVICE_FIELDS,
+    ServiceRows,
+    dos_service_from_snapshot,
+    export_dos_snapshot,
+    has_sgsd,
+    read_dos_snapshot,
+    stream_dos_snapshot,
+)
+from application.common.opening_times import OpenPeriod, SpecifiedOpeningTime
+
+FILE_PATH = "application.common.dos_snapshot"
+
+SNAPSHOT_RECORD = {
+    "id": 2,
+    "uid": 100002,
+    "name": "Fake Pharmacy",
+    "odscode": "TES73",
+    "address": "Old Address$Bath",
+    "town": "BATH",
+    "postcode": "TE5 7ER",
+    "web": "www.example.com",
+    "typeid": 13,
+    "statusid": 1,
+    "publicphone": "0100 000 0000",
+    "publicname": "Fake Pharmacy",
+    "easting": 391000,
+    "northing": 156000,
+    "latitude": 51.301,
+    "longitude": -2.131,
+    "service_type_name": "Pharmacy",
+    "status_name": "active",
+    "standard_opening_times": [["Monday", "09:00:00", "17:00:00"], ["Tuesday", "09:00:00", "12:00:00"]],
+    "specified_opening_times": [
+        ["2023-12-25", "00:00:00", "00:00:00", True],
+        ["2023-12-26", "10:00:00", "14:00:00", False],
+    ],
+    "sgsds": [[360, 14167]],
+}
+
+
+def test_read_dos_snapshot(tmp_path: Path) -> None:
+    # Arrange
+    path = tmp_path / "dos_snapshot.ndjson.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as snapshot_file:
+        snapshot_file.write(f"{json.dumps(SNAPSHOT_RECORD)}\n\n{json.dumps({'id': 3})}\n")
+    # Act
+    response = list(read_dos_snapshot(path))
+    # Assert
+    assert response == [SNAPSHOT_RECORD, {"id": 3}]
+
+
+def test_dos_service_from_snapshot() -> None:
+    # Act
+    service = dos_service_from_snapshot(SNAPSHOT_RECORD)
+    # Assert
+    assert service.id == 2
+    assert service.odscode == "TES73"
+    assert service.service_type_name == "Pharmacy"
+    assert service.standard_opening_times.monday == [OpenPeriod(time(9, 0), time(17, 0))]
+    assert service.standard_opening_times.tuesday == [OpenPeriod(time(9, 0), time(12, 0))]
+    assert service.standard_opening_times.wednesday == []
+    assert service.specified_opening_times == [
+        SpecifiedOpeningTime([], date(2023, 12, 25), is_open=False),
+        SpecifiedOpeningTime([OpenPeriod(time(10, 0), time(14, 0))], date(2023, 12, 26)),
+    ]
+    assert service.palliative_care is True
+    assert service.blood_pressure is False
+    assert service.contraception is False
+
+
+def test_dos_service_from_snapshot_blood_pressure() -> None:
+    # Arrange
+    record = {"id": 4, "odscode": "TES73", "typeid": 148, "statusid": 1}
+    # Act
+    service = dos_service_from_snapshot(record)
+    # Assert
+    assert service.blood_pressure is True
+    assert service.palliative_care is False
+    assert service.standard_opening_times.fully_closed()
+    assert service.specified_opening_times == []
+
+
+def test_has_sgsd() -> None:
+    # Act & Assert
+    assert has_sgsd([[360, 14207], [360, 14167]], 360, 14167) is True
+    assert has_sgsd([[360, 14207]], 360, 14167) is False
+    assert has_sgsd([], 360, 14167) is False
+
+
+def test_service_rows() -> None:
+    # Arrange
+    rows = [{"serviceid": 1, "value": "a"}, {"serviceid": 3, "value": "b"}, {"serviceid": 3, "value": "c"}]
+    service_rows = ServiceRows(iter(rows))
+    # Act & Assert
+    assert service_rows.pop(2) == []
+    assert service_rows.pop(3) == [{"serviceid": 3, "value": "b"}, {"serviceid": 3, "value": "c"}]
+    assert service_rows.pop(4) == []
+
+
+@patch(f"{FILE_PATH}.get_reference_data")
+@patch(f"{FILE_PATH}.query_dos_db")
+def test_stream_dos_snapshot(mock_query_dos_db: MagicMock, mock_get_reference_data: MagicMock) -> None:
+    # Arrange
+    mock_connection = MagicMock()
+    mock_get_reference_data.return_value.service_types = {13: "Pharmacy"}
+    mock_get_reference_data.return_value.service_statuses = {1: "active"}
+    mock_get_reference_data.return_value.opening_time_days = {1: "Monday"}
+    service = {field: SNAPSHOT_RECORD[field] for field in DOS_SNAPSHOT_SERVICE_FIELDS[:-2]}
+    cursors = [
+        [service, service | {"id": 3}],
+        [
+            {"serviceid": 2, "dayid": 1, "starttime": time(9, 0), "endtime": time(17, 0)},
+            {"serviceid": 3, "dayid": 1, "starttime": time(9, 0), "endtime": time(12, 0)},
+        ],
+        [{"serviceid": 2, "date": date(2023, 12, 25), "starttime": time(0), "endtime": time(0), "isclosed": True}],
+        [{"serviceid": 2, "sgid": 360, "sdid": 14167}],
+    ]
+    mock_cursors = [MagicMock(__iter__=MagicMock(return_value=iter(rows))) for rows in cursors]
+    mock_query_dos_db.side_effect = mock_cursors
+    # Act
+    response = list(stream_dos_snapshot(mock_connection, fetch_size=10))
+    # Assert
+    assert response == [
+        service
+        | {
+            "service_type_name": "Pharmacy",
+            "status_name": "active",
+            "standard_opening_times": [["Monday", "09:00:00", "17:00:00"]],
+            "specified_opening_times": [["2023-12-25", "00:00:00", "00:00:00", True]],
+            "sgsds": [[360, 14167]],
+        },
+        service
+        | {
+            "id": 3,
+            "service_type_name": "Pharmacy",
+            "status_name": "active",
+            "standard_opening_times": [["Monday", "09:00:00", "12:00:00"]],
+            "specified_opening_times": [],
+            "sgsds": [],
+        },
+    ]
+    assert [call.kwargs["cursor_name"] for call in mock_query_dos_db.call_args_list] == [
+        "dos_snapshot_services",
+        "dos_snapshot_standard_opening_times",
+        "dos_snapshot_specified_opening_times",
+        "dos_snapshot_sgsds",
+    ]
+    assert [mock_cursor.itersize for mock_cursor in mock_cursors] == [10, 10, 10, 10]
+
+
+@patch(f"{FILE_PATH}.stream_dos_snapshot")
+def test_export_dos_snapshot(mock_stream_dos_snapshot: MagicMock, tmp_path: Path) -> None:
+    # Arrange
+    mock_connection = MagicMock()
+    mock_stream_dos_snapshot.return_value = iter([SNAPSHOT_RECORD, SNAPSHOT_RECORD | {"id": 3}])
+    path = tmp_path / "dos_snapshot.ndjson.gz"
+    # Act
+    response = export_dos_snapshot(mock_connection, path, fetch_size=10)
+    # Assert
+    assert response == 2
+    assert list(read_dos_snapshot(path)) == [SNAPSHOT_RECORD, SNAPSHOT_RECORD | {"id": 3}]
+    mock_stream_dos_snapshot.assert_called_once_with(mock_connection, fetch_size=10)
+    mock_connection.rollback.assert_called_once_with()
@@ -1,6 +1,6 @@
 import pytest
 
-from application.common.errors import DynamoDBError, ValidationError
+from application.common.errors import DynamoDBError, SQSError, ValidationError
 
 
 def test_validation_exception() -> None:
@@ -15,3 +15,10 @@ def test_dynamodb_exception() -> None:
     with pytest.raises(DynamoDBError):  # noqa: PT012
         msg = "Test"
         raise DynamoDBError(msg)
+
+
+def test_sqs_exception() -> None:
+    # Arrange & Act
+    with pytest.raises(SQSError):  # noqa: PT012
+        msg = "Test"
+        raise SQSError(msg)
@@ -0,0 +1,238 @@
+import gzip
+import json
+from collections.abc import Generator
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+from botocore.exceptions import ClientError
+
+from application.common.matching_index import (
+    MATCHING_INDEX_TTL,
+    MatchingIndex,
+    build_matching_index,
+    clear_matching_index,
+    get_indexed_matching_services,
+    get_matching_index,
+    load_matching_index,
+    write_matching_index,
+)
+
+FILE_PATH = "application.common.matching_index"
+
+SNAPSHOT_RECORD = {
+    "id": 2,
+    "uid": "100002",
+    "name": "Fake Pharmacy",
+    "odscode": "TES73",
+    "address": "Old Address$Bath",
+    "town": "BATH",
+    "postcode": "TE5 7ER",
+    "web": "www.example.com",
+    "typeid": 13,
+    "statusid": 1,
+    "publicphone": "0100 000 0000",
+    "publicname": "Fake Pharmacy",
+    "easting": 391000,
+    "northing": 156000,
+    "latitude": 51.301,
+    "longitude": -2.131,
+    "service_type_name": "Pharmacy",
+    "status_name": "active",
+    "standard_opening_times": [["Monday", "09:00:00", "17:00:00"]],
+    "specified_opening_times": [],
+    "sgsds": [],
+}
+INDEXED_SERVICE = {
+    "id": 2,
+    "uid": "100002",
+    "name": "Fake Pharmacy",
+    "odscode": "TES73",
+    "address": "Old Address$Bath",
+    "postcode": "TE5 7ER",
+    "web": "www.example.com",
+    "typeid": 13,
+    "statusid": 1,
+    "publicphone": "0100 000 0000",
+    "publicname": "Fake Pharmacy",
+    "service_type_name": "Pharmacy",
+    "status_name": "active",
+}
+
+
+@pytest.fixture(autouse=True)
+def _clear_matching_index(monkeypatch: pytest.MonkeyPatch) -> Generator[None, None, None]:
+    monkeypatch.delenv("MATCHING_INDEX_PATH", raising=False)
+    monkeypatch.delenv("MATCHING_INDEX_MAX_AGE", raising=False)
+    clear_matching_index()
+    yield
+    clear_matching_index()
+
+
+def test_build_matching_index() -> None:
+    # Arrange
+    exported_at = datetime(2024, 1, 31, 2, tzinfo=UTC)
+    records = [
+        SNAPSHOT_RECORD,
+        SNAPSHOT_RECORD | {"id": 3, "odscode": "TES73001", "typeid": 148, "statusid": 3},
+        SNAPSHOT_RECORD | {"id": 4, "odscode": "FXX99", "statusid": 2},
+        SNAPSHOT_RECORD | {"id": 5, "odscode": "TES"},
+        SNAPSHOT_RECORD | {"id": 6, "odscode": None},
+    ]
+    # Act
+    response = build_matching_index(records, exported_at)
+    # Assert
+    assert response.exported_at == exported_at
+    assert response.services == {
+        "TES73": [INDEXED_SERVICE, INDEXED_SERVICE | {"id": 3, "odscode": "TES73001", "typeid": 148, "statusid": 3}],
+    }
+
+
+@pytest.mark.parametrize("file_name", ["matching_index.json", "matching_index.json.gz"])
+def test_write_and_load_matching_index(file_name: str, tmp_path: Path) -> None:
+    # Arrange
+    path = tmp_path / file_name
+    matching_index = MatchingIndex(
+        exported_at=datetime(2024, 1, 31, 2, tzinfo=UTC),
+        services={"TES73": [INDEXED_SERVICE]},
+    )
+    # Act
+    write_matching_index(matching_index, path)
+    response = load_matching_index(str(path))
+    # Assert
+    assert response == matching_index
+    assert path.read_bytes().startswith(b"\x1f\x8b") is file_name.endswith(".gz")
+
+
+@patch(f"{FILE_PATH}.get_client")
+def test_load_matching_index_from_s3(mock_get_client: MagicMock) -> None:
+    # Arrange
+    document = {"exported_at": "2024-01-31T02:00:00+00:00", "services": {"TES73": [INDEXED_SERVICE]}}
+    mock_get_client.return_value.get_object.return_value = {
+        "Body": MagicMock(read=MagicMock(return_value=gzip.compress(json.dumps(document).encode()))),
+    }
+    # Act
+    response = load_matching_index("s3://index-bucket/service_matcher/matching_index.json.gz")
+    # Assert
+    mock_get_client.assert_called_once_with("s3")
+    mock_get_client.return_value.get_object.assert_called_once_with(
+        Bucket="index-bucket",
+        Key="service_matcher/matching_index.json.gz",
+    )
+    assert response.services == {"TES73": [INDEXED_SERVICE]}
+
+
+@patch(f"{FILE_PATH}.load_matching_index")
+def test_get_matching_index_disabled(mock_load_matching_index: MagicMock) -> None:
+    # Act
+    response = get_matching_index()
+    # Assert
+    assert response is None
+    mock_load_matching_index.assert_not_called()
+
+
+@patch(f"{FILE_PATH}.monotonic")
+@patch(f"{FILE_PATH}.load_matching_index")
+def test_get_matching_index_reloads_after_ttl(
+    mock_load_matching_index: MagicMock,
+    mock_monotonic: MagicMock,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # Arrange
+    monkeypatch.setenv("MATCHING_INDEX_PATH", "matching_index.json.gz")
+    mock_load_matching_index.side_effect = ["first index", "second index"]
+    mock_monotonic.return_value = 1000.0
+    # Act
+    first = get_matching_index()
+    cached = get_matching_index()
+    mock_monotonic.return_value = 1000.0 + MATCHING_INDEX_TTL + 1
+    reloaded = get_matching_index()
+    # Assert
+    assert (first, cached, reloaded) == ("first index", "first index", "second index")
+    assert mock_load_matching_index.call_count == 2
+
+
+@patch(f"{FILE_PATH}.monotonic")
+@patch(f"{FILE_PATH}.load_matching_index")
+def test_get_matching_index_keeps_index_on_failed_reload(
+    mock_load_matching_index: MagicMock,
+    mock_monotonic: MagicMock,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # Arrange
+    monkeypatch.setenv("MATCHING_INDEX_PATH", "s3://index-bucket/matching_index.json.gz")
+    mock_load_matching_index.side_effect = [
+        "first index",
+        ClientError({"Error": {"Code": "NoSuchKey", "Message": "Not Found"}}, "GetObject"),
+    ]
+    mock_monotonic.return_value = 1000.0
+    get_matching_index()
+    mock_monotonic.return_value = 1000.0 + MATCHING_INDEX_TTL + 1
+    # Act
+    response = get_matching_index()
+    # Assert
+    assert response == "first index"
+
+
+@patch(f"{FILE_PATH}.load_matching_index")
+def test_get_matching_index_failed_load_not_retried_within_ttl(
+    mock_load_matching_index: MagicMock,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # Arrange
+    monkeypatch.setenv("MATCHING_INDEX_PATH", "missing_matching_index.json.gz")
+    mock_load_matching_index.side_effect = FileNotFoundError
+    # Act
+    responses = [get_matching_index(), get_matching_index()]
+    # Assert
+    assert responses == [None, None]
+    mock_load_matching_index.assert_called_once_with("missing_matching_index.json.gz")
+
+
+@patch(f"{FILE_PATH}.get_matching_index")
+def test_get_indexed_matching_services(mock_get_matching_index: MagicMock) -> None:
+    # Arrange
+    mock_get_matching_index.return_value = MatchingIndex(
+        exported_at=datetime.now(UTC) - timedelta(minutes=5),
+        services={"TES73": [INDEXED_SERVICE]},
+    )
+    # Act
+    response = get_indexed_matching_services("TES73001")
+    # Assert
+    assert [(service.id, service.odscode, service.status_name) for service in response] == [(2, "TES73", "active")]
+
+
+@patch(f"{FILE_PATH}.get_matching_index")
+def test_get_indexed_matching_services_miss(mock_get_matching_index: MagicMock) -> None:
+    # Arrange
+    mock_get_matching_index.return_value = MatchingIndex(exported_at=datetime.now(UTC), services={})
+    # Act & Assert
+    assert get_indexed_matching_services("TES73") is None
+
+
+@patch(f"{FILE_PATH}.get_matching_index")
+def test_get_indexed_matching_services_stale(
+    mock_get_matching_index: MagicMock,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # Arrange
+    monkeypatch.setenv("MATCHING_INDEX_MAX_AGE", "600")
+    mock_get_matching_index.return_value = MatchingIndex(
+        exported_at=datetime.now(UTC) - timedelta(minutes=11),
+        services={"TES73": [INDEXED_SERVICE]},
+    )
+    # Act & Assert
+    assert get_indexed_matching_services("TES73") is None
+
+
+@patch(f"{FILE_PATH}.get_matching_index")
+def test_get_indexed_matching_services_short_odscode(mock_get_matching_index: MagicMock) -> None:
+    # Act & Assert
+    assert get_indexed_matching_services("TES") is None
+    mock_get_matching_index.assert_not_called()
+
+
+def test_get_indexed_matching_services_disabled() -> None:
+    # Act & Assert
+    assert get_indexed_matching_services("TES73") is None
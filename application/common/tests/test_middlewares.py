@@ -1,6 +1,7 @@
 import logging
 import re
 from json import dumps
+from unittest.mock import ANY, MagicMock, patch
 
 import pytest
 from aws_lambda_powertools.utilities.data_classes import SQSEvent
@@ -8,13 +9,17 @@ from aws_lambda_powertools.utilities.typing import LambdaContext
 from botocore.exceptions import ClientError
 
 from application.common.middlewares import (
+    profiling,
     redact_staff_key_from_event,
+    stage_metrics,
     unhandled_exception_logging,
     unhandled_exception_logging_hidden_event,
 )
 from application.common.utilities import extract_body
 from application.conftest import PHARMACY_STANDARD_EVENT, PHARMACY_STANDARD_EVENT_STAFF
 
+FILE_PATH = "application.common.middlewares"
+
 
 def test_redact_staff_key_from_event_with_no_staff_key(caplog: pytest.LogCaptureFixture) -> None:
     @redact_staff_key_from_event()
@@ -48,6 +53,42 @@ def test_redact_staff_key_from_event(caplog: pytest.LogCaptureFixture) -> None:
     assert "Staff" not in extract_body(result["Records"][0]["body"])
 
 
+@patch(f"{FILE_PATH}.set_parsed_body")
+@patch(f"{FILE_PATH}.extract_body")
+def test_redact_staff_key_from_event_skips_parsing_without_staff_key(
+    mock_extract_body: MagicMock,
+    mock_set_parsed_body: MagicMock,
+) -> None:
+    @redact_staff_key_from_event()
+    def dummy_handler(event: dict[str, str], context: LambdaContext) -> SQSEvent:
+        return event
+
+    # Arrange
+    event = SQS_EVENT.copy()
+    event["Records"][0]["body"] = dumps(PHARMACY_STANDARD_EVENT.copy())
+    # Act
+    dummy_handler(event, None)
+    # Assert
+    mock_extract_body.assert_not_called()
+    mock_set_parsed_body.assert_not_called()
+
+
+@patch(f"{FILE_PATH}.set_parsed_body")
+def test_redact_staff_key_from_event_stores_parsed_body(mock_set_parsed_body: MagicMock) -> None:
+    @redact_staff_key_from_event()
+    def dummy_handler(event: dict[str, str], context: LambdaContext) -> SQSEvent:
+        return event
+
+    # Arrange
+    event = SQS_EVENT.copy()
+    event["Records"][0]["body"] = dumps(PHARMACY_STANDARD_EVENT_STAFF.copy())
+    # Act
+    result = dummy_handler(event, None)
+    # Assert
+    redacted_body = result["Records"][0]["body"]
+    mock_set_parsed_body.assert_called_once_with(redacted_body, extract_body(redacted_body))
+
+
 def test_redact_staff_key_from_event_no_records(caplog: pytest.LogCaptureFixture) -> None:
     @redact_staff_key_from_event()
     def dummy_handler(event: dict[str, str], context: LambdaContext) -> SQSEvent:
@@ -119,6 +160,111 @@ def test_unhandled_exception_logging_hidden_event_no_error() -> None:
     dummy_handler(event, None)
 
 
+@patch(f"{FILE_PATH}.dump_query_stats")
+@patch(f"{FILE_PATH}.clear_query_stats")
+@patch(f"{FILE_PATH}.flush_stage_metrics")
+@patch(f"{FILE_PATH}.time_stage")
+@patch(f"{FILE_PATH}.clear_stage_durations")
+def test_stage_metrics(
+    mock_clear_stage_durations: MagicMock,
+    mock_time_stage: MagicMock,
+    mock_flush_stage_metrics: MagicMock,
+    mock_clear_query_stats: MagicMock,
+    mock_dump_query_stats: MagicMock,
+    lambda_context: LambdaContext,
+) -> None:
+    @stage_metrics()
+    def dummy_handler(event: dict[str, str], context: LambdaContext) -> str:
+        return "response"
+
+    # Act
+    response = dummy_handler({}, lambda_context)
+    # Assert
+    assert response == "response"
+    mock_clear_stage_durations.assert_called_once_with()
+    mock_time_stage.assert_called_once_with("handler")
+    mock_flush_stage_metrics.assert_called_once_with(lambda_name="lambda")
+    mock_clear_query_stats.assert_called_once_with()
+    mock_dump_query_stats.assert_called_once_with()
+
+
+@patch(f"{FILE_PATH}.flush_stage_metrics")
+def test_stage_metrics_flushes_on_error(mock_flush_stage_metrics: MagicMock, lambda_context: LambdaContext) -> None:
+    @stage_metrics()
+    def dummy_handler(event: dict[str, str], context: LambdaContext) -> None:
+        msg = "error"
+        raise ValueError(msg)
+
+    # Act
+    with pytest.raises(ValueError, match="error"):
+        dummy_handler({}, lambda_context)
+    # Assert
+    mock_flush_stage_metrics.assert_called_once_with(lambda_name="lambda")
+
+
+@patch(f"{FILE_PATH}.save_profile")
+@patch(f"{FILE_PATH}.should_profile")
+def test_profiling_not_sampled(
+    mock_should_profile: MagicMock,
+    mock_save_profile: MagicMock,
+    lambda_context: LambdaContext,
+) -> None:
+    @profiling()
+    def dummy_handler(event: dict[str, str], context: LambdaContext) -> str:
+        return "response"
+
+    # Arrange
+    mock_should_profile.return_value = False
+    # Act
+    response = dummy_handler({}, lambda_context)
+    # Assert
+    assert response == "response"
+    mock_save_profile.assert_not_called()
+
+
+@patch(f"{FILE_PATH}.save_profile")
+@patch(f"{FILE_PATH}.should_profile")
+def test_profiling(mock_should_profile: MagicMock, mock_save_profile: MagicMock, lambda_context: LambdaContext) -> None:
+    @profiling()
+    def dummy_handler(event: dict[str, str], context: LambdaContext) -> str:
+        return "response"
+
+    # Arrange
+    mock_should_profile.return_value = True
+    # Act
+    response = dummy_handler({}, lambda_context)
+    # Assert
+    assert response == "response"
+    mock_save_profile.assert_called_once_with(
+        ANY,
+        lambda_name="lambda",
+        request_id="52fdfc07-2182-154f-163f-5f0f9a621d72",
+    )
+    stats = mock_save_profile.call_args.args[0]
+    assert any(function_name == "dummy_handler" for _, _, function_name in stats.stats)
+
+
+@patch(f"{FILE_PATH}.save_profile")
+@patch(f"{FILE_PATH}.should_profile")
+def test_profiling_saves_profile_on_error(
+    mock_should_profile: MagicMock,
+    mock_save_profile: MagicMock,
+    lambda_context: LambdaContext,
+) -> None:
+    @profiling()
+    def dummy_handler(event: dict[str, str], context: LambdaContext) -> None:
+        msg = "error"
+        raise ValueError(msg)
+
+    # Arrange
+    mock_should_profile.return_value = True
+    # Act
+    with pytest.raises(ValueError, match="error"):
+        dummy_handler({}, lambda_context)
+    # Assert
+    mock_save_profile.assert_called_once()
+
+
 SQS_EVENT = {
     "Records": [
         {
@@ -4,6 +4,7 @@ import pytest
 
 from application.common.opening_times import (
     WEEKDAYS,
+    OpeningTimesFingerprint,
     OpenPeriod,
     SpecifiedOpeningTime,
     StandardOpeningTimes,
@@ -705,3 +706,22 @@ def test_std_open_times_fully_closed() -> None:
         std_open_times.add_open_period(OpenPeriod.from_string_times("08:00", "13:00"), day)
         assert not std_open_times.fully_closed()
         setattr(std_open_times, day, [])
+
+
+def test_opening_times_fingerprint_changed_weekdays() -> None:
+    # Arrange
+    dos_standard_opening_times = StandardOpeningTimes()
+    dos_standard_opening_times.add_open_period(OpenPeriod(time(9, 0), time(17, 0)), "monday")
+    dos_standard_opening_times.add_open_period(OpenPeriod(time(8, 0), time(8, 30)), "monday")
+    dos_standard_opening_times.add_open_period(OpenPeriod(time(9, 0), time(12, 0)), "tuesday")
+    nhs_standard_opening_times = StandardOpeningTimes()
+    nhs_standard_opening_times.add_open_period(OpenPeriod(time(8, 0), time(8, 30)), "Monday")
+    nhs_standard_opening_times.add_open_period(OpenPeriod(time(9, 0), time(17, 0)), "Monday")
+    nhs_standard_opening_times.add_open_period(OpenPeriod(time(9, 0), time(13, 0)), "Tuesday")
+    nhs_standard_opening_times.add_open_period(OpenPeriod(time(9, 0), time(13, 0)), "Sunday")
+    # Act
+    dos_fingerprint = OpeningTimesFingerprint(dos_standard_opening_times)
+    nhs_fingerprint = OpeningTimesFingerprint(nhs_standard_opening_times)
+    # Assert
+    assert dos_fingerprint.changed_weekdays(nhs_fingerprint) == ["tuesday", "sunday"]
+    assert dos_fingerprint.changed_weekdays(dos_fingerprint) == []
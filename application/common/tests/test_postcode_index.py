@@ -0,0 +1,200 @@
+from collections.abc import Generator
+from unittest.mock import MagicMock, call, patch
+
+import pytest
+
+from application.common.dos_location import DoSLocation
+from application.common.postcode_index import (
+    POSTCODE_INDEX_TTL,
+    LocationRegion,
+    clear_location_regions,
+    get_loaded_location_region,
+    get_valid_dos_locations,
+    is_postcode_index_enabled,
+    is_postcode_variation,
+    load_location_region,
+    location_regions,
+    normalise_postcode,
+    region_of,
+)
+
+FILE_PATH = "application.common.postcode_index"
+
+
+def location_row(location_id: int, postcode: str, easting: int | None = 2) -> dict:
+    return {
+        "id": location_id,
+        "postcode": postcode,
+        "easting": easting,
+        "northing": 3,
+        "postaltown": "BATH",
+        "latitude": 4.0,
+        "longitude": 2.0,
+    }
+
+
+@pytest.fixture(autouse=True)
+def _clear_location_regions() -> Generator[None, None, None]:
+    clear_location_regions()
+    yield
+    clear_location_regions()
+
+
+def test_normalise_postcode() -> None:
+    # Act & Assert
+    assert normalise_postcode("ba2 7af") == "BA27AF"
+
+
+@pytest.mark.parametrize(
+    ("postcode", "expected"),
+    [
+        ("BA2 7AF", True),
+        ("BA27AF", True),
+        ("B A27AF", True),
+        ("ba2 7af", False),
+        ("BA2 7 AF", False),
+        (" BA27AF", False),
+        ("BA27AF ", False),
+    ],
+)
+def test_is_postcode_variation(postcode: str, expected: bool) -> None:
+    # Act & Assert
+    assert is_postcode_variation(postcode) is expected
+
+
+@pytest.mark.parametrize(
+    ("normal_postcode", "expected"),
+    [("BA27AF", "BA"), ("B12AA", "B1"), ("B", None), ("%_1", None)],
+)
+def test_region_of(normal_postcode: str, expected: str | None) -> None:
+    # Act & Assert
+    assert region_of(normal_postcode) == expected
+
+
+@patch(f"{FILE_PATH}.monotonic")
+@patch(f"{FILE_PATH}.query_dos_db")
+def test_load_location_region(mock_query_dos_db: MagicMock, mock_monotonic: MagicMock) -> None:
+    # Arrange
+    mock_connection = MagicMock()
+    mock_query_dos_db.return_value.fetchall.return_value = [
+        location_row(1, "BA2 7AF"),
+        location_row(2, "BA1 1AA"),
+        location_row(3, "B A27AF"),
+        location_row(4, "ba1 1aa"),
+    ]
+    mock_monotonic.return_value = 1000.0
+    # Act
+    response = load_location_region(mock_connection, "BA")
+    # Assert
+    mock_query_dos_db.assert_called_once_with(
+        connection=mock_connection,
+        query="SELECT id, postcode, easting, northing, postaltown, latitude, longitude "
+        "FROM locations WHERE postcode LIKE %(REGION)s OR postcode LIKE %(SPACED_REGION)s",
+        query_vars={"REGION": "BA%", "SPACED_REGION": "B A%"},
+    )
+    assert response.postcodes == ["BA11AA", "BA27AF", "BA27AF"]
+    assert [location.id for location in response.locations] == [2, 1, 3]
+    assert response.loaded_at == 1000.0
+
+
+def test_location_region_get() -> None:
+    # Arrange
+    locations = [DoSLocation(**location_row(location_id, "BA2 7AF")) for location_id in (1, 2)]
+    region = LocationRegion(
+        postcodes=["BA11AA", "BA27AF", "BA27AF", "BA27AG"],
+        locations=[DoSLocation(**location_row(3, "BA1 1AA")), *locations, DoSLocation(**location_row(4, "BA2 7AG"))],
+        loaded_at=0.0,
+    )
+    # Act & Assert
+    assert region.get("BA27AF") == locations
+    assert region.get("BA27AE") == []
+
+
+def test_location_region_get_valid() -> None:
+    # Arrange
+    invalid_location = DoSLocation(**location_row(1, "BA2 7AF", easting=None))
+    valid_location = DoSLocation(**location_row(2, "BA2 7AF"))
+    region = LocationRegion(postcodes=["BA27AF", "BA27AF"], locations=[invalid_location, valid_location], loaded_at=0.0)
+    # Act & Assert
+    assert region.get_valid("BA27AF") == valid_location
+    assert region.get_valid("BA27AG") is None
+
+
+@patch(f"{FILE_PATH}.monotonic")
+def test_get_loaded_location_region(mock_monotonic: MagicMock) -> None:
+    # Arrange
+    location_regions["BA"] = region = LocationRegion(postcodes=[], locations=[], loaded_at=1000.0)
+    mock_monotonic.return_value = 1000.0 + POSTCODE_INDEX_TTL
+    # Act & Assert
+    assert get_loaded_location_region("BA27AF") is region
+    assert get_loaded_location_region("B12AA") is None
+    assert get_loaded_location_region("B") is None
+    mock_monotonic.return_value = 1000.0 + POSTCODE_INDEX_TTL + 1
+    assert get_loaded_location_region("BA27AF") is None
+
+
+@patch(f"{FILE_PATH}.load_location_region")
+@patch(f"{FILE_PATH}.connect_to_db_reader")
+def test_get_valid_dos_locations(mock_connect_to_db_reader: MagicMock, mock_load_location_region: MagicMock) -> None:
+    # Arrange
+    mock_connection = mock_connect_to_db_reader.return_value.__enter__.return_value
+    invalid_location = DoSLocation(**location_row(1, "BA2 7AF", easting=None))
+    valid_location = DoSLocation(**location_row(2, "BA2 7AF"))
+    b1_location = DoSLocation(**location_row(3, "B1 2AA"))
+    mock_load_location_region.side_effect = [
+        LocationRegion(postcodes=["BA27AF", "BA27AF"], locations=[invalid_location, valid_location], loaded_at=0.0),
+        LocationRegion(postcodes=["B12AA"], locations=[b1_location], loaded_at=0.0),
+    ]
+    # Act
+    response = get_valid_dos_locations(["ba2 7af", "BA27AF", "BA2 7AG", "B1 2AA", "B"])
+    # Assert
+    assert response == {"BA27AF": valid_location, "BA27AG": None, "B12AA": b1_location, "B": None}
+    mock_connect_to_db_reader.assert_called_once_with()
+    mock_load_location_region.assert_has_calls([call(mock_connection, "BA"), call(mock_connection, "B1")])
+
+
+@patch(f"{FILE_PATH}.monotonic")
+@patch(f"{FILE_PATH}.load_location_region")
+@patch(f"{FILE_PATH}.connect_to_db_reader")
+def test_get_valid_dos_locations_reloads_after_ttl(
+    mock_connect_to_db_reader: MagicMock,
+    mock_load_location_region: MagicMock,
+    mock_monotonic: MagicMock,
+) -> None:
+    # Arrange
+    location_regions["BA"] = LocationRegion(postcodes=[], locations=[], loaded_at=1000.0)
+    valid_location = DoSLocation(**location_row(1, "BA2 7AF"))
+    mock_load_location_region.return_value = LocationRegion(
+        postcodes=["BA27AF"],
+        locations=[valid_location],
+        loaded_at=1000.0 + POSTCODE_INDEX_TTL + 1,
+    )
+    mock_monotonic.return_value = 1000.0 + POSTCODE_INDEX_TTL / 2
+    # Act
+    cached_response = get_valid_dos_locations(["BA2 7AF"])
+    mock_monotonic.return_value = 1000.0 + POSTCODE_INDEX_TTL + 1
+    reloaded_response = get_valid_dos_locations(["BA2 7AF"])
+    # Assert
+    assert cached_response == {"BA27AF": None}
+    assert reloaded_response == {"BA27AF": valid_location}
+    mock_load_location_region.assert_called_once()
+
+
+@patch(f"{FILE_PATH}.connect_to_db_reader")
+def test_get_valid_dos_locations_no_postcodes(mock_connect_to_db_reader: MagicMock) -> None:
+    # Act
+    response = get_valid_dos_locations([])
+    # Assert
+    assert response == {}
+    mock_connect_to_db_reader.assert_not_called()
+
+
+@pytest.mark.parametrize(("value", "expected"), [("true", True), ("True", True), ("false", False), (None, False)])
+def test_is_postcode_index_enabled(value: str | None, expected: bool, monkeypatch: pytest.MonkeyPatch) -> None:
+    # Arrange
+    if value is None:
+        monkeypatch.delenv("POSTCODE_INDEX_ENABLED", raising=False)
+    else:
+        monkeypatch.setenv("POSTCODE_INDEX_ENABLED", value)
+    # Act & Assert
+    assert is_postcode_index_enabled() is expected
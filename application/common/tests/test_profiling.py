@@ -0,0 +1,161 @@
+import re
+from cProfile import Profile
+from marshal import dumps
+from pathlib import Path
+from pstats import Stats
+from unittest.mock import MagicMock, patch
+
+import pytest
+from botocore.exceptions import ClientError
+
+from application.common.profiling import hot_functions, profile_key, save_profile, should_profile
+
+FILE_PATH = "application.common.profiling"
+
+
+def profiled_stats() -> Stats:
+    def busy_function() -> int:
+        return sum(range(10000))
+
+    profiler = Profile()
+    profiler.runcall(busy_function)
+    return Stats(profiler)
+
+
+@pytest.fixture(autouse=True)
+def _clear_profiling_environment(monkeypatch: pytest.MonkeyPatch) -> None:
+    for name in (
+        "PROFILING_ENABLED",
+        "PROFILING_SAMPLE_RATE",
+        "PROFILING_TOP_FUNCTIONS",
+        "PROFILES_DIRECTORY",
+        "PROFILES_BUCKET_NAME",
+    ):
+        monkeypatch.delenv(name, raising=False)
+
+
+def test_should_profile_disabled_by_default() -> None:
+    # Act & Assert
+    assert should_profile() is False
+
+
+def test_should_profile_enabled(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Arrange
+    monkeypatch.setenv("PROFILING_ENABLED", "True")
+    # Act & Assert
+    assert should_profile() is True
+
+
+@pytest.mark.parametrize(("random_value", "expected"), [(0.05, True), (0.1, False), (0.9, False)])
+@patch(f"{FILE_PATH}.random")
+def test_should_profile_sample_rate(
+    mock_random: MagicMock,
+    random_value: float,
+    expected: bool,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # Arrange
+    monkeypatch.setenv("PROFILING_SAMPLE_RATE", "0.1")
+    mock_random.return_value = random_value
+    # Act & Assert
+    assert should_profile() is expected
+
+
+@patch(f"{FILE_PATH}.random")
+def test_should_profile_zero_sample_rate(mock_random: MagicMock, monkeypatch: pytest.MonkeyPatch) -> None:
+    # Arrange
+    monkeypatch.setenv("PROFILING_SAMPLE_RATE", "0")
+    # Act & Assert
+    assert should_profile() is False
+    mock_random.assert_not_called()
+
+
+def test_hot_functions() -> None:
+    # Arrange
+    stats = profiled_stats()
+    # Act
+    response = hot_functions(stats, 2)
+    # Assert
+    assert len(response) == 2
+    assert response[0]["own_ms"] >= response[1]["own_ms"]
+    assert set(response[0]) == {"function", "calls", "own_ms", "cumulative_ms"}
+    assert any("busy_function" in function["function"] for function in hot_functions(stats, 10))
+
+
+def test_profile_key() -> None:
+    # Act
+    response = profile_key("service-sync", "request-id")
+    # Assert
+    assert re.fullmatch(r"service-sync/\d{4}/\d{2}/\d{2}/request-id\.prof", response)
+
+
+@patch(f"{FILE_PATH}.profile_key")
+@patch(f"{FILE_PATH}.logger")
+def test_save_profile_to_directory(
+    mock_logger: MagicMock,
+    mock_profile_key: MagicMock,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # Arrange
+    monkeypatch.setenv("PROFILES_DIRECTORY", str(tmp_path))
+    monkeypatch.setenv("PROFILING_TOP_FUNCTIONS", "3")
+    mock_profile_key.return_value = "lambda/2024/01/31/request-id.prof"
+    # Act
+    save_profile(profiled_stats(), lambda_name="lambda", request_id="request-id")
+    # Assert
+    mock_profile_key.assert_called_once_with("lambda", "request-id")
+    Stats(str(tmp_path / "lambda/2024/01/31/request-id.prof"))
+    mock_logger.info.assert_called_once()
+    assert len(mock_logger.info.call_args.kwargs["profile_hot_functions"]) == 3
+    assert mock_logger.info.call_args.kwargs["profile_key"] == "lambda/2024/01/31/request-id.prof"
+    mock_logger.exception.assert_not_called()
+
+
+@patch(f"{FILE_PATH}.get_client")
+@patch(f"{FILE_PATH}.profile_key")
+def test_save_profile_to_bucket(
+    mock_profile_key: MagicMock,
+    mock_get_client: MagicMock,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # Arrange
+    monkeypatch.setenv("PROFILES_BUCKET_NAME", "profiles-bucket")
+    mock_profile_key.return_value = "lambda/2024/01/31/request-id.prof"
+    stats = profiled_stats()
+    # Act
+    save_profile(stats, lambda_name="lambda", request_id="request-id")
+    # Assert
+    mock_get_client.assert_called_once_with("s3")
+    put_object = mock_get_client.return_value.put_object
+    put_object.assert_called_once()
+    assert put_object.call_args.kwargs["Bucket"] == "profiles-bucket"
+    assert put_object.call_args.kwargs["Key"] == "lambda/2024/01/31/request-id.prof"
+    assert put_object.call_args.kwargs["Body"] == dumps(stats.stats)
+
+
+@patch(f"{FILE_PATH}.get_client")
+def test_save_profile_without_destination(mock_get_client: MagicMock) -> None:
+    # Act
+    save_profile(profiled_stats(), lambda_name="lambda", request_id="request-id")
+    # Assert
+    mock_get_client.assert_not_called()
+
+
+@patch(f"{FILE_PATH}.logger")
+@patch(f"{FILE_PATH}.get_client")
+def test_save_profile_logs_failure(
+    mock_get_client: MagicMock,
+    mock_logger: MagicMock,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # Arrange
+    monkeypatch.setenv("PROFILES_BUCKET_NAME", "profiles-bucket")
+    mock_get_client.return_value.put_object.side_effect = ClientError(
+        {"Error": {"Code": "AccessDenied", "Message": "Access Denied"}},
+        "PutObject",
+    )
+    # Act
+    save_profile(profiled_stats(), lambda_name="lambda", request_id="request-id")
+    # Assert
+    mock_logger.exception.assert_called_once()
@@ -0,0 +1,122 @@
+import pickle
+from collections.abc import Generator
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from application.common.query_registry import (
+    UNNAMED_QUERY,
+    DoSQuery,
+    QueryStats,
+    clear_query_stats,
+    dump_query_stats,
+    fingerprint_sql,
+    query_stats,
+    record_query,
+    register_query,
+)
+
+FILE_PATH = "application.common.query_registry"
+
+
+@pytest.fixture(autouse=True)
+def _clear_query_stats() -> Generator[None, None, None]:
+    clear_query_stats()
+    yield
+    clear_query_stats()
+
+
+def test_dos_query() -> None:
+    # Act
+    query = DoSQuery("get_service", "SELECT id FROM services WHERE id = %(SERVICE_ID)s")
+    # Assert
+    assert query == "SELECT id FROM services WHERE id = %(SERVICE_ID)s"
+    assert query.name == "get_service"
+    assert query.fingerprint == fingerprint_sql("SELECT id FROM services WHERE id = %(SERVICE_ID)s")
+
+
+def test_dos_query_pickle() -> None:
+    # Arrange
+    query = DoSQuery("get_service", "SELECT id FROM services")
+    # Act
+    response = pickle.loads(pickle.dumps(query))  # noqa: S301
+    # Assert
+    assert response == query
+    assert response.name == "get_service"
+    assert response.fingerprint == query.fingerprint
+
+
+def test_fingerprint_sql_ignores_whitespace() -> None:
+    # Act & Assert
+    assert fingerprint_sql("SELECT id\n    FROM services") == fingerprint_sql("SELECT id FROM services")
+    assert fingerprint_sql("SELECT id FROM services") != fingerprint_sql("SELECT uid FROM services")
+
+
+def test_register_query() -> None:
+    # Act
+    query = register_query("test_register_query", "SELECT id FROM services")
+    # Assert
+    assert register_query("test_register_query", "SELECT id  FROM services") is query
+
+
+def test_register_query_different_sql() -> None:
+    # Arrange
+    register_query("test_register_query_different_sql", "SELECT id FROM services")
+    # Act & Assert
+    with pytest.raises(ValueError, match="Query 'test_register_query_different_sql' is already registered"):
+        register_query("test_register_query_different_sql", "SELECT uid FROM services")
+
+
+def test_query_stats() -> None:
+    # Arrange
+    stats = QueryStats("get_service", "fingerprint")
+    # Act
+    stats.add(0.5, 1)
+    stats.add(3, 2)
+    stats.add(6000, -1)
+    # Assert
+    assert stats.export() == {
+        "name": "get_service",
+        "fingerprint": "fingerprint",
+        "calls": 3,
+        "rows": 3,
+        "total_duration_ms": 6003.5,
+        "max_duration_ms": 6000,
+        "latency_histogram": {"le_1": 1, "le_5": 1, "le_inf": 1},
+    }
+
+
+def test_record_query() -> None:
+    # Arrange
+    query = DoSQuery("get_service", "SELECT id FROM services")
+    # Act
+    record_query(query, 1.5, 1)
+    record_query(query, 2.5, 1)
+    record_query("SELECT uid FROM services", 1, 10)
+    # Assert
+    assert query_stats["get_service"].calls == 2
+    assert query_stats["get_service"].fingerprint == query.fingerprint
+    assert query_stats[UNNAMED_QUERY].rows == 10
+    assert query_stats[UNNAMED_QUERY].fingerprint is None
+
+
+@patch(f"{FILE_PATH}.logger")
+def test_dump_query_stats(mock_logger: MagicMock) -> None:
+    # Arrange
+    record_query(DoSQuery("fast_query", "SELECT 1"), 1, 1)
+    record_query(DoSQuery("slow_query", "SELECT 2"), 100, 1)
+    # Act
+    response = dump_query_stats()
+    # Assert
+    assert [stats["name"] for stats in response] == ["slow_query", "fast_query"]
+    mock_logger.info.assert_called_once_with("DoS query statistics", query_stats=response)
+    assert not query_stats
+
+
+@patch(f"{FILE_PATH}.logger")
+def test_dump_query_stats_no_queries(mock_logger: MagicMock) -> None:
+    # Act
+    response = dump_query_stats()
+    # Assert
+    assert response == []
+    mock_logger.info.assert_not_called()
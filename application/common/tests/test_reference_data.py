@@ -0,0 +1,182 @@
+from collections.abc import Generator
+from time import monotonic
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from application.common.reference_data import (
+    REFERENCE_DATA_TTL,
+    ReferenceData,
+    clear_reference_data,
+    get_reference_data,
+    load_reference_data,
+    symptom_group_symptom_discriminator_exists,
+)
+
+FILE_PATH = "application.common.reference_data"
+
+
+@pytest.fixture(autouse=True)
+def _clear_reference_data() -> Generator[None, None, None]:
+    clear_reference_data()
+    yield
+    clear_reference_data()
+
+
+def reference_data(
+    loaded_at: float | None = None, symptom_group_symptom_discriminators: frozenset = frozenset()
+) -> ReferenceData:
+    if loaded_at is None:
+        loaded_at = monotonic()
+    return ReferenceData(
+        service_types={13: "Pharmacy"},
+        service_statuses={1: "active"},
+        opening_time_days={1: "Monday"},
+        symptom_group_symptom_discriminators=symptom_group_symptom_discriminators,
+        loaded_at=loaded_at,
+    )
+
+
+@patch(f"{FILE_PATH}.monotonic")
+@patch(f"{FILE_PATH}.load_reference_data")
+def test_get_reference_data(mock_load_reference_data: MagicMock, mock_monotonic: MagicMock) -> None:
+    # Arrange
+    mock_connection = MagicMock()
+    mock_load_reference_data.return_value = reference_data(loaded_at=0)
+    mock_monotonic.return_value = REFERENCE_DATA_TTL
+    # Act
+    first = get_reference_data(mock_connection)
+    second = get_reference_data(mock_connection)
+    # Assert
+    assert first is second
+    mock_load_reference_data.assert_called_once_with(mock_connection)
+
+
+@patch(f"{FILE_PATH}.monotonic")
+@patch(f"{FILE_PATH}.load_reference_data")
+def test_get_reference_data_expired(mock_load_reference_data: MagicMock, mock_monotonic: MagicMock) -> None:
+    # Arrange
+    mock_connection = MagicMock()
+    mock_load_reference_data.side_effect = [
+        reference_data(loaded_at=0),
+        reference_data(loaded_at=REFERENCE_DATA_TTL + 1),
+    ]
+    mock_monotonic.return_value = REFERENCE_DATA_TTL + 1
+    # Act
+    get_reference_data(mock_connection)
+    response = get_reference_data(mock_connection)
+    # Assert
+    assert response.loaded_at == REFERENCE_DATA_TTL + 1
+    assert mock_load_reference_data.call_count == 2
+
+
+@patch(f"{FILE_PATH}.load_reference_data")
+def test_get_reference_data_refresh(mock_load_reference_data: MagicMock) -> None:
+    # Arrange
+    mock_connection = MagicMock()
+    mock_load_reference_data.return_value = reference_data()
+    # Act
+    get_reference_data(mock_connection)
+    get_reference_data(mock_connection, refresh=True)
+    # Assert
+    assert mock_load_reference_data.call_count == 2
+
+
+@patch(f"{FILE_PATH}.load_reference_data")
+def test_clear_reference_data(mock_load_reference_data: MagicMock) -> None:
+    # Arrange
+    mock_connection = MagicMock()
+    mock_load_reference_data.return_value = reference_data()
+    # Act
+    get_reference_data(mock_connection)
+    clear_reference_data()
+    get_reference_data(mock_connection)
+    # Assert
+    assert mock_load_reference_data.call_count == 2
+
+
+@patch(f"{FILE_PATH}.query_dos_db")
+def test_load_reference_data(mock_query_dos_db: MagicMock) -> None:
+    # Arrange
+    mock_connection = MagicMock()
+    mock_query_dos_db.return_value.fetchall.side_effect = [
+        [{"id": 13, "name": "Pharmacy"}],
+        [{"id": 1, "name": "active"}],
+        [{"id": 1, "name": "Monday"}, {"id": 8, "name": "BankHoliday"}],
+        [{"symptomgroupid": 360, "symptomdiscriminatorid": 14167}],
+    ]
+    # Act
+    response = load_reference_data(mock_connection)
+    # Assert
+    assert response.service_types == {13: "Pharmacy"}
+    assert response.service_statuses == {1: "active"}
+    assert response.opening_time_days == {1: "Monday", 8: "BankHoliday"}
+    assert response.symptom_group_symptom_discriminators == frozenset({(360, 14167)})
+    assert mock_query_dos_db.call_count == 4
+    assert mock_query_dos_db.return_value.close.call_count == 4
+
+
+@patch(f"{FILE_PATH}.load_reference_data")
+def test_symptom_group_symptom_discriminator_exists(mock_load_reference_data: MagicMock) -> None:
+    # Arrange
+    mock_connection = MagicMock()
+    mock_load_reference_data.return_value = reference_data(
+        symptom_group_symptom_discriminators=frozenset({(360, 14167)}),
+    )
+    # Act & Assert
+    assert symptom_group_symptom_discriminator_exists(mock_connection, 360, 14167) is True
+    assert symptom_group_symptom_discriminator_exists(mock_connection, 360, 14167) is True
+    mock_load_reference_data.assert_called_once_with(mock_connection)
+
+
+@patch(f"{FILE_PATH}.load_reference_data")
+def test_symptom_group_symptom_discriminator_exists_reloads_when_missing(mock_load_reference_data: MagicMock) -> None:
+    # Arrange
+    mock_connection = MagicMock()
+    mock_load_reference_data.side_effect = [
+        reference_data(),
+        reference_data(symptom_group_symptom_discriminators=frozenset({(360, 14167)})),
+    ]
+    get_reference_data(mock_connection)
+    # Act
+    response = symptom_group_symptom_discriminator_exists(mock_connection, 360, 14167)
+    # Assert
+    assert response is True
+    assert mock_load_reference_data.call_count == 2
+
+
+@patch(f"{FILE_PATH}.monotonic")
+@patch(f"{FILE_PATH}.load_reference_data")
+def test_symptom_group_symptom_discriminator_exists_reloads_once_per_ttl_when_missing(
+    mock_load_reference_data: MagicMock,
+    mock_monotonic: MagicMock,
+) -> None:
+    # Arrange
+    mock_connection = MagicMock()
+    mock_monotonic.return_value = 1000.0
+    mock_load_reference_data.return_value = reference_data(loaded_at=1000.0)
+    get_reference_data(mock_connection)
+    # Act
+    responses = [
+        symptom_group_symptom_discriminator_exists(mock_connection, 360, symptom_discriminator_id)
+        for symptom_discriminator_id in (14167, 14168, 14167)
+    ]
+    reloads_within_ttl = mock_load_reference_data.call_count
+    mock_monotonic.return_value = 1000.0 + REFERENCE_DATA_TTL / 2
+    symptom_group_symptom_discriminator_exists(mock_connection, 360, 14169)
+    # Assert
+    assert responses == [False, False, False]
+    assert reloads_within_ttl == 2
+    assert mock_load_reference_data.call_count == 2
+
+
+@patch(f"{FILE_PATH}.load_reference_data")
+def test_symptom_group_symptom_discriminator_exists_does_not_exist(mock_load_reference_data: MagicMock) -> None:
+    # Arrange
+    mock_connection = MagicMock()
+    mock_load_reference_data.return_value = reference_data()
+    # Act
+    response = symptom_group_symptom_discriminator_exists(mock_connection, 360, 14167)
+    # Assert
+    assert response is False
+    mock_load_reference_data.assert_called_once_with(mock_connection)
@@ -1,6 +1,5 @@
 from json import dumps
 
-import boto3
 import pytest
 from moto import mock_aws
 
@@ -9,12 +8,13 @@ FILE_PATH = "application.common.secretsmanager"
 
 @mock_aws
 def test_get_secret() -> None:
+    from application.common.aws_clients import get_client
     from application.common.secretsmanager import get_secret
 
     # Arrangement
     secret_name = "dummy_name"
     secret = {"username": "dummy_username", "password": "dummy_password"}
-    sm = boto3.client("secretsmanager")
+    sm = get_client("secretsmanager")
     sm.create_secret(Name=secret_name, SecretString=dumps(secret))
     # Act
     return_value = get_secret(secret_name=secret_name)
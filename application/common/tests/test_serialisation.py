@@ -0,0 +1,196 @@
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from decimal import Decimal
+from enum import Enum
+from json import dumps as json_dumps
+from json import loads as json_loads
+from unittest.mock import patch
+from uuid import UUID
+
+import pytest
+from boto3.dynamodb.types import TypeSerializer
+
+from application.common.serialisation import dumps, is_orjson_plain, loads, to_attribute_value, to_dynamodb_item
+from application.conftest import PHARMACY_STANDARD_EVENT
+
+FILE_PATH = "application.common.serialisation"
+
+
+def test_loads() -> None:
+    # Act
+    result = loads('{"test": [1, 2.5, null, true]}')
+    # Assert
+    assert result == {"test": [1, 2.5, None, True]}
+
+
+def test_loads_nan_falls_back_to_stdlib() -> None:
+    # Act
+    result = loads('{"test": NaN}')
+    # Assert
+    assert result["test"] != result["test"]
+
+
+def test_loads_exception() -> None:
+    # Act & Assert
+    with pytest.raises(ValueError, match="Expecting value"):
+        loads("test")
+
+
+def test_dumps() -> None:
+    # Act
+    result = dumps(PHARMACY_STANDARD_EVENT)
+    # Assert
+    assert json_loads(result) == PHARMACY_STANDARD_EVENT
+
+
+def test_dumps_decimal_falls_back_to_stdlib() -> None:
+    # Act & Assert
+    with pytest.raises(TypeError, match="Object of type Decimal is not JSON serializable"):
+        dumps({"test": Decimal("1.5")})
+
+
+def test_dumps_big_int_falls_back_to_stdlib() -> None:
+    # Arrange
+    big_int = 2**70
+    # Act
+    result = dumps({"test": big_int})
+    # Assert
+    assert result == f'{{"test":{big_int}}}'
+
+
+@patch(f"{FILE_PATH}.orjson", None)
+def test_stdlib_backend() -> None:
+    # Act
+    result = dumps({"test": "test"})
+    # Assert
+    assert result == '{"test":"test"}'
+    assert loads(result) == {"test": "test"}
+
+
+@pytest.mark.parametrize(
+    "obj",
+    [
+        PHARMACY_STANDARD_EVENT,
+        {"change_event": PHARMACY_STANDARD_EVENT, "service_id": "1"},
+        {"change_event": PHARMACY_STANDARD_EVENT | {"OrganisationName": "Café Pharmacy, Bath"}, "service_id": "1"},
+    ],
+)
+def test_dumps_backends_identical(obj: dict) -> None:
+    # Arrange
+    orjson = pytest.importorskip("orjson")
+    # Act
+    with patch(f"{FILE_PATH}.orjson", None):
+        stdlib_result = dumps(obj)
+    # Assert
+    # Change events and update requests are hashed into SQS deduplication ids, so must encode the same either way
+    assert stdlib_result.encode() == orjson.dumps(obj)
+
+
+@dataclass
+class Point:
+    x: int
+
+
+class Colour(Enum):
+    RED = "red"
+
+
+@pytest.mark.parametrize(
+    "obj",
+    [
+        {"test": 1e-7},
+        {"test": 1e-05},
+        {"test": 1e16},
+        {"test": [53.38030624389648, -0.0]},
+        {"test": float("nan")},
+        {"test": float("inf")},
+        {"test": 2**70},
+        {"test": (1, "a")},
+        {1: "test"},
+    ],
+)
+def test_dumps_parity(obj: object) -> None:
+    # Arrange
+    pytest.importorskip("orjson")
+    # Act
+    result = dumps(obj)
+    with patch(f"{FILE_PATH}.orjson", None):
+        stdlib_result = dumps(obj)
+    # Assert
+    assert result == stdlib_result == json_dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+@pytest.mark.parametrize(
+    "obj",
+    [
+        {"test": datetime(2024, 1, 1, tzinfo=UTC)},
+        {"test": UUID(int=1)},
+        {"test": Point(1)},
+        {"test": Colour.RED},
+        {"test": {"a"}},
+    ],
+)
+def test_dumps_parity_unsupported_types(obj: object) -> None:
+    # Arrange
+    pytest.importorskip("orjson")
+    # Act
+    with pytest.raises(TypeError) as error:
+        dumps(obj)
+    with patch(f"{FILE_PATH}.orjson", None), pytest.raises(TypeError) as stdlib_error:
+        dumps(obj)
+    # Assert
+    assert str(error.value) == str(stdlib_error.value)
+
+
+@pytest.mark.parametrize(
+    ("obj", "expected"),
+    [
+        (PHARMACY_STANDARD_EVENT, True),
+        ({"test": [1, 2.5, None, True, "a"]}, True),
+        ({"test": 1e-7}, False),
+        ({"test": float("nan")}, False),
+        ({"test": Decimal("1.5")}, False),
+        ({"test": Colour.RED}, False),
+    ],
+)
+def test_is_orjson_plain(obj: object, expected: bool) -> None:
+    # Act & Assert
+    assert is_orjson_plain(obj) is expected
+
+
+def test_to_dynamodb_item_matches_type_serializer() -> None:
+    # Arrange
+    serializer = TypeSerializer()
+    item = {"Id": "1", "SequenceNumber": 1, "Event": PHARMACY_STANDARD_EVENT}
+    decimal_item = json_loads(json_dumps(item), parse_float=Decimal)
+    expected = {k: serializer.serialize(v) for k, v in decimal_item.items()}
+    # Act
+    result = to_dynamodb_item(item)
+    # Assert
+    assert result == expected
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        ("test", {"S": "test"}),
+        (True, {"BOOL": True}),
+        (None, {"NULL": True}),
+        (12, {"N": "12"}),
+        (53.38030624389648, {"N": "53.38030624389648"}),
+        (1e-05, {"N": "0.00001"}),
+        (Decimal("1.10"), {"N": "1.10"}),
+        ([1, "a"], {"L": [{"N": "1"}, {"S": "a"}]}),
+        ({"a": {"b": False}}, {"M": {"a": {"M": {"b": {"BOOL": False}}}}}),
+    ],
+)
+def test_to_attribute_value(value: object, expected: dict) -> None:
+    # Act & Assert
+    assert to_attribute_value(value) == expected
+
+
+@pytest.mark.parametrize("value", [float("nan"), float("inf"), {"a"}])
+def test_to_attribute_value_unsupported(value: object) -> None:
+    # Act & Assert
+    with pytest.raises(TypeError):
+        to_attribute_value(value)
@@ -0,0 +1,76 @@
+from collections.abc import Generator
+from json import loads
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from application.common.stage_metrics import (
+    STAGE_DURATION_METRIC,
+    clear_stage_durations,
+    flush_stage_metrics,
+    record_stage_duration,
+    stage_durations,
+    time_stage,
+)
+
+FILE_PATH = "application.common.stage_metrics"
+
+
+@pytest.fixture(autouse=True)
+def _clear_stage_durations() -> Generator[None, None, None]:
+    clear_stage_durations()
+    yield
+    clear_stage_durations()
+
+
+@patch(f"{FILE_PATH}.perf_counter")
+def test_time_stage(mock_perf_counter: MagicMock) -> None:
+    # Arrange
+    mock_perf_counter.side_effect = [1.0, 1.25]
+    # Act
+    with time_stage("secret_fetch"):
+        pass
+    # Assert
+    assert stage_durations == {"secret_fetch": [250.0]}
+
+
+@patch(f"{FILE_PATH}.perf_counter")
+def test_time_stage_records_duration_on_error(mock_perf_counter: MagicMock) -> None:
+    # Arrange
+    mock_perf_counter.side_effect = [1.0, 1.5]
+    # Act
+    with pytest.raises(ValueError, match="error"), time_stage("db_connect"):
+        raise ValueError("error")  # noqa: EM101
+    # Assert
+    assert stage_durations == {"db_connect": [500.0]}
+
+
+def test_flush_stage_metrics(capsys: pytest.CaptureFixture, monkeypatch: pytest.MonkeyPatch) -> None:
+    # Arrange
+    monkeypatch.setenv("POWERTOOLS_METRICS_NAMESPACE", "test-namespace")
+    record_stage_duration("query.get_service", 1.5)
+    record_stage_duration("query.get_service", 2.5)
+    record_stage_duration("comparison", 3.0)
+    # Act
+    flush_stage_metrics(lambda_name="service-sync")
+    # Assert
+    documents = [loads(line) for line in capsys.readouterr().out.splitlines() if line.startswith('{"_aws"')]
+    assert len(documents) == 2
+    query_document, comparison_document = documents
+    cloudwatch_metrics = query_document["_aws"]["CloudWatchMetrics"][0]
+    assert cloudwatch_metrics["Namespace"] == "test-namespace"
+    assert {"lambda", "stage"} <= set(cloudwatch_metrics["Dimensions"][0])
+    assert cloudwatch_metrics["Metrics"] == [{"Name": STAGE_DURATION_METRIC, "Unit": "Milliseconds"}]
+    assert query_document["lambda"] == "service-sync"
+    assert query_document["stage"] == "query.get_service"
+    assert query_document[STAGE_DURATION_METRIC] == [1.5, 2.5]
+    assert comparison_document["stage"] == "comparison"
+    assert comparison_document[STAGE_DURATION_METRIC] == [3.0]
+    assert not stage_durations
+
+
+def test_flush_stage_metrics_no_stages(capsys: pytest.CaptureFixture) -> None:
+    # Act
+    flush_stage_metrics(lambda_name="service-sync")
+    # Assert
+    assert '"_aws"' not in capsys.readouterr().out
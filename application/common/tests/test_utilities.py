@@ -4,12 +4,14 @@ import pytest
 from aws_lambda_powertools.utilities.data_classes.sqs_event import SQSRecord
 
 from application.common.utilities import (
+    clear_parsed_bodies,
     extract_body,
     get_sequence_number,
     get_sqs_msg_attribute,
     handle_sqs_msg_attributes,
     is_val_none_or_empty,
     json_str_body,
+    set_parsed_body,
 )
 
 
@@ -32,13 +34,39 @@ def test_extract_body_exception() -> None:
         extract_body(expected_change_event)
 
 
+def test_extract_body_reuses_parsed_body() -> None:
+    # Arrange
+    body = '{"test": "test"}'
+    parsed_body = {"test": "test"}
+    set_parsed_body(body, parsed_body)
+    # Act
+    first = extract_body(body)
+    second = extract_body(body)
+    # Assert
+    assert first is parsed_body
+    assert second == parsed_body
+    assert second is not parsed_body
+
+
+def test_clear_parsed_bodies() -> None:
+    # Arrange
+    body = '{"test": "test"}'
+    parsed_body = {"test": "test"}
+    set_parsed_body(body, parsed_body)
+    # Act
+    clear_parsed_bodies()
+    # Assert
+    assert extract_body(body) is not parsed_body
+
+
 def test_json_str_body() -> None:
     # Arrange
-    expected_json_str = '{"test": "test"}'
+    expected_body = {"test": "test"}
     # Act
-    result = json_str_body({"test": "test"})
+    result = json_str_body(expected_body)
     # Assert
-    assert result == expected_json_str, f"Change event body should be {expected_json_str} str but is {result}"
+    assert isinstance(result, str)
+    assert loads(result) == expected_body, f"Change event body should be {expected_body} but is {loads(result)}"
 
 
 def test_expected_json_str_exception() -> None:
@@ -37,3 +37,10 @@ class EmailMessage(TypedDict):
     recipient_email_address: str
     s3_filename: str
     user_id: str
+
+
+class EmailMessageBatch(TypedDict):
+    """Class to represent a batch of email messages for the send email lambda."""
+
+    correlation_id: str
+    email_messages: list[EmailMessage]
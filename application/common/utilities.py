@@ -1,13 +1,16 @@
-from json import dumps, loads
 from typing import Any
 
 from aws_lambda_powertools.logging import Logger
 from aws_lambda_powertools.utilities.data_classes.sqs_event import SQSRecord
 
+from common.serialisation import dumps, loads
 from common.types import UpdateRequest
 
 logger = Logger()
 
+# Bodies already parsed by a middleware, keyed by the exact body string so the handler can reuse them.
+_parsed_bodies: dict[str, dict[str, Any]] = {}
+
 
 def is_val_none_or_empty(val: Any) -> bool:  # noqa: ANN401
     """Checks if the value is None or empty.
@@ -24,12 +27,17 @@ def is_val_none_or_empty(val: Any) -> bool:  # noqa: ANN401
 def extract_body(body: str) -> dict[str, Any] | UpdateRequest:
     """Extracts the event body from the lambda function invocation event.
 
+    If the body has already been parsed by a middleware the parsed body is reused (once) instead of parsing it again.
+
     Args:
         body (str): Lambda function invocation event body
 
     Returns:
         Dict[str, Any] | UpdateRequest: Message body as a dictionary
     """
+    parsed_body = _parsed_bodies.pop(body, None)
+    if parsed_body is not None:
+        return parsed_body
     try:
         return loads(body)
     except ValueError as e:
@@ -37,6 +45,21 @@ def extract_body(body: str) -> dict[str, Any] | UpdateRequest:
         raise ValueError(msg) from e
 
 
+def set_parsed_body(body: str, parsed_body: dict[str, Any]) -> None:
+    """Stores an already parsed event body so the next extract_body call for the same body can reuse it.
+
+    Args:
+        body (str): Lambda function invocation event body
+        parsed_body (Dict[str, Any]): The body already parsed into a dictionary
+    """
+    _parsed_bodies[body] = parsed_body
+
+
+def clear_parsed_bodies() -> None:
+    """Removes any stored parsed event bodies."""
+    _parsed_bodies.clear()
+
+
 def json_str_body(body: dict[str, Any]) -> str:
     """Encode a Dict event body from the lambda function invocation event into a JSON string.
 
@@ -6,10 +6,10 @@ from typing import Any
 from aws_lambda_powertools.logging import Logger
 from aws_lambda_powertools.tracing import Tracer
 from aws_lambda_powertools.utilities.typing import LambdaContext
-from boto3 import client
 from boto3.dynamodb.types import TypeDeserializer
 from simplejson import dumps
 
+from common.aws_clients import get_client
 from common.middlewares import unhandled_exception_logging
 
 tracer = Tracer()
@@ -75,7 +75,7 @@ def get_change_event(odscode: str, sequence_number: Decimal) -> dict[str, Any]:
     Returns:
         dict[str, Any]: The change event
     """
-    response = client("dynamodb").query(
+    response = get_client("dynamodb").query(
         TableName=getenv("CHANGE_EVENTS_TABLE_NAME"),
         IndexName="gsi_ods_sequence",
         ProjectionExpression="Event",
@@ -112,7 +112,7 @@ def send_change_event(change_event: dict[str, Any], odscode: str, sequence_numbe
         sequence_number (int): The sequence number of the change event
         correlation_id (str): The correlation id of the event replay
     """
-    sqs = client("sqs")
+    sqs = get_client("sqs")
     queue_url = getenv("CHANGE_EVENT_SQS_URL")
     logger.info("Sending change event to SQS", queue_url=queue_url)
     change_event_str = dumps(change_event)
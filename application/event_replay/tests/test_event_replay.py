@@ -102,21 +102,21 @@ def test_build_correlation_id(mock_time_ns: MagicMock) -> None:
     assert response == f"{time}-local-replayed-event"
 
 
-@patch(f"{FILE_PATH}.client")
-def test_get_change_event(mock_client: MagicMock, change_event: dict[str, str], event: dict[str, str]) -> None:
+@patch(f"{FILE_PATH}.get_client")
+def test_get_change_event(mock_get_client: MagicMock, change_event: dict[str, str], event: dict[str, str]) -> None:
     # Arrange
     table_name = "my-table"
     environ["CHANGE_EVENTS_TABLE_NAME"] = table_name
     environ["AWS_REGION"] = "eu-west-1"
     serializer = TypeSerializer()
 
-    mock_client.return_value.query.return_value = {"Items": [{"Event": serializer.serialize(change_event)}]}
+    mock_get_client.return_value.query.return_value = {"Items": [{"Event": serializer.serialize(change_event)}]}
     # Act
     response = get_change_event(event["odscode"], Decimal(event["sequence_number"]))
     # Assert
     assert response == change_event
-    mock_client.assert_called_with("dynamodb")
-    mock_client().query.assert_called_with(
+    mock_get_client.assert_called_with("dynamodb")
+    mock_get_client().query.assert_called_with(
         TableName=table_name,
         IndexName="gsi_ods_sequence",
         ProjectionExpression="Event",
@@ -130,21 +130,21 @@ def test_get_change_event(mock_client: MagicMock, change_event: dict[str, str],
     del environ["AWS_REGION"]
 
 
-@patch(f"{FILE_PATH}.client")
+@patch(f"{FILE_PATH}.get_client")
 def test_get_change_event_no_change_event_in_dynamodb(
-    mock_client: MagicMock, change_event: dict[str, str], event: dict[str, str]
+    mock_get_client: MagicMock, change_event: dict[str, str], event: dict[str, str]
 ) -> None:
     # Arrange
     table_name = "my-table"
     environ["CHANGE_EVENTS_TABLE_NAME"] = table_name
     environ["AWS_REGION"] = "eu-west-1"
-    mock_client.return_value.query.return_value = {"Items": []}
+    mock_get_client.return_value.query.return_value = {"Items": []}
     # Act
     with pytest.raises(ValueError, match="No change event found for ods code FXXX1 and sequence number 1"):
         get_change_event(event["odscode"], Decimal(event["sequence_number"]))
     # Assert
-    mock_client.assert_called_with("dynamodb")
-    mock_client().query.assert_called_with(
+    mock_get_client.assert_called_with("dynamodb")
+    mock_get_client().query.assert_called_with(
         TableName=table_name,
         IndexName="gsi_ods_sequence",
         ProjectionExpression="Event",
@@ -158,16 +158,16 @@ def test_get_change_event_no_change_event_in_dynamodb(
     del environ["AWS_REGION"]
 
 
-@patch(f"{FILE_PATH}.client")
-def test_send_change_event(mock_client: MagicMock, change_event: dict[str, str], event: dict[str, str]) -> None:
+@patch(f"{FILE_PATH}.get_client")
+def test_send_change_event(mock_get_client: MagicMock, change_event: dict[str, str], event: dict[str, str]) -> None:
     # Arrange
     correlation_id = "CORRELATION_ID"
     environ["CHANGE_EVENT_SQS_URL"] = queue_url = "https://sqs.eu-west-1.amazonaws.com/123456789/my-queue"
     # Act
     send_change_event(change_event, event["odscode"], int(event["sequence_number"]), correlation_id)
     # Assert
-    mock_client.assert_called_with("sqs")
-    mock_client().send_message.assert_called_with(
+    mock_get_client.assert_called_with("sqs")
+    mock_get_client().send_message.assert_called_with(
         QueueUrl=queue_url,
         MessageBody=dumps(change_event),
         MessageGroupId=event["odscode"],
@@ -1,8 +1,8 @@
 from typing import Any
 
 from aws_lambda_powertools.logging import Logger
-from aws_lambda_powertools.utilities.validation import validate
-from aws_lambda_powertools.utilities.validation.exceptions import SchemaValidationError
+from fastjsonschema import JsonSchemaException
+from fastjsonschema import compile as compile_schema
 
 from common.constants import (
     PHARMACY_ODSCODE_LENGTH,
@@ -20,11 +20,13 @@ def validate_change_event(event: dict[str, Any]) -> None:
     Args:
         event (Dict[str, Any]): Lambda function invocation event.
     """
-    logger.info(f"Attempting to validate event payload: {event}")
+    logger.info("Attempting to validate event payload")
+    logger.debug("Event payload to validate", event=event)
     try:
-        validate(event=event, schema=INPUT_SCHEMA)
-    except SchemaValidationError as exception:
-        raise ValidationError(exception) from exception
+        validate_schema(event)
+    except JsonSchemaException as exception:
+        msg = f"Failed schema validation - {exception.message}"
+        raise ValidationError(msg) from exception
     validate_organisation_keys(event.get("OrganisationTypeId"), event.get("OrganisationSubType"))
     check_ods_code_length(event["ODSCode"])
     logger.info("Event has been validated")
@@ -79,23 +81,64 @@ def validate_organisation_type_id(org_type_id: str) -> None:
         raise ValidationError(msg)
 
 
+# Only the shape of the fields NHSEntity reads is checked here, invalid opening times
+# (e.g. overlaps or blank times) are still reported by the service matcher and service sync
+NULLABLE_STRING = {"type": ["string", "null"]}
+OBJECT_LIST = {"type": ["array", "null"], "items": {"type": "object"}}
+
 INPUT_SCHEMA = {
     "$schema": "https://json-schema.org/draft-07/schema",
     "type": "object",
     "required": ["ODSCode", "OrganisationTypeId", "OrganisationSubType"],
     "properties": {
-        "ODSCode": {
-            "$id": "#/properties/ODSCode",
-            "type": "string",
+        "ODSCode": {"type": "string"},
+        "OrganisationTypeId": {"type": "string"},
+        "OrganisationSubType": {"type": "string"},
+        "OrganisationName": NULLABLE_STRING,
+        "OrganisationType": NULLABLE_STRING,
+        "OrganisationStatus": {"type": "string"},
+        "Address1": NULLABLE_STRING,
+        "Address2": NULLABLE_STRING,
+        "Address3": NULLABLE_STRING,
+        "Address4": NULLABLE_STRING,
+        "City": NULLABLE_STRING,
+        "County": NULLABLE_STRING,
+        "Postcode": {"type": "string"},
+        "ParentOrganisation": {
+            "type": "object",
+            "properties": {"OrganisationName": NULLABLE_STRING},
         },
-        "OrganisationTypeId": {
-            "$id": "#/properties/OrganisationTypeId",
-            "type": "string",
+        "Contacts": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "ContactType": {"type": "string"},
+                    "ContactAvailabilityType": {"type": "string"},
+                    "ContactMethodType": {"type": "string"},
+                    "ContactValue": NULLABLE_STRING,
+                },
+            },
         },
-        "OrganisationSubType": {
-            "$id": "#/properties/OrganisationSubType",
-            "type": "string",
+        "OpeningTimes": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "OpeningTimeType": {"type": "string"},
+                    "Weekday": NULLABLE_STRING,
+                    "OpeningTime": NULLABLE_STRING,
+                    "ClosingTime": NULLABLE_STRING,
+                    "AdditionalOpeningDate": NULLABLE_STRING,
+                    "IsOpen": {"type": "boolean"},
+                },
+            },
         },
+        "Services": OBJECT_LIST,
+        "UecServices": OBJECT_LIST,
     },
-    "additionalProperties": "true",
+    "additionalProperties": True,
 }
+
+# Compiled once per lambda container rather than on every validation
+validate_schema = compile_schema(INPUT_SCHEMA)
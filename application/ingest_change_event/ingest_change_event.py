@@ -6,21 +6,22 @@ from aws_lambda_powertools.logging import Logger
 from aws_lambda_powertools.tracing import Tracer
 from aws_lambda_powertools.utilities.data_classes import SQSEvent, event_source
 from aws_lambda_powertools.utilities.typing.lambda_context import LambdaContext
-from boto3 import client
 
 from .change_event_validation import validate_change_event
+from common.aws_clients import get_client
 from common.dynamodb import add_change_event_to_dynamodb, get_latest_sequence_id_for_a_given_odscode_from_dynamodb
-from common.middlewares import redact_staff_key_from_event, unhandled_exception_logging
+from common.middlewares import redact_staff_key_from_event, stage_metrics, unhandled_exception_logging
+from common.stage_metrics import time_stage
 from common.types import HoldingQueueChangeEventItem
 from common.utilities import extract_body, get_sequence_number
 
 logger = Logger()
 tracer = Tracer()
-sqs = client("sqs")
 
 
 @redact_staff_key_from_event()
 @unhandled_exception_logging()
+@stage_metrics()
 @tracer.capture_lambda_handler()
 @event_source(data_class=SQSEvent)
 @logger.inject_lambda_context(
@@ -82,8 +83,9 @@ def lambda_handler(event: SQSEvent, context: LambdaContext) -> None:  # noqa: AR
         correlation_id=logger.get_correlation_id(),
     )
     logger.debug("Change event validated", holding_queue_change_event_item=holding_queue_change_event_item)
-    sqs.send_message(
-        QueueUrl=getenv("HOLDING_QUEUE_URL"),
-        MessageBody=dumps(holding_queue_change_event_item),
-        MessageGroupId=ods_code,
-    )
+    with time_stage("sqs_send"):
+        get_client("sqs").send_message(
+            QueueUrl=getenv("HOLDING_QUEUE_URL"),
+            MessageBody=dumps(holding_queue_change_event_item),
+            MessageGroupId=ods_code,
+        )
@@ -1,3 +1,4 @@
+import re
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -35,6 +36,63 @@ def test_validate_change_event_missing_key(
     mock_validate_organisation_keys.assert_not_called()
 
 
+@pytest.mark.parametrize(
+    ("key", "value", "message"),
+    [
+        ("OpeningTimes", None, "data.OpeningTimes must be array"),
+        ("OpeningTimes", ["Monday"], "data.OpeningTimes[0] must be object"),
+        (
+            "OpeningTimes",
+            [{"OpeningTimeType": "General", "IsOpen": "true"}],
+            "data.OpeningTimes[0].IsOpen must be boolean",
+        ),
+        (
+            "OpeningTimes",
+            [{"OpeningTimeType": "General", "OpeningTime": 900}],
+            "data.OpeningTimes[0].OpeningTime must be",
+        ),
+        ("Contacts", [{"ContactMethodType": None}], "data.Contacts[0].ContactMethodType must be string"),
+        ("ParentOrganisation", None, "data.ParentOrganisation must be object"),
+        ("OrganisationStatus", None, "data.OrganisationStatus must be string"),
+        ("Services", [1], "data.Services[0] must be object"),
+    ],
+)
+@patch(f"{FILE_PATH}.validate_organisation_keys")
+def test_validate_change_event_malformed_field(
+    mock_validate_organisation_keys: MagicMock,
+    key: str,
+    value: object,
+    message: str,
+    change_event: dict[str, str],
+) -> None:
+    # Arrange
+    change_event[key] = value
+    # Act & Assert
+    with pytest.raises(ValidationError, match=re.escape(f"Failed schema validation - {message}")):
+        validate_change_event(change_event)
+    mock_validate_organisation_keys.assert_not_called()
+
+
+@patch(f"{FILE_PATH}.validate_organisation_keys")
+def test_validate_change_event_allows_invalid_opening_times(
+    mock_validate_organisation_keys: MagicMock, change_event: dict[str, str]
+) -> None:
+    # Arrange
+    change_event["OpeningTimes"] = [
+        {"OpeningTimeType": "F8k3", "Weekday": "Monday", "OpeningTime": "", "ClosingTime": "", "IsOpen": True},
+        {"OpeningTimeType": "Additional", "AdditionalOpeningDate": "", "OpeningTime": None, "IsOpen": False},
+    ]
+    # Act
+    validate_change_event(change_event)
+    # Assert
+    mock_validate_organisation_keys.assert_called_once()
+
+
+def test_validate_change_event_with_staff(change_event_staff: dict[str, str]) -> None:
+    # Act & Assert
+    validate_change_event(change_event_staff)
+
+
 @pytest.mark.parametrize(
     ("odscode"),
     [
@@ -12,7 +12,7 @@ from application.ingest_change_event.ingest_change_event import lambda_handler
 FILE_PATH = "application.ingest_change_event.ingest_change_event"
 
 
-@patch(f"{FILE_PATH}.sqs")
+@patch(f"{FILE_PATH}.get_client")
 @patch(f"{FILE_PATH}.HoldingQueueChangeEventItem")
 @patch(f"{FILE_PATH}.add_change_event_to_dynamodb")
 @patch(f"{FILE_PATH}.get_latest_sequence_id_for_a_given_odscode_from_dynamodb")
@@ -26,7 +26,7 @@ def test_lambda_handler(
     mock_get_latest_sequence_id_for_a_given_odscode_from_dynamodb: MagicMock,
     mock_add_change_event_to_dynamodb: MagicMock,
     mock_holding_queue_change_event_item: MagicMock,
-    mock_sqs: MagicMock,
+    mock_get_client: MagicMock,
     change_event: dict,
     lambda_context: LambdaContext,
 ) -> None:
@@ -62,7 +62,7 @@ def test_lambda_handler(
         dynamo_record_id=dynamodb_record,
         correlation_id="1",
     )
-    mock_sqs.send_message.assert_called_once_with(
+    mock_get_client.return_value.send_message.assert_called_once_with(
         QueueUrl=queue_url,
         MessageBody=dumps(holding_queue_change_event_item),
         MessageGroupId=change_event["ODSCode"],
@@ -72,7 +72,7 @@ def test_lambda_handler(
     del environ["HOLDING_QUEUE_URL"]
 
 
-@patch(f"{FILE_PATH}.sqs")
+@patch(f"{FILE_PATH}.get_client")
 @patch(f"{FILE_PATH}.HoldingQueueChangeEventItem")
 @patch(f"{FILE_PATH}.add_change_event_to_dynamodb")
 @patch(f"{FILE_PATH}.get_latest_sequence_id_for_a_given_odscode_from_dynamodb")
@@ -84,7 +84,7 @@ def test_lambda_handler_with_sensitive_staff_key(
     mock_get_latest_sequence_id_for_a_given_odscode_from_dynamodb: MagicMock,
     mock_add_change_event_to_dynamodb: MagicMock,
     mock_holding_queue_change_event_item: MagicMock,
-    mock_sqs: MagicMock,
+    mock_get_client: MagicMock,
     change_event_staff: dict,
     change_event: dict,
     lambda_context: LambdaContext,
@@ -119,7 +119,7 @@ def test_lambda_handler_with_sensitive_staff_key(
         dynamo_record_id=dynamodb_record,
         correlation_id="1",
     )
-    mock_sqs.send_message.assert_called_once_with(
+    mock_get_client.return_value.send_message.assert_called_once_with(
         QueueUrl=queue_url,
         MessageBody=dumps(holding_queue_change_event_item),
         MessageGroupId=change_event["ODSCode"],
@@ -130,7 +130,7 @@ def test_lambda_handler_with_sensitive_staff_key(
 
 
 @patch.object(Logger, "error")
-@patch(f"{FILE_PATH}.sqs")
+@patch(f"{FILE_PATH}.get_client")
 @patch(f"{FILE_PATH}.HoldingQueueChangeEventItem")
 @patch(f"{FILE_PATH}.add_change_event_to_dynamodb")
 @patch(f"{FILE_PATH}.get_latest_sequence_id_for_a_given_odscode_from_dynamodb")
@@ -144,7 +144,7 @@ def test_lambda_handler_no_sequence_number(
     mock_get_latest_sequence_id_for_a_given_odscode_from_dynamodb: MagicMock,
     mock_add_change_event_to_dynamodb: MagicMock,
     mock_holding_queue_change_event_item: MagicMock,
-    mock_sqs: MagicMock,
+    mock_get_client: MagicMock,
     mock_logger_error: MagicMock,
     change_event: dict,
     lambda_context: LambdaContext,
@@ -175,7 +175,7 @@ def test_lambda_handler_no_sequence_number(
     mock_get_latest_sequence_id_for_a_given_odscode_from_dynamodb.assert_called_once_with(change_event["ODSCode"])
     mock_add_change_event_to_dynamodb.assert_called_once_with(change_event, sequence_number, sqs_timestamp)
     mock_holding_queue_change_event_item.assert_not_called()
-    mock_sqs.send_message.assert_not_called()
+    mock_get_client.return_value.send_message.assert_not_called()
     mock_logger_error.assert_called_once_with("No sequence number provided, so message will be ignored.")
     # Cleanup
     del environ["ENV"]
@@ -183,7 +183,7 @@ def test_lambda_handler_no_sequence_number(
 
 
 @patch.object(Logger, "error")
-@patch(f"{FILE_PATH}.sqs")
+@patch(f"{FILE_PATH}.get_client")
 @patch(f"{FILE_PATH}.HoldingQueueChangeEventItem")
 @patch(f"{FILE_PATH}.add_change_event_to_dynamodb")
 @patch(f"{FILE_PATH}.get_latest_sequence_id_for_a_given_odscode_from_dynamodb")
@@ -197,7 +197,7 @@ def test_lambda_handler_less_than_latest_sequence_number(
     mock_get_latest_sequence_id_for_a_given_odscode_from_dynamodb: MagicMock,
     mock_add_change_event_to_dynamodb: MagicMock,
     mock_holding_queue_change_event_item: MagicMock,
-    mock_sqs: MagicMock,
+    mock_get_client: MagicMock,
     mock_logger_error: MagicMock,
     change_event: dict,
     lambda_context: LambdaContext,
@@ -228,7 +228,7 @@ def test_lambda_handler_less_than_latest_sequence_number(
     mock_get_latest_sequence_id_for_a_given_odscode_from_dynamodb.assert_called_once_with(change_event["ODSCode"])
     mock_add_change_event_to_dynamodb.assert_called_once_with(change_event, sequence_number, sqs_timestamp)
     mock_holding_queue_change_event_item.assert_not_called()
-    mock_sqs.send_message.assert_not_called()
+    mock_get_client.return_value.send_message.assert_not_called()
     mock_logger_error.assert_called_once_with(
         "Sequence id is smaller than the existing one in db for a given odscode, so will be ignored",
         incoming_sequence_number=sequence_number,
@@ -239,7 +239,7 @@ def test_lambda_handler_less_than_latest_sequence_number(
     del environ["HOLDING_QUEUE_URL"]
 
 
-@patch(f"{FILE_PATH}.sqs")
+@patch(f"{FILE_PATH}.get_client")
 @patch(f"{FILE_PATH}.HoldingQueueChangeEventItem")
 @patch(f"{FILE_PATH}.add_change_event_to_dynamodb")
 @patch(f"{FILE_PATH}.get_latest_sequence_id_for_a_given_odscode_from_dynamodb")
@@ -253,7 +253,7 @@ def test_lambda_handler_mutiple_records(
     mock_get_latest_sequence_id_for_a_given_odscode_from_dynamodb: MagicMock,
     mock_add_change_event_to_dynamodb: MagicMock,
     mock_holding_queue_change_event_item: MagicMock,
-    mock_sqs: MagicMock,
+    mock_get_client: MagicMock,
     change_event: dict,
     lambda_context: LambdaContext,
 ) -> None:
@@ -284,7 +284,7 @@ def test_lambda_handler_mutiple_records(
     mock_get_latest_sequence_id_for_a_given_odscode_from_dynamodb.assert_not_called()
     mock_add_change_event_to_dynamodb.assert_not_called()
     mock_holding_queue_change_event_item.assert_not_called()
-    mock_sqs.send_message.assert_not_called()
+    mock_get_client.return_value.send_message.assert_not_called()
     # Cleanup
     del environ["ENV"]
     del environ["HOLDING_QUEUE_URL"]
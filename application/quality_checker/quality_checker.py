@@ -12,7 +12,7 @@ from .check_dos import (
 )
 from common.commissioned_service_type import BLOOD_PRESSURE, CONTRACEPTION
 from common.dos_db_connection import connect_to_db_reader
-from common.middlewares import unhandled_exception_logging
+from common.middlewares import stage_metrics, unhandled_exception_logging
 
 logger = Logger()
 tracer = Tracer()
@@ -21,6 +21,7 @@ tracer = Tracer()
 @tracer.capture_lambda_handler()
 @logger.inject_lambda_context(clear_state=True)
 @unhandled_exception_logging
+@stage_metrics
 @event_source(data_class=EventBridgeEvent)
 def lambda_handler(event: EventBridgeEvent, context: LambdaContext) -> None:  # noqa: ARG001
     """Lambda handler for quality checker."""
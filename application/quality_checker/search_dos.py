@@ -7,8 +7,47 @@ from common.commissioned_service_type import PALLIATIVE_CARE, CommissionedServic
 from common.constants import DISTANCE_SELLING_PHARMACY_ID, DOS_ACTIVE_STATUS_ID, PHARMACY_SERVICE_TYPE_IDS
 from common.dos import DoSService
 from common.dos_db_connection import query_dos_db
+from common.query_registry import register_query
 
 logger = Logger(child=True)
+SEARCH_FOR_PHARMACY_ODS_CODES_QUERY = register_query(
+    "search_for_pharmacy_ods_codes",
+    "SELECT LEFT(odscode, 5) FROM services s WHERE s.typeid = ANY(%(PHARMACY_SERVICE_TYPE_IDS)s) "
+    "AND s.statusid = %(ACTIVE_STATUS_ID)s AND LEFT(REPLACE(TRIM(odscode), CHR(9), ''), 1) IN "
+    "(%(ODSCODE_STARTING_CHARACTER_CAPITALISED)s, %(ODSCODE_STARTING_CHARACTER)s)",
+)
+SEARCH_FOR_MATCHING_SERVICES_QUERY = register_query(
+    "search_for_matching_services",
+    "SELECT s.id, uid, s.name, odscode, address, postcode, web, typeid,"
+    "statusid, ss.name status_name, publicphone, publicname, st.name service_type_name "
+    "FROM services s LEFT JOIN servicetypes st ON s.typeid = st.id "
+    "LEFT JOIN servicestatuses ss on s.statusid = ss.id "
+    "WHERE s.odscode LIKE %(ODSCODE)s AND s.statusid = %(ACTIVE_STATUS_ID)s "
+    "AND s.typeid = ANY(%(PHARMACY_SERVICE_TYPE_IDS)s)",
+)
+SEARCH_FOR_Z_CODE_ON_INCORRECT_TYPE_QUERY = register_query(
+    "search_for_incorrectly_profiled_z_code_on_incorrect_type",
+    "SELECT s.id, uid, s.name, odscode, address, postcode, web, typeid, statusid, ss.name status_name, "
+    "publicphone, publicname, st.name service_type_name "
+    "FROM services s LEFT JOIN servicetypes st ON s.typeid = st.id "
+    "LEFT JOIN servicestatuses ss on s.statusid = ss.id "
+    "LEFT JOIN servicesgsds sgsds on s.id = sgsds.serviceid "
+    "WHERE sgsds.sgid = %(SYMPTOM_GROUP)s AND sgsds.sdid = %(SYMPTOM_DISCRIMINATOR)s "
+    "AND s.statusid = %(ACTIVE_STATUS_ID)s AND s.typeid = ANY(%(SERVICE_TYPE_IDS)s) "
+    "AND LEFT(s.odscode,1) in (%(ODSCODE_STARTING_CHARACTER_CAPITALISED)s, %(ODSCODE_STARTING_CHARACTER)s)",
+)
+SEARCH_FOR_Z_CODE_ON_CORRECT_TYPE_QUERY = register_query(
+    "search_for_incorrectly_profiled_z_code_on_correct_type",
+    "SELECT s.id, uid, s.name, odscode, address, postcode, web, typeid, statusid, ss.name status_name, "
+    "publicphone, publicname, st.name service_type_name "
+    "FROM services s LEFT JOIN servicetypes st ON s.typeid = st.id "
+    "LEFT JOIN servicestatuses ss on s.statusid = ss.id "
+    "LEFT JOIN servicesgsds sgsds on s.id = sgsds.serviceid "
+    "WHERE sgsds.sgid = %(SYMPTOM_GROUP)s AND sgsds.sdid = %(SYMPTOM_DISCRIMINATOR)s "
+    "AND s.statusid = %(ACTIVE_STATUS_ID)s AND s.typeid = ANY(%(SERVICE_TYPE_IDS)s) "
+    "AND LEFT(s.odscode,1) in (%(ODSCODE_STARTING_CHARACTER_CAPITALISED)s, %(ODSCODE_STARTING_CHARACTER)s)"
+    "AND LENGTH(s.odscode) > 5",
+)
 
 
 def search_for_pharmacy_ods_codes(connection: Connection) -> set[str]:
@@ -23,9 +62,7 @@ def search_for_pharmacy_ods_codes(connection: Connection) -> set[str]:
     starting_character = getenv("ODSCODE_STARTING_CHARACTER") or "f"
     cursor = query_dos_db(
         connection,
-        "SELECT LEFT(odscode, 5) FROM services s WHERE s.typeid = ANY(%(PHARMACY_SERVICE_TYPE_IDS)s) "
-        "AND s.statusid = %(ACTIVE_STATUS_ID)s AND LEFT(REPLACE(TRIM(odscode), CHR(9), ''), 1) IN "
-        "(%(ODSCODE_STARTING_CHARACTER_CAPITALISED)s, %(ODSCODE_STARTING_CHARACTER)s)",
+        SEARCH_FOR_PHARMACY_ODS_CODES_QUERY,
         {
             "PHARMACY_SERVICE_TYPE_IDS": PHARMACY_SERVICE_TYPE_IDS,
             "ACTIVE_STATUS_ID": DOS_ACTIVE_STATUS_ID,
@@ -51,12 +88,7 @@ def search_for_matching_services(connection: Connection, odscode: str) -> list[D
     """
     cursor = query_dos_db(
         connection,
-        "SELECT s.id, uid, s.name, odscode, address, postcode, web, typeid,"
-        "statusid, ss.name status_name, publicphone, publicname, st.name service_type_name "
-        "FROM services s LEFT JOIN servicetypes st ON s.typeid = st.id "
-        "LEFT JOIN servicestatuses ss on s.statusid = ss.id "
-        "WHERE s.odscode LIKE %(ODSCODE)s AND s.statusid = %(ACTIVE_STATUS_ID)s "
-        "AND s.typeid = ANY(%(PHARMACY_SERVICE_TYPE_IDS)s)",
+        SEARCH_FOR_MATCHING_SERVICES_QUERY,
         {
             "ODSCODE": f"{odscode}%",
             "ACTIVE_STATUS_ID": DOS_ACTIVE_STATUS_ID,
@@ -90,14 +122,7 @@ def search_for_incorrectly_profiled_z_code_on_incorrect_type(
     starting_character = getenv("ODSCODE_STARTING_CHARACTER") or "f"
     cursor = query_dos_db(
         connection,
-        "SELECT s.id, uid, s.name, odscode, address, postcode, web, typeid, statusid, ss.name status_name, "
-        "publicphone, publicname, st.name service_type_name "
-        "FROM services s LEFT JOIN servicetypes st ON s.typeid = st.id "
-        "LEFT JOIN servicestatuses ss on s.statusid = ss.id "
-        "LEFT JOIN servicesgsds sgsds on s.id = sgsds.serviceid "
-        "WHERE sgsds.sgid = %(SYMPTOM_GROUP)s AND sgsds.sdid = %(SYMPTOM_DISCRIMINATOR)s "
-        "AND s.statusid = %(ACTIVE_STATUS_ID)s AND s.typeid = ANY(%(SERVICE_TYPE_IDS)s) "
-        "AND LEFT(s.odscode,1) in (%(ODSCODE_STARTING_CHARACTER_CAPITALISED)s, %(ODSCODE_STARTING_CHARACTER)s)",
+        SEARCH_FOR_Z_CODE_ON_INCORRECT_TYPE_QUERY,
         {
             "ACTIVE_STATUS_ID": DOS_ACTIVE_STATUS_ID,
             "SERVICE_TYPE_IDS": matchable_service_types,
@@ -133,15 +158,7 @@ def search_for_incorrectly_profiled_z_code_on_correct_type(
     starting_character = getenv("ODSCODE_STARTING_CHARACTER") or "f"
     cursor = query_dos_db(
         connection,
-        "SELECT s.id, uid, s.name, odscode, address, postcode, web, typeid, statusid, ss.name status_name, "
-        "publicphone, publicname, st.name service_type_name "
-        "FROM services s LEFT JOIN servicetypes st ON s.typeid = st.id "
-        "LEFT JOIN servicestatuses ss on s.statusid = ss.id "
-        "LEFT JOIN servicesgsds sgsds on s.id = sgsds.serviceid "
-        "WHERE sgsds.sgid = %(SYMPTOM_GROUP)s AND sgsds.sdid = %(SYMPTOM_DISCRIMINATOR)s "
-        "AND s.statusid = %(ACTIVE_STATUS_ID)s AND s.typeid = ANY(%(SERVICE_TYPE_IDS)s) "
-        "AND LEFT(s.odscode,1) in (%(ODSCODE_STARTING_CHARACTER_CAPITALISED)s, %(ODSCODE_STARTING_CHARACTER)s)"
-        "AND LENGTH(s.odscode) > 5",
+        SEARCH_FOR_Z_CODE_ON_CORRECT_TYPE_QUERY,
         {
             "ACTIVE_STATUS_ID": DOS_ACTIVE_STATUS_ID,
             "SERVICE_TYPE_IDS": [service_type.DOS_TYPE_ID],
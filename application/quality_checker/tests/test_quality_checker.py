@@ -49,6 +49,7 @@ def test_check_dos_data_quality(
     mock_check_for_zcode_profiling_on_incorrect_type: MagicMock,
 ) -> None:
     # Arrange
+    mock_connect_to_db_reader.return_value.__enter__.return_value.cursor.return_value.rowcount = 0
     # Act
     check_dos_data_quality()
     # Assert
@@ -0,0 +1,43 @@
+"""Build the service matcher's matching index from a DoS snapshot file.
+
+The matching index holds the DoS services get_matching_dos_services would match, keyed by the first 5 characters of
+their ODS code. The service matcher uses it instead of querying DoS when MATCHING_INDEX_PATH is set to the index file
+or its s3://bucket/key URI, until it is older than MATCHING_INDEX_MAX_AGE seconds. Its age is taken from
+--exported-at, which defaults to when the DoS snapshot file was last modified.
+
+Run from the application directory:
+    python -m reconciliation.build_matching_index --snapshot dos_snapshot.ndjson.gz --output matching_index.json.gz
+        [--exported-at 2024-01-31T02:00:00+00:00]
+"""
+
+from argparse import ArgumentParser
+from datetime import UTC, datetime
+from pathlib import Path
+
+from common.dos_snapshot import read_dos_snapshot
+from common.matching_index import build_matching_index, write_matching_index
+
+
+def main() -> None:
+    """Build the matching index."""
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--snapshot", type=Path, required=True, help="DoS snapshot file, gzip compressed if .gz")
+    parser.add_argument("--output", type=Path, required=True, help="Matching index file, gzip compressed if .gz")
+    parser.add_argument(
+        "--exported-at",
+        type=datetime.fromisoformat,
+        help="when the DoS snapshot was exported, as an ISO 8601 timestamp with a timezone",
+    )
+    args = parser.parse_args()
+
+    exported_at = args.exported_at or datetime.fromtimestamp(args.snapshot.stat().st_mtime, tz=UTC)
+    if exported_at.tzinfo is None:
+        parser.error("--exported-at must have a timezone")
+    matching_index = build_matching_index(read_dos_snapshot(args.snapshot), exported_at)
+    write_matching_index(matching_index, args.output)
+    services = sum(len(services) for services in matching_index.services.values())
+    print(f"Indexed {services} services under {len(matching_index.services)} ODS code prefixes to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
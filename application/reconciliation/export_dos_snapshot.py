@@ -0,0 +1,36 @@
+"""Export a snapshot of every pharmacy service in DoS, with its opening times and sgsds, to a file.
+
+The snapshot is streamed from the DoS reader through server side cursors, so memory use does not grow with
+the size of the estate. It connects with the same DB_* environment variables as the lambdas. The snapshot
+format is described in common.dos_snapshot.
+
+Run from the application directory:
+    python -m reconciliation.export_dos_snapshot --output dos_snapshot.ndjson.gz [--fetch-size 2000]
+"""
+
+from argparse import ArgumentParser
+from pathlib import Path
+
+from common.dos_db_connection import connect_to_db_reader
+from common.dos_snapshot import DOS_SNAPSHOT_FETCH_SIZE, export_dos_snapshot
+
+
+def main() -> None:
+    """Export the DoS snapshot."""
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", type=Path, required=True, help="DoS snapshot file, gzip compressed if .gz")
+    parser.add_argument(
+        "--fetch-size",
+        type=int,
+        default=DOS_SNAPSHOT_FETCH_SIZE,
+        help="rows fetched from each server side cursor at a time",
+    )
+    args = parser.parse_args()
+
+    with connect_to_db_reader() as connection:
+        services_exported = export_dos_snapshot(connection, args.output, fetch_size=args.fetch_size)
+    print(f"Exported {services_exported} services to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+"""Reconcile a full NHS UK pharmacy export against a DoS snapshot and summarise the changes DoS needs.
+
+Each NHS UK record is joined in memory to the DoS services sharing the first 5 characters of its ODS code,
+filtered as the service matcher would, and compared with the same logic as service sync. Nothing is written
+to DoS. The only database access is validating changed postcodes against the DoS locations table, which uses
+the same DB_* environment variables as the lambdas. With --postcode-index the changed postcodes of each chunk are
+validated at once against the postcode index, which loads the locations of each postcode region in one query.
+
+Run from the application directory:
+    python -m reconciliation.reconciliation --nhs-uk nhs_uk_export.ndjson --dos-snapshot dos_snapshot.ndjson.gz
+        [--summary summary.json] [--diffs diffs.ndjson] [--workers 4] [--log-level ERROR] [--postcode-index]
+
+The NHS UK export is NDJSON with one change event shaped record per line. The DoS snapshot format is
+described in common.dos_snapshot.
+"""
+
+from argparse import ArgumentParser
+from collections import Counter, defaultdict, deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from os import cpu_count, environ
+from pathlib import Path
+from typing import Any, Self
+
+from aws_lambda_powertools.logging import Logger
+from service_matcher.review_matches import review_matches
+from service_sync.data_processing.check_for_change import compare_nhs_uk_and_dos_data
+from service_sync.data_processing.service_histories import ServiceHistories
+
+from common.constants import PHARMACY_ODSCODE_LENGTH
+from common.dos import DoSService, is_matchable_dos_service
+from common.dos_snapshot import dos_service_from_snapshot, read_dos_snapshot
+from common.nhs import NHSEntity
+from common.opening_times import DAY_IDS, WEEKDAYS
+from common.postcode_index import get_valid_dos_locations, is_postcode_index_enabled, normalise_postcode
+from common.serialisation import dumps, loads
+
+logger = Logger()
+# Number of NHS UK records sent to a worker process at a time
+CHUNK_SIZE = 100
+# Chunks submitted to the worker processes ahead of their results being summarised, per worker
+IN_FLIGHT_CHUNKS_PER_WORKER = 2
+WEEKDAY_NAMES = dict(zip(DAY_IDS, WEEKDAYS, strict=True))
+
+
+def read_nhs_uk_export(path: Path) -> Iterator[dict[str, Any]]:
+    """Reads the change event shaped records of an NHS UK export one at a time.
+
+    Args:
+        path (Path): Path to the NDJSON NHS UK export
+
+    Yields:
+        dict[str, Any]: NHS UK record
+    """
+    with open(path, encoding="utf-8") as export_file:
+        for line in export_file:
+            if line.strip():
+                yield loads(line)
+
+
+def index_dos_snapshot(records: Iterable[dict[str, Any]]) -> dict[str, list[dict[str, Any]]]:
+    """Indexes the matchable DoS snapshot records by the first 5 characters of their ODS code.
+
+    Args:
+        records (Iterable[dict[str, Any]]): DoS snapshot records
+
+    Returns:
+        dict[str, list[dict[str, Any]]]: DoS snapshot records by ODS code prefix
+    """
+    index = defaultdict(list)
+    for record in records:
+        odscode = record.get("odscode")
+        if odscode and is_matchable_dos_service(DoSService(record)):
+            index[odscode[:PHARMACY_ODSCODE_LENGTH]].append(record)
+    return dict(index)
+
+
+def reconcile_change_event(change_event: dict[str, Any], dos_records: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Compares an NHS UK record with its matching DoS services as the service matcher and service sync would.
+
+    Args:
+        change_event (dict[str, Any]): NHS UK record
+        dos_records (list[dict[str, Any]]): DoS snapshot records with the same ODS code prefix
+
+    Returns:
+        list[dict[str, Any]]: The diff of each matched DoS service, an empty list if nothing matched
+    """
+    matching_services = review_matches(
+        [dos_service_from_snapshot(record) for record in dos_records],
+        NHSEntity(change_event),
+    )
+    diffs = []
+    for dos_service in matching_services or []:
+        try:
+            service_histories = ServiceHistories(service_id=dos_service.id)
+            service_histories.create_service_histories_entry()
+            # Each comparison gets its own NHSEntity as service sync does, as the comparison formats its fields
+            changes_to_dos = compare_nhs_uk_and_dos_data(
+                dos_service=dos_service,
+                nhs_entity=NHSEntity(change_event),
+                service_histories=service_histories,
+            )
+            diffs.append(changes_to_dos.export_diff())
+        except Exception as error:  # noqa: BLE001
+            diffs.append({"service_id": dos_service.id, "odscode": change_event.get("ODSCode"), "error": repr(error)})
+    return diffs
+
+
+def reconcile_chunk(chunk: list[tuple[dict[str, Any], list[dict[str, Any]]]]) -> list[list[dict[str, Any]]]:
+    """Reconciles a chunk of NHS UK records in a worker process.
+
+    Args:
+        chunk (list[tuple[dict[str, Any], list[dict[str, Any]]]]): NHS UK records with their DoS snapshot records
+
+    Returns:
+        list[list[dict[str, Any]]]: The diffs of each NHS UK record
+    """
+    if is_postcode_index_enabled():
+        # Load the regions of the postcodes the comparisons will validate before comparing
+        get_valid_dos_locations(
+            normalise_postcode(change_event.get("Postcode") or "")
+            for change_event, dos_records in chunk
+            for record in dos_records
+            if normalise_postcode(record.get("postcode") or "")
+            != normalise_postcode(change_event.get("Postcode") or "")
+        )
+    return [reconcile_change_event(change_event, dos_records) for change_event, dos_records in chunk]
+
+
+def chunk_pairs(
+    change_events: Iterable[dict[str, Any]],
+    dos_index: dict[str, list[dict[str, Any]]],
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[list[tuple[dict[str, Any], list[dict[str, Any]]]]]:
+    """Joins NHS UK records to their DoS snapshot records by ODS code prefix and groups them into chunks.
+
+    Args:
+        change_events (Iterable[dict[str, Any]]): NHS UK records
+        dos_index (dict[str, list[dict[str, Any]]]): DoS snapshot records by ODS code prefix
+        chunk_size (int, optional): Number of NHS UK records in a chunk. Defaults to CHUNK_SIZE.
+
+    Yields:
+        list[tuple[dict[str, Any], list[dict[str, Any]]]]: Chunk of NHS UK records with their DoS snapshot records
+    """
+    chunk = []
+    for change_event in change_events:
+        odscode = change_event.get("ODSCode") or ""
+        chunk.append((change_event, dos_index.get(odscode[:PHARMACY_ODSCODE_LENGTH], [])))
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class ReconciliationSummary:
+    """Counts of the changes needed to bring DoS in line with NHS UK."""
+
+    def __init__(self: Self) -> None:
+        """Initialises the summary with no records."""
+        self.nhs_uk_records = 0
+        self.skipped_nhs_uk_records = 0
+        self.services_compared = 0
+        self.services_with_changes = 0
+        self.errors = 0
+        self.changes = Counter()
+
+    def add(self: Self, diffs: list[dict[str, Any]]) -> None:
+        """Adds the diffs of one NHS UK record to the summary.
+
+        Args:
+            diffs (list[dict[str, Any]]): The diff of each DoS service matched to the NHS UK record
+        """
+        self.nhs_uk_records += 1
+        if not diffs:
+            # Unmatched, or not sent to service sync by the service matcher (e.g. closed or hidden)
+            self.skipped_nhs_uk_records += 1
+        for diff in diffs:
+            self.services_compared += 1
+            if "error" in diff:
+                self.errors += 1
+                continue
+            if diff["has_changes"]:
+                self.services_with_changes += 1
+            self.changes.update(f"demographic.{field}" for field in diff["demographic_changes"])
+            self.changes.update(
+                f"standard_opening_times.{WEEKDAY_NAMES[day_id]}" for day_id in diff["standard_opening_times_changes"]
+            )
+            # Removing every specified opening time is a change with no new specified opening times
+            if diff["specified_opening_times_changes"] is not None:
+                self.changes["specified_opening_times"] += 1
+            for change in ("palliative_care", "blood_pressure", "contraception"):
+                if diff[f"{change}_changes"]:
+                    self.changes[change] += 1
+
+    def export(self: Self) -> dict[str, Any]:
+        """Exports the summary as a JSON serialisable dictionary.
+
+        Returns:
+            dict[str, Any]: The summary
+        """
+        return {
+            "nhs_uk_records": self.nhs_uk_records,
+            "skipped_nhs_uk_records": self.skipped_nhs_uk_records,
+            "services_compared": self.services_compared,
+            "services_with_changes": self.services_with_changes,
+            "errors": self.errors,
+            "changes": dict(sorted(self.changes.items())),
+        }
+
+
+def set_log_level(log_level: str) -> None:
+    """Sets the log level of the lambda code, so the per service logging does not swamp the output.
+
+    Args:
+        log_level (str): The log level
+    """
+    # The lambda code uses child loggers with their own levels, which all log through this handler
+    logger.registered_handler.setLevel(log_level)
+
+
+def bounded_map(
+    executor: Executor,
+    function: Callable[[Any], Any],
+    items: Iterable[Any],
+    max_in_flight: int,
+) -> Iterator[Any]:
+    """Maps a function over items in an executor, submitting at most max_in_flight items ahead of their results.
+
+    Unlike Executor.map, which submits every item up front, items are only taken from the iterable as results
+    are consumed, so a streamed export is never held in memory all at once.
+
+    Args:
+        executor (Executor): Executor to run the function in
+        function (Callable[[Any], Any]): Function to map
+        items (Iterable[Any]): Items to map the function over
+        max_in_flight (int): Maximum number of items submitted whose results have not been yielded
+
+    Yields:
+        Any: Result of the function for each item, in the order of the items
+    """
+    futures: deque[Future] = deque()
+    for item in items:
+        if len(futures) >= max_in_flight:
+            yield futures.popleft().result()
+        futures.append(executor.submit(function, item))
+    while futures:
+        yield futures.popleft().result()
+
+
+def reconcile(
+    nhs_uk_export: Path,
+    dos_snapshot: Path,
+    workers: int,
+    diffs_path: Path | None = None,
+    log_level: str = "ERROR",
+) -> dict[str, Any]:
+    """Reconciles an NHS UK export against a DoS snapshot.
+
+    Args:
+        nhs_uk_export (Path): Path to the NDJSON NHS UK export
+        dos_snapshot (Path): Path to the DoS snapshot
+        workers (int): Number of worker processes, 1 reconciles in this process
+        diffs_path (Path | None, optional): Path to write the diff of every compared service to as NDJSON
+        log_level (str, optional): Log level of the lambda code in the worker processes. Defaults to "ERROR".
+
+    Returns:
+        dict[str, Any]: The reconciliation summary
+    """
+    dos_index = index_dos_snapshot(read_dos_snapshot(dos_snapshot))
+    chunks = chunk_pairs(read_nhs_uk_export(nhs_uk_export), dos_index)
+    summary = ReconciliationSummary()
+    executor = None
+    diffs_file = open(diffs_path, "w", encoding="utf-8") if diffs_path else None  # noqa: SIM115
+    try:
+        if workers == 1:
+            results = map(reconcile_chunk, chunks)
+        else:
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=set_log_level, initargs=(log_level,))
+            results = bounded_map(executor, reconcile_chunk, chunks, workers * IN_FLIGHT_CHUNKS_PER_WORKER)
+        for chunk_diffs in results:
+            for diffs in chunk_diffs:
+                summary.add(diffs)
+                if diffs_file:
+                    diffs_file.writelines(f"{dumps(diff)}\n" for diff in diffs)
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
+        if diffs_file:
+            diffs_file.close()
+    return summary.export()
+
+
+def main() -> None:
+    """Run the reconciliation and write or print the summary."""
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nhs-uk", type=Path, required=True, help="NDJSON NHS UK export")
+    parser.add_argument("--dos-snapshot", type=Path, required=True, help="DoS snapshot, gzip compressed if .gz")
+    parser.add_argument("--summary", type=Path, help="write the summary JSON to this file instead of stdout")
+    parser.add_argument("--diffs", type=Path, help="write the diff of every compared service to this NDJSON file")
+    parser.add_argument("--workers", type=int, default=cpu_count() or 1, help="number of worker processes")
+    parser.add_argument("--log-level", default="ERROR", help="log level of the lambda code")
+    parser.add_argument(
+        "--postcode-index",
+        action="store_true",
+        help="validate changed postcodes against the postcode index instead of a query per postcode",
+    )
+    args = parser.parse_args()
+
+    if args.postcode_index:
+        # Set before the worker processes are started, so they inherit it
+        environ["POSTCODE_INDEX_ENABLED"] = "true"
+    set_log_level(args.log_level)
+    summary = reconcile(
+        nhs_uk_export=args.nhs_uk,
+        dos_snapshot=args.dos_snapshot,
+        workers=args.workers,
+        diffs_path=args.diffs,
+        log_level=args.log_level,
+    )
+    if args.summary:
+        args.summary.write_text(dumps(summary))
+    else:
+        print(dumps(summary))
+
+
+if __name__ == "__main__":
+    main()
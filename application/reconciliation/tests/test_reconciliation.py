@@ -0,0 +1,193 @@
+import json
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from application.common.tests.test_dos_snapshot import SNAPSHOT_RECORD
+from application.conftest import PHARMACY_STANDARD_EVENT
+from application.reconciliation.reconciliation import (
+    ReconciliationSummary,
+    bounded_map,
+    chunk_pairs,
+    index_dos_snapshot,
+    reconcile,
+    reconcile_change_event,
+    reconcile_chunk,
+)
+
+FILE_PATH = "application.reconciliation.reconciliation"
+
+
+def test_index_dos_snapshot() -> None:
+    # Arrange
+    records = [
+        SNAPSHOT_RECORD,
+        SNAPSHOT_RECORD | {"id": 3, "odscode": "TES73001", "typeid": 148, "statusid": 2},
+        SNAPSHOT_RECORD | {"id": 4, "statusid": 2},
+        SNAPSHOT_RECORD | {"id": 5, "odscode": None},
+        SNAPSHOT_RECORD | {"id": 6, "odscode": "ABC12"},
+    ]
+    # Act
+    response = index_dos_snapshot(records)
+    # Assert
+    assert {odscode: [record["id"] for record in records] for odscode, records in response.items()} == {
+        "TES73": [2, 3],
+        "ABC12": [6],
+    }
+
+
+def test_chunk_pairs() -> None:
+    # Arrange
+    change_events = [{"ODSCode": "TES73"}, {"ODSCode": "ABC12"}, {}]
+    dos_index = {"TES73": [SNAPSHOT_RECORD]}
+    # Act
+    response = list(chunk_pairs(change_events, dos_index, chunk_size=2))
+    # Assert
+    assert response == [[({"ODSCode": "TES73"}, [SNAPSHOT_RECORD]), ({"ODSCode": "ABC12"}, [])], [({}, [])]]
+
+
+@patch(f"{FILE_PATH}.compare_nhs_uk_and_dos_data")
+def test_reconcile_change_event(mock_compare_nhs_uk_and_dos_data: MagicMock) -> None:
+    # Arrange
+    mock_compare_nhs_uk_and_dos_data.return_value.export_diff.return_value = diff = {"has_changes": True}
+    # Act
+    response = reconcile_change_event(PHARMACY_STANDARD_EVENT, [SNAPSHOT_RECORD])
+    # Assert
+    assert response == [diff]
+    mock_compare_nhs_uk_and_dos_data.assert_called_once()
+    assert mock_compare_nhs_uk_and_dos_data.call_args.kwargs["dos_service"].id == SNAPSHOT_RECORD["id"]
+
+
+def test_reconcile_change_event_unmatched() -> None:
+    # Act
+    response = reconcile_change_event(PHARMACY_STANDARD_EVENT, [])
+    # Assert
+    assert response == []
+
+
+@patch(f"{FILE_PATH}.compare_nhs_uk_and_dos_data")
+def test_reconcile_change_event_error(mock_compare_nhs_uk_and_dos_data: MagicMock) -> None:
+    # Arrange
+    mock_compare_nhs_uk_and_dos_data.side_effect = KeyError("DB_READER_SERVER")
+    # Act
+    response = reconcile_change_event(PHARMACY_STANDARD_EVENT, [SNAPSHOT_RECORD])
+    # Assert
+    assert response == [{"service_id": 2, "odscode": "TES73", "error": "KeyError('DB_READER_SERVER')"}]
+
+
+@patch(f"{FILE_PATH}.reconcile_change_event")
+@patch(f"{FILE_PATH}.get_valid_dos_locations")
+def test_reconcile_chunk_postcode_index(
+    mock_get_valid_dos_locations: MagicMock,
+    mock_reconcile_change_event: MagicMock,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # Arrange
+    monkeypatch.setenv("POSTCODE_INDEX_ENABLED", "true")
+    same_postcode = {"Postcode": SNAPSHOT_RECORD["postcode"].lower()}
+    changed_postcode = {"Postcode": "BA2 7AF"}
+    chunk = [(same_postcode, [SNAPSHOT_RECORD]), (changed_postcode, [SNAPSHOT_RECORD]), ({"Postcode": "BA1 1AA"}, [])]
+    mock_reconcile_change_event.return_value = []
+    # Act
+    response = reconcile_chunk(chunk)
+    # Assert
+    assert response == [[], [], []]
+    assert list(mock_get_valid_dos_locations.call_args.args[0]) == ["BA27AF"]
+
+
+@patch(f"{FILE_PATH}.reconcile_change_event")
+@patch(f"{FILE_PATH}.get_valid_dos_locations")
+def test_reconcile_chunk(
+    mock_get_valid_dos_locations: MagicMock,
+    mock_reconcile_change_event: MagicMock,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # Arrange
+    monkeypatch.delenv("POSTCODE_INDEX_ENABLED", raising=False)
+    mock_reconcile_change_event.return_value = diffs = [{"has_changes": False}]
+    # Act
+    response = reconcile_chunk([(PHARMACY_STANDARD_EVENT, [SNAPSHOT_RECORD])])
+    # Assert
+    assert response == [diffs]
+    mock_reconcile_change_event.assert_called_once_with(PHARMACY_STANDARD_EVENT, [SNAPSHOT_RECORD])
+    mock_get_valid_dos_locations.assert_not_called()
+
+
+def test_reconciliation_summary() -> None:
+    # Arrange
+    summary = ReconciliationSummary()
+    diff = {
+        "has_changes": True,
+        "demographic_changes": {"web": "www.example.com", "publicphone": "01234 567890"},
+        "standard_opening_times_changes": {1: ["09:00-13:00"], 7: []},
+        "specified_opening_times_changes": None,
+        "palliative_care_changes": True,
+        "blood_pressure_changes": False,
+        "contraception_changes": False,
+    }
+    # Act
+    summary.add([diff, diff | {"demographic_changes": {}, "specified_opening_times_changes": []}])
+    summary.add([])
+    summary.add([{"service_id": 1, "error": "KeyError()"}])
+    # Assert
+    assert summary.export() == {
+        "nhs_uk_records": 3,
+        "skipped_nhs_uk_records": 1,
+        "services_compared": 3,
+        "services_with_changes": 2,
+        "errors": 1,
+        "changes": {
+            "demographic.publicphone": 1,
+            "demographic.web": 1,
+            "palliative_care": 2,
+            "specified_opening_times": 1,
+            "standard_opening_times.monday": 2,
+            "standard_opening_times.sunday": 2,
+        },
+    }
+
+
+def test_bounded_map() -> None:
+    # Arrange
+    taken = []
+
+    def items() -> Iterator[int]:
+        for item in range(10):
+            taken.append(item)
+            yield item
+
+    # Act
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = bounded_map(executor, lambda item: item * 2, items(), max_in_flight=3)
+        first_result = next(results)
+        taken_before_first_result = len(taken)
+        remaining_results = list(results)
+    # Assert
+    assert [first_result, *remaining_results] == [item * 2 for item in range(10)]
+    # Only the max_in_flight submitted items and the one waiting to be submitted are taken before a result is used
+    assert taken_before_first_result == 4
+
+
+def test_reconcile(tmp_path: Path) -> None:
+    # Arrange
+    nhs_uk_export = tmp_path / "nhs_uk.ndjson"
+    nhs_uk_export.write_text(f"{json.dumps(PHARMACY_STANDARD_EVENT)}\n{json.dumps({'ODSCode': 'ABC12'})}\n")
+    dos_snapshot = tmp_path / "dos_snapshot.ndjson"
+    # Same postcode as the change event, so the postcode is not validated against the DoS database
+    dos_snapshot.write_text(f"{json.dumps(SNAPSHOT_RECORD)}\n")
+    diffs_path = tmp_path / "diffs.ndjson"
+    # Act
+    response = reconcile(nhs_uk_export, dos_snapshot, workers=1, diffs_path=diffs_path)
+    # Assert
+    assert response["nhs_uk_records"] == 2
+    assert response["skipped_nhs_uk_records"] == 1
+    assert response["services_compared"] == 1
+    assert response["services_with_changes"] == 1
+    assert response["errors"] == 0
+    assert response["changes"]["demographic.web"] == 1
+    assert response["changes"]["demographic.address"] == 1
+    diffs = [json.loads(line) for line in diffs_path.read_text().splitlines()]
+    assert [diff["service_id"] for diff in diffs] == [2]
@@ -1,41 +1,230 @@
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
-from os import environ
-from smtplib import SMTP, SMTPException
+from functools import cache
+from os import environ, getenv
+from smtplib import (
+    SMTP,
+    SMTPAuthenticationError,
+    SMTPDataError,
+    SMTPException,
+    SMTPRecipientsRefused,
+    SMTPSenderRefused,
+)
+from typing import Self
 
 from aws_lambda_powertools.logging import Logger
 from aws_lambda_powertools.tracing import Tracer
 from aws_lambda_powertools.utilities.typing import LambdaContext
+from botocore.exceptions import BotoCoreError, ClientError
 
+from common.aws_clients import get_client
 from common.middlewares import unhandled_exception_logging_hidden_event
 from common.secretsmanager import get_secret
-from common.types import EmailMessage
+from common.serialisation import dumps
+from common.types import EmailMessage, EmailMessageBatch
 
 tracer = Tracer()
 logger = Logger()
+SMTP_HOST = "smtp.office365.com"
+SMTP_PORT = 587
+SMTP_TIMEOUT = 15
+# Attempts at sending an email, reconnecting to the SMTP server between them
+SMTP_SEND_ATTEMPTS = 2
+
+
+@cache
+def get_email_secrets() -> dict[str, str]:
+    """Gets the email secrets, once per lambda container unless cleared after a failed login.
+
+    Returns:
+        dict[str, str]: The email secrets
+    """
+    return get_secret(environ["EMAIL_SECRET_NAME"])
+
+
+class SMTPSession:
+    """An authenticated SMTP session, which connects on first use and reconnects if the connection fails."""
+
+    def __init__(self: Self) -> None:
+        """Initialises the SMTPSession object without connecting."""
+        self.smtp: SMTP | None = None
+        self.from_address: str | None = None
+
+    def __enter__(self: Self) -> Self:
+        """Enters the session context.
+
+        Returns:
+            SMTPSession: The session
+        """
+        return self
+
+    def __exit__(self: Self, *args: object) -> None:
+        """Closes the session when the context is exited."""
+        self.close()
+
+    def connect(self: Self) -> None:
+        """Connects and logs in to the SMTP server."""
+        email_secrets = get_email_secrets()
+        # Don't log any variables that contain PID or password
+        smtp = SMTP(host=SMTP_HOST, port=SMTP_PORT, timeout=SMTP_TIMEOUT)
+        try:
+            logger.info("Connected to SMTP server")
+            smtp.ehlo()
+            logger.info("Sent EHLO")
+            smtp.starttls()
+            logger.info("Started TLS")
+            smtp.login(email_secrets["DI_SYSTEM_MAILBOX_ADDRESS"], email_secrets["DI_SYSTEM_MAILBOX_PASSWORD"])
+            logger.info("Logged in to SMTP server")
+        except BaseException:
+            smtp.close()
+            raise
+        self.smtp = smtp
+        self.from_address = email_secrets["DI_SYSTEM_MAILBOX_ADDRESS"]
+
+    def send(self: Self, to_address: str, msg: str) -> None:
+        """Sends an email, reconnecting to the SMTP server if the connection fails.
+
+        Args:
+            to_address (str): Email address to send the email to
+            msg (str): The email message
+        """
+        for attempt in range(1, SMTP_SEND_ATTEMPTS + 1):
+            try:
+                if self.smtp is None:
+                    self.connect()
+                self.smtp.sendmail(from_addr=self.from_address, to_addrs=[to_address], msg=msg)
+            except (SMTPRecipientsRefused, SMTPSenderRefused, SMTPDataError):
+                # The server refused the email, not the connection, so the session can still be used
+                raise
+            except OSError as error:
+                if isinstance(error, SMTPAuthenticationError):
+                    # The password may have been rotated since the secrets were cached
+                    get_email_secrets.cache_clear()
+                self.close()
+                if attempt == SMTP_SEND_ATTEMPTS:
+                    raise
+                logger.warning("SMTP connection failed, reconnecting", attempt=attempt)
+            else:
+                return
+
+    def close(self: Self) -> None:
+        """Disconnects from the SMTP server, if connected."""
+        if self.smtp is None:
+            return
+        try:
+            self.smtp.quit()
+            logger.info("Disconnected from SMTP server")
+        except OSError:
+            # The connection has already failed
+            self.smtp.close()
+        self.smtp = None
 
 
 @tracer.capture_lambda_handler()
 @unhandled_exception_logging_hidden_event
 @logger.inject_lambda_context(clear_state=True, correlation_id_path="correlation_id")
-def lambda_handler(event: EmailMessage, context: LambdaContext) -> None:  # noqa: ARG001
+def lambda_handler(
+    event: EmailMessage | EmailMessageBatch,
+    context: LambdaContext,  # noqa: ARG001
+) -> list[dict[str, str]] | None:
     """Entrypoint handler for the service_sync lambda.
 
     Args:
-        event (EmailMessage): Lambda function invocation event
+        event (EmailMessage | EmailMessageBatch): Lambda function invocation event, a single email message or a batch
         context (LambdaContext): Lambda function context object
+
+    Returns:
+        list[dict[str, str]] | None: The change id and status, sent or failed, of each email in a batch.
+            Failed emails are requeued as their own invocations, so they are retried and sent to the
+            on-failure destination like an email sent alone. Emails that can't be requeued are logged.
     """
-    logger.append_keys(user_id=event["user_id"], change_id=event["change_id"], s3_filename=event["s3_filename"])
     logger.info("Starting send_email lambda")
+    if "email_messages" not in event:
+        send_email_message(event)
+        return None
+    outcomes = []
+    # Every email in the batch is sent through one SMTP session
+    with SMTPSession() as smtp_session:
+        for email_message in event["email_messages"]:
+            try:
+                send_email_message(email_message, smtp_session=smtp_session)
+                status = "sent"
+            except SMTPException:
+                # Carry on so one failed email does not stop the rest of the batch, it has already been logged
+                status = "failed"
+            outcomes.append({"change_id": email_message["change_id"], "status": status})
+    failed_email_messages = [
+        email_message
+        for email_message, outcome in zip(event["email_messages"], outcomes, strict=True)
+        if outcome["status"] == "failed"
+    ]
+    logger.info(
+        "Email batch sent",
+        outcomes=outcomes,
+        emails=len(outcomes),
+        emails_failed=len(failed_email_messages),
+    )
+    requeue_email_messages(failed_email_messages)
+    return outcomes
+
+
+def requeue_email_messages(email_messages: list[EmailMessage]) -> None:
+    """Requeues email messages as asynchronous invocations of this lambda, one per email.
+
+    Retrying the whole batch would send its sent emails again, so only the failed emails are requeued, and an
+    email that can't be requeued is logged to be resent rather than failing the batch.
+
+    Args:
+        email_messages (list[EmailMessage]): The email messages to requeue
+    """
+    for email_message in email_messages:
+        try:
+            get_client("lambda").invoke(
+                FunctionName=environ["AWS_LAMBDA_FUNCTION_NAME"],
+                InvocationType="Event",
+                Payload=dumps(email_message),
+            )
+        except (BotoCoreError, ClientError):
+            logger.exception(
+                "Failed email could not be requeued",
+                change_id=email_message["change_id"],
+                s3_filename=email_message["s3_filename"],
+                environment=getenv("ENVIRONMENT"),
+                cloudwatch_metric_filter_matching_attribute="EmailRequeueFailed",
+            )
+            continue
+        logger.warning("Failed email requeued", change_id=email_message["change_id"])
+
+
+def send_email_message(email_message: EmailMessage, smtp_session: SMTPSession | None = None) -> None:
+    """Send an email message.
+
+    Args:
+        email_message (EmailMessage): The email message to send
+        smtp_session (SMTPSession | None, optional): SMTP session to send the email through.
+            Defaults to None, which sends it through a new session.
+    """
+    logger.append_keys(
+        user_id=email_message["user_id"],
+        change_id=email_message["change_id"],
+        s3_filename=email_message["s3_filename"],
+    )
     send_email(
-        email_address=event["recipient_email_address"],
-        html_content=event["email_body"],
-        subject=event["email_subject"],
-        correlation_id=event["correlation_id"],
+        email_address=email_message["recipient_email_address"],
+        html_content=email_message["email_body"],
+        subject=email_message["email_subject"],
+        correlation_id=email_message["correlation_id"],
+        smtp_session=smtp_session,
     )
 
 
-def send_email(email_address: str, html_content: str, subject: str, correlation_id: str) -> None:
+def send_email(
+    email_address: str,
+    html_content: str,
+    subject: str,
+    correlation_id: str,
+    smtp_session: SMTPSession | None = None,
+) -> None:
     """Send an email to the specified email address.
 
     Args:
@@ -43,32 +232,23 @@ def send_email(email_address: str, html_content: str, subject: str, correlation_
         html_content (str): HTML content of the email
         subject (str): Subject of the email
         correlation_id (str): Correlation ID of the email
+        smtp_session (SMTPSession | None, optional): SMTP session to send the email through.
+            Defaults to None, which sends it through a new session.
     """
     aws_account_name = environ["AWS_ACCOUNT_NAME"]
     if aws_account_name != "nonprod" or "email" in correlation_id:
         logger.info("Preparing to send email")
-        email_secrets = get_secret(environ["EMAIL_SECRET_NAME"])
-        to_email_address = email_address
-        di_system_email_address = email_secrets["DI_SYSTEM_MAILBOX_ADDRESS"]
-        di_system_email_password = email_secrets["DI_SYSTEM_MAILBOX_PASSWORD"]
         msg = MIMEMultipart("alternative")
         msg["Subject"] = subject
         msg.attach(MIMEText(html_content, "html"))
         logger.info("Email content prepared")
         try:
-            # Don't log any variables that contain PID or password
-            smtp = SMTP(host="smtp.office365.com", port=587, timeout=15)
-            logger.info("Connected to SMTP server")
-            smtp.ehlo()
-            logger.info("Sent EHLO")
-            smtp.starttls()
-            logger.info("Started TLS")
-            smtp.login(di_system_email_address, di_system_email_password)
-            logger.info("Logged in to SMTP server")
-            smtp.sendmail(from_addr=di_system_email_address, to_addrs=[to_email_address], msg=msg.as_string())
+            if smtp_session is None:
+                with SMTPSession() as new_smtp_session:
+                    new_smtp_session.send(to_address=email_address, msg=msg.as_string())
+            else:
+                smtp_session.send(to_address=email_address, msg=msg.as_string())
             logger.warning("Sent email", cloudwatch_metric_filter_matching_attribute="EmailSent")
-            smtp.quit()
-            logger.info("Disconnected from SMTP server")
         except BaseException:
             logger.exception("Email failed", cloudwatch_metric_filter_matching_attribute="EmailFailed")
             msg = "An error occurred while sending the email"
@@ -1,11 +1,27 @@
+import ssl
+from collections.abc import Generator
+from datetime import UTC, datetime, timedelta
+from email import message_from_bytes
 from os import environ
-from smtplib import SMTPException
-from unittest.mock import MagicMock, patch
+from pathlib import Path
+from smtplib import SMTPException, SMTPRecipientsRefused, SMTPServerDisconnected
+from socket import SHUT_RDWR, socket
+from typing import Self
+from unittest.mock import MagicMock, call, patch
 
 import pytest
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import AuthResult, Envelope, LoginPassword, Session
+from aws_lambda_powertools.logging import Logger
 from aws_lambda_powertools.utilities.typing import LambdaContext
+from botocore.exceptions import ClientError
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
 
-from application.send_email.send_email import lambda_handler, send_email
+from application.send_email.send_email import SMTPSession, get_email_secrets, lambda_handler, send_email
+from common.serialisation import dumps
 from common.types import EmailMessage
 
 FILE_PATH = "application.send_email.send_email"
@@ -24,6 +40,104 @@ EVENT = EmailMessage(
     change_id="change_id",
     s3_filename="s3_filename",
 )
+SYSTEM_MAILBOX_ADDRESS = "di_system_mailbox_address@example.com"
+SYSTEM_MAILBOX_PASSWORD = "di_system_mailbox_password"
+
+
+@pytest.fixture(autouse=True)
+def _clear_email_secrets() -> Generator[None, None, None]:
+    get_email_secrets.cache_clear()
+    yield
+    get_email_secrets.cache_clear()
+
+
+class LocalSMTPHandler:
+    """Handler of the local SMTP server, which records the emails it receives."""
+
+    def __init__(self: Self) -> None:
+        """Initialises the handler with no emails received."""
+        self.envelopes: list[Envelope] = []
+        self.logins = 0
+
+    async def handle_DATA(self: Self, server: object, session: Session, envelope: Envelope) -> str:  # noqa: ARG002, N802
+        self.envelopes.append(envelope)
+        return "250 Message accepted for delivery"
+
+    def authenticate(
+        self: Self,
+        server: object,  # noqa: ARG002
+        session: Session,  # noqa: ARG002
+        envelope: Envelope,  # noqa: ARG002
+        mechanism: str,  # noqa: ARG002
+        auth_data: LoginPassword,
+    ) -> AuthResult:
+        self.logins += 1
+        success = auth_data.login.decode() == SYSTEM_MAILBOX_ADDRESS and auth_data.password == (
+            SYSTEM_MAILBOX_PASSWORD.encode()
+        )
+        return AuthResult(success=success, handled=False)
+
+
+@pytest.fixture(scope="module")
+def tls_context(tmp_path_factory: pytest.TempPathFactory) -> ssl.SSLContext:
+    """Server TLS context with a self signed certificate, send_email does not verify the server certificate."""
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.now(UTC)
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now)
+        .not_valid_after(now + timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    directory: Path = tmp_path_factory.mktemp("smtp")
+    (cert_file := directory / "cert.pem").write_bytes(certificate.public_bytes(serialization.Encoding.PEM))
+    (key_file := directory / "key.pem").write_bytes(
+        key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ),
+    )
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert_file, key_file)
+    return context
+
+
+@pytest.fixture()
+def smtp_server(
+    tls_context: ssl.SSLContext,
+    monkeypatch: pytest.MonkeyPatch,
+) -> Generator[LocalSMTPHandler, None, None]:
+    """Local SMTP server requiring STARTTLS and a login, which send_email is pointed at."""
+    handler = LocalSMTPHandler()
+    with socket() as free_port_socket:
+        free_port_socket.bind(("127.0.0.1", 0))
+        port = free_port_socket.getsockname()[1]
+    controller = Controller(
+        handler,
+        hostname="127.0.0.1",
+        port=port,
+        tls_context=tls_context,
+        require_starttls=True,
+        authenticator=handler.authenticate,
+    )
+    controller.start()
+    monkeypatch.setattr(f"{FILE_PATH}.SMTP_HOST", controller.hostname)
+    monkeypatch.setattr(f"{FILE_PATH}.SMTP_PORT", port)
+    monkeypatch.setenv("AWS_ACCOUNT_NAME", "test")
+    monkeypatch.setenv("EMAIL_SECRET_NAME", "mock_secret_name")
+    with patch(f"{FILE_PATH}.get_secret") as mock_get_secret:
+        mock_get_secret.return_value = {
+            "DI_SYSTEM_MAILBOX_ADDRESS": SYSTEM_MAILBOX_ADDRESS,
+            "DI_SYSTEM_MAILBOX_PASSWORD": SYSTEM_MAILBOX_PASSWORD,
+        }
+        yield handler
+    controller.stop()
 
 
 @patch(f"{FILE_PATH}.send_email")
@@ -39,7 +153,101 @@ def test_lambda_handler(mock_send_email: MagicMock, lambda_context: LambdaContex
         html_content=event["email_body"],
         subject=event["email_subject"],
         correlation_id=event["correlation_id"],
+        smtp_session=None,
+    )
+
+
+@patch(f"{FILE_PATH}.get_client")
+@patch(f"{FILE_PATH}.SMTPSession")
+@patch(f"{FILE_PATH}.send_email")
+def test_lambda_handler_batch(
+    mock_send_email: MagicMock,
+    mock_smtp_session: MagicMock,
+    mock_get_client: MagicMock,
+    lambda_context: LambdaContext,
+) -> None:
+    # Arrange
+    environ["AWS_LAMBDA_FUNCTION_NAME"] = "send-email"
+    second_event = EVENT | {"recipient_email_address": "second_recipient_email_address", "change_id": "change_id_2"}
+    event = {"correlation_id": CORRELATION_ID, "email_messages": [EVENT.copy(), second_event]}
+    mock_send_email.side_effect = [SMTPException("error"), None]
+    # Act
+    response = lambda_handler(event, lambda_context)
+    # Assert
+    assert response == [{"change_id": "change_id", "status": "failed"}, {"change_id": "change_id_2", "status": "sent"}]
+    smtp_session = mock_smtp_session.return_value.__enter__.return_value
+    assert [
+        call(
+            email_address=RECIPIENT_EMAIL_ADDRESS,
+            html_content=EMAIL_BODY,
+            subject=EMAIL_SUBJECT,
+            correlation_id=CORRELATION_ID,
+            smtp_session=smtp_session,
+        ),
+        call(
+            email_address="second_recipient_email_address",
+            html_content=EMAIL_BODY,
+            subject=EMAIL_SUBJECT,
+            correlation_id=CORRELATION_ID,
+            smtp_session=smtp_session,
+        ),
+    ] == mock_send_email.call_args_list
+    mock_smtp_session.return_value.__exit__.assert_called_once()
+    # Only the failed email is requeued, as its own invocation
+    mock_get_client.assert_called_once_with("lambda")
+    mock_get_client.return_value.invoke.assert_called_once_with(
+        FunctionName="send-email",
+        InvocationType="Event",
+        Payload=dumps(EVENT),
+    )
+    # Clean up
+    del environ["AWS_LAMBDA_FUNCTION_NAME"]
+
+
+@patch(f"{FILE_PATH}.get_client")
+@patch(f"{FILE_PATH}.SMTPSession")
+@patch(f"{FILE_PATH}.send_email")
+def test_lambda_handler_batch_requeue_failure(
+    mock_send_email: MagicMock,
+    mock_smtp_session: MagicMock,
+    mock_get_client: MagicMock,
+    lambda_context: LambdaContext,
+) -> None:
+    # Arrange
+    environ["AWS_LAMBDA_FUNCTION_NAME"] = "send-email"
+    second_event = EVENT | {"change_id": "change_id_2"}
+    third_event = EVENT | {"change_id": "change_id_3"}
+    event = {"correlation_id": CORRELATION_ID, "email_messages": [EVENT.copy(), second_event, third_event]}
+    mock_send_email.side_effect = [SMTPException("error"), SMTPException("error"), None]
+    mock_get_client.return_value.invoke.side_effect = [
+        ClientError({"Error": {"Code": "TooManyRequestsException", "Message": "Rate exceeded"}}, "Invoke"),
+        None,
+    ]
+    # Act
+    with patch.object(Logger, "exception") as mock_logger_exception:
+        response = lambda_handler(event, lambda_context)
+    # Assert
+    # The batch does not fail, so its sent email is not sent again
+    assert response == [
+        {"change_id": "change_id", "status": "failed"},
+        {"change_id": "change_id_2", "status": "failed"},
+        {"change_id": "change_id_3", "status": "sent"},
+    ]
+    # The email that could not be requeued is logged, and the next failed email is still requeued
+    assert mock_get_client.return_value.invoke.call_args_list[1] == call(
+        FunctionName="send-email",
+        InvocationType="Event",
+        Payload=dumps(second_event),
     )
+    mock_logger_exception.assert_called_once_with(
+        "Failed email could not be requeued",
+        change_id=EVENT["change_id"],
+        s3_filename=EVENT["s3_filename"],
+        environment=environ.get("ENVIRONMENT"),
+        cloudwatch_metric_filter_matching_attribute="EmailRequeueFailed",
+    )
+    # Clean up
+    del environ["AWS_LAMBDA_FUNCTION_NAME"]
 
 
 @patch(f"{FILE_PATH}.MIMEMultipart")
@@ -138,8 +346,10 @@ def test_send_email_exception(
         )
     # Assert
     mock_get_secret.assert_called_once_with(secret_name)
-    mock_smtp.assert_called_once_with(host="smtp.office365.com", port=587, timeout=15)
-    mock_smtp.return_value.ehlo.assert_called_once()
+    # The connection is retried once
+    assert [call(host="smtp.office365.com", port=587, timeout=15)] * 2 == mock_smtp.call_args_list
+    assert mock_smtp.return_value.ehlo.call_count == 2
+    assert mock_smtp.return_value.close.call_count == 2
     mock_smtp.return_value.starttls.assert_not_called()
     mock_smtp.return_value.login.assert_not_called()
     mock_smtp.return_value.sendmail.assert_not_called()
@@ -147,3 +357,103 @@ def test_send_email_exception(
     # Clean up
     del environ["AWS_ACCOUNT_NAME"]
     del environ["EMAIL_SECRET_NAME"]
+
+
+def test_lambda_handler_batch_local_smtp_server(smtp_server: LocalSMTPHandler, lambda_context: LambdaContext) -> None:
+    # Arrange
+    email_messages = [
+        EVENT | {"recipient_email_address": f"recipient_{number}@example.com", "change_id": f"change_id_{number}"}
+        for number in range(3)
+    ]
+    event = {"correlation_id": CORRELATION_ID, "email_messages": email_messages}
+    # Act
+    response = lambda_handler(event, lambda_context)
+    # Assert
+    assert response == [{"change_id": f"change_id_{number}", "status": "sent"} for number in range(3)]
+    # Every email is sent through one session
+    assert smtp_server.logins == 1
+    assert [[f"recipient_{number}@example.com"] for number in range(3)] == [
+        envelope.rcpt_tos for envelope in smtp_server.envelopes
+    ]
+    assert {SYSTEM_MAILBOX_ADDRESS} == {envelope.mail_from for envelope in smtp_server.envelopes}
+    assert message_from_bytes(smtp_server.envelopes[0].original_content)["Subject"] == EMAIL_SUBJECT
+
+
+def test_smtp_session_reconnects(smtp_server: LocalSMTPHandler) -> None:
+    # Arrange
+    with SMTPSession() as smtp_session:
+        smtp_session.send(to_address="first@example.com", msg="Subject: first\r\n\r\nfirst")
+        # The server drops the connection between emails
+        smtp_session.smtp.sock.shutdown(SHUT_RDWR)
+        # Act
+        smtp_session.send(to_address="second@example.com", msg="Subject: second\r\n\r\nsecond")
+    # Assert
+    assert smtp_server.logins == 2
+    assert [envelope.rcpt_tos for envelope in smtp_server.envelopes] == [["first@example.com"], ["second@example.com"]]
+
+
+@patch(f"{FILE_PATH}.SMTP")
+@patch(f"{FILE_PATH}.get_secret")
+def test_smtp_session_reconnects_once(mock_get_secret: MagicMock, mock_smtp: MagicMock) -> None:
+    # Arrange
+    environ["EMAIL_SECRET_NAME"] = "mock_secret_name"
+    mock_get_secret.return_value = {
+        "DI_SYSTEM_MAILBOX_ADDRESS": SYSTEM_MAILBOX_ADDRESS,
+        "DI_SYSTEM_MAILBOX_PASSWORD": SYSTEM_MAILBOX_PASSWORD,
+    }
+    mock_smtp.return_value.sendmail.side_effect = SMTPServerDisconnected()
+    mock_smtp.return_value.quit.side_effect = SMTPServerDisconnected()
+    # Act
+    with pytest.raises(SMTPServerDisconnected), SMTPSession() as smtp_session:
+        smtp_session.send(to_address=RECIPIENT_EMAIL_ADDRESS, msg="msg")
+    # Assert
+    assert mock_smtp.call_count == 2
+    assert mock_smtp.return_value.sendmail.call_count == 2
+    assert mock_smtp.return_value.close.call_count == 2
+    assert smtp_session.smtp is None
+    # Clean up
+    del environ["EMAIL_SECRET_NAME"]
+
+
+@patch(f"{FILE_PATH}.SMTP")
+@patch(f"{FILE_PATH}.get_secret")
+def test_smtp_session_refused_email_not_retried(mock_get_secret: MagicMock, mock_smtp: MagicMock) -> None:
+    # Arrange
+    environ["EMAIL_SECRET_NAME"] = "mock_secret_name"
+    mock_get_secret.return_value = {
+        "DI_SYSTEM_MAILBOX_ADDRESS": SYSTEM_MAILBOX_ADDRESS,
+        "DI_SYSTEM_MAILBOX_PASSWORD": SYSTEM_MAILBOX_PASSWORD,
+    }
+    mock_smtp.return_value.sendmail.side_effect = [SMTPRecipientsRefused({}), None]
+    with SMTPSession() as smtp_session:
+        # Act
+        with pytest.raises(SMTPRecipientsRefused):
+            smtp_session.send(to_address=RECIPIENT_EMAIL_ADDRESS, msg="msg")
+        smtp_session.send(to_address=RECIPIENT_EMAIL_ADDRESS, msg="msg")
+    # Assert
+    mock_smtp.assert_called_once()
+    mock_smtp.return_value.login.assert_called_once()
+    assert mock_smtp.return_value.sendmail.call_count == 2
+    mock_smtp.return_value.quit.assert_called_once()
+    # Clean up
+    del environ["EMAIL_SECRET_NAME"]
+
+
+def test_smtp_session_login_failure_clears_email_secrets(smtp_server: LocalSMTPHandler) -> None:
+    # Arrange
+    with patch(f"{FILE_PATH}.get_secret") as mock_get_secret:
+        mock_get_secret.side_effect = [
+            {"DI_SYSTEM_MAILBOX_ADDRESS": SYSTEM_MAILBOX_ADDRESS, "DI_SYSTEM_MAILBOX_PASSWORD": "rotated_password"},
+            {
+                "DI_SYSTEM_MAILBOX_ADDRESS": SYSTEM_MAILBOX_ADDRESS,
+                "DI_SYSTEM_MAILBOX_PASSWORD": SYSTEM_MAILBOX_PASSWORD,
+            },
+        ]
+        # Act
+        with SMTPSession() as smtp_session:
+            smtp_session.send(to_address="recipient@example.com", msg="Subject: test\r\n\r\ntest")
+    # Assert
+    assert mock_get_secret.call_count == 2
+    # smtplib tries the rotated password with both the PLAIN and LOGIN mechanisms before giving up
+    assert smtp_server.logins == 3
+    assert len(smtp_server.envelopes) == 1
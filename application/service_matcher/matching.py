@@ -1,6 +1,7 @@
 from aws_lambda_powertools.logging import Logger
 
 from common.dos import DoSService, get_matching_dos_services
+from common.matching_index import get_indexed_matching_services
 from common.nhs import NHSEntity
 
 logger = Logger(child=True)
@@ -9,8 +10,8 @@ logger = Logger(child=True)
 def get_matching_services(nhs_entity: NHSEntity) -> list[DoSService]:
     """Gets the matching DoS services for the given nhs entity.
 
-    Using the nhs entity attributed to this object, it finds the
-    matching DoS services from the db and filters the results.
+    Using the nhs entity attributed to this object, it finds the matching DoS services
+    from the matching index if it is enabled and fresh, otherwise from the db.
 
     Args:
         nhs_entity (NHSEntity): The nhs entity to match against.
@@ -18,11 +19,16 @@ def get_matching_services(nhs_entity: NHSEntity) -> list[DoSService]:
     Returns:
         list[DoSService]: The list of matching DoS services.
     """
-    # Check database for services with same first 5 digits of ODSCode
+    # Check the matching index, then the database, for services with same first 5 digits of ODSCode
     logger.debug(f"Getting matching DoS Services for odscode '{nhs_entity.odscode}'.")
-    matching_services = get_matching_dos_services(nhs_entity.odscode)
+    matching_services = get_indexed_matching_services(nhs_entity.odscode)
+    matched_from_index = matching_services is not None
+    if matching_services is None:
+        matching_services = get_matching_dos_services(nhs_entity.odscode)
     logger.info(
-        f"Found {len(matching_services)} services in DB with matching first 5 chars of ODSCode: {matching_services}",
+        f"Found {len(matching_services)} services in {'matching index' if matched_from_index else 'DB'} "
+        f"with matching first 5 chars of ODSCode: {matching_services}",
+        matched_from_index=matched_from_index,
     )
 
     return matching_services
@@ -1,50 +1,123 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
 from hashlib import sha256
-from json import dumps
 from os import environ, getenv
-from typing import Any
+from time import sleep
+from typing import TYPE_CHECKING, Any
 
 from aws_lambda_powertools.logging import Logger
 from aws_lambda_powertools.tracing import Tracer
 from aws_lambda_powertools.utilities.data_classes import SQSEvent, event_source
+from aws_lambda_powertools.utilities.data_classes.sqs_event import SQSRecord
 from aws_lambda_powertools.utilities.typing.lambda_context import LambdaContext
-from boto3 import client
 
 from .matching import get_matching_services
 from .review_matches import review_matches
-from common.middlewares import unhandled_exception_logging
+from common.aws_clients import get_client
+from common.errors import SQSError
+from common.middlewares import profiling, stage_metrics, unhandled_exception_logging
 from common.nhs import NHSEntity
+from common.serialisation import dumps
+from common.stage_metrics import time_stage
 from common.types import HoldingQueueChangeEventItem, UpdateRequest
 from common.utilities import extract_body
 
+if TYPE_CHECKING:
+    from botocore.client import BaseClient
+
 logger = Logger()
 tracer = Tracer()
-sqs = client("sqs")
+# Entries in a send_message_batch request, the SQS maximum
+SEND_MESSAGE_BATCH_SIZE = 10
+# Batches sent concurrently when a change event matches more than SEND_MESSAGE_BATCH_SIZE services
+SEND_MESSAGE_BATCH_WORKERS = 5
+# Attempts at sending each message, with exponential backoff from SEND_MESSAGE_BATCH_BACKOFF seconds between them
+SEND_MESSAGE_BATCH_ATTEMPTS = 4
+SEND_MESSAGE_BATCH_BACKOFF = 0.1
 
 
 @unhandled_exception_logging()
+@profiling()
+@stage_metrics()
 @tracer.capture_lambda_handler()
 @logger.inject_lambda_context(clear_state=True)
 @event_source(data_class=SQSEvent)
-def lambda_handler(event: SQSEvent, context: LambdaContext) -> None:  # noqa: ARG001
+def lambda_handler(event: SQSEvent, context: LambdaContext) -> dict[str, list[dict[str, str]]]:  # noqa: ARG001
     """Entrypoint handler for the service_matcher lambda.
 
+    Change events in the batch are collapsed by ODS code, so only the change event with the highest sequence
+    number for each ODS code is matched. The older change events are skipped, as the newer change event is in
+    the same batch.
+
     Args:
-        event (SQSEvent): Lambda function invocation event (list of 1 SQS Message)
+        event (SQSEvent): Lambda function invocation event (list of up to 10 SQS Messages)
             Change Event has been validate by the ingest change event lambda
         context (LambdaContext): Lambda function context object
 
     Event: The event payload should contain a NHS Entity (Service)
+
+    Returns:
+        dict[str, list[dict[str, str]]]: Partial batch response with the messages of every ODS code that failed
+    """
+    records_by_odscode: dict[str, list[tuple[SQSRecord, HoldingQueueChangeEventItem]]] = {}
+    for record in event.records:
+        holding_queue_change_event_item: HoldingQueueChangeEventItem = extract_body(record.body)
+        odscode = holding_queue_change_event_item["change_event"]["ODSCode"]
+        records_by_odscode.setdefault(odscode, []).append((record, holding_queue_change_event_item))
+
+    batch_item_failures = []
+    for records in records_by_odscode.values():
+        latest_change_event_item = compact_change_events([item for _, item in records])
+        try:
+            match_change_event(latest_change_event_item)
+        except Exception:
+            logger.exception("Failed to match change event, so its messages will be retried")
+            # The older change events were only skipped because of this one, so they are retried with it
+            batch_item_failures.extend({"itemIdentifier": record.message_id} for record, _ in records)
+    return {"batchItemFailures": batch_item_failures}
+
+
+def compact_change_events(
+    holding_queue_change_event_items: list[HoldingQueueChangeEventItem],
+) -> HoldingQueueChangeEventItem:
+    """Collapses the change events for an ODS code in a batch into the one with the highest sequence number.
+
+    Args:
+        holding_queue_change_event_items (list[HoldingQueueChangeEventItem]): Change events for one ODS code
+
+    Returns:
+        HoldingQueueChangeEventItem: The change event with the highest sequence number
+    """
+    latest = max(holding_queue_change_event_items, key=lambda item: item["sequence_number"])
+    for item in holding_queue_change_event_items:
+        if item is not latest:
+            logger.warning(
+                "Change event superseded by a newer change event in the batch, so will be skipped",
+                correlation_id=item["correlation_id"],
+                ods_code=item["change_event"]["ODSCode"],
+                sequence_number=item["sequence_number"],
+                latest_sequence_number=latest["sequence_number"],
+                environment=getenv("ENVIRONMENT"),
+                cloudwatch_metric_filter_matching_attribute="ChangeEventSuperseded",
+            )
+    return latest
+
+
+def match_change_event(holding_queue_change_event_item: HoldingQueueChangeEventItem) -> None:
+    """Matches a change event to DoS services and sends an update request for each matching service.
+
+    Args:
+        holding_queue_change_event_item (HoldingQueueChangeEventItem): Change event from the holding queue
     """
-    record = next(event.records)
-    holding_queue_change_event_item: HoldingQueueChangeEventItem = extract_body(record.body)
     logger.set_correlation_id(holding_queue_change_event_item["correlation_id"])
     change_event = holding_queue_change_event_item["change_event"]
-
     nhs_entity = NHSEntity(change_event)
     logger.append_keys(ods_code=nhs_entity.odscode, org_type=nhs_entity.org_type, org_sub_type=nhs_entity.org_sub_type)
     logger.info("Created NHS Entity for processing", nhs_entity=nhs_entity)
 
-    matching_services = get_matching_services(nhs_entity)
+    with time_stage("get_matching_services"):
+        matching_services = get_matching_services(nhs_entity)
     matching_services = review_matches(matching_services, nhs_entity)
     if matching_services is None:
         return
@@ -73,13 +146,23 @@ def send_update_requests(
     record_id: str,
     sequence_number: int,
 ) -> None:
-    """Sends update request payload off to next part of workflow."""
+    """Sends update request payload off to next part of workflow.
+
+    The messages are sent in batches of 10, concurrently when there is more than one batch.
+
+    Raises:
+        SQSError: If any update request could not be sent after retrying
+    """
     messages = []
+    # Every update request of a change event carries the same change event, so it is only hashed once
+    change_event_hashes: dict[int, str] = {}
     for update_request in update_requests:
         service_id = update_request.get("service_id")
+        change_event = update_request.get("change_event")
+        if id(change_event) not in change_event_hashes:
+            change_event_hashes[id(change_event)] = sha256(dumps(change_event).encode()).hexdigest()
+        hashed_payload = change_event_hashes[id(change_event)]
         update_request_json = dumps(update_request)
-        encoded = update_request_json.encode()
-        hashed_payload = sha256(encoded).hexdigest()
         message_deduplication_id = f"{service_id}-{hashed_payload}"
         message_group_id = str(service_id)
         entry_id = f"{service_id}-{sequence_number}"
@@ -104,22 +187,72 @@ def send_update_requests(
                     "dynamo_record_id": {"DataType": "String", "StringValue": record_id},
                     "ods_code": {
                         "DataType": "String",
-                        "StringValue": update_request.get("change_event").get("ODSCode"),
+                        "StringValue": change_event.get("ODSCode"),
                     },
                     "message_deduplication_id": {"DataType": "String", "StringValue": message_deduplication_id},
                     "message_group_id": {"DataType": "String", "StringValue": message_group_id},
                 },
             },
         )
-    chunks = list(divide_chunks(messages, 10))
-    for i, chunk in enumerate(chunks):
-        # TODO: Handle errors?
-        logger.debug(f"Sending off message chunk {i+1}/{len(chunks)}")
-        response = sqs.send_message_batch(QueueUrl=environ["UPDATE_REQUEST_QUEUE_URL"], Entries=chunk)
-        logger.debug("Sent off message chunk", response=response)
-        logger.warning(
-            "Sent Off Update Request",
-            service_id=service_id,
+    chunks = list(divide_chunks(messages, SEND_MESSAGE_BATCH_SIZE))
+    # Create the client before starting any threads, so they share one client
+    sqs = get_client("sqs")
+    queue_url = environ["UPDATE_REQUEST_QUEUE_URL"]
+    if len(chunks) > 1:
+        logger.debug(f"Sending off {len(chunks)} message chunks")
+        with ThreadPoolExecutor(max_workers=min(len(chunks), SEND_MESSAGE_BATCH_WORKERS)) as executor:
+            results = list(executor.map(lambda chunk: send_message_batch(sqs, queue_url, chunk), chunks))
+    else:
+        results = [send_message_batch(sqs, queue_url, chunk) for chunk in chunks]
+    failed_entries = []
+    for chunk, failed in zip(chunks, results, strict=True):
+        failed_entries.extend(failed)
+        if len(failed) < len(chunk):
+            logger.warning(
+                "Sent Off Update Request",
+                service_id=chunk[-1]["MessageGroupId"],
+                environment=getenv("ENVIRONMENT"),
+                cloudwatch_metric_filter_matching_attribute="UpdateRequestSent",
+            )
+    if failed_entries:
+        logger.error(
+            "Failed to send update requests",
+            failed_entries=failed_entries,
             environment=getenv("ENVIRONMENT"),
-            cloudwatch_metric_filter_matching_attribute="UpdateRequestSent",
+            cloudwatch_metric_filter_matching_attribute="UpdateRequestFailed",
         )
+        msg = f"Failed to send {len(failed_entries)} of {len(messages)} update requests"
+        raise SQSError(msg)
+
+
+def send_message_batch(sqs: BaseClient, queue_url: str, entries: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Sends a batch of messages to SQS, retrying only the failed entries with exponential backoff.
+
+    Entries that failed due to a sender fault are not retried.
+
+    Args:
+        sqs (BaseClient): SQS client
+        queue_url (str): URL of the queue to send the messages to
+        entries (list[dict[str, Any]]): Up to 10 send_message_batch entries
+
+    Returns:
+        list[dict[str, Any]]: The Failed response entries of the messages that could not be sent
+    """
+    # Sender faults, such as an invalid message, fail again if retried
+    sender_faults = []
+    retries = []
+    for attempt in range(SEND_MESSAGE_BATCH_ATTEMPTS):
+        if attempt > 0:
+            sleep(SEND_MESSAGE_BATCH_BACKOFF * 2 ** (attempt - 1))
+        with time_stage("sqs_send"):
+            response = sqs.send_message_batch(QueueUrl=queue_url, Entries=entries)
+        logger.debug("Sent off message chunk", response=response)
+        failed = response.get("Failed", [])
+        sender_faults.extend(entry for entry in failed if entry.get("SenderFault"))
+        retries = [entry for entry in failed if not entry.get("SenderFault")]
+        if not retries:
+            break
+        logger.warning("Retrying failed update requests", failed=retries, attempt=attempt + 1)
+        retry_ids = {entry["Id"] for entry in retries}
+        entries = [entry for entry in entries if entry["Id"] in retry_ids]
+    return sender_faults + retries
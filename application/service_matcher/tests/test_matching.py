@@ -8,7 +8,9 @@ FILE_PATH = "application.service_matcher.matching"
 
 
 @patch(f"{FILE_PATH}.get_matching_dos_services")
+@patch(f"{FILE_PATH}.get_indexed_matching_services")
 def test_get_matching_services(
+    mock_get_indexed_matching_services: MagicMock,
     mock_get_matching_dos_services: MagicMock,
     change_event: dict[str, str],
 ) -> None:
@@ -17,11 +19,32 @@ def test_get_matching_services(
     service = dummy_dos_service()
     service.typeid = 13
     service.statusid = 1
+    mock_get_indexed_matching_services.return_value = None
     mock_get_matching_dos_services.return_value = [service]
     # Act
     matching_services = get_matching_services(nhs_entity)
     # Assert
     assert matching_services == [service]
+    mock_get_indexed_matching_services.assert_called_once_with(nhs_entity.odscode)
+    mock_get_matching_dos_services.assert_called_once_with(nhs_entity.odscode)
+
+
+@patch(f"{FILE_PATH}.get_matching_dos_services")
+@patch(f"{FILE_PATH}.get_indexed_matching_services")
+def test_get_matching_services_from_matching_index(
+    mock_get_indexed_matching_services: MagicMock,
+    mock_get_matching_dos_services: MagicMock,
+    change_event: dict[str, str],
+) -> None:
+    # Arrange
+    nhs_entity = NHSEntity(change_event)
+    service = dummy_dos_service()
+    mock_get_indexed_matching_services.return_value = [service]
+    # Act
+    matching_services = get_matching_services(nhs_entity)
+    # Assert
+    assert matching_services == [service]
+    mock_get_matching_dos_services.assert_not_called()
 
 
 @patch(f"{FILE_PATH}.get_matching_dos_services")
@@ -1,15 +1,21 @@
 import hashlib
-from json import dumps
 from os import environ
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, call, patch
 
 import pytest
 from aws_lambda_powertools.logging import Logger
 from aws_lambda_powertools.utilities.typing import LambdaContext
 
+from application.common.serialisation import dumps
 from application.common.types import HoldingQueueChangeEventItem
 from application.conftest import PHARMACY_STANDARD_EVENT, dummy_dos_service
-from application.service_matcher.service_matcher import lambda_handler, send_update_requests
+from application.service_matcher.service_matcher import (
+    compact_change_events,
+    lambda_handler,
+    send_message_batch,
+    send_update_requests,
+)
+from common.errors import SQSError
 from common.nhs import NHSEntity
 
 FILE_PATH = "application.service_matcher.service_matcher"
@@ -33,6 +39,25 @@ def _get_message_attributes(
     }
 
 
+def _holding_queue_change_event_item(odscode: str, sequence_number: int) -> HoldingQueueChangeEventItem:
+    return HoldingQueueChangeEventItem(
+        change_event=PHARMACY_STANDARD_EVENT | {"ODSCode": odscode},
+        message_received=1234567890,
+        sequence_number=sequence_number,
+        dynamo_record_id="123",
+        correlation_id=f"{odscode}-{sequence_number}",
+    )
+
+
+def _sqs_event(*holding_queue_change_event_items: HoldingQueueChangeEventItem) -> dict[str, list[dict[str, str]]]:
+    return {
+        "Records": [
+            SQS_EVENT["Records"][0] | {"messageId": f"message-{index}", "body": dumps(item)}
+            for index, item in enumerate(holding_queue_change_event_items)
+        ],
+    }
+
+
 @patch(f"{FILE_PATH}.review_matches")
 @patch(f"{FILE_PATH}.get_matching_services")
 @patch(f"{FILE_PATH}.send_update_requests")
@@ -60,7 +85,7 @@ def test_lambda_handler(
     # Act
     response = lambda_handler(sqs_event, lambda_context)
     # Assert
-    assert response is None, f"Response should be None but is {response}"
+    assert response == {"batchItemFailures": []}
     mock_extract_body.assert_called_once_with(sqs_event["Records"][0]["body"])
     mock_nhs_entity.assert_called_once_with(change_event)
     mock_get_matching_services.assert_called_once_with(mock_entity)
@@ -98,7 +123,7 @@ def test_lambda_handler_unmatched_service(
     # Act
     response = lambda_handler(sqs_event, lambda_context)
     # Assert
-    assert response is None, f"Response should be None but is {response}"
+    assert response == {"batchItemFailures": []}
     mock_extract_body.assert_called_once_with(sqs_event["Records"][0]["body"])
     mock_nhs_entity.assert_called_once_with(change_event)
     mock_get_matching_services.assert_called_once_with(mock_entity)
@@ -107,25 +132,70 @@ def test_lambda_handler_unmatched_service(
     del environ["ENV"]
 
 
-def test_lambda_handler_should_throw_exception_if_event_records_len_not_eq_one(lambda_context: LambdaContext) -> None:
+@patch(f"{FILE_PATH}.match_change_event")
+def test_lambda_handler_superseded_change_event(
+    mock_match_change_event: MagicMock,
+    lambda_context: LambdaContext,
+) -> None:
+    # Arrange
+    older = _holding_queue_change_event_item("FXXX1", 1)
+    newer = _holding_queue_change_event_item("FXXX1", 2)
+    other = _holding_queue_change_event_item("FYYY1", 1)
+    sqs_event = _sqs_event(newer, other, older)
+    # Act
+    response = lambda_handler(sqs_event, lambda_context)
+    # Assert
+    assert response == {"batchItemFailures": []}
+    assert mock_match_change_event.call_args_list == [call(newer), call(other)]
+
+
+@patch(f"{FILE_PATH}.match_change_event")
+def test_lambda_handler_failed_change_event_retries_superseded_change_events(
+    mock_match_change_event: MagicMock,
+    lambda_context: LambdaContext,
+) -> None:
+    # Arrange
+    older = _holding_queue_change_event_item("FXXX1", 1)
+    newer = _holding_queue_change_event_item("FXXX1", 2)
+    other = _holding_queue_change_event_item("FYYY1", 1)
+    sqs_event = _sqs_event(older, newer, other)
+    mock_match_change_event.side_effect = [SQSError("Failed to send 1 of 1 update requests"), None]
+    # Act
+    response = lambda_handler(sqs_event, lambda_context)
+    # Assert
+    assert response == {"batchItemFailures": [{"itemIdentifier": "message-0"}, {"itemIdentifier": "message-1"}]}
+    assert mock_match_change_event.call_args_list == [call(newer), call(other)]
+
+
+def test_compact_change_events() -> None:
+    # Arrange
+    items = [_holding_queue_change_event_item("FXXX1", sequence_number) for sequence_number in (3, 5, 4)]
+    # Act
+    response = compact_change_events(items)
+    # Assert
+    assert response is items[1]
+
+
+def test_lambda_handler_empty_batch(lambda_context: LambdaContext) -> None:
     # Arrange
     sqs_event = SQS_EVENT.copy()
     sqs_event["Records"] = []
     environ["ENV"] = "test"
-    # Act / Assert
-    with pytest.raises(StopIteration):
-        lambda_handler(sqs_event, lambda_context)
+    # Act
+    response = lambda_handler(sqs_event, lambda_context)
+    # Assert
+    assert response == {"batchItemFailures": []}
     # Clean up
     del environ["ENV"]
 
 
-@patch(f"{FILE_PATH}.sqs")
+@patch(f"{FILE_PATH}.get_client")
 @patch.object(Logger, "get_correlation_id", return_value="1")
 @patch.object(Logger, "warning")
 def test_send_update_requests(
     mock_logger: MagicMock,
     get_correlation_id_mock: MagicMock,
-    mock_sqs: MagicMock,
+    mock_get_client: MagicMock,
 ) -> None:
     # Arrange
     q_name = "test-queue"
@@ -135,6 +205,7 @@ def test_send_update_requests(
     sequence_number = 1
     odscode = "FXXX1"
     update_requests = [{"service_id": "1", "change_event": {"ODSCode": odscode}}]
+    mock_get_client.return_value.send_message_batch.return_value = {"Successful": [{"Id": "1-1"}]}
     # Act
     send_update_requests(
         update_requests=update_requests,
@@ -144,8 +215,7 @@ def test_send_update_requests(
     )
     # Assert
     payload = dumps(update_requests[0])
-    encoded = payload.encode()
-    hashed_payload = hashlib.sha256(encoded).hexdigest()
+    hashed_payload = hashlib.sha256(dumps(update_requests[0]["change_event"]).encode()).hexdigest()
     entry_details = {
         "Id": "1-1",
         "MessageBody": payload,
@@ -160,7 +230,7 @@ def test_send_update_requests(
             "1",
         ),
     }
-    mock_sqs.send_message_batch.assert_called_with(
+    mock_get_client.return_value.send_message_batch.assert_called_with(
         QueueUrl=q_name,
         Entries=[entry_details],
     )
@@ -174,6 +244,99 @@ def test_send_update_requests(
     del environ["UPDATE_REQUEST_QUEUE_URL"]
 
 
+@patch(f"{FILE_PATH}.get_client")
+@patch.object(Logger, "get_correlation_id", return_value="1")
+def test_send_update_requests_multiple_chunks(get_correlation_id_mock: MagicMock, mock_get_client: MagicMock) -> None:
+    # Arrange
+    environ["UPDATE_REQUEST_QUEUE_URL"] = "test-queue"
+    change_event = {"ODSCode": "FXXX1"}
+    update_requests = [{"service_id": str(service_id), "change_event": change_event} for service_id in range(25)]
+    mock_get_client.return_value.send_message_batch.return_value = {}
+    # Act
+    send_update_requests(
+        update_requests=update_requests,
+        message_received=1642501355616,
+        record_id="someid",
+        sequence_number=1,
+    )
+    # Assert
+    calls = mock_get_client.return_value.send_message_batch.call_args_list
+    assert sorted((len(call.kwargs["Entries"]) for call in calls), reverse=True) == [10, 10, 5]
+    entries = [entry for call in calls for entry in call.kwargs["Entries"]]
+    hashed_payload = hashlib.sha256(dumps(change_event).encode()).hexdigest()
+    assert sorted(f"{service_id}-{hashed_payload}" for service_id in range(25)) == sorted(
+        entry["MessageDeduplicationId"] for entry in entries
+    )
+    # Clean up
+    del environ["UPDATE_REQUEST_QUEUE_URL"]
+
+
+@patch(f"{FILE_PATH}.sleep")
+def test_send_message_batch_retries_failed_entries(mock_sleep: MagicMock) -> None:
+    # Arrange
+    sqs = MagicMock()
+    entries = [{"Id": "1-1"}, {"Id": "2-1"}, {"Id": "3-1"}]
+    sqs.send_message_batch.side_effect = [
+        {"Successful": [{"Id": "1-1"}], "Failed": [{"Id": "2-1", "SenderFault": False}, {"Id": "3-1"}]},
+        {"Successful": [{"Id": "2-1"}], "Failed": [{"Id": "3-1", "SenderFault": False}]},
+        {"Successful": [{"Id": "3-1"}]},
+    ]
+    # Act
+    failed = send_message_batch(sqs, "test-queue", entries)
+    # Assert
+    assert failed == []
+    assert [
+        call(QueueUrl="test-queue", Entries=entries),
+        call(QueueUrl="test-queue", Entries=[{"Id": "2-1"}, {"Id": "3-1"}]),
+        call(QueueUrl="test-queue", Entries=[{"Id": "3-1"}]),
+    ] == sqs.send_message_batch.call_args_list
+    assert [call(0.1), call(0.2)] == mock_sleep.call_args_list
+
+
+@patch(f"{FILE_PATH}.sleep")
+def test_send_message_batch_sender_fault(mock_sleep: MagicMock) -> None:
+    # Arrange
+    sqs = MagicMock()
+    entries = [{"Id": "1-1"}, {"Id": "2-1"}]
+    sender_fault = {"Id": "1-1", "SenderFault": True, "Code": "InvalidMessageContents"}
+    sqs.send_message_batch.side_effect = [
+        {"Failed": [sender_fault, {"Id": "2-1", "SenderFault": False}]},
+        {"Successful": [{"Id": "2-1"}]},
+    ]
+    # Act
+    failed = send_message_batch(sqs, "test-queue", entries)
+    # Assert
+    assert [sender_fault] == failed
+    sqs.send_message_batch.assert_called_with(QueueUrl="test-queue", Entries=[{"Id": "2-1"}])
+    mock_sleep.assert_called_once_with(0.1)
+
+
+@patch(f"{FILE_PATH}.sleep")
+@patch(f"{FILE_PATH}.get_client")
+@patch.object(Logger, "get_correlation_id", return_value="1")
+def test_send_update_requests_failed(
+    get_correlation_id_mock: MagicMock,
+    mock_get_client: MagicMock,
+    mock_sleep: MagicMock,
+) -> None:
+    # Arrange
+    environ["UPDATE_REQUEST_QUEUE_URL"] = "test-queue"
+    update_requests = [{"service_id": "1", "change_event": {"ODSCode": "FXXX1"}}]
+    mock_get_client.return_value.send_message_batch.return_value = {"Failed": [{"Id": "1-1", "SenderFault": False}]}
+    # Act / Assert
+    with pytest.raises(SQSError, match="Failed to send 1 of 1 update requests"):
+        send_update_requests(
+            update_requests=update_requests,
+            message_received=1642501355616,
+            record_id="someid",
+            sequence_number=1,
+        )
+    assert mock_get_client.return_value.send_message_batch.call_count == 4
+    assert mock_sleep.call_count == 3
+    # Clean up
+    del environ["UPDATE_REQUEST_QUEUE_URL"]
+
+
 HOLDING_QUEUE_CHANGE_EVENT_ITEM = HoldingQueueChangeEventItem(
     change_event=PHARMACY_STANDARD_EVENT.copy(),
     message_received=1234567890,
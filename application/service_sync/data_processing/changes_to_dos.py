@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import Any
+from typing import Any, Self
 
 from aws_lambda_powertools.logging import Logger
 
@@ -45,3 +45,54 @@ class ChangesToDoS:
     # new_day_opening_times e.g. new_monday_opening_times
     # current_day_opening_times e.g. current_monday_opening_times
     # The type of the value is a list of OpenPeriod objects
+
+    def has_changes(self: Self) -> bool:
+        """Whether any changes need to be made to the DoS service.
+
+        Returns:
+            bool: True if there are changes to be made, False if not
+        """
+        return any(
+            [
+                self.demographic_changes,
+                self.standard_opening_times_changes,
+                self.specified_opening_times_changes,
+                self.palliative_care_changes,
+                self.blood_pressure_changes,
+                self.contraception_changes,
+            ],
+        )
+
+    def export_diff(self: Self) -> dict[str, Any]:
+        """Exports the changes to be made to the DoS service as a JSON serialisable diff.
+
+        Returns:
+            dict[str, Any]: The changes to be made to the DoS service
+        """
+        service_history_changes = self.service_histories.service_history.get(
+            self.service_histories.NEW_CHANGE_KEY,
+            {},
+        ).get("new", {})
+        return {
+            "service_id": self.dos_service.id,
+            "odscode": self.nhs_entity.odscode,
+            "has_changes": self.has_changes(),
+            "demographic_changes": self.demographic_changes,
+            "standard_opening_times_changes": {
+                day_id: [open_period.export_db_string_format() for open_period in sorted(open_periods)]
+                for day_id, open_periods in self.standard_opening_times_changes.items()
+            },
+            "specified_opening_times_changes": (
+                [
+                    change
+                    for specified_opening_time in self.new_specified_opening_times or []
+                    for change in specified_opening_time.export_dos_log_format()
+                ]
+                if self.specified_opening_times_changes
+                else None
+            ),
+            "palliative_care_changes": self.palliative_care_changes,
+            "blood_pressure_changes": self.blood_pressure_changes,
+            "contraception_changes": self.contraception_changes,
+            "service_history_changes": service_history_changes,
+        }
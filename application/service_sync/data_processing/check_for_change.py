@@ -43,7 +43,7 @@ from common.constants import (
 from common.dos import DoSService
 from common.dos_location import DoSLocation
 from common.nhs import NHSEntity, get_palliative_care_log_value, skip_if_key_is_none
-from common.opening_times import DAY_IDS, WEEKDAYS
+from common.opening_times import DAY_IDS, WEEKDAYS, OpeningTimesFingerprint
 
 logger = Logger(child=True)
 
@@ -201,6 +201,9 @@ def check_location_for_change(changes_to_dos: ChangesToDoS) -> ChangesToDoS:
 def check_opening_times_for_changes(changes_to_dos: ChangesToDoS) -> ChangesToDoS:
     """Compares and creates changes individually for all opening times if needed.
 
+    The standard opening times of both sides are fingerprinted once, so only the weekdays whose
+    fingerprints differ are compared in detail and added to the service history.
+
     Args:
         changes_to_dos (ChangesToDoS): ChangesToDoS holder object
 
@@ -216,13 +219,21 @@ def check_opening_times_for_changes(changes_to_dos: ChangesToDoS) -> ChangesToDo
             )
         else:
             logger.warning("Standard opening times are not blank")
-            # Compare standard opening times
+            dos_fingerprint = OpeningTimesFingerprint(changes_to_dos.dos_service.standard_opening_times)
+            nhs_fingerprint = OpeningTimesFingerprint(changes_to_dos.nhs_entity.standard_opening_times)
+            changed_weekdays = dos_fingerprint.changed_weekdays(nhs_fingerprint)
+            if not changed_weekdays:
+                logger.info("Standard opening times are equal, so no change")
+            # Compare standard opening times for the weekdays that have changed
             for weekday, dos_weekday_key, day_id in zip(  # noqa: B905
                 WEEKDAYS,
                 DOS_STANDARD_OPENING_TIMES_CHANGE_KEY_LIST,
                 DAY_IDS,
             ):
-                if compare_standard_opening_times(changes=changes_to_dos, weekday=weekday):
+                if weekday in changed_weekdays and compare_standard_opening_times(
+                    changes=changes_to_dos,
+                    weekday=weekday,
+                ):
                     changes_to_dos.standard_opening_times_changes[day_id] = getattr(
                         changes_to_dos,
                         f"new_{weekday}_opening_times",
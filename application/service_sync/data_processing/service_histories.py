@@ -6,7 +6,6 @@ from typing import Any, Self
 
 from aws_lambda_powertools.logging import Logger
 from psycopg import Connection
-from psycopg.rows import dict_row
 from pytz import timezone
 
 from .service_histories_change import ServiceHistoriesChange
@@ -18,8 +17,25 @@ from common.constants import (
 )
 from common.dos_db_connection import query_dos_db
 from common.opening_times import SpecifiedOpeningTime, StandardOpeningTimes
+from common.query_registry import register_query
 
 logger = Logger(child=True)
+GET_SERVICE_HISTORY_QUERY = register_query(
+    "get_service_history",
+    "Select history from servicehistories where serviceid = %(SERVICE_ID)s",
+)
+UPDATE_SERVICE_MODIFIED_QUERY = register_query(
+    "update_service_modified",
+    "UPDATE services SET modifiedby=%(USER_NAME)s, modifiedtime=%(CURRENT_DATE_TIME)s WHERE id = %(SERVICE_ID)s;",
+)
+UPDATE_SERVICE_HISTORY_QUERY = register_query(
+    "update_service_history",
+    "UPDATE servicehistories SET history = %(SERVICE_HISTORY)s WHERE serviceid = %(SERVICE_ID)s;",
+)
+INSERT_SERVICE_HISTORY_QUERY = register_query(
+    "insert_service_history",
+    "INSERT INTO servicehistories (serviceid, history) VALUES (%(SERVICE_ID)s, %(SERVICE_HISTORY)s);",
+)
 
 
 class ServiceHistories:
@@ -52,11 +68,11 @@ class ServiceHistories:
         Args:
             connection (Connection): The connection to the database
         """
-        cursor = connection.cursor(row_factory=dict_row)
         # Get the history json from the database for the service
-        cursor.execute(
-            query="Select history from servicehistories where serviceid = %(SERVICE_ID)s",
-            params={"SERVICE_ID": self.service_id},
+        cursor = query_dos_db(
+            connection=connection,
+            query=GET_SERVICE_HISTORY_QUERY,
+            query_vars={"SERVICE_ID": self.service_id},
         )
         if results := cursor.fetchall():
             # Change History exists in the database
@@ -220,10 +236,7 @@ class ServiceHistories:
         logger.debug("Service history to be saved", service_history=json_service_history)
         cursor = query_dos_db(
             connection=connection,
-            query=(
-                """UPDATE services SET modifiedby=%(USER_NAME)s, """
-                """modifiedtime=%(CURRENT_DATE_TIME)s WHERE id = %(SERVICE_ID)s;"""
-            ),
+            query=UPDATE_SERVICE_MODIFIED_QUERY,
             query_vars={
                 "USER_NAME": DOS_INTEGRATION_USER_NAME,
                 "CURRENT_DATE_TIME": current_date_time,
@@ -235,9 +248,7 @@ class ServiceHistories:
             # Update the service_histories json in the database
             cursor = query_dos_db(
                 connection=connection,
-                query=(
-                    """UPDATE servicehistories SET history = %(SERVICE_HISTORY)s WHERE serviceid = %(SERVICE_ID)s;"""
-                ),
+                query=UPDATE_SERVICE_HISTORY_QUERY,
                 query_vars={"SERVICE_HISTORY": json_service_history, "SERVICE_ID": self.service_id},
             )
             logger.info(f"Service history updated for serviceid {self.service_id}")
@@ -246,10 +257,7 @@ class ServiceHistories:
             # Create a new entry in the service_histories json for the service
             cursor = query_dos_db(
                 connection=connection,
-                query=(
-                    """INSERT INTO servicehistories (serviceid, history) """
-                    """VALUES (%(SERVICE_ID)s, %(SERVICE_HISTORY)s);"""
-                ),
+                query=INSERT_SERVICE_HISTORY_QUERY,
                 query_vars={"SERVICE_ID": self.service_id, "SERVICE_HISTORY": json_service_history},
             )
             cursor.close()
@@ -1,5 +1,7 @@
+from datetime import date, time
 from unittest.mock import MagicMock
 
+from application.common.opening_times import OpenPeriod, SpecifiedOpeningTime
 from application.service_sync.data_processing.changes_to_dos import ChangesToDoS
 
 FILE_PATH = "application.service_sync.data_processing.changes_to_dos"
@@ -29,3 +31,45 @@ def test_changes_to_dos() -> None:
     assert None is changes_to_dos.current_public_phone
     assert None is changes_to_dos.current_specified_opening_times
     assert None is changes_to_dos.current_website
+
+
+def test_changes_to_dos_has_changes() -> None:
+    # Arrange
+    changes_to_dos = ChangesToDoS(dos_service=MagicMock(), nhs_entity=MagicMock(), service_histories=MagicMock())
+    # Act & Assert
+    assert changes_to_dos.has_changes() is False
+    changes_to_dos.blood_pressure_changes = True
+    assert changes_to_dos.has_changes() is True
+
+
+def test_changes_to_dos_export_diff() -> None:
+    # Arrange
+    dos_service = MagicMock()
+    dos_service.id = 1
+    nhs_entity = MagicMock()
+    nhs_entity.odscode = "FA123"
+    service_histories = MagicMock()
+    service_histories.NEW_CHANGE_KEY = "new_change"
+    service_histories.service_history = {"new_change": {"new": {"cmsurl": {"data": "www.example.com"}}}}
+    changes_to_dos = ChangesToDoS(dos_service=dos_service, nhs_entity=nhs_entity, service_histories=service_histories)
+    changes_to_dos.demographic_changes = {"web": "www.example.com"}
+    changes_to_dos.standard_opening_times_changes = {
+        1: [OpenPeriod(time(13, 0), time(17, 0)), OpenPeriod(time(9, 0), time(12, 0))],
+    }
+    changes_to_dos.specified_opening_times_changes = True
+    changes_to_dos.new_specified_opening_times = [SpecifiedOpeningTime([], date(2023, 12, 25), is_open=False)]
+    # Act
+    response = changes_to_dos.export_diff()
+    # Assert
+    assert response == {
+        "service_id": 1,
+        "odscode": "FA123",
+        "has_changes": True,
+        "demographic_changes": {"web": "www.example.com"},
+        "standard_opening_times_changes": {1: ["09:00-12:00", "13:00-17:00"]},
+        "specified_opening_times_changes": ["2023-12-25-closed"],
+        "palliative_care_changes": False,
+        "blood_pressure_changes": False,
+        "contraception_changes": False,
+        "service_history_changes": {"cmsurl": {"data": "www.example.com"}},
+    }
@@ -1,3 +1,4 @@
+from datetime import date, time
 from unittest.mock import MagicMock, call, patch
 
 from application.common.constants import (
@@ -21,6 +22,7 @@ from application.common.constants import (
     DOS_STATUS_CHANGE_KEY,
     DOS_WEBSITE_CHANGE_KEY,
 )
+from application.common.opening_times import WEEKDAYS, OpenPeriod, SpecifiedOpeningTime, StandardOpeningTimes
 from application.conftest import dummy_dos_location
 from application.service_sync.data_processing.changes_to_dos import ChangesToDoS
 from application.service_sync.data_processing.check_for_change import (
@@ -215,6 +217,7 @@ def test_check_location_for_change_no_changes(
     mock_services_change.assert_not_called()
 
 
+@patch(f"{FILE_PATH}.OpeningTimesFingerprint")
 @patch(f"{FILE_PATH}.compare_specified_opening_times")
 @patch(f"{FILE_PATH}.compare_standard_opening_times")
 @patch(f"{FILE_PATH}.services_change")
@@ -224,6 +227,7 @@ def test_check_opening_times_for_changes(
     mock_services_change: MagicMock,
     mock_compare_standard_opening_times: MagicMock,
     mock_compare_specified_opening_times: MagicMock,
+    mock_opening_times_fingerprint: MagicMock,
 ) -> None:
     # Arrange
     dos_service = MagicMock()
@@ -240,6 +244,7 @@ def test_check_opening_times_for_changes(
     changes_to_dos.new_sunday_opening_times = "new_sunday_opening_times"
     mock_validate_opening_times.return_value = True
     dos_service.standard_opening_times.same_openings.return_value = False
+    mock_opening_times_fingerprint.return_value.changed_weekdays.return_value = list(WEEKDAYS)
     mock_compare_standard_opening_times.return_value = True
     mock_compare_specified_opening_times.return_value = True
     # Act
@@ -336,6 +341,7 @@ def test_check_opening_times_for_changes_blank_opening_times(
     changes_to_dos.service_histories.add_specified_opening_times_change.assert_not_called()
 
 
+@patch(f"{FILE_PATH}.OpeningTimesFingerprint")
 @patch(f"{FILE_PATH}.compare_specified_opening_times")
 @patch(f"{FILE_PATH}.compare_standard_opening_times")
 @patch(f"{FILE_PATH}.services_change")
@@ -345,6 +351,7 @@ def test_check_opening_times_for_changes_no_change(
     mock_services_change: MagicMock,
     mock_compare_standard_opening_times: MagicMock,
     mock_compare_specified_opening_times: MagicMock,
+    mock_opening_times_fingerprint: MagicMock,
 ) -> None:
     # Arrange
     dos_service = MagicMock()
@@ -360,12 +367,49 @@ def test_check_opening_times_for_changes_no_change(
     changes_to_dos.new_sunday_opening_times = "new_sunday_opening_times"
     mock_validate_opening_times.return_value = True
     dos_service.standard_opening_times.same_openings.return_value = False
+    nhs_entity.standard_opening_times.fully_closed.return_value = False
+    mock_opening_times_fingerprint.return_value.changed_weekdays.return_value = ["monday"]
     mock_compare_standard_opening_times.return_value = False
     mock_compare_specified_opening_times.return_value = False
     # Act
     response = check_opening_times_for_changes(changes_to_dos)
     # Assert
     assert response == changes_to_dos
+    mock_compare_standard_opening_times.assert_called_once_with(changes=changes_to_dos, weekday="monday")
+    changes_to_dos.service_histories.add_standard_opening_times_change.assert_not_called()
+    changes_to_dos.service_histories.add_specified_opening_times_change.assert_not_called()
+
+
+@patch(f"{FILE_PATH}.compare_specified_opening_times")
+@patch(f"{FILE_PATH}.compare_standard_opening_times")
+@patch(f"{FILE_PATH}.validate_opening_times")
+def test_check_opening_times_for_changes_same_fingerprints(
+    mock_validate_opening_times: MagicMock,
+    mock_compare_standard_opening_times: MagicMock,
+    mock_compare_specified_opening_times: MagicMock,
+) -> None:
+    # Arrange
+    dos_service = MagicMock()
+    dos_service.standard_opening_times = StandardOpeningTimes()
+    dos_service.standard_opening_times.add_open_period(OpenPeriod(time(9, 0), time(17, 0)), "monday")
+    dos_service.standard_opening_times.add_open_period(OpenPeriod(time(8, 0), time(8, 30)), "monday")
+    dos_service.specified_opening_times = []
+    nhs_entity = MagicMock()
+    nhs_entity.standard_opening_times = StandardOpeningTimes()
+    nhs_entity.standard_opening_times.add_open_period(OpenPeriod(time(8, 0), time(8, 30)), "Monday")
+    nhs_entity.standard_opening_times.add_open_period(OpenPeriod(time(9, 0), time(17, 0)), "Monday")
+    nhs_entity.specified_opening_times = [SpecifiedOpeningTime([], date(2000, 1, 1), is_open=False)]
+    service_histories = MagicMock()
+    changes_to_dos = ChangesToDoS(dos_service=dos_service, nhs_entity=nhs_entity, service_histories=service_histories)
+    mock_validate_opening_times.return_value = True
+    mock_compare_specified_opening_times.return_value = False
+    # Act
+    response = check_opening_times_for_changes(changes_to_dos)
+    # Assert
+    assert response == changes_to_dos
+    mock_compare_standard_opening_times.assert_not_called()
+    # Specified opening times are only compared once, by compare_specified_opening_times
+    mock_compare_specified_opening_times.assert_called_once_with(changes=changes_to_dos)
     changes_to_dos.service_histories.add_standard_opening_times_change.assert_not_called()
     changes_to_dos.service_histories.add_specified_opening_times_change.assert_not_called()
 
@@ -39,6 +39,7 @@ def test_service_histories_get_service_history_from_db_rows_returned() -> None:
     change = {"new_change": 123}
     service_history_data = {"history": dumps(change)}
     mock_connection.cursor.return_value.fetchall.return_value = [service_history_data]
+    mock_connection.cursor.return_value.rowcount = 1
     # Act
     service_history.get_service_history_from_db(mock_connection)
     # Assert
@@ -57,6 +58,7 @@ def test_service_histories_get_service_history_from_db_no_rows_returned() -> Non
     service_history = ServiceHistories(service_id=SERVICE_ID)
     mock_connection = MagicMock()
     mock_connection.cursor.return_value.fetchall.return_value = []
+    mock_connection.cursor.return_value.rowcount = 0
     # Act
     service_history.get_service_history_from_db(mock_connection)
     # Assert
@@ -1,6 +1,13 @@
+from collections.abc import Generator
 from datetime import date, time
+from json import loads
+from os import environ
 from unittest.mock import MagicMock, call, patch
 
+import pytest
+from psycopg import Connection, Pipeline, connect, pq
+from psycopg.errors import PipelineAborted
+
 from application.common.constants import (
     DOS_BLOOD_PRESSURE_SYMPTOM_DISCRIMINATOR,
     DOS_BLOOD_PRESSURE_SYMPTOM_GROUP,
@@ -10,8 +17,11 @@ from application.common.constants import (
     DOS_PALLIATIVE_CARE_SYMPTOM_GROUP,
 )
 from application.common.opening_times import OpenPeriod, SpecifiedOpeningTime
+from application.service_sync.data_processing.service_histories import ServiceHistories
 from application.service_sync.data_processing.update_dos import (
     save_blood_pressure_into_db,
+    save_changes_into_db,
+    save_changes_with_pipeline,
     save_contraception_into_db,
     save_demographics_into_db,
     save_palliative_care_into_db,
@@ -23,6 +33,7 @@ from application.service_sync.data_processing.update_dos import (
 FILE_PATH = "application.service_sync.data_processing.update_dos"
 
 
+@patch(f"{FILE_PATH}.deepcopy")
 @patch(f"{FILE_PATH}.log_service_updates")
 @patch(f"{FILE_PATH}.save_palliative_care_into_db")
 @patch(f"{FILE_PATH}.save_specified_opening_times_into_db")
@@ -36,10 +47,12 @@ def test_update_dos_data(
     mock_save_specified_opening_times_into_db: MagicMock,
     mock_save_palliative_care_into_db: MagicMock,
     mock_log_service_updates: MagicMock,
+    mock_deepcopy: MagicMock,
 ) -> None:
     # Arrange
     changes_to_dos = MagicMock()
     service_histories = MagicMock()
+    mock_deepcopy.return_value = service_histories
     service_id = 1
     # Act
     update_dos_data(changes_to_dos, service_id, service_histories)
@@ -66,12 +79,75 @@ def test_update_dos_data(
         is_changes=changes_to_dos.palliative_care_changes,
         palliative_care=changes_to_dos.nhs_entity.palliative_care,
     )
+    mock_deepcopy.assert_called_once_with(service_histories)
+    mock_connect_to_db_writer.return_value.__enter__.return_value.pipeline.assert_called_once_with()
     service_histories.save_service_histories.assert_called_once_with(connection=mock_connect_to_db_writer().__enter__())
     mock_connect_to_db_writer.return_value.__enter__.return_value.commit.assert_called_once()
     mock_connect_to_db_writer.return_value.__enter__.return_value.close.assert_called_once()
     mock_log_service_updates.assert_called_once_with(changes_to_dos=changes_to_dos, service_histories=service_histories)
 
 
+@patch(f"{FILE_PATH}.log_service_updates")
+@patch(f"{FILE_PATH}.save_changes_into_db")
+@patch(f"{FILE_PATH}.connect_to_db_writer")
+def test_update_dos_data_pipeline_mode_disabled(
+    mock_connect_to_db_writer: MagicMock,
+    mock_save_changes_into_db: MagicMock,
+    mock_log_service_updates: MagicMock,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # Arrange
+    monkeypatch.setenv("DB_PIPELINE_MODE", "false")
+    changes_to_dos = MagicMock()
+    service_histories = MagicMock()
+    service_id = 1
+    mock_save_changes_into_db.return_value = (True, service_histories)
+    connection = mock_connect_to_db_writer.return_value.__enter__.return_value
+    # Act
+    update_dos_data(changes_to_dos, service_id, service_histories)
+    # Assert
+    connection.pipeline.assert_not_called()
+    mock_save_changes_into_db.assert_called_once_with(
+        connection=connection,
+        changes_to_dos=changes_to_dos,
+        service_id=service_id,
+        service_histories=service_histories,
+    )
+    connection.commit.assert_called_once()
+    mock_log_service_updates.assert_called_once_with(changes_to_dos=changes_to_dos, service_histories=service_histories)
+
+
+@patch(f"{FILE_PATH}.log_service_updates")
+@patch(f"{FILE_PATH}.save_changes_into_db")
+@patch(f"{FILE_PATH}.connect_to_db_writer")
+def test_update_dos_data_pipeline_mode_error(
+    mock_connect_to_db_writer: MagicMock,
+    mock_save_changes_into_db: MagicMock,
+    mock_log_service_updates: MagicMock,
+) -> None:
+    # Arrange
+    changes_to_dos = MagicMock()
+    service_histories = MagicMock()
+    service_id = 1
+    mock_save_changes_into_db.side_effect = [PipelineAborted(), (True, service_histories)]
+    connection = mock_connect_to_db_writer.return_value.__enter__.return_value
+    # Act
+    update_dos_data(changes_to_dos, service_id, service_histories)
+    # Assert
+    connection.pipeline.assert_called_once_with()
+    connection.rollback.assert_called_once_with()
+    assert mock_save_changes_into_db.call_count == 2
+    # The retry saves the original service histories, not the copy used in pipeline mode
+    mock_save_changes_into_db.assert_called_with(
+        connection=connection,
+        changes_to_dos=changes_to_dos,
+        service_id=service_id,
+        service_histories=service_histories,
+    )
+    connection.commit.assert_called_once()
+    mock_log_service_updates.assert_called_once_with(changes_to_dos=changes_to_dos, service_histories=service_histories)
+
+
 @patch(f"{FILE_PATH}.save_palliative_care_into_db")
 @patch(f"{FILE_PATH}.save_specified_opening_times_into_db")
 @patch(f"{FILE_PATH}.save_standard_opening_times_into_db")
@@ -121,6 +197,86 @@ def test_update_dos_data_no_changes(
     mock_connect_to_db_writer.return_value.__enter__.return_value.close.assert_called_once()
 
 
+@pytest.fixture()
+def dos_test_db() -> Generator[Connection, None, None]:
+    """Connection to the DOS_TEST_DB Postgres database, with temporary tables for saving a standard opening day."""
+    if "DOS_TEST_DB" not in environ:
+        pytest.skip("DOS_TEST_DB is not set to a Postgres database to test against")
+    if not Pipeline.is_supported():
+        pytest.skip("libpq does not support pipeline mode")
+    with connect(environ["DOS_TEST_DB"]) as connection:
+        # Temporary tables are searched before the DoS tables, and are dropped when the connection closes
+        connection.execute("CREATE TEMPORARY TABLE services (id integer, modifiedby text, modifiedtime timestamp)")
+        connection.execute("CREATE TEMPORARY TABLE servicedayopenings (id serial, serviceid integer, dayid integer)")
+        connection.execute(
+            "CREATE TEMPORARY TABLE servicedayopeningtimes "
+            "(id serial, servicedayopeningid integer, starttime time, endtime time)",
+        )
+        connection.execute("CREATE TEMPORARY TABLE servicehistories (serviceid integer, history text)")
+        connection.execute("INSERT INTO services (id) VALUES (1)")
+        connection.commit()
+        yield connection
+
+
+@patch("common.dos_db_connection.record_query")
+def test_save_changes_with_pipeline_error_retried_without_pipeline(
+    mock_record_query: MagicMock,
+    dos_test_db: Connection,
+) -> None:
+    # Arrange
+    changes_to_dos = MagicMock(
+        demographic_changes={},
+        standard_opening_times_changes={1: [OpenPeriod(time(9, 0), time(17, 0))]},
+        specified_opening_times_changes=False,
+        palliative_care_changes=False,
+        blood_pressure_changes=False,
+        contraception_changes=False,
+    )
+    service_histories = ServiceHistories(service_id=1)
+    service_histories.create_service_histories_entry()
+    pipeline_statuses = []
+
+    def save_changes_failing_in_pipeline(**kwargs: object) -> tuple[bool, ServiceHistories]:
+        response = save_changes_into_db(**kwargs)
+        pipeline_statuses.append(dos_test_db.pgconn.pipeline_status)
+        if dos_test_db.pgconn.pipeline_status == pq.PipelineStatus.ON:
+            # Fails when the pipeline is synced, after every change has been sent
+            dos_test_db.execute("SELECT 1 / 0")
+        return response
+
+    # Act
+    with patch(f"{FILE_PATH}.save_changes_into_db", side_effect=save_changes_failing_in_pipeline):
+        is_changes, saved_service_histories = save_changes_with_pipeline(
+            connection=dos_test_db,
+            changes_to_dos=changes_to_dos,
+            service_id=1,
+            service_histories=service_histories,
+        )
+    dos_test_db.commit()
+    # Assert
+    assert is_changes is True
+    assert pipeline_statuses == [pq.PipelineStatus.ON, pq.PipelineStatus.OFF]
+    # The retry saved the original service histories, which the pipeline attempt did not change
+    assert saved_service_histories is service_histories
+    assert "new_change" not in service_histories.service_history
+    # Only the changes saved by the retry were committed
+    assert dos_test_db.execute("SELECT serviceid, dayid FROM servicedayopenings").fetchall() == [(1, 1)]
+    assert dos_test_db.execute("SELECT starttime, endtime FROM servicedayopeningtimes").fetchall() == [
+        (time(9, 0), time(17, 0)),
+    ]
+    (history,) = dos_test_db.execute("SELECT history FROM servicehistories").fetchone()
+    assert list(loads(history)) == list(service_histories.service_history)
+    # Queries sent in the pipeline are not recorded, as their duration and row count are not known when sent
+    assert [recorded_call.args[0].name for recorded_call in mock_record_query.call_args_list] == [
+        "delete_standard_opening_times",
+        "insert_standard_opening_day",
+        "insert_standard_opening_time",
+        "update_service_modified",
+        "insert_service_history",
+    ]
+    assert mock_record_query.call_args_list[1].args[2] == 1
+
+
 @patch(f"{FILE_PATH}.SQL")
 @patch(f"{FILE_PATH}.query_dos_db")
 def test_save_demographics_into_db(mock_query_dos_db: MagicMock, mock_sql: MagicMock) -> None:
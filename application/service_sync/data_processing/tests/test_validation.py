@@ -1,4 +1,4 @@
-from unittest.mock import MagicMock, call, patch
+from unittest.mock import MagicMock, patch
 
 import pytest
 from aws_lambda_powertools.logging import Logger
@@ -90,11 +90,15 @@ def test_validate_website_failure(mock_log_website_is_invalid: MagicMock, websit
     mock_log_website_is_invalid.assert_called_once_with(nhs_entity, website, dos_service)
 
 
-@patch(f"{FILE_PATH}.query_dos_db")
-def test_validate_z_code_exists(mock_query_dos_db: MagicMock) -> None:
+@patch(f"{FILE_PATH}.log_generic_change_event_error")
+@patch(f"{FILE_PATH}.symptom_group_symptom_discriminator_exists")
+def test_validate_z_code_exists(
+    mock_symptom_group_symptom_discriminator_exists: MagicMock,
+    mock_log_generic_change_event_error: MagicMock,
+) -> None:
     # Arrange
     mock_connection = MagicMock()
-    mock_query_dos_db.return_value.rowcount = 1
+    mock_symptom_group_symptom_discriminator_exists.return_value = True
     dos_service = MagicMock()
     # Act
     response = validate_z_code_exists(
@@ -106,26 +110,23 @@ def test_validate_z_code_exists(mock_query_dos_db: MagicMock) -> None:
     )
     # Assert
     assert True is response
-    mock_query_dos_db.assert_has_calls(
-        calls=[
-            call(
-                connection=mock_connection,
-                query=(
-                    "SELECT id FROM symptomgroupsymptomdiscriminators WHERE symptomgroupid=%(SGID)s "
-                    "AND symptomdiscriminatorid=%(SDID)s;"
-                ),
-                query_vars={"SGID": 360, "SDID": 14167},
-            ),
-            call().close(),
-        ],
+    mock_symptom_group_symptom_discriminator_exists.assert_called_once_with(
+        connection=mock_connection,
+        symptom_group_id=360,
+        symptom_discriminator_id=14167,
     )
+    mock_log_generic_change_event_error.assert_not_called()
 
 
-@patch(f"{FILE_PATH}.query_dos_db")
-def test_validate_z_code_existss_does_not_exist(mock_query_dos_db: MagicMock) -> None:
+@patch(f"{FILE_PATH}.log_generic_change_event_error")
+@patch(f"{FILE_PATH}.symptom_group_symptom_discriminator_exists")
+def test_validate_z_code_existss_does_not_exist(
+    mock_symptom_group_symptom_discriminator_exists: MagicMock,
+    mock_log_generic_change_event_error: MagicMock,
+) -> None:
     # Arrange
     mock_connection = MagicMock()
-    mock_query_dos_db.return_value.rowcount = 0
+    mock_symptom_group_symptom_discriminator_exists.return_value = False
     dos_service = MagicMock()
     # Act
     response = validate_z_code_exists(
@@ -137,16 +138,14 @@ def test_validate_z_code_existss_does_not_exist(mock_query_dos_db: MagicMock) ->
     )
     # Assert
     assert False is response
-    mock_query_dos_db.assert_has_calls(
-        calls=[
-            call(
-                connection=mock_connection,
-                query=(
-                    "SELECT id FROM symptomgroupsymptomdiscriminators WHERE symptomgroupid=%(SGID)s "
-                    "AND symptomdiscriminatorid=%(SDID)s;"
-                ),
-                query_vars={"SGID": 360, "SDID": 14167},
-            ),
-            call().close(),
-        ],
+    mock_symptom_group_symptom_discriminator_exists.assert_called_once_with(
+        connection=mock_connection,
+        symptom_group_id=360,
+        symptom_discriminator_id=14167,
+    )
+    mock_log_generic_change_event_error.assert_called_once_with(
+        "Palliative Care Z code does not exist in the DoS database",
+        "Palliative Care Z code does not exist",
+        "symptom_group_symptom_discriminator=False",
+        dos_service,
     )
@@ -1,5 +1,9 @@
+from copy import deepcopy
+from os import getenv
+
 from aws_lambda_powertools.logging import Logger
-from psycopg import Connection
+from psycopg import Connection, Pipeline
+from psycopg import Error as PsycopgError
 from psycopg.sql import SQL, Identifier, Literal
 
 from ..service_update_logger import log_service_updates
@@ -23,8 +27,54 @@ from common.constants import (
 from common.dos import DoSService
 from common.dos_db_connection import connect_to_db_writer, query_dos_db
 from common.opening_times import OpenPeriod, SpecifiedOpeningTime
+from common.query_registry import register_query
+from common.stage_metrics import time_stage
 
 logger = Logger(child=True)
+DELETE_STANDARD_OPENING_TIMES_QUERY = register_query(
+    "delete_standard_opening_times",
+    "DELETE FROM servicedayopenings WHERE serviceid=%(SERVICE_ID)s AND dayid=%(DAY_ID)s",
+)
+INSERT_STANDARD_OPENING_DAY_QUERY = register_query(
+    "insert_standard_opening_day",
+    "INSERT INTO servicedayopenings (serviceid, dayid) VALUES (%(SERVICE_ID)s, %(DAY_ID)s) RETURNING id",
+)
+INSERT_STANDARD_OPENING_TIME_QUERY = register_query(
+    "insert_standard_opening_time",
+    "INSERT INTO servicedayopeningtimes (servicedayopeningid, starttime, endtime) "
+    "VALUES (%(SERVICE_DAY_OPENING_ID)s, %(OPEN_PERIOD_START)s, %(OPEN_PERIOD_END)s);",
+)
+DELETE_SPECIFIED_OPENING_TIMES_QUERY = register_query(
+    "delete_specified_opening_times",
+    "DELETE FROM servicespecifiedopeningdates WHERE serviceid=%(SERVICE_ID)s ",
+)
+INSERT_SPECIFIED_OPENING_DATE_QUERY = register_query(
+    "insert_specified_opening_date",
+    "INSERT INTO servicespecifiedopeningdates (date,serviceid) "
+    "VALUES (%(SPECIFIED_OPENING_TIMES_DATE)s,%(SERVICE_ID)s) RETURNING id;",
+)
+INSERT_SPECIFIED_OPENING_TIME_QUERY = register_query(
+    "insert_specified_opening_time",
+    "INSERT INTO servicespecifiedopeningtimes (starttime, endtime, isclosed, servicespecifiedopeningdateid) "
+    "VALUES (%(OPEN_PERIOD_START)s, %(OPEN_PERIOD_END)s,%(IS_CLOSED)s,%(SERVICE_SPECIFIED_OPENING_DATE_ID)s);",
+)
+INSERT_SPECIFIED_CLOSED_DAY_QUERY = register_query(
+    "insert_specified_closed_day",
+    "INSERT INTO servicespecifiedopeningtimes (starttime, endtime, isclosed, servicespecifiedopeningdateid) "
+    "VALUES ('00:00:00', '00:00:00',%(IS_CLOSED)s,%(SERVICE_SPECIFIED_OPENING_DATE_ID)s);",
+)
+INSERT_SERVICE_SGSD_QUERY = register_query(
+    "insert_service_sgsd",
+    "INSERT INTO servicesgsds (serviceid, sdid, sgid) VALUES (%(SERVICE_ID)s, %(SDID)s, %(SGID)s);",
+)
+DELETE_SERVICE_SGSD_QUERY = register_query(
+    "delete_service_sgsd",
+    "DELETE FROM servicesgsds WHERE serviceid=%(SERVICE_ID)s AND sdid=%(SDID)s AND sgid=%(SGID)s;",
+)
+UPDATE_SERVICE_STATUS_QUERY = register_query(
+    "update_service_status",
+    "UPDATE services SET statusid=%(STATUS_ID)s WHERE id=%(SERVICE_ID)s;",
+)
 
 
 def update_dos_data(changes_to_dos: ChangesToDoS, service_id: int, service_histories: ServiceHistories) -> None:
@@ -39,55 +89,15 @@ def update_dos_data(changes_to_dos: ChangesToDoS, service_id: int, service_histo
     try:
         # Save all the changes to the DoS database with a single transaction
         with connect_to_db_writer() as connection:
-            is_demographic_changes = save_demographics_into_db(
-                connection=connection,
-                service_id=service_id,
-                demographics_changes=changes_to_dos.demographic_changes,
-            )
-            is_standard_opening_times_changes = save_standard_opening_times_into_db(
-                connection=connection,
-                service_id=service_id,
-                standard_opening_times_changes=changes_to_dos.standard_opening_times_changes,
-            )
-            is_specified_opening_times_changes = save_specified_opening_times_into_db(
+            is_changes, service_histories = save_changes_with_pipeline(
                 connection=connection,
+                changes_to_dos=changes_to_dos,
                 service_id=service_id,
-                is_changes=changes_to_dos.specified_opening_times_changes,
-                specified_opening_times_changes=changes_to_dos.new_specified_opening_times,
-            )
-            is_palliative_care_changes = save_palliative_care_into_db(
-                connection=connection,
-                dos_service=changes_to_dos.dos_service,
-                is_changes=changes_to_dos.palliative_care_changes,
-                palliative_care=changes_to_dos.nhs_entity.palliative_care,
-            )
-            is_blood_pressure_changes, service_histories = save_blood_pressure_into_db(
-                connection=connection,
-                dos_service=changes_to_dos.dos_service,
-                is_changes=changes_to_dos.blood_pressure_changes,
-                blood_pressure=changes_to_dos.nhs_entity.blood_pressure,
                 service_histories=service_histories,
             )
-            is_contraception_changes, service_histories = save_contraception_into_db(
-                connection=connection,
-                dos_service=changes_to_dos.dos_service,
-                is_changes=changes_to_dos.contraception_changes,
-                contraception=changes_to_dos.nhs_entity.contraception,
-                service_histories=service_histories,
-            )
-            # If there are any changes, update the service history and commit the changes to the database
-            if any(
-                [
-                    is_demographic_changes,
-                    is_standard_opening_times_changes,
-                    is_specified_opening_times_changes,
-                    is_palliative_care_changes,
-                    is_blood_pressure_changes,
-                    is_contraception_changes,
-                ],
-            ):
-                service_histories.save_service_histories(connection=connection)
-                connection.commit()
+            if is_changes:
+                with time_stage("commit"):
+                    connection.commit()
                 logger.info(f"Updates successfully committed to the DoS database for service id {service_id}")
                 log_service_updates(changes_to_dos=changes_to_dos, service_histories=service_histories)
             else:
@@ -99,6 +109,134 @@ def update_dos_data(changes_to_dos: ChangesToDoS, service_id: int, service_histo
             connection.close()
 
 
+def is_pipeline_mode_enabled() -> bool:
+    """Checks if the write transaction should be sent to the DoS database in pipeline mode.
+
+    Returns:
+        bool: True unless the DB_PIPELINE_MODE environment variable is set to false or libpq does not support it
+    """
+    return getenv("DB_PIPELINE_MODE", "true").lower() == "true" and Pipeline.is_supported()
+
+
+def save_changes_with_pipeline(
+    connection: Connection,
+    changes_to_dos: ChangesToDoS,
+    service_id: int,
+    service_histories: ServiceHistories,
+) -> tuple[bool, ServiceHistories]:
+    """Saves the changes to the DoS database in pipeline mode, falling back to one statement at a time on error.
+
+    In pipeline mode statements are sent without waiting for the result of the previous one, so the
+    transaction only waits on the database where a result is needed, e.g. the id returned by an insert.
+
+    Args:
+        connection (Connection): Connection to the DoS database
+        changes_to_dos (ChangesToDoS): Changes to the dos service
+        service_id (int): Id of service to update
+        service_histories (ServiceHistories): Service history of the service
+
+    Returns:
+        bool: True if any changes were saved, False otherwise
+        service_histories (ServiceHistories): Service history of the service
+    """
+    if is_pipeline_mode_enabled():
+        try:
+            with connection.pipeline():
+                # Saving changes the service histories, so a failed attempt must not change the ones retried with
+                return save_changes_into_db(
+                    connection=connection,
+                    changes_to_dos=changes_to_dos,
+                    service_id=service_id,
+                    service_histories=deepcopy(service_histories),
+                )
+        except PsycopgError:
+            logger.exception(f"Pipeline mode failed for service id {service_id}, retrying without pipeline mode")
+            connection.rollback()
+    return save_changes_into_db(
+        connection=connection,
+        changes_to_dos=changes_to_dos,
+        service_id=service_id,
+        service_histories=service_histories,
+    )
+
+
+def save_changes_into_db(
+    connection: Connection,
+    changes_to_dos: ChangesToDoS,
+    service_id: int,
+    service_histories: ServiceHistories,
+) -> tuple[bool, ServiceHistories]:
+    """Saves the changes and, if there are any, the service history to the DoS database without committing.
+
+    Args:
+        connection (Connection): Connection to the DoS database
+        changes_to_dos (ChangesToDoS): Changes to the dos service
+        service_id (int): Id of service to update
+        service_histories (ServiceHistories): Service history of the service
+
+    Returns:
+        bool: True if any changes were saved, False otherwise
+        service_histories (ServiceHistories): Service history of the service
+    """
+    with time_stage("save_demographics"):
+        is_demographic_changes = save_demographics_into_db(
+            connection=connection,
+            service_id=service_id,
+            demographics_changes=changes_to_dos.demographic_changes,
+        )
+    with time_stage("save_standard_opening_times"):
+        is_standard_opening_times_changes = save_standard_opening_times_into_db(
+            connection=connection,
+            service_id=service_id,
+            standard_opening_times_changes=changes_to_dos.standard_opening_times_changes,
+        )
+    with time_stage("save_specified_opening_times"):
+        is_specified_opening_times_changes = save_specified_opening_times_into_db(
+            connection=connection,
+            service_id=service_id,
+            is_changes=changes_to_dos.specified_opening_times_changes,
+            specified_opening_times_changes=changes_to_dos.new_specified_opening_times,
+        )
+    with time_stage("save_palliative_care"):
+        is_palliative_care_changes = save_palliative_care_into_db(
+            connection=connection,
+            dos_service=changes_to_dos.dos_service,
+            is_changes=changes_to_dos.palliative_care_changes,
+            palliative_care=changes_to_dos.nhs_entity.palliative_care,
+        )
+    with time_stage("save_blood_pressure"):
+        is_blood_pressure_changes, service_histories = save_blood_pressure_into_db(
+            connection=connection,
+            dos_service=changes_to_dos.dos_service,
+            is_changes=changes_to_dos.blood_pressure_changes,
+            blood_pressure=changes_to_dos.nhs_entity.blood_pressure,
+            service_histories=service_histories,
+        )
+    with time_stage("save_contraception"):
+        is_contraception_changes, service_histories = save_contraception_into_db(
+            connection=connection,
+            dos_service=changes_to_dos.dos_service,
+            is_changes=changes_to_dos.contraception_changes,
+            contraception=changes_to_dos.nhs_entity.contraception,
+            service_histories=service_histories,
+        )
+    # If there are any changes, update the service history
+    is_changes = any(
+        [
+            is_demographic_changes,
+            is_standard_opening_times_changes,
+            is_specified_opening_times_changes,
+            is_palliative_care_changes,
+            is_blood_pressure_changes,
+            is_contraception_changes,
+        ],
+    )
+    if is_changes:
+        with time_stage("save_service_histories"):
+            service_histories.save_service_histories(connection=connection)
+    return is_changes, service_histories
+
+
 def save_demographics_into_db(connection: Connection, service_id: int, demographics_changes: dict) -> bool:
     """Saves the demographic changes to the DoS database.
 
@@ -120,6 +258,7 @@ def save_demographics_into_db(connection: Connection, service_id: int, demograph
             SQL("{} = {}").format(Identifier(key), Literal(value)).as_string(connection)
             for key, value in demographics_changes.items()
         ]
+        # The columns are only known at run time, so the query is not registered and is recorded as unnamed
         query = SQL("""UPDATE services SET {} WHERE id = %(SERVICE_ID)s;""").format(SQL(", ".join(columns_and_values)))
         query_str = query.as_string(connection)
         cursor = query_dos_db(
@@ -158,7 +297,7 @@ def save_standard_opening_times_into_db(
             # servicedayopenings table and servicedayopeningtimes table
             cursor = query_dos_db(
                 connection=connection,
-                query="""DELETE FROM servicedayopenings WHERE serviceid=%(SERVICE_ID)s AND dayid=%(DAY_ID)s""",
+                query=DELETE_STANDARD_OPENING_TIMES_QUERY,
                 query_vars={"SERVICE_ID": service_id, "DAY_ID": dayid},
             )
             cursor.close()
@@ -166,10 +305,7 @@ def save_standard_opening_times_into_db(
                 logger.info(f"Saving standard opening times for dayid: {dayid}")
                 cursor = query_dos_db(
                     connection=connection,
-                    query=(
-                        """INSERT INTO servicedayopenings (serviceid, dayid) """
-                        """VALUES (%(SERVICE_ID)s, %(DAY_ID)s) RETURNING id"""
-                    ),
+                    query=INSERT_STANDARD_OPENING_DAY_QUERY,
                     query_vars={"SERVICE_ID": service_id, "DAY_ID": dayid},
                 )
                 # Get the id of the newly created servicedayopenings entry by using the RETURNING clause
@@ -181,10 +317,7 @@ def save_standard_opening_times_into_db(
                     logger.info(f"Saving standard opening times period for dayid: {dayid}, period: {open_period}")
                     cursor = query_dos_db(
                         connection=connection,
-                        query=(
-                            """INSERT INTO servicedayopeningtimes (servicedayopeningid, starttime, endtime) """
-                            """VALUES (%(SERVICE_DAY_OPENING_ID)s, %(OPEN_PERIOD_START)s, %(OPEN_PERIOD_END)s);"""
-                        ),
+                        query=INSERT_STANDARD_OPENING_TIME_QUERY,
                         query_vars={
                             "SERVICE_DAY_OPENING_ID": service_day_opening_id,
                             "OPEN_PERIOD_START": open_period.start,
@@ -222,7 +355,7 @@ def save_specified_opening_times_into_db(
         # servicedayopenings table and servicedayopeningtimes table
         cursor = query_dos_db(
             connection=connection,
-            query=("""DELETE FROM servicespecifiedopeningdates WHERE serviceid=%(SERVICE_ID)s """),
+            query=DELETE_SPECIFIED_OPENING_TIMES_QUERY,
             query_vars={"SERVICE_ID": service_id},
         )
         cursor.close()
@@ -230,10 +363,7 @@ def save_specified_opening_times_into_db(
             logger.info(f"Saving specfied opening times for: {specified_opening_times_day}")
             cursor = query_dos_db(
                 connection=connection,
-                query=(
-                    """INSERT INTO servicespecifiedopeningdates (date,serviceid) """
-                    """VALUES (%(SPECIFIED_OPENING_TIMES_DATE)s,%(SERVICE_ID)s) RETURNING id;"""
-                ),
+                query=INSERT_SPECIFIED_OPENING_DATE_QUERY,
                 query_vars={"SPECIFIED_OPENING_TIMES_DATE": specified_opening_times_day.date, "SERVICE_ID": service_id},
             )
             # Get the id of the newly created servicedayopenings entry by using the RETURNING clause
@@ -249,12 +379,7 @@ def save_specified_opening_times_into_db(
                     )
                     cursor = query_dos_db(
                         connection=connection,
-                        query=(
-                            """INSERT INTO servicespecifiedopeningtimes """
-                            """(starttime, endtime, isclosed, servicespecifiedopeningdateid) """
-                            """VALUES (%(OPEN_PERIOD_START)s, %(OPEN_PERIOD_END)s,"""
-                            """%(IS_CLOSED)s,%(SERVICE_SPECIFIED_OPENING_DATE_ID)s);"""
-                        ),
+                        query=INSERT_SPECIFIED_OPENING_TIME_QUERY,
                         query_vars={
                             "OPEN_PERIOD_START": open_period.start,
                             "OPEN_PERIOD_END": open_period.end,
@@ -267,12 +392,7 @@ def save_specified_opening_times_into_db(
                 # If the day is closed, save the single closed all day times
                 cursor = query_dos_db(
                     connection=connection,
-                    query=(
-                        """INSERT INTO servicespecifiedopeningtimes """
-                        """(starttime, endtime, isclosed, servicespecifiedopeningdateid) """
-                        """VALUES ('00:00:00', '00:00:00',"""
-                        """%(IS_CLOSED)s,%(SERVICE_SPECIFIED_OPENING_DATE_ID)s);"""
-                    ),
+                    query=INSERT_SPECIFIED_CLOSED_DAY_QUERY,
                     query_vars={
                         "IS_CLOSED": not specified_opening_times_day.is_open,
                         "SERVICE_SPECIFIED_OPENING_DATE_ID": service_specified_opening_date_id,
@@ -313,10 +433,10 @@ def save_sgsdid_update(
     }
 
     if value:
-        query = "INSERT INTO servicesgsds (serviceid, sdid, sgid) VALUES (%(SERVICE_ID)s, %(SDID)s, %(SGID)s);"
+        query = INSERT_SERVICE_SGSD_QUERY
         logger.debug(f"Setting {name} to true for service id {dos_service.id}")
     else:
-        query = "DELETE FROM servicesgsds WHERE serviceid=%(SERVICE_ID)s AND sdid=%(SDID)s AND sgid=%(SGID)s;"
+        query = DELETE_SERVICE_SGSD_QUERY
         logger.debug(f"Setting {name} to false for service id {dos_service.id}")
     cursor = query_dos_db(connection=connection, query=query, query_vars=query_vars)
     cursor.close()
@@ -397,10 +517,9 @@ def save_blood_pressure_into_db(
 
     def save_service_status_update() -> None:
         status = DOS_ACTIVE_STATUS_ID if blood_pressure else DOS_CLOSED_STATUS_ID
-        query = "UPDATE services SET statusid=%(STATUS_ID)s WHERE id=%(SERVICE_ID)s;"
         cursor = query_dos_db(
             connection=connection,
-            query=query,
+            query=UPDATE_SERVICE_STATUS_QUERY,
             query_vars={"STATUS_ID": status, "SERVICE_ID": dos_service.id},
         )
         cursor.close()
@@ -482,10 +601,9 @@ def save_contraception_into_db(
 
     def save_service_status_update() -> None:
         status = DOS_ACTIVE_STATUS_ID if contraception else DOS_CLOSED_STATUS_ID
-        query = "UPDATE services SET statusid=%(STATUS_ID)s WHERE id=%(SERVICE_ID)s;"
         cursor = query_dos_db(
             connection=connection,
-            query=query,
+            query=UPDATE_SERVICE_STATUS_QUERY,
             query_vars={"STATUS_ID": status, "SERVICE_ID": dos_service.id},
         )
         cursor.close()
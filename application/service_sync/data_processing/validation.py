@@ -11,8 +11,14 @@ from ..reporting import (
 from common.dos import DoSService
 from common.dos_db_connection import query_dos_db
 from common.nhs import NHSEntity
+from common.query_registry import register_query
+from common.reference_data import symptom_group_symptom_discriminator_exists
 
 logger = Logger(child=True)
+GET_SERVICE_SGSD_QUERY = register_query(
+    "get_service_sgsd",
+    "SELECT id FROM servicesgsds WHERE serviceid=%(SERVICE_ID)s AND sgid=%(SGID)s AND sdid=%(SDID)s;",
+)
 
 
 def validate_opening_times(dos_service: DoSService, nhs_entity: NHSEntity) -> bool:
@@ -74,13 +80,15 @@ def validate_z_code_exists_on_service(
     """
     cursor = query_dos_db(
         connection=connection,
-        query=("SELECT id FROM servicesgsds WHERE serviceid=%(SERVICE_ID)s AND sgid=%(SGID)s AND sdid=%(SDID)s;"),
+        query=GET_SERVICE_SGSD_QUERY,
         query_vars={
             "SERVICE_ID": dos_service.id,
             "SGID": symptom_group_id,
             "SDID": symptom_discriminator_id,
         },
     )
+    # Fetch the rows so the rowcount is known when the query is sent in pipeline mode
+    cursor.fetchall()
     service_sgsd_rowcount = cursor.rowcount
     cursor.close()
 
@@ -111,25 +119,20 @@ def validate_z_code_exists(
     Returns:
         bool: True if the Z code exists, False if it does not
     """
-    cursor = query_dos_db(
+    z_code_exists = symptom_group_symptom_discriminator_exists(
         connection=connection,
-        query=(
-            "SELECT id FROM symptomgroupsymptomdiscriminators "
-            "WHERE symptomgroupid=%(SGID)s AND symptomdiscriminatorid=%(SDID)s;"
-        ),
-        query_vars={"SGID": symptom_group_id, "SDID": symptom_discriminator_id},
+        symptom_group_id=symptom_group_id,
+        symptom_discriminator_id=symptom_discriminator_id,
     )
-    symptom_group_symptom_discriminator_combo_rowcount = cursor.rowcount
-    cursor.close()
 
-    if symptom_group_symptom_discriminator_combo_rowcount == 1:
+    if z_code_exists:
         logger.debug(f"{z_code_alias} Z code exists in the DoS database", z_code_alias=z_code_alias)
         return True
 
     log_generic_change_event_error(
         f"{z_code_alias} Z code does not exist in the DoS database",
         f"{z_code_alias} Z code does not exist",
-        f"symptom_group_symptom_discriminator={bool(symptom_group_symptom_discriminator_combo_rowcount)}",
+        f"symptom_group_symptom_discriminator={z_code_exists}",
         dos_service,
     )
 
@@ -1,23 +1,50 @@
+import re
+from collections.abc import Generator
 from dataclasses import dataclass
 from datetime import datetime
+from functools import cache
 from json import JSONDecodeError, dumps, loads
 from os import environ
 from time import time_ns
 from typing import Self
 
 from aws_lambda_powertools.logging import Logger
-from boto3 import client
 from psycopg import Connection
 from psycopg.rows import DictRow
 from pytz import timezone
 
 from ..service_update_logger import ServiceUpdateLogger
 from .s3 import put_content_to_s3
+from common.aws_clients import get_client
 from common.constants import DI_CHANGE_ITEMS, DOS_INTEGRATION_USER_NAME
-from common.dos_db_connection import connect_to_db_writer, query_dos_db
-from common.types import EmailFile, EmailMessage
+from common.dos_db_connection import query_dos_db
+from common.query_registry import register_query
+from common.types import EmailFile, EmailMessage, EmailMessageBatch
 
 logger = Logger(child=True)
+REJECTION_EMAIL_SUBJECT = "Your DoS Change has been rejected"
+REJECTION_EMAIL_TEMPLATE_PATH = "service_sync/reject_pending_changes/rejection-email.html"
+TEMPLATE_PLACEHOLDER = re.compile(r"\{\{(\w+)\}\}")
+# Asynchronous lambda invocations are limited to a 256 KB payload, which leaves room for the batch wrapper
+EMAIL_BATCH_MAX_PAYLOAD_SIZE = 200_000
+# Most services have no pending changes, which this answers from the changes table alone
+HAS_PENDING_CHANGES_QUERY = register_query(
+    "has_pending_changes",
+    "SELECT EXISTS (SELECT 1 FROM changes WHERE serviceid=%(SERVICE_ID)s AND approvestatus='PENDING') "
+    "AS has_pending_changes",
+)
+GET_PENDING_CHANGES_QUERY = register_query(
+    "get_pending_changes",
+    "SELECT c.id, c.value, c.creatorsname, u.email, s.typeid, s.name, s.uid, u.id AS user_id "
+    "FROM changes c INNER JOIN users u ON u.username = c.creatorsname "
+    "INNER JOIN services s ON s.id = c.serviceid "
+    "WHERE serviceid=%(SERVICE_ID)s AND approvestatus='PENDING'",
+)
+REJECT_PENDING_CHANGES_QUERY = register_query(
+    "reject_pending_changes",
+    "UPDATE changes SET approvestatus='REJECTED', modifiedtimestamp=%(TIMESTAMP)s, modifiersname=%(USER_NAME)s "
+    "WHERE id = ANY(%(CHANGE_IDS)s)",
+)
 
 
 @dataclass(repr=True)
@@ -78,23 +105,42 @@ class PendingChange:
             return False
 
 
-def check_and_remove_pending_dos_changes(service_id: str) -> None:
+def check_and_remove_pending_dos_changes(connection: Connection, service_id: str) -> None:
     """Checks for pending changes in DoS and removes them if they exist.
 
     Args:
+        connection (Connection): The connection to the DoS database
         service_id (str): The ID of the service to check
     """
-    with connect_to_db_writer() as connection:
-        pending_changes = get_pending_changes(connection=connection, service_id=service_id)
-        if pending_changes != [] and pending_changes is not None:
-            logger.info("Pending Changes to be rejected", pending_changes=pending_changes)
-            reject_pending_changes(connection=connection, pending_changes=pending_changes)
-            connection.commit()
-            log_rejected_changes(pending_changes)
-            send_rejection_emails(pending_changes)
-            logger.info("All pending changes rejected and emails sent")
-        else:
-            logger.info("No valid pending changes found")
+    if not has_pending_changes(connection=connection, service_id=service_id):
+        logger.info("No pending changes found")
+        return
+    pending_changes = get_pending_changes(connection=connection, service_id=service_id)
+    if pending_changes != [] and pending_changes is not None:
+        logger.info("Pending Changes to be rejected", pending_changes=pending_changes)
+        reject_pending_changes(connection=connection, pending_changes=pending_changes)
+        connection.commit()
+        log_rejected_changes(pending_changes)
+        send_rejection_emails(pending_changes)
+        logger.info("All pending changes rejected and emails sent")
+    else:
+        logger.info("No valid pending changes found")
+
+
+def has_pending_changes(connection: Connection, service_id: str) -> bool:
+    """Checks if a service has any pending changes, without fetching them.
+
+    Args:
+        connection (Connection): The connection to the DoS database
+        service_id (str): The ID of the service to check
+
+    Returns:
+        bool: True if the service has pending changes, False otherwise
+    """
+    cursor = query_dos_db(connection=connection, query=HAS_PENDING_CHANGES_QUERY, query_vars={"SERVICE_ID": service_id})
+    is_pending_changes: bool = cursor.fetchone()["has_pending_changes"]
+    cursor.close()
+    return is_pending_changes
 
 
 def get_pending_changes(connection: Connection, service_id: str) -> list[PendingChange] | None:
@@ -107,14 +153,8 @@ def get_pending_changes(connection: Connection, service_id: str) -> list[Pending
     Returns:
         Optional[List[Dict[str, Any]]]: A list of pending changes or None if there are no pending changes
     """
-    sql_query = (
-        "SELECT c.id, c.value, c.creatorsname, u.email, s.typeid, s.name, s.uid, u.id AS user_id "
-        "FROM changes c INNER JOIN users u ON u.username = c.creatorsname "
-        "INNER JOIN services s ON s.id = c.serviceid "
-        "WHERE serviceid=%(SERVICE_ID)s AND approvestatus='PENDING'"
-    )
     query_vars = {"SERVICE_ID": service_id}
-    cursor = query_dos_db(connection=connection, query=sql_query, query_vars=query_vars)
+    cursor = query_dos_db(connection=connection, query=GET_PENDING_CHANGES_QUERY, query_vars=query_vars)
     response_rows: list[DictRow] = cursor.fetchall()
     cursor.close()
     if not response_rows:
@@ -140,22 +180,12 @@ def reject_pending_changes(connection: Connection, pending_changes: list[Pending
         connection (connection): The connection to the DoS database
         pending_changes (List[PendingChange]): The pending change to reject
     """
-    conditions = (
-        f"id='{pending_changes[0].id}'"
-        if len(pending_changes) == 1
-        else f"""id in ({",".join(f"'{change.id}'" for change in pending_changes)})"""
-    )
-    # SQL Injection is prevented by the query only using data from DoS DB
-    sql_query = (
-        "UPDATE changes SET approvestatus='REJECTED', "  # noqa: S608
-        "modifiedtimestamp=%(TIMESTAMP)s, modifiersname=%(USER_NAME)s"
-        f""" WHERE {conditions}"""
-    )
     query_vars = {
         "USER_NAME": DOS_INTEGRATION_USER_NAME,
         "TIMESTAMP": datetime.now(timezone("Europe/London")),
+        "CHANGE_IDS": [pending_change.id for pending_change in pending_changes],
     }
-    cursor = query_dos_db(connection=connection, query=sql_query, query_vars=query_vars)
+    cursor = query_dos_db(connection=connection, query=REJECT_PENDING_CHANGES_QUERY, query_vars=query_vars)
     cursor.close()
     logger.info("Rejected pending change/s", pending_changes=pending_changes)
 
@@ -178,45 +208,120 @@ def log_rejected_changes(pending_changes: list[PendingChange]) -> None:
 def send_rejection_emails(pending_changes: list[PendingChange]) -> None:
     """Sends rejection emails to the users who created the pending changes.
 
+    The email files are uploaded to S3 as one manifest, and the emails are sent by as few asynchronous
+    send email lambda invocations as the payload size limit allows.
+
     Args:
         pending_changes (List[PendingChange]): The pending changes to send rejection emails for
     """
-    subject = "Your DoS Change has been rejected"
+    correlation_id: str = logger.get_correlation_id()
+    file_name = f"rejection-emails/rejection-emails-{time_ns()}.json"
+    email_files: list[EmailFile] = []
+    email_messages: list[EmailMessage] = []
     for pending_change in pending_changes:
-        file_name = f"rejection-emails/rejection-email-{time_ns()}.json"
         file_contents = build_change_rejection_email_contents(pending_change, file_name)
-        correlation_id: str = logger.get_correlation_id()
-        email_file = EmailFile(
-            correlation_id=correlation_id,
-            email_body=file_contents,
-            email_subject=subject,
-            user_id=pending_change.user_id,
+        email_files.append(
+            EmailFile(
+                correlation_id=correlation_id,
+                email_body=file_contents,
+                email_subject=REJECTION_EMAIL_SUBJECT,
+                user_id=pending_change.user_id,
+            ),
         )
-        logger.info("Email file created", subject=subject, user_id=pending_change.user_id)
-        put_content_to_s3(content=dumps(email_file), s3_filename=file_name)
-        logger.info("File contents uploaded to S3")
-        file_contents = file_contents.replace("{{InitiatorName}}", pending_change.creatorsname)
-        message = EmailMessage(
-            change_id=pending_change.id,
-            correlation_id=correlation_id,
-            email_body=file_contents,
-            email_subject=subject,
-            recipient_email_address=pending_change.email,
-            s3_filename=file_name,
-            user_id=pending_change.user_id,
+        email_messages.append(
+            EmailMessage(
+                change_id=pending_change.id,
+                correlation_id=correlation_id,
+                email_body=file_contents.replace("{{InitiatorName}}", pending_change.creatorsname),
+                email_subject=REJECTION_EMAIL_SUBJECT,
+                recipient_email_address=pending_change.email,
+                s3_filename=file_name,
+                user_id=pending_change.user_id,
+            ),
         )
-        logger.debug("Email message created")
-        client("lambda").invoke(
+        logger.info("Email file created", subject=REJECTION_EMAIL_SUBJECT, user_id=pending_change.user_id)
+    put_content_to_s3(content=dumps(email_files), s3_filename=file_name)
+    logger.info("File contents uploaded to S3", emails=len(email_files))
+    for email_message_batch in batch_email_messages(email_messages):
+        get_client("lambda").invoke(
             FunctionName=environ["SEND_EMAIL_LAMBDA"],
             InvocationType="Event",
-            Payload=dumps(message),
+            Payload=dumps(EmailMessageBatch(correlation_id=correlation_id, email_messages=email_message_batch)),
         )
-        logger.info("Send email lambda invoked")
+        logger.info("Send email lambda invoked", emails=len(email_message_batch))
+
+
+def batch_email_messages(
+    email_messages: list[EmailMessage],
+    max_payload_size: int = EMAIL_BATCH_MAX_PAYLOAD_SIZE,
+) -> Generator[list[EmailMessage], None, None]:
+    """Groups email messages into batches that fit in one send email lambda invocation.
+
+    Args:
+        email_messages (List[EmailMessage]): The email messages to batch
+        max_payload_size (int, optional): Maximum size in bytes of the messages in a batch.
+            Defaults to EMAIL_BATCH_MAX_PAYLOAD_SIZE.
+
+    Yields:
+        List[EmailMessage]: Batch of email messages, a message larger than the maximum is batched alone
+    """
+    batch: list[EmailMessage] = []
+    batch_size = 0
+    for email_message in email_messages:
+        message_size = len(dumps(email_message).encode())
+        if batch and batch_size + message_size > max_payload_size:
+            yield batch
+            batch = []
+            batch_size = 0
+        batch.append(email_message)
+        batch_size += message_size
+    if batch:
+        yield batch
+
+
+def parse_template(template: str) -> tuple[str, ...]:
+    """Parses a template with {{name}} placeholders, so it can be rendered without searching it again.
+
+    Args:
+        template (str): The template
+
+    Returns:
+        Tuple[str, ...]: Literal text and placeholder names alternately, starting and ending with literal text
+    """
+    return tuple(TEMPLATE_PLACEHOLDER.split(template))
+
+
+def render_template(template: tuple[str, ...], values: dict[str, str]) -> str:
+    """Renders a parsed template, leaving placeholders without a value in place.
+
+    Args:
+        template (Tuple[str, ...]): The template parsed by parse_template
+        values (Dict[str, str]): Value of each placeholder
+
+    Returns:
+        str: The rendered template
+    """
+    return "".join(
+        part if index % 2 == 0 else values.get(part, f"{{{{{part}}}}}") for index, part in enumerate(template)
+    )
+
+
+@cache
+def get_rejection_email_template() -> tuple[str, ...]:
+    """Reads and parses the rejection email template, once per lambda container.
+
+    Returns:
+        Tuple[str, ...]: The parsed template, with the newlines removed from the HTML
+    """
+    with open(REJECTION_EMAIL_TEMPLATE_PATH) as email_template:
+        return parse_template(email_template.read().replace("\n", " "))
 
 
 def build_change_rejection_email_contents(pending_change: PendingChange, file_name: str) -> str:
     """Builds the contents of the change rejection email.
 
+    The {{InitiatorName}} placeholder is left in the contents, as they are also uploaded to S3.
+
     Args:
         pending_change (PendingChange): The pending change to build the email for
         file_name (str): The name of the file to upload to S3
@@ -224,34 +329,29 @@ def build_change_rejection_email_contents(pending_change: PendingChange, file_na
     Returns:
         str: The contents of the email
     """
-    with open("service_sync/reject_pending_changes/rejection-email.html") as email_template:
-        file_contents = email_template.read()
-        email_template.close()
     email_correlation_id = f"{pending_change.uid}-{time_ns()}"
-    file_contents = file_contents.replace("{{ServiceName}}", pending_change.name)
-    file_contents = file_contents.replace("{{ServiceUid}}", pending_change.uid)
-    file_contents = file_contents.replace("{{EmailCorrelationId}}", email_correlation_id)
-    file_contents = file_contents.replace("{{DiTeamEmail}}", environ.get("TEAM_EMAIL_ADDRESS", ""))
     logger.info("Email Correlation Id", email_correlation_id=email_correlation_id, file_name=file_name)
     json_value = loads(pending_change.value)
-    for change_key, value in json_value["new"].items():
-        # Add a new change row to the table in the email
-        row = TABLE_ROW
-        row = row.replace("{{change_key}}", change_key)
-        row = row.replace("{{previous}}", str(value.get("previous")))
-        row = row.replace("{{new}}", str(value.get("data")))
-        file_contents = file_contents.replace("{{row}}", row)
-    # Remove the placeholder row
-    file_contents = file_contents.replace("{{row}}", " ")
-    # Remove the \n characters from the HTML
-    return file_contents.replace("\n", " ")
-
-
-TABLE_ROW: str = """
-        <tr>
-            <td>{{change_key}}</td>
-            <td>{{previous}}</td>
-            <td>{{new}}</td>
-        </tr>
-        {{row}}
-    """
+    # Add a row to the table in the email for each change
+    rows = [
+        render_template(
+            TABLE_ROW_TEMPLATE,
+            {"change_key": change_key, "previous": str(value.get("previous")), "new": str(value.get("data"))},
+        )
+        for change_key, value in json_value["new"].items()
+    ]
+    values = {
+        "ServiceName": pending_change.name,
+        "ServiceUid": pending_change.uid,
+        "EmailCorrelationId": email_correlation_id,
+        "DiTeamEmail": environ.get("TEAM_EMAIL_ADDRESS", ""),
+        "row": "".join(rows) or " ",
+    }
+    # Remove any \n characters the values would add to the HTML
+    return render_template(
+        get_rejection_email_template(),
+        {key: value.replace("\n", " ") for key, value in values.items()},
+    )
+
+
+TABLE_ROW_TEMPLATE = parse_template("<tr> <td>{{change_key}}</td> <td>{{previous}}</td> <td>{{new}}</td> </tr> ")
@@ -1,7 +1,8 @@
 from os import getenv
 
 from aws_lambda_powertools.logging import Logger
-from boto3 import client
+
+from common.aws_clients import get_client
 
 logger = Logger(child=True)
 
@@ -14,5 +15,5 @@ def put_content_to_s3(content: bytes, s3_filename: str) -> None:
         s3_filename (str): The filename when the file is stored in S3
     """
     bucket = getenv("SEND_EMAIL_BUCKET_NAME")
-    client("s3").put_object(Body=content, Bucket=bucket, Key=s3_filename, ServerSideEncryption="AES256")
+    get_client("s3").put_object(Body=content, Bucket=bucket, Key=s3_filename, ServerSideEncryption="AES256")
     logger.info(f"Uploaded to S3 as {s3_filename}", bucket=bucket, s3_filename=s3_filename)
@@ -1,18 +1,24 @@
 from json import dumps
 from os import environ
 from random import choices
-from unittest.mock import MagicMock, call, patch
+from unittest.mock import MagicMock, patch
 
 import pytest
 from pytz import timezone
 
 from application.service_sync.reject_pending_changes.pending_changes import (
+    HAS_PENDING_CHANGES_QUERY,
     PendingChange,
+    batch_email_messages,
     build_change_rejection_email_contents,
     check_and_remove_pending_dos_changes,
     get_pending_changes,
+    get_rejection_email_template,
+    has_pending_changes,
     log_rejected_changes,
+    parse_template,
     reject_pending_changes,
+    render_template,
     send_rejection_emails,
 )
 
@@ -101,28 +107,30 @@ def test_pending_change_is_valid_exception() -> None:
 @patch(f"{FILE_PATH}.log_rejected_changes")
 @patch(f"{FILE_PATH}.reject_pending_changes")
 @patch(f"{FILE_PATH}.get_pending_changes")
-@patch(f"{FILE_PATH}.connect_to_db_writer")
+@patch(f"{FILE_PATH}.has_pending_changes")
 def test_check_and_remove_pending_dos_changes(
-    mock_connect_to_db_writer: MagicMock,
+    mock_has_pending_changes: MagicMock,
     mock_get_pending_changes: MagicMock,
     mock_reject_pending_changes: MagicMock,
     mock_log_rejected_changes: MagicMock,
     mock_send_rejection_emails: MagicMock,
 ) -> None:
     # Arrange
+    connection = MagicMock()
     service_id = "test"
+    mock_has_pending_changes.return_value = True
     mock_get_pending_changes.return_value = get_pending_changes_response = [PendingChange(ROW)]
     # Act
-    response = check_and_remove_pending_dos_changes(service_id)
+    response = check_and_remove_pending_dos_changes(connection, service_id)
     # Assert
     assert None is response
-    mock_connect_to_db_writer.assert_called_once()
+    mock_has_pending_changes.assert_called_once_with(connection=connection, service_id=service_id)
     mock_get_pending_changes.assert_called_once_with(
-        connection=mock_connect_to_db_writer.return_value.__enter__.return_value,
+        connection=connection,
         service_id=service_id,
     )
     mock_reject_pending_changes.assert_called_once_with(
-        connection=mock_connect_to_db_writer.return_value.__enter__.return_value,
+        connection=connection,
         pending_changes=get_pending_changes_response,
     )
     mock_log_rejected_changes.assert_called_once_with(get_pending_changes_response)
@@ -133,24 +141,26 @@ def test_check_and_remove_pending_dos_changes(
 @patch(f"{FILE_PATH}.log_rejected_changes")
 @patch(f"{FILE_PATH}.reject_pending_changes")
 @patch(f"{FILE_PATH}.get_pending_changes")
-@patch(f"{FILE_PATH}.connect_to_db_writer")
+@patch(f"{FILE_PATH}.has_pending_changes")
 def test_check_and_remove_pending_dos_changes_no_pending_changes(
-    mock_connect_to_db_writer: MagicMock,
+    mock_has_pending_changes: MagicMock,
     mock_get_pending_changes: MagicMock,
     mock_reject_pending_changes: MagicMock,
     mock_log_rejected_changes: MagicMock,
     mock_send_rejection_emails: MagicMock,
 ) -> None:
     # Arrange
+    connection = MagicMock()
     service_id = "test"
+    mock_has_pending_changes.return_value = True
     mock_get_pending_changes.return_value = None
     # Act
-    response = check_and_remove_pending_dos_changes(service_id)
+    response = check_and_remove_pending_dos_changes(connection, service_id)
     # Assert
     assert None is response
-    mock_connect_to_db_writer.assert_called_once()
+    mock_has_pending_changes.assert_called_once_with(connection=connection, service_id=service_id)
     mock_get_pending_changes.assert_called_once_with(
-        connection=mock_connect_to_db_writer.return_value.__enter__.return_value,
+        connection=connection,
         service_id=service_id,
     )
     mock_reject_pending_changes.assert_not_called()
@@ -162,24 +172,26 @@ def test_check_and_remove_pending_dos_changes_no_pending_changes(
 @patch(f"{FILE_PATH}.log_rejected_changes")
 @patch(f"{FILE_PATH}.reject_pending_changes")
 @patch(f"{FILE_PATH}.get_pending_changes")
-@patch(f"{FILE_PATH}.connect_to_db_writer")
+@patch(f"{FILE_PATH}.has_pending_changes")
 def test_check_and_remove_pending_dos_changes_invalid_changes(
-    mock_connect_to_db_writer: MagicMock,
+    mock_has_pending_changes: MagicMock,
     mock_get_pending_changes: MagicMock,
     mock_reject_pending_changes: MagicMock,
     mock_log_rejected_changes: MagicMock,
     mock_send_rejection_emails: MagicMock,
 ) -> None:
     # Arrange
+    connection = MagicMock()
     service_id = "test"
+    mock_has_pending_changes.return_value = True
     mock_get_pending_changes.return_value = []
     # Act
-    response = check_and_remove_pending_dos_changes(service_id)
+    response = check_and_remove_pending_dos_changes(connection, service_id)
     # Assert
     assert None is response
-    mock_connect_to_db_writer.assert_called_once()
+    mock_has_pending_changes.assert_called_once_with(connection=connection, service_id=service_id)
     mock_get_pending_changes.assert_called_once_with(
-        connection=mock_connect_to_db_writer.return_value.__enter__.return_value,
+        connection=connection,
         service_id=service_id,
     )
     mock_reject_pending_changes.assert_not_called()
@@ -187,6 +199,50 @@ def test_check_and_remove_pending_dos_changes_invalid_changes(
     mock_send_rejection_emails.assert_not_called()
 
 
+@patch(f"{FILE_PATH}.send_rejection_emails")
+@patch(f"{FILE_PATH}.reject_pending_changes")
+@patch(f"{FILE_PATH}.get_pending_changes")
+@patch(f"{FILE_PATH}.has_pending_changes")
+def test_check_and_remove_pending_dos_changes_nothing_pending(
+    mock_has_pending_changes: MagicMock,
+    mock_get_pending_changes: MagicMock,
+    mock_reject_pending_changes: MagicMock,
+    mock_send_rejection_emails: MagicMock,
+) -> None:
+    # Arrange
+    connection = MagicMock()
+    service_id = "test"
+    mock_has_pending_changes.return_value = False
+    # Act
+    response = check_and_remove_pending_dos_changes(connection, service_id)
+    # Assert
+    assert None is response
+    mock_has_pending_changes.assert_called_once_with(connection=connection, service_id=service_id)
+    mock_get_pending_changes.assert_not_called()
+    mock_reject_pending_changes.assert_not_called()
+    mock_send_rejection_emails.assert_not_called()
+    connection.commit.assert_not_called()
+
+
+@pytest.mark.parametrize("is_pending_changes", [True, False])
+@patch(f"{FILE_PATH}.query_dos_db")
+def test_has_pending_changes(mock_query_dos_db: MagicMock, is_pending_changes: bool) -> None:
+    # Arrange
+    connection = MagicMock()
+    service_id = "test"
+    mock_query_dos_db.return_value.fetchone.return_value = {"has_pending_changes": is_pending_changes}
+    # Act
+    response = has_pending_changes(connection, service_id)
+    # Assert
+    assert is_pending_changes is response
+    mock_query_dos_db.assert_called_once_with(
+        connection=connection,
+        query=HAS_PENDING_CHANGES_QUERY,
+        query_vars={"SERVICE_ID": service_id},
+    )
+    mock_query_dos_db.return_value.close.assert_called_once_with()
+
+
 @patch(f"{FILE_PATH}.PendingChange.__repr__")
 @patch(f"{FILE_PATH}.PendingChange.is_valid")
 @patch(f"{FILE_PATH}.query_dos_db")
@@ -276,10 +332,14 @@ def test_reject_pending_changes_single_rejection(mock_query_dos_db: MagicMock, m
     mock_query_dos_db.assert_called_once_with(
         connection=connection,
         query=(
-            "UPDATE changes SET approvestatus='REJECTED', "
-            f"modifiedtimestamp=%(TIMESTAMP)s, modifiersname=%(USER_NAME)s WHERE id='{pending_change.id}'"
+            "UPDATE changes SET approvestatus='REJECTED', modifiedtimestamp=%(TIMESTAMP)s, modifiersname=%(USER_NAME)s "
+            "WHERE id = ANY(%(CHANGE_IDS)s)"
         ),
-        query_vars={"USER_NAME": "DOS_INTEGRATION", "TIMESTAMP": mock_datetime.now.return_value},
+        query_vars={
+            "USER_NAME": "DOS_INTEGRATION",
+            "TIMESTAMP": mock_datetime.now.return_value,
+            "CHANGE_IDS": [pending_change.id],
+        },
     )
 
 
@@ -303,11 +363,14 @@ def test_reject_pending_changes_multiple_rejections(mock_query_dos_db: MagicMock
     mock_query_dos_db.assert_called_once_with(
         connection=connection,
         query=(
-            "UPDATE changes SET approvestatus='REJECTED', "
-            f"modifiedtimestamp=%(TIMESTAMP)s, modifiersname=%(USER_NAME)s "
-            f"WHERE id in ('{pending_change1.id}','{pending_change2.id}','{pending_change3.id}')"
+            "UPDATE changes SET approvestatus='REJECTED', modifiedtimestamp=%(TIMESTAMP)s, modifiersname=%(USER_NAME)s "
+            "WHERE id = ANY(%(CHANGE_IDS)s)"
         ),
-        query_vars={"USER_NAME": "DOS_INTEGRATION", "TIMESTAMP": mock_datetime.now.return_value},
+        query_vars={
+            "USER_NAME": "DOS_INTEGRATION",
+            "TIMESTAMP": mock_datetime.now.return_value,
+            "CHANGE_IDS": ["Change1", "Change2", "Change3"],
+        },
     )
 
 
@@ -328,77 +391,115 @@ def test_log_rejected_changes(capsys: pytest.CaptureFixture) -> None:
     ) in captured.err
 
 
-@patch(f"{FILE_PATH}.client")
-@patch(f"{FILE_PATH}.EmailMessage")
+@patch(f"{FILE_PATH}.get_client")
 @patch(f"{FILE_PATH}.build_change_rejection_email_contents")
 @patch(f"{FILE_PATH}.time_ns")
-@patch(f"{FILE_PATH}.dumps")
-@patch("builtins.open")
 @patch(f"{FILE_PATH}.put_content_to_s3")
 def test_send_rejection_emails(
     mock_put_content_to_s3: MagicMock,
-    mock_open: MagicMock,
-    mock_dumps: MagicMock,
     mock_time_ns: MagicMock,
     mock_build_change_rejection_email_contents: MagicMock,
-    mock_email_message: MagicMock,
-    mock_client: MagicMock,
+    mock_get_client: MagicMock,
 ) -> None:
     # Arrange
     environ["SEND_EMAIL_LAMBDA"] = send_email_lambda_name = "test"
     pending_change = PendingChange(ROW)
-    pending_changes = [pending_change]
-    mock_build_change_rejection_email_contents.return_value = file_contents = "test"
+    pending_changes = [pending_change, pending_change]
+    mock_build_change_rejection_email_contents.return_value = "Dear {{InitiatorName}}"
+    file_name = f"rejection-emails/rejection-emails-{mock_time_ns.return_value}.json"
     expected_subject = "Your DoS Change has been rejected"
+    email_file = {
+        "correlation_id": None,
+        "email_body": "Dear {{InitiatorName}}",
+        "email_subject": expected_subject,
+        "user_id": pending_change.user_id,
+    }
+    email_message = {
+        "change_id": pending_change.id,
+        "correlation_id": None,
+        "email_body": f"Dear {pending_change.creatorsname}",
+        "email_subject": expected_subject,
+        "recipient_email_address": pending_change.email,
+        "s3_filename": file_name,
+        "user_id": pending_change.user_id,
+    }
     # Act
     response = send_rejection_emails(pending_changes)
     # Assert
     assert None is response
-    mock_dumps.assert_has_calls(
-        calls=[
-            call(
-                {
-                    "correlation_id": None,
-                    "user_id": pending_change.user_id,
-                    "email_body": mock_build_change_rejection_email_contents.return_value,
-                    "email_subject": expected_subject,
-                },
-            ),
-            call(mock_email_message.return_value),
-        ],
-    )
-    mock_put_content_to_s3.assert_called_once_with(
-        content=mock_dumps.return_value,
-        s3_filename=f"rejection-emails/rejection-email-{mock_time_ns.return_value}.json",
-    )
-    mock_email_message.assert_called_once_with(
-        change_id=pending_change.id,
-        correlation_id=None,
-        recipient_email_address=pending_change.email,
-        email_body=file_contents,
-        email_subject=expected_subject,
-        s3_filename=f"rejection-emails/rejection-email-{mock_time_ns.return_value}.json",
-        user_id=pending_change.user_id,
-    )
-    mock_client.assert_called_once_with("lambda")
-    mock_client.return_value.invoke.assert_called_once_with(
+    assert mock_build_change_rejection_email_contents.call_count == 2
+    mock_build_change_rejection_email_contents.assert_called_with(pending_change, file_name)
+    mock_put_content_to_s3.assert_called_once_with(content=dumps([email_file, email_file]), s3_filename=file_name)
+    mock_get_client.assert_called_once_with("lambda")
+    mock_get_client.return_value.invoke.assert_called_once_with(
         FunctionName=send_email_lambda_name,
         InvocationType="Event",
-        Payload=mock_dumps.return_value,
+        Payload=dumps({"correlation_id": None, "email_messages": [email_message, email_message]}),
     )
     # Cleanup
     del environ["SEND_EMAIL_LAMBDA"]
 
 
-@patch("builtins.open")
-def test_build_change_rejection_email_contents(mock_open: MagicMock) -> None:
+def test_batch_email_messages() -> None:
+    # Arrange
+    email_messages = [{"email_body": "a" * 30}, {"email_body": "b" * 30}, {"email_body": "c" * 100}, {}]
+    # Act
+    batches = list(batch_email_messages(email_messages, max_payload_size=100))
+    # Assert
+    assert [email_messages[:2], email_messages[2:3], email_messages[3:]] == batches
+
+
+def test_batch_email_messages_no_messages() -> None:
+    # Act & Assert
+    assert list(batch_email_messages([])) == []
+
+
+def test_render_template() -> None:
+    # Arrange
+    template = parse_template("<p>{{first}} and {{second}}</p>{{missing}}")
+    # Act
+    response = render_template(template, {"first": "1", "second": "{{first}}"})
+    # Assert
+    assert template == ("<p>", "first", " and ", "second", "</p>", "missing", "")
+    assert response == "<p>1 and {{first}}</p>{{missing}}"
+
+
+@patch(f"{FILE_PATH}.time_ns")
+@patch(f"{FILE_PATH}.get_rejection_email_template")
+def test_build_change_rejection_email_contents(
+    mock_get_rejection_email_template: MagicMock,
+    mock_time_ns: MagicMock,
+) -> None:
     # Arrange
+    environ["TEAM_EMAIL_ADDRESS"] = "team@example.com"
+    mock_get_rejection_email_template.return_value = parse_template(
+        "Dear {{InitiatorName}} {{ServiceName}} {{ServiceUid}} {{EmailCorrelationId}} {{DiTeamEmail}} {{row}}",
+    )
+    mock_time_ns.return_value = 1
     pending_change = PendingChange(ROW)
     pending_change.value = '{"new":{"cmsurl":{"previous":"test.com","data":"https://www.test.com"}}}'
     # Act
     response = build_change_rejection_email_contents(pending_change, "test_file")
     # Assert
     assert (
-        response
-        == mock_open.return_value.__enter__.return_value.read.return_value.replace.return_value.replace.return_value.replace.return_value.replace.return_value.replace.return_value.replace.return_value.replace.return_value  # noqa: E501
-    )
+        f"Dear {{{{InitiatorName}}}} {pending_change.name} {pending_change.uid} {pending_change.uid}-1 "
+        "team@example.com <tr> <td>cmsurl</td> <td>test.com</td> <td>https://www.test.com</td> </tr> "
+    ) == response
+    # Cleanup
+    del environ["TEAM_EMAIL_ADDRESS"]
+
+
+@patch("builtins.open")
+def test_get_rejection_email_template(mock_open: MagicMock) -> None:
+    # Arrange
+    get_rejection_email_template.cache_clear()
+    mock_open.return_value.__enter__.return_value.read.return_value = "<p>\n{{ServiceName}}</p>\n"
+    # Act
+    first_response = get_rejection_email_template()
+    second_response = get_rejection_email_template()
+    # Assert
+    assert first_response == ("<p> ", "ServiceName", "</p> ")
+    assert first_response is second_response
+    mock_open.assert_called_once_with("service_sync/reject_pending_changes/rejection-email.html")
+    # Cleanup
+    get_rejection_email_template.cache_clear()
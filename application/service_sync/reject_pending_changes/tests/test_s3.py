@@ -6,8 +6,8 @@ from application.service_sync.reject_pending_changes.s3 import put_content_to_s3
 FILE_PATH = "application.service_sync.reject_pending_changes.s3"
 
 
-@patch(f"{FILE_PATH}.client")
-def test_put_content_to_s3(mock_client: MagicMock) -> None:
+@patch(f"{FILE_PATH}.get_client")
+def test_put_content_to_s3(mock_get_client: MagicMock) -> None:
     # Arrange
     environ["SEND_EMAIL_BUCKET_NAME"] = bucket_name = "bucket_name"
     s3_filename = "s3_filename"
@@ -15,8 +15,8 @@ def test_put_content_to_s3(mock_client: MagicMock) -> None:
     # Act
     put_content_to_s3(content, s3_filename)
     # Assert
-    mock_client.assert_called_once_with("s3")
-    mock_client.return_value.put_object.assert_called_once_with(
+    mock_get_client.assert_called_once_with("s3")
+    mock_get_client.return_value.put_object.assert_called_once_with(
         Body=content,
         Bucket=bucket_name,
         Key=s3_filename,
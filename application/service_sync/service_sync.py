@@ -7,14 +7,16 @@ from aws_lambda_powertools.tracing import Tracer
 from aws_lambda_powertools.utilities.data_classes import SQSEvent, event_source
 from aws_lambda_powertools.utilities.data_classes.sqs_event import SQSRecord
 from aws_lambda_powertools.utilities.typing import LambdaContext
-from boto3 import client
 
 from .data_processing.check_for_change import compare_nhs_uk_and_dos_data
 from .data_processing.get_data import get_dos_service_and_history
 from .data_processing.update_dos import update_dos_data
 from .reject_pending_changes.pending_changes import check_and_remove_pending_dos_changes
-from common.middlewares import unhandled_exception_logging
+from common.aws_clients import get_client
+from common.dos_db_connection import connect_to_db_reader, connect_to_db_writer
+from common.middlewares import profiling, stage_metrics, unhandled_exception_logging
 from common.nhs import NHSEntity
+from common.stage_metrics import time_stage
 from common.types import UpdateRequest
 from common.utilities import extract_body
 
@@ -24,6 +26,8 @@ logger = Logger()
 
 @tracer.capture_lambda_handler()
 @unhandled_exception_logging
+@profiling
+@stage_metrics
 @logger.inject_lambda_context(clear_state=True)
 @event_source(data_class=SQSEvent)
 def lambda_handler(event: SQSEvent, context: LambdaContext) -> None:  # noqa: ARG001
@@ -42,22 +46,49 @@ def lambda_handler(event: SQSEvent, context: LambdaContext) -> None:  # noqa: AR
             service_id=update_request["service_id"],
         )
         service_id: str = update_request["service_id"]
-        check_and_remove_pending_dos_changes(service_id)
+        dry_run = is_dry_run()
+        # Share one connection between checking for pending changes and getting the current DoS state,
+        # a dry run only reads from DoS so doesn't take a writer connection
+        with connect_to_db_reader() if dry_run else connect_to_db_writer() as connection:
+            if not dry_run:
+                with time_stage("pending_changes"):
+                    check_and_remove_pending_dos_changes(connection=connection, service_id=service_id)
+            # Get current DoS state
+            with time_stage("get_dos_service"):
+                dos_service, service_histories = get_dos_service_and_history(
+                    connection=connection,
+                    service_id=int(service_id),
+                )
         # Set up NHS UK Service
         change_event: dict[str, Any] = update_request["change_event"]
         nhs_entity = NHSEntity(change_event)
-        # Get current DoS state
-        dos_service, service_histories = get_dos_service_and_history(service_id=int(service_id))
         # Compare NHS UK and DoS data
-        changes_to_dos = compare_nhs_uk_and_dos_data(
-            dos_service=dos_service,
-            nhs_entity=nhs_entity,
-            service_histories=service_histories,
-        )
+        with time_stage("comparison"):
+            changes_to_dos = compare_nhs_uk_and_dos_data(
+                dos_service=dos_service,
+                nhs_entity=nhs_entity,
+                service_histories=service_histories,
+            )
+        if dry_run:
+            # Report the changes instead of making them. The update request is done with, as update requests are
+            # only consumed by this deployment's service sync, and the SQS event source would delete it on return.
+            remove_sqs_message_from_queue(receipt_handle=record.receipt_handle)
+            logger.warning(
+                "Update Request Dry Run",
+                changes_to_dos=changes_to_dos.export_diff(),
+                environment=getenv("ENVIRONMENT"),
+                cloudwatch_metric_filter_matching_attribute="UpdateRequestDryRun",
+            )
+            return
         # Update Service History with changes to be made
         service_histories = changes_to_dos.service_histories
         # Update DoS data
-        update_dos_data(changes_to_dos=changes_to_dos, service_id=int(service_id), service_histories=service_histories)
+        with time_stage("update_dos"):
+            update_dos_data(
+                changes_to_dos=changes_to_dos,
+                service_id=int(service_id),
+                service_histories=service_histories,
+            )
         # Delete the message from the queue
         remove_sqs_message_from_queue(receipt_handle=record.receipt_handle)
         # Log custom metrics
@@ -76,12 +107,24 @@ def lambda_handler(event: SQSEvent, context: LambdaContext) -> None:  # noqa: AR
         )
 
 
+def is_dry_run() -> bool:
+    """Whether the lambda is running in dry run mode.
+
+    In dry run mode changes are compared against the DoS reader and logged as JSON, but pending changes are
+    not rejected and DoS is not updated. Update requests are still removed from the queue once logged.
+
+    Returns:
+        bool: True if the DRY_RUN environment variable is set to true
+    """
+    return getenv("DRY_RUN", "false").lower() == "true"
+
+
 def remove_sqs_message_from_queue(receipt_handle: str) -> None:
     """Removes the SQS message from the queue.
 
     Args:
         receipt_handle (str): The SQS message receipt handle
     """
-    sqs = client("sqs")
-    sqs.delete_message(QueueUrl=getenv("UPDATE_REQUEST_QUEUE_URL"), ReceiptHandle=receipt_handle)
+    with time_stage("sqs_delete"):
+        get_client("sqs").delete_message(QueueUrl=getenv("UPDATE_REQUEST_QUEUE_URL"), ReceiptHandle=receipt_handle)
     logger.info("Removed SQS message from queue", receipt_handle=receipt_handle)
@@ -5,7 +5,7 @@ from unittest.mock import MagicMock, patch
 from aws_lambda_powertools.logging import Logger
 from aws_lambda_powertools.utilities.typing import LambdaContext
 
-from application.service_sync.service_sync import lambda_handler, remove_sqs_message_from_queue
+from application.service_sync.service_sync import is_dry_run, lambda_handler, remove_sqs_message_from_queue
 from common.types import UpdateRequest
 
 FILE_PATH = "application.service_sync.service_sync"
@@ -47,7 +47,9 @@ SQS_EVENT = {
 @patch(f"{FILE_PATH}.compare_nhs_uk_and_dos_data")
 @patch(f"{FILE_PATH}.get_dos_service_and_history")
 @patch(f"{FILE_PATH}.NHSEntity")
+@patch(f"{FILE_PATH}.connect_to_db_writer")
 def test_lambda_handler(
+    mock_connect_to_db_writer: MagicMock,
     mock_nhs_entity: MagicMock,
     mock_get_dos_service_and_history: MagicMock,
     mock_compare_nhs_uk_and_dos_data: MagicMock,
@@ -66,9 +68,10 @@ def test_lambda_handler(
     # Act
     lambda_handler(event=SQS_EVENT, context=lambda_context)
     # Assert
-    mock_check_and_remove_pending_dos_changes.assert_called_once_with(SERVICE_ID)
+    connection = mock_connect_to_db_writer.return_value.__enter__.return_value
+    mock_check_and_remove_pending_dos_changes.assert_called_once_with(connection=connection, service_id=SERVICE_ID)
     mock_nhs_entity.assert_called_once_with(CHANGE_EVENT)
-    mock_get_dos_service_and_history.assert_called_once_with(service_id=int(SERVICE_ID))
+    mock_get_dos_service_and_history.assert_called_once_with(connection=connection, service_id=int(SERVICE_ID))
     mock_compare_nhs_uk_and_dos_data.assert_called_once_with(
         dos_service=dos_service,
         nhs_entity=nhs_entity,
@@ -84,6 +87,65 @@ def test_lambda_handler(
     del environ["ENV"]
 
 
+@patch.object(Logger, "warning")
+@patch(f"{FILE_PATH}.check_and_remove_pending_dos_changes")
+@patch(f"{FILE_PATH}.remove_sqs_message_from_queue")
+@patch(f"{FILE_PATH}.update_dos_data")
+@patch(f"{FILE_PATH}.compare_nhs_uk_and_dos_data")
+@patch(f"{FILE_PATH}.get_dos_service_and_history")
+@patch(f"{FILE_PATH}.NHSEntity")
+@patch(f"{FILE_PATH}.connect_to_db_writer")
+@patch(f"{FILE_PATH}.connect_to_db_reader")
+def test_lambda_handler_dry_run(
+    mock_connect_to_db_reader: MagicMock,
+    mock_connect_to_db_writer: MagicMock,
+    mock_nhs_entity: MagicMock,
+    mock_get_dos_service_and_history: MagicMock,
+    mock_compare_nhs_uk_and_dos_data: MagicMock,
+    mock_update_dos_data: MagicMock,
+    mock_remove_sqs_message_from_queue: MagicMock,
+    mock_check_and_remove_pending_dos_changes: MagicMock,
+    mock_logger_warning: MagicMock,
+    lambda_context: LambdaContext,
+) -> None:
+    # Arrange
+    environ["DRY_RUN"] = "true"
+    mock_get_dos_service_and_history.return_value = MagicMock(), MagicMock()
+    # Act
+    lambda_handler(event=SQS_EVENT, context=lambda_context)
+    # Assert
+    mock_connect_to_db_reader.assert_called_once_with()
+    mock_connect_to_db_writer.assert_not_called()
+    mock_get_dos_service_and_history.assert_called_once_with(
+        connection=mock_connect_to_db_reader.return_value.__enter__.return_value,
+        service_id=int(SERVICE_ID),
+    )
+    mock_check_and_remove_pending_dos_changes.assert_not_called()
+    mock_compare_nhs_uk_and_dos_data.assert_called_once()
+    mock_update_dos_data.assert_not_called()
+    # The dry run is the only consumer of its update request queue, so the update request is done with
+    mock_remove_sqs_message_from_queue.assert_called_once_with(receipt_handle=RECEIPT_HANDLE)
+    mock_logger_warning.assert_called_once_with(
+        "Update Request Dry Run",
+        changes_to_dos=mock_compare_nhs_uk_and_dos_data.return_value.export_diff.return_value,
+        environment="local",
+        cloudwatch_metric_filter_matching_attribute="UpdateRequestDryRun",
+    )
+    # Cleanup
+    del environ["DRY_RUN"]
+
+
+def test_is_dry_run() -> None:
+    # Act & Assert
+    assert is_dry_run() is False
+    environ["DRY_RUN"] = "True"
+    assert is_dry_run() is True
+    environ["DRY_RUN"] = "false"
+    assert is_dry_run() is False
+    # Cleanup
+    del environ["DRY_RUN"]
+
+
 @patch(f"{FILE_PATH}.check_and_remove_pending_dos_changes")
 @patch.object(Logger, "exception")
 @patch(f"{FILE_PATH}.remove_sqs_message_from_queue")
@@ -91,7 +153,9 @@ def test_lambda_handler(
 @patch(f"{FILE_PATH}.compare_nhs_uk_and_dos_data")
 @patch(f"{FILE_PATH}.get_dos_service_and_history")
 @patch(f"{FILE_PATH}.NHSEntity")
+@patch(f"{FILE_PATH}.connect_to_db_writer")
 def test_lambda_handler_exception(
+    mock_connect_to_db_writer: MagicMock,
     mock_nhs_entity: MagicMock,
     mock_get_dos_service_and_history: MagicMock,
     mock_compare_nhs_uk_and_dos_data: MagicMock,
@@ -108,9 +172,10 @@ def test_lambda_handler_exception(
     # Act
     lambda_handler(event=SQS_EVENT, context=lambda_context)
     # Assert
-    mock_check_and_remove_pending_dos_changes.assert_called_once_with(SERVICE_ID)
-    mock_nhs_entity.assert_called_once_with(CHANGE_EVENT)
-    mock_get_dos_service_and_history.assert_called_once_with(service_id=int(SERVICE_ID))
+    connection = mock_connect_to_db_writer.return_value.__enter__.return_value
+    mock_check_and_remove_pending_dos_changes.assert_called_once_with(connection=connection, service_id=SERVICE_ID)
+    mock_get_dos_service_and_history.assert_called_once_with(connection=connection, service_id=int(SERVICE_ID))
+    mock_nhs_entity.assert_not_called()
     mock_compare_nhs_uk_and_dos_data.assert_not_called()
     mock_update_dos_data.assert_not_called()
     mock_remove_sqs_message_from_queue.assert_not_called()
@@ -122,15 +187,15 @@ def test_lambda_handler_exception(
 
 
 @patch.object(Logger, "info")
-@patch(f"{FILE_PATH}.client")
-def test_remove_sqs_message_from_queue(mock_client: MagicMock, mock_logger_info: MagicMock) -> None:
+@patch(f"{FILE_PATH}.get_client")
+def test_remove_sqs_message_from_queue(mock_get_client: MagicMock, mock_logger_info: MagicMock) -> None:
     # Arrange
     environ["UPDATE_REQUEST_QUEUE_URL"] = update_request_queue_url = "update_request_queue_url"
     # Act
     remove_sqs_message_from_queue(receipt_handle=RECEIPT_HANDLE)
     # Assert
-    mock_client.assert_called_once_with("sqs")
-    mock_client.return_value.delete_message.assert_called_once_with(
+    mock_get_client.assert_called_once_with("sqs")
+    mock_get_client.return_value.delete_message.assert_called_once_with(
         QueueUrl=update_request_queue_url,
         ReceiptHandle=RECEIPT_HANDLE,
     )
@@ -0,0 +1,187 @@
+-- Minimal DoS database for running the lambdas locally.
+-- Only the tables and columns read or written by the lambdas are created,
+-- with reference data and one pharmacy matching test_resources/STANDARD_EVENT.json.
+DROP SCHEMA IF EXISTS pathwaysdos CASCADE;
+CREATE SCHEMA pathwaysdos;
+SET search_path TO pathwaysdos;
+
+CREATE TABLE servicetypes (
+    id integer PRIMARY KEY,
+    "name" varchar(255) NOT NULL,
+    nationalranking varchar(255),
+    searchcapacitystatus boolean,
+    capacitymodel varchar(255),
+    capacityreset varchar(255)
+);
+
+CREATE TABLE servicestatuses (
+    id integer PRIMARY KEY,
+    "name" varchar(255) NOT NULL
+);
+
+CREATE TABLE services (
+    id serial PRIMARY KEY,
+    uid varchar(255) NOT NULL,
+    "name" varchar(255),
+    odscode varchar(255),
+    openallhours boolean DEFAULT false,
+    address varchar(512),
+    town varchar(255),
+    postcode varchar(16),
+    easting integer,
+    northing integer,
+    latitude double precision,
+    longitude double precision,
+    publicphone varchar(255),
+    publicname varchar(255),
+    web varchar(255),
+    typeid integer REFERENCES servicetypes (id),
+    statusid integer REFERENCES servicestatuses (id),
+    parentid integer REFERENCES services (id),
+    createdtime timestamp with time zone DEFAULT now(),
+    modifiedtime timestamp with time zone DEFAULT now(),
+    modifiedby varchar(255)
+);
+CREATE INDEX services_odscode_idx ON services (odscode varchar_pattern_ops);
+
+CREATE TABLE locations (
+    id serial PRIMARY KEY,
+    postcode varchar(16) NOT NULL,
+    easting integer,
+    northing integer,
+    postaltown varchar(255),
+    latitude double precision,
+    longitude double precision
+);
+CREATE INDEX locations_postcode_idx ON locations (postcode);
+
+CREATE TABLE openingtimedays (
+    id integer PRIMARY KEY,
+    "name" varchar(255) NOT NULL
+);
+
+CREATE TABLE servicedayopenings (
+    id serial PRIMARY KEY,
+    serviceid integer NOT NULL REFERENCES services (id),
+    dayid integer NOT NULL REFERENCES openingtimedays (id)
+);
+
+CREATE TABLE servicedayopeningtimes (
+    id serial PRIMARY KEY,
+    servicedayopeningid integer NOT NULL REFERENCES servicedayopenings (id) ON DELETE CASCADE,
+    starttime time NOT NULL,
+    endtime time NOT NULL
+);
+
+CREATE TABLE servicespecifiedopeningdates (
+    id serial PRIMARY KEY,
+    "date" date NOT NULL,
+    serviceid integer NOT NULL REFERENCES services (id)
+);
+
+CREATE TABLE servicespecifiedopeningtimes (
+    id serial PRIMARY KEY,
+    starttime time NOT NULL,
+    endtime time NOT NULL,
+    isclosed boolean NOT NULL,
+    servicespecifiedopeningdateid integer NOT NULL REFERENCES servicespecifiedopeningdates (id) ON DELETE CASCADE
+);
+
+CREATE TABLE symptomdiscriminators (
+    id integer PRIMARY KEY,
+    description varchar(255)
+);
+
+CREATE TABLE symptomgroupsymptomdiscriminators (
+    id integer PRIMARY KEY,
+    symptomgroupid integer NOT NULL,
+    symptomdiscriminatorid integer NOT NULL REFERENCES symptomdiscriminators (id)
+);
+
+CREATE TABLE servicesgsds (
+    id serial PRIMARY KEY,
+    serviceid integer NOT NULL REFERENCES services (id),
+    sdid integer NOT NULL,
+    sgid integer NOT NULL
+);
+
+CREATE TABLE servicehistories (
+    serviceid integer PRIMARY KEY REFERENCES services (id),
+    history text NOT NULL
+);
+
+CREATE TABLE users (
+    id serial PRIMARY KEY,
+    username varchar(255) NOT NULL UNIQUE,
+    email varchar(255)
+);
+
+CREATE TABLE changes (
+    id varchar(255) PRIMARY KEY,
+    approvestatus varchar(255) NOT NULL,
+    "type" varchar(255),
+    initiatorname varchar(255),
+    "name" varchar(255),
+    servicename varchar(255),
+    value text,
+    createdtimestamp timestamp with time zone,
+    creatorsname varchar(255),
+    modifiedtimestamp timestamp with time zone,
+    modifiersname varchar(255),
+    serviceid integer REFERENCES services (id),
+    approvedby varchar(255),
+    approvedtimestamp timestamp with time zone,
+    externalref varchar(255)
+);
+
+-- Lets service sync check a service for pending changes from the index alone
+CREATE INDEX changes_serviceid_approvestatus_idx ON changes (serviceid, approvestatus);
+
+INSERT INTO servicetypes (id, "name") VALUES
+    (13, 'Pharmacy'),
+    (131, 'Community Pharmacy'),
+    (132, 'Distance Selling Pharmacy'),
+    (134, 'Dispensing Appliance Contractor'),
+    (137, 'Extended Hours Pharmacy'),
+    (148, 'NHS Community Blood Pressure Check service'),
+    (149, 'NHS Community Pharmacy Contraception service');
+
+INSERT INTO servicestatuses (id, "name") VALUES (1, 'active'), (2, 'closed'), (3, 'commissioning');
+
+INSERT INTO openingtimedays (id, "name") VALUES
+    (1, 'Monday'),
+    (2, 'Tuesday'),
+    (3, 'Wednesday'),
+    (4, 'Thursday'),
+    (5, 'Friday'),
+    (6, 'Saturday'),
+    (7, 'Sunday'),
+    (8, 'BankHoliday');
+
+INSERT INTO symptomdiscriminators (id, description) VALUES
+    (14167, 'Pharmacy Palliative Care Medication Stockholder'),
+    (14207, 'Blood Pressure'),
+    (14210, 'Contraception');
+
+INSERT INTO symptomgroupsymptomdiscriminators (id, symptomgroupid, symptomdiscriminatorid) VALUES
+    (10000, 360, 14167),
+    (10001, 360, 14207),
+    (10002, 360, 14210);
+
+INSERT INTO locations (postcode, easting, northing, postaltown, latitude, longitude) VALUES
+    ('TE5 7ER', 391000, 156000, 'BATH', 51.301, -2.131);
+
+INSERT INTO services (id, uid, "name", odscode, typeid, statusid) VALUES (1, '1', 'South West', NULL, 13, 1);
+
+INSERT INTO services (
+    id, uid, "name", odscode, address, town, postcode, easting, northing, latitude, longitude,
+    publicphone, publicname, web, typeid, statusid, parentid
+) VALUES (
+    2, '100002', 'Fake Pharmacy', 'TES73', 'Old Address$Bath', 'BATH', 'TE5 7ER', 391000, 156000, 51.301, -2.131,
+    '0100 000 0000', 'Fake Pharmacy', 'www.example.com', 13, 1, 1
+);
+
+INSERT INTO servicedayopenings (serviceid, dayid) VALUES (2, 1);
+INSERT INTO servicedayopeningtimes (servicedayopeningid, starttime, endtime) VALUES (1, '09:00', '17:00');
+
+SELECT setval(pg_get_serial_sequence('services', 'id'), (SELECT max(id) FROM services));
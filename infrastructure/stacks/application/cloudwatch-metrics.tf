@@ -119,6 +119,21 @@ resource "aws_cloudwatch_log_metric_filter" "email_failed" {
   }
 }
 
+resource "aws_cloudwatch_log_metric_filter" "email_requeue_failed" {
+  name           = "${var.project_id}-${var.blue_green_environment}-email-requeue-failed"
+  pattern        = "{ $.cloudwatch_metric_filter_matching_attribute = \"EmailRequeueFailed\" }"
+  log_group_name = module.send_email_lambda.lambda_cloudwatch_log_group_name
+
+  metric_transformation {
+    name      = "EmailRequeueFailed"
+    namespace = "uec-dos-int"
+    value     = "1"
+    dimensions = {
+      environment = "$.environment"
+    }
+  }
+}
+
 resource "aws_cloudwatch_log_metric_filter" "invalid_open_times" {
   name           = "${var.project_id}-${var.blue_green_environment}-invalid-open-times"
   pattern        = "{ $.cloudwatch_metric_filter_matching_attribute = \"InvalidOpenTimes\" }"
@@ -180,6 +195,21 @@ resource "aws_cloudwatch_log_metric_filter" "dos_all_service_update" {
   }
 }
 
+resource "aws_cloudwatch_log_metric_filter" "change_event_superseded" {
+  name           = "${var.project_id}-${var.blue_green_environment}-change-event-superseded"
+  pattern        = "{ $.cloudwatch_metric_filter_matching_attribute = \"ChangeEventSuperseded\" }"
+  log_group_name = module.service_matcher_lambda.lambda_cloudwatch_log_group_name
+
+  metric_transformation {
+    name      = "ChangeEventSuperseded"
+    namespace = "uec-dos-int"
+    value     = 1
+    dimensions = {
+      environment = "$.environment"
+    }
+  }
+}
+
 resource "aws_cloudwatch_log_metric_filter" "update_request_sent" {
   name           = "${var.project_id}-${var.blue_green_environment}-update-request-sent"
   pattern        = "{ $.cloudwatch_metric_filter_matching_attribute = \"UpdateRequestSent\" }"
@@ -195,6 +225,21 @@ resource "aws_cloudwatch_log_metric_filter" "update_request_sent" {
   }
 }
 
+resource "aws_cloudwatch_log_metric_filter" "update_request_failed" {
+  name           = "${var.project_id}-${var.blue_green_environment}-update-request-failed"
+  pattern        = "{ $.cloudwatch_metric_filter_matching_attribute = \"UpdateRequestFailed\" }"
+  log_group_name = module.service_matcher_lambda.lambda_cloudwatch_log_group_name
+
+  metric_transformation {
+    name      = "UpdateRequestFailed"
+    namespace = "uec-dos-int"
+    value     = 1
+    dimensions = {
+      environment = "$.environment"
+    }
+  }
+}
+
 resource "aws_cloudwatch_log_metric_filter" "update_request_success" {
   name           = "${var.project_id}-${var.blue_green_environment}-update-request-success"
   pattern        = "{ $.cloudwatch_metric_filter_matching_attribute = \"UpdateRequestSuccess\" }"
@@ -235,6 +235,15 @@ data "aws_iam_policy_document" "send_email_policy" {
       "arn:aws:secretsmanager:${var.aws_region}:${var.aws_account_id}:secret:${var.project_deployment_secrets}",
     ]
   }
+  statement {
+    effect = "Allow"
+    actions = [
+      "lambda:InvokeFunction",
+    ]
+    resources = [
+      "arn:aws:lambda:${var.aws_region}:${var.aws_account_id}:function:${var.send_email_lambda}",
+    ]
+  }
 }
 
 data "aws_iam_policy_document" "service_matcher_policy" {
@@ -282,6 +291,15 @@ data "aws_iam_policy_document" "service_matcher_policy" {
       data.aws_kms_key.signing_key.arn,
     ]
   }
+  statement {
+    effect = "Allow"
+    actions = [
+      "s3:PutObject",
+    ]
+    resources = [
+      "arn:aws:s3:::${var.profiles_bucket_name}/*",
+    ]
+  }
 }
 
 data "aws_iam_policy_document" "service_sync_policy" {
@@ -300,6 +318,7 @@ data "aws_iam_policy_document" "service_sync_policy" {
     effect = "Allow"
     actions = [
       "kms:Decrypt",
+      "kms:GenerateDataKey*",
     ]
     resources = [
       data.aws_kms_key.signing_key.arn,
@@ -367,6 +386,15 @@ data "aws_iam_policy_document" "service_sync_policy" {
       "arn:aws:lambda:${var.aws_region}:${var.aws_account_id}:function:${var.send_email_lambda}",
     ]
   }
+  statement {
+    effect = "Allow"
+    actions = [
+      "s3:PutObject",
+    ]
+    resources = [
+      "arn:aws:s3:::${var.profiles_bucket_name}/*",
+    ]
+  }
 }
 
 data "aws_iam_policy_document" "slack_messenger_policy" {
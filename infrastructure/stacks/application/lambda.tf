@@ -266,7 +266,7 @@ module "service_matcher_lambda" {
   create_package                 = false
   image_uri                      = "${var.docker_registry}/${var.service_matcher}:${var.service_matcher_version}"
   package_type                   = "Image"
-  timeout                        = 10
+  timeout                        = 30
   memory_size                    = 192
   architectures                  = ["arm64"]
   kms_key_arn                    = data.aws_kms_key.signing_key.arn
@@ -306,6 +306,8 @@ module "service_matcher_lambda" {
     "DB_READER_SERVER"                   = var.dos_db_reader_route_53
     "DB_WRITER_SERVER"                   = var.dos_db_writer_route_53
     "DB_SCHEMA"                          = var.dos_db_schema
+    "PROFILING_SAMPLE_RATE"              = var.lambda_profiling_sample_rate
+    "PROFILES_BUCKET_NAME"               = var.profiles_bucket_name
   }
 }
 
@@ -366,6 +368,9 @@ module "service_sync_lambda" {
     "TEAM_EMAIL_ADDRESS"                 = local.project_team_email_address
     "SYSTEM_EMAIL_ADDRESS"               = local.project_system_email_address
     "SEND_EMAIL_LAMBDA_NAME"             = var.send_email_lambda
+    "DRY_RUN"                            = var.service_sync_dry_run
+    "PROFILING_SAMPLE_RATE"              = var.lambda_profiling_sample_rate
+    "PROFILES_BUCKET_NAME"               = var.profiles_bucket_name
   }
 }
 
@@ -138,6 +138,11 @@ variable "send_email_bucket_name" {
   description = "Name of the bucket to temporarily store emails to be sent"
 }
 
+variable "profiles_bucket_name" {
+  type        = string
+  description = "Name of the bucket to store lambda invocation profiles"
+}
+
 # ##############
 # # FIREHOSE
 # ##############
@@ -493,6 +498,18 @@ variable "odscode_starting_character" {
   description = "The starting character of the ods code"
 }
 
+variable "service_sync_dry_run" {
+  type        = bool
+  description = "Whether service sync compares and logs changes without rejecting pending changes or updating DoS"
+  default     = false
+}
+
+variable "lambda_profiling_sample_rate" {
+  type        = number
+  description = "Fraction of service matcher and service sync invocations to profile, from 0 to 1"
+  default     = 0
+}
+
 # ############################
 # # IAM
 # ############################
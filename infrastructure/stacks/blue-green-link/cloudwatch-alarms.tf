@@ -117,6 +117,23 @@ resource "aws_cloudwatch_metric_alarm" "high_number_of_failed_emails_alert" {
   threshold                 = "1"
 }
 
+resource "aws_cloudwatch_metric_alarm" "failed_email_requeue_alert" {
+  count                     = can(regex("ds-*", var.blue_green_environment)) ? 0 : 1
+  alarm_actions             = [data.aws_sns_topic.sns_topic_app_alerts_for_slack_default_region.arn]
+  alarm_description         = "Alert for when a failed email could not be requeued and needs resending"
+  alarm_name                = "${var.project_id} | ${var.blue_green_environment} | Failed Email Requeue"
+  comparison_operator       = "GreaterThanOrEqualToThreshold"
+  datapoints_to_alarm       = "1"
+  dimensions                = { environment = var.blue_green_environment }
+  evaluation_periods        = "1"
+  insufficient_data_actions = []
+  metric_name               = "EmailRequeueFailed"
+  namespace                 = "uec-dos-int"
+  period                    = "120" # 2 minutes
+  statistic                 = "Sum"
+  threshold                 = "1"
+}
+
 resource "aws_cloudwatch_metric_alarm" "average_message_latency_alert" {
   count                     = can(regex("ds-*", var.blue_green_environment)) ? 0 : 1
   alarm_actions             = [data.aws_sns_topic.sns_topic_app_alerts_for_slack_default_region.arn]
@@ -27,6 +27,34 @@ module "di_send_email_bucket" {
   ]
 }
 
+module "di_profiles_bucket" {
+  source             = "../../modules/s3"
+  name               = var.profiles_bucket_name
+  project_id         = var.project_id
+  versioning_enabled = "false"
+  force_destroy      = "true"
+
+  logging = {
+    target_bucket = module.di_logs_bucket.s3_bucket_id
+    target_prefix = "s3/profiles_bucket/"
+  }
+
+  server_side_encryption_configuration = {
+    rule = [{
+      apply_server_side_encryption_by_default = {
+        kms_master_key_id = aws_kms_key.signing_key.id
+        sse_algorithm     = "aws:kms"
+      }
+    }]
+  }
+  lifecycle_days_to_expiration = "30"
+  lifecycle_expiration_enabled = "true"
+
+  depends_on = [
+    module.di_logs_bucket
+  ]
+}
+
 module "di_logs_bucket" {
   source             = "../../modules/s3"
   name               = var.logs_bucket_name
@@ -51,12 +79,13 @@ data "aws_iam_policy_document" "logging_bucket" {
 
     resources = [
       "arn:aws:s3:::${var.logs_bucket_name}/*",
-      "arn:aws:s3:::${var.logs_bucket_name}/s3/send_email_bucket/*"
+      "arn:aws:s3:::${var.logs_bucket_name}/s3/send_email_bucket/*",
+      "arn:aws:s3:::${var.logs_bucket_name}/s3/profiles_bucket/*"
     ]
     condition {
       test     = "ArnLike"
       variable = "aws:SourceArn"
-      values   = ["arn:aws:s3:::${var.send_email_bucket_name}"]
+      values   = ["arn:aws:s3:::${var.send_email_bucket_name}", "arn:aws:s3:::${var.profiles_bucket_name}"]
     }
     condition {
       test     = "StringEquals"
@@ -120,6 +120,11 @@ variable "send_email_bucket_name" {
   description = "Name of the bucket to temporarily store emails to be sent"
 }
 
+variable "profiles_bucket_name" {
+  type        = string
+  description = "Name of the bucket to store lambda invocation profiles"
+}
+
 variable "logs_bucket_name" {
   type        = string
   description = "Name of the bucket to store logs"
@@ -8,6 +8,20 @@ class OdsCodes:
 
     invalid_ods_codes: list[list[str]] | None = None
     valid_ods_codes: list[list[str]] | None = None
+    # ODS codes by file name, used instead of the files in offline mode
+    generated_ods_codes: dict[str, list[list[str]]] | None = None
+
+    def use_generated_ods_codes(self: Self, valid_ods_codes: list[str], invalid_ods_codes: list[str]) -> None:
+        """Use generated ods codes, such as those of the local API stand-in, instead of the ods code files.
+
+        Args:
+            valid_ods_codes (list[str]): The ods codes that match a DoS service
+            invalid_ods_codes (list[str]): The ods codes that match no DoS service
+        """
+        self.generated_ods_codes = {
+            "valid_ods_codes.csv": [[odscode] for odscode in valid_ods_codes],
+            "invalid_ods_codes.csv": [[odscode] for odscode in invalid_ods_codes],
+        }
 
     def get_ods_codes_from_file(self: Self, ods_code_file: str) -> list[list[str]]:
         """Get the ods codes from a file.
@@ -37,7 +51,11 @@ class OdsCodes:
             Tuple[str, list[list[str]]]: The odscode and the list of ods codes
         """
         if odscode_list is None or len(odscode_list) == 0:
-            odscode_list = self.get_ods_codes_from_file(ods_code_file_name)
+            odscode_list = (
+                list(self.generated_ods_codes[ods_code_file_name])
+                if self.generated_ods_codes is not None
+                else self.get_ods_codes_from_file(ods_code_file_name)
+            )
         odscode_list_of_one = choice(odscode_list)
         odscode_list.remove(odscode_list_of_one)
         return odscode_list_of_one[0], odscode_list
@@ -4,7 +4,8 @@ from locust import FastHttpUser, task
 
 from functions.api import send_change_event
 from functions.change_event import ChangeEvent
-from functions.utilities import get_api_key
+from functions.ods_codes import ODS_CODES
+from functions.utilities import get_api_key, is_offline_mode
 
 
 class PerformanceTest(FastHttpUser):
@@ -18,8 +19,14 @@ class PerformanceTest(FastHttpUser):
     payload: dict[str, Any]
 
     def on_start(self: Self) -> None:
-        """Get the api key before starting the test."""
+        """Get the api key before starting the test.
+
+        In offline mode the ods codes are the generated ods codes of the local API stand-in.
+        """
         self.api_key = get_api_key()
+        if is_offline_mode() and ODS_CODES.generated_ods_codes is None:
+            ods_codes = self.client.get("/ods-codes", name="OdsCodes").json()
+            ODS_CODES.use_generated_ods_codes(ods_codes["valid"], ods_codes["invalid"])
 
     @task(3)
     def all_updates_change_event(self: Self) -> None:
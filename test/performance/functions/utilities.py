@@ -3,8 +3,18 @@ from os import getenv
 
 from .aws import get_secret
 
+# API key of the local API stand-in (python -m benchmarks.api_stand_in) the tests send to in offline mode
+OFFLINE_API_KEY = "performance-test"
+
+
+def is_offline_mode() -> bool:
+    """Check if the tests target the local API stand-in rather than a deployed environment."""
+    return getenv("OFFLINE_MODE", "false").lower() == "true"
+
 
 def get_api_key() -> str:
-    """Get the api key from AWS secrets manager."""
+    """Get the api key from AWS secrets manager, or the local API stand-in api key in offline mode."""
+    if is_offline_mode():
+        return getenv("OFFLINE_API_KEY", OFFLINE_API_KEY)
     api_key_json = get_secret(getenv("API_KEY_SECRET"))
     return loads(api_key_json)[getenv("NHS_UK_API_KEY")]